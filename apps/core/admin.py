@@ -1,6 +1,6 @@
 # apps/core/admin.py
 from django.contrib import admin
-from .models import Location, InstagramReel, UserLocation
+from .models import Location, InstagramReel, UserLocation, BackgroundJob, GeocodeCache
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
     list_display = ('name', 'location_type', 'category', 'is_instagram_source', 'created_at')
@@ -64,4 +64,21 @@ class InstagramReelAdmin(admin.ModelAdmin):
     list_display = ('url', 'created_by', 'date_posted', 'likes', 'comments')
     list_filter = ('date_posted', 'created_at')
     search_fields = ('url', 'description')
-    readonly_fields = ('date_extracted', 'created_at')
\ No newline at end of file
+    readonly_fields = ('date_extracted', 'created_at')
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job_type', 'status', 'user', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('job_type', 'status', 'created_at')
+    search_fields = ('id', 'user__username')
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'locked_by', 'locked_at')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+@admin.register(GeocodeCache)
+class GeocodeCacheAdmin(admin.ModelAdmin):
+    list_display = ('name', 'latitude', 'longitude', 'source', 'created_at')
+    list_filter = ('source', 'created_at')
+    search_fields = ('name', 'normalized_name', 'address')
+    readonly_fields = ('normalized_name', 'created_at', 'updated_at')
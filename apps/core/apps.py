@@ -11,19 +11,12 @@ class CoreConfig(AppConfig):
         Initialize any app-specific settings here.
         This is called when Django starts.
         """
-        try:
-            # Import and initialize Firebase Admin SDK
-            import firebase_admin
-            from firebase_admin import credentials
-            from django.conf import settings
+        from django.conf import settings
+        from . import signals  # connects the model signal receivers
+        from . import sqlite_tuning  # applies SQLITE_PRAGMAS to new connections
+
+        # Firebase is initialized lazily by FirebaseService.db; management
+        # commands and workers that never touch the RTDB skip it entirely
+        if getattr(settings, 'FIREBASE_EAGER_INIT', False):
             from .services.firebase_service import FirebaseService
-            FirebaseService()
-            if not firebase_admin._apps:
-                cred = credentials.Certificate(settings.FIREBASE_ADMIN_SDK_PATH)
-                firebase_admin.initialize_app(cred, {
-                    'databaseURL': settings.FIREBASE_CONFIG['databaseURL']
-                })
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            print(f"Warning: Could not initialize Firebase: {e}")
\ No newline at end of file
+            FirebaseService.warm_up()
@@ -0,0 +1,73 @@
+# apps/core/conditional.py
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+import hashlib
+
+def make_etag(token: str, request) -> str:
+    """Strong ETag for one representation of the data identified by ``token``.
+
+    The full path (cursor, page size, ``fields``, ``stream``) and the
+    negotiated media type are mixed in, so different pages and formats of
+    the same data never share a validator.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(token.encode('utf-8'))
+    digest.update(request.get_full_path().encode('utf-8'))
+    digest.update(str(getattr(request, 'accepted_media_type', '')).encode('utf-8'))
+    return f'"{digest.hexdigest()}"'
+
+def conditional_response(
+    request,
+    token: str,
+    last_modified: Optional[datetime],
+    render: Callable[[], object],
+    cache_control: Optional[Dict] = None
+):
+    """304 if the client's validators match, else ``render()`` with validators set.
+
+    ``cache_control`` defaults to ``private, no-cache``: per-user data that
+    caches may store but must revalidate.
+    """
+    etag = make_etag(token, request)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+        if response.status_code != 200:
+            return response
+
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    patch_cache_control(response, **(cache_control or {'private': True, 'no_cache': True}))
+    return response
+
+def conditional(validators: Callable[..., Optional[Tuple[str, Optional[datetime]]]]):
+    """Add ETag/Last-Modified to a viewset GET handler and answer 304s.
+
+    ``validators(view, request, *args, **kwargs)`` returns ``(token,
+    last_modified)`` or None to skip conditional handling. It runs before the
+    handler, so a matching ``If-None-Match`` / ``If-Modified-Since`` is
+    answered without reading or serializing the payload.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return method(self, request, *args, **kwargs)
+
+            found = validators(self, request, *args, **kwargs)
+            if found is None:
+                return method(self, request, *args, **kwargs)
+
+            token, last_modified = found
+            return conditional_response(
+                request, token, last_modified,
+                lambda: method(self, request, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
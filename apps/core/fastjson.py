@@ -0,0 +1,47 @@
+# apps/core/fastjson.py
+"""orjson-backed JSON encoding shared by the API renderer, parser and cache layer.
+
+datetime, date, time, UUID and dataclasses are handled natively by orjson.
+Everything else DRF's encoder accepts (lazy strings, Decimals, querysets,
+generic iterables) goes through ``_default``.
+"""
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+import datetime
+import decimal
+import orjson
+
+DUMPS_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+JSONDecodeError = orjson.JSONDecodeError
+
+def _default(obj):
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # Serializers coerce decimals to strings unless told otherwise
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    if hasattr(obj, '__str__') and type(obj).__str__ is not object.__str__:
+        # ipaddress objects and the like
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes"""
+    options = DUMPS_OPTIONS | orjson.OPT_INDENT_2 if indent else DUMPS_OPTIONS
+    return orjson.dumps(obj, default=_default, option=options)
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    return orjson.loads(data)
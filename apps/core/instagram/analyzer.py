@@ -1,11 +1,12 @@
 # apps/core/instagram/analyzer.py
 import requests
 import re
-import html
+import codecs
 import json
 import time
 from datetime import datetime
 from typing import Optional, Dict, Tuple, List
+from .text_cleaner import extract_metadata_and_clean
 
 class InstagramReelAnalyzer:
     def __init__(self, google_api_key: str):
@@ -28,8 +29,21 @@ class InstagramReelAnalyzer:
             return reel_data
         return None
 
+OG_DESCRIPTION_RE = re.compile(r'<meta property="og:description" content="([^"]+)"')
+OG_DESCRIPTION_PREFIX = '<meta property="og:description" content="'
+HEAD_END = '</head>'
+
 class InstagramReelDescriptionExtractor:
-    def __init__(self):
+    STREAM_CHUNK_SIZE = 8192
+
+    def __init__(self, stream: bool = True):
+        """
+        stream: read the page incrementally and stop as soon as the
+        og:description tag (or the end of <head>) has been seen, instead
+        of downloading the whole document.
+        """
+        self.stream = stream
+        self.last_bytes_read = 0
         self.session = requests.Session()
         self.session.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -47,91 +61,63 @@ class InstagramReelDescriptionExtractor:
 
     def _extract_metadata_and_clean(self, text: str) -> Tuple[str, Dict]:
         """Extract metadata and clean text in one pass"""
-        metadata = {
-            'likes': None,
-            'comments': None,
-            'date': None
-        }
+        return extract_metadata_and_clean(text)
+
+    def _scan_head(self, response) -> Optional[str]:
+        """Read a streamed response until og:description or </head> is found"""
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        buffer = ''
+        for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+            self.last_bytes_read += len(chunk)
+            scanned = len(buffer)
+            buffer += decoder.decode(chunk)
+
+            meta_desc = OG_DESCRIPTION_RE.search(buffer)
+            if meta_desc:
+                return meta_desc.group(1)
+            if buffer.find(HEAD_END, max(0, scanned - len(HEAD_END) + 1)) != -1:
+                return None
+
+            # Only an unterminated tag at the end of the buffer can still
+            # match, so drop everything before it to keep memory flat.
+            keep_from = buffer.rfind(OG_DESCRIPTION_PREFIX)
+            if keep_from == -1 or '"' in buffer[keep_from + len(OG_DESCRIPTION_PREFIX):]:
+                keep_from = max(0, len(buffer) - len(OG_DESCRIPTION_PREFIX) + 1)
+            buffer = buffer[keep_from:]
+        return None
 
-        # Extract metadata
-        stats_match = re.match(r'(\d+[KM]?)\s*likes?,\s*(\d+[KM]?)\s*comments?', text)
-        if stats_match:
-            metadata['likes'] = stats_match.group(1)
-            metadata['comments'] = stats_match.group(2)
-
-        date_match = re.search(r'on ([A-Z][a-z]+ \d+, \d{4}):', text)
-        if date_match:
-            metadata['date'] = date_match.group(1)
-
-        # Remove metadata section and clean text
-        if ' - ' in text:
-            text = text.split(' - ', 1)[1]
-        if ': ' in text:
-            text = text.split(': ', 1)[1]
-
-        # Clean text function
-        def clean_text(text: str) -> str:
-            # Handle Unicode and emojis
-            text = text.encode('utf-8').decode('utf-8')
-            # Remove Unicode escape sequences
-            text = re.sub(r'\\u[0-9a-fA-F]{4}', '', text)
-            text = re.sub(r'\ud83d[\ude00-\udfff]', '', text)
-            text = re.sub(r'\ud83e[\udd00-\udfff]', '', text)
-            text = text.encode('ascii', 'ignore').decode('ascii')
-
-            # Clean HTML entities
-            text = html.unescape(text)
-            text = text.replace('&quot;', '"').replace('&amp;', '&')
-
-            # Remove URLs and social media elements
-            text = re.sub(r'http\S+', '', text)
-            text = re.sub(r'@\w+', '', text)
-            text = re.sub(r'#\w+', '', text)
-
-            # Clean formatting
-            text = re.sub(r'\s+', ' ', text)
-            text = re.sub(r'\s*([,.])\s*', r'\1 ', text)
-            text = re.sub(r'[^\w\s.,!?()-]', '', text)
-
-            return text.strip()
-
-        # Process text sentence by sentence
-        sentences = text.split('.')
-        cleaned_sentences = []
-
-        for sentence in sentences:
-            cleaned = clean_text(sentence)
-            if cleaned and len(cleaned) > 5:  # Filter out very short segments
-                # Remove bullets and numbering
-                cleaned = re.sub(r'^\s*[\u2022\-*]\s*', '', cleaned)
-                cleaned = re.sub(r'^\d+\.\s*', '', cleaned)
-                cleaned_sentences.append(cleaned.strip())
-
-        # Create final text
-        final_text = '. '.join(s for s in cleaned_sentences if s)
-        if final_text and not final_text.endswith('.'):
-            final_text += '.'
-
-        return final_text, metadata
+    def fetch_og_description(self, url: str) -> Optional[str]:
+        """Fetch the raw og:description content of a reel page"""
+        self.last_bytes_read = 0
+        if not self.stream:
+            response = self.session.get(url)
+            if response.status_code != 200:
+                return None
+            self.last_bytes_read = len(response.content)
+            meta_desc = OG_DESCRIPTION_RE.search(response.text)
+            return meta_desc.group(1) if meta_desc else None
+
+        # Leaving the block closes the connection instead of draining the body
+        with self.session.get(url, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            return self._scan_head(response)
 
     def extract_description(self, url: str) -> Optional[Dict]:
         """Extract and process Instagram reel description"""
         try:
-            response = self.session.get(url)
-            if response.status_code == 200:
-                meta_desc = re.search(r'<meta property="og:description" content="([^"]+)"', response.text)
-                if meta_desc:
-                    raw_description = meta_desc.group(1)
-                    cleaned_text, metadata = self._extract_metadata_and_clean(raw_description)
-
-                    return {
-                        'url': url,
-                        'likes': metadata['likes'],
-                        'comments': metadata['comments'],
-                        'date_posted': metadata['date'],
-                        'date_extracted': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'description': cleaned_text
-                    }
+            raw_description = self.fetch_og_description(url)
+            if raw_description:
+                cleaned_text, metadata = self._extract_metadata_and_clean(raw_description)
+
+                return {
+                    'url': url,
+                    'likes': metadata['likes'],
+                    'comments': metadata['comments'],
+                    'date_posted': metadata['date'],
+                    'date_extracted': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'description': cleaned_text
+                }
             return None
         except Exception as e:
             print(f"Error: {e}")
@@ -0,0 +1,99 @@
+# apps/core/instagram/text_cleaner.py
+import re
+import html
+from typing import Dict, Tuple
+
+# Metadata patterns
+STATS_RE = re.compile(r'(\d+[KM]?)\s*likes?,\s*(\d+[KM]?)\s*comments?')
+DATE_RE = re.compile(r'on ([A-Z][a-z]+ \d+, \d{4}):')
+
+# Literal "\uXXXX" escape sequences left in the page source
+ESCAPE_RE = re.compile(r'\\u[0-9a-fA-F]{4}')
+# URLs must go before handles/hashtags: "@foohttp://x" is stripped
+# differently if the handle is matched first.
+URL_RE = re.compile(r'http\S+')
+SOCIAL_RE = re.compile(r'[@#]\w+')
+WHITESPACE_RE = re.compile(r'\s+')
+DISALLOWED_RE = re.compile(r'[^\w\s.,!?()-]')
+BULLET_RE = re.compile(r'^\s*[\u2022\-*]\s*')
+NUMBERING_RE = re.compile(r'^\d+\.\s*')
+
+def _normalize_punctuation_spacing(text: str) -> str:
+    """Equivalent of re.sub(r'\\s*([,.])\\s*', r'\\1 ', text) on collapsed text.
+
+    Once whitespace runs are single spaces, the regex drops every space
+    next to a comma or period and emits each one followed by a single
+    space. Plain str.replace does that without the per-match template
+    expansion that made the regex the slowest step of the cleaner.
+    """
+    text = text.replace(' ,', ',').replace(' .', '.')
+    text = text.replace(', ', ',').replace('. ', '.')
+    return text.replace(',', ', ').replace('.', '. ')
+
+def clean_sentence(text: str) -> str:
+    """Clean a single caption sentence.
+
+    Produces the same output as the original per-sentence cleaner, with
+    the regexes compiled once and independent passes merged.
+    """
+    if '\\u' in text:
+        text = ESCAPE_RE.sub('', text)
+    if not text.isascii():
+        text = text.encode('ascii', 'ignore').decode('ascii')
+
+    # Clean HTML entities
+    if '&' in text:
+        text = html.unescape(text)
+        text = text.replace('&quot;', '"').replace('&amp;', '&')
+
+    # Remove URLs and social media elements
+    if 'http' in text:
+        text = URL_RE.sub('', text)
+    text = SOCIAL_RE.sub('', text)
+
+    # Clean formatting
+    text = WHITESPACE_RE.sub(' ', text)
+    if ',' in text or '.' in text:
+        text = _normalize_punctuation_spacing(text)
+    text = DISALLOWED_RE.sub('', text)
+
+    return text.strip()
+
+def extract_metadata_and_clean(text: str) -> Tuple[str, Dict]:
+    """Extract likes/comments/date metadata and clean the caption text"""
+    metadata = {
+        'likes': None,
+        'comments': None,
+        'date': None
+    }
+
+    stats_match = STATS_RE.match(text)
+    if stats_match:
+        metadata['likes'] = stats_match.group(1)
+        metadata['comments'] = stats_match.group(2)
+
+    date_match = DATE_RE.search(text)
+    if date_match:
+        metadata['date'] = date_match.group(1)
+
+    # Remove metadata section
+    if ' - ' in text:
+        text = text.split(' - ', 1)[1]
+    if ': ' in text:
+        text = text.split(': ', 1)[1]
+
+    # Process text sentence by sentence
+    cleaned_sentences = []
+    for sentence in text.split('.'):
+        cleaned = clean_sentence(sentence)
+        if cleaned and len(cleaned) > 5:  # Filter out very short segments
+            # Remove bullets and numbering
+            cleaned = BULLET_RE.sub('', cleaned)
+            cleaned = NUMBERING_RE.sub('', cleaned)
+            cleaned_sentences.append(cleaned.strip())
+
+    final_text = '. '.join(s for s in cleaned_sentences if s)
+    if final_text and not final_text.endswith('.'):
+        final_text += '.'
+
+    return final_text, metadata
@@ -0,0 +1,60 @@
+# apps/core/management/commands/audit_queries.py
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.services.query_audit import QueryAudit, audit_app_queries
+
+class Command(BaseCommand):
+    help = 'Explain the query plans of the local-mirror queries and flag full scans and sorts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Username or numeric user id to run the per-user queries as (defaults to the first user)'
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Database alias to explain against'
+        )
+        parser.add_argument(
+            '--sql',
+            action='store_true',
+            help='Print the SQL of every query, not only of the flagged ones'
+        )
+        parser.add_argument(
+            '--fail-on-problems',
+            action='store_true',
+            help='Exit with an error if any query scans a table or sorts without an index'
+        )
+
+    def handle(self, *args, **options):
+        user = self._user(options['user'], options['database'])
+        audit = audit_app_queries(user, QueryAudit(using=options['database']))
+        queries = audit.report()
+
+        flagged = 0
+        for query in queries:
+            status = self.style.WARNING('; '.join(query.problems)) if query.problems else self.style.SUCCESS('ok')
+            flagged += bool(query.problems)
+            repeat = f' (x{query.count})' if query.count > 1 else ''
+            self.stdout.write(f'{query.label}{repeat}: {status}')
+            if options['sql'] or query.problems:
+                self.stdout.write(f'  {query.sql}')
+            for line in query.plan:
+                self.stdout.write(f'    {line}')
+
+        vendor = audit.connection.vendor
+        self.stdout.write(f'\n{len(queries)} distinct queries on {vendor}, {flagged} flagged')
+        if flagged and options['fail_on_problems']:
+            raise CommandError(f'{flagged} queries scan a table or sort without an index')
+
+    def _user(self, value, database):
+        users = User.objects.using(database)
+        if value is None:
+            # Plans don't depend on whose rows they read; an unsaved id works on an empty database
+            return users.order_by('id').first() or User(id=0)
+        lookup = {'id': int(value)} if value.isdigit() else {'username': value}
+        try:
+            return users.get(**lookup)
+        except User.DoesNotExist:
+            raise CommandError(f'User not found: {value}')
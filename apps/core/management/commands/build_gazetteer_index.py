@@ -0,0 +1,40 @@
+# apps/core/management/commands/build_gazetteer_index.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.core.services.geocoder import OfflineGeocoder, build_gazetteer_index
+
+class Command(BaseCommand):
+    help = 'Compile the GeoNames-format gazetteer into the memory-mapped geocoder index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default=settings.GAZETTEER_PATH,
+            help='GeoNames-format TSV to index'
+        )
+        parser.add_argument(
+            '--output',
+            default=settings.GAZETTEER_INDEX_PATH,
+            help='Where to write the binary index'
+        )
+        parser.add_argument(
+            '--lookup',
+            action='append',
+            default=[],
+            help='Geocode this name with the new index (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        count = build_gazetteer_index(options['source'], options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} names into {options['output']}"))
+
+        if options['lookup']:
+            geocoder = OfflineGeocoder(options['source'], options['output'])
+            for name, match in geocoder.geocode_many(options['lookup']).items():
+                if match:
+                    self.stdout.write(
+                        f"{name}: {match['name']} ({match['latitude']}, {match['longitude']}) [{match['match']}]"
+                    )
+                else:
+                    self.stdout.write(f"{name}: no match")
+            geocoder.close()
@@ -0,0 +1,55 @@
+# apps/core/management/commands/export_locations.py
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.services.export_service import EXPORT_FORMATS, LocationExportService
+import sys
+
+class Command(BaseCommand):
+    help = "Export a user's saved locations as GeoJSON or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('user', help='Username or numeric user id')
+        parser.add_argument(
+            '--output',
+            choices=list(EXPORT_FORMATS),
+            default='geojson',
+            help='geojson FeatureCollection or ndjson records'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Compress the export on the fly'
+        )
+        parser.add_argument(
+            '--file',
+            help='Write to this path instead of stdout'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Rows fetched per query (defaults to EXPORT_CHUNK_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        lookup = {'id': int(options['user'])} if options['user'].isdigit() else {'username': options['user']}
+        try:
+            user = User.objects.get(**lookup)
+        except User.DoesNotExist:
+            raise CommandError(f"User not found: {options['user']}")
+
+        exporter = LocationExportService(user, chunk_size=options['chunk_size'])
+        chunks = exporter.iter_bytes(options['output'], compress=options['gzip'])
+
+        written = 0
+        if options['file']:
+            with open(options['file'], 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    written += len(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['file']}"))
+        else:
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
@@ -0,0 +1,102 @@
+# apps/core/management/commands/preload_geocode_cache.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.models import GeocodeCache
+from apps.core.services.geocoder import iter_gazetteer_rows, normalize_place_name
+from pathlib import Path
+import csv
+
+class Command(BaseCommand):
+    help = 'Bulk load place names and coordinates into the shared geocode cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gazetteer',
+            nargs='?',
+            const=settings.GAZETTEER_PATH,
+            help='Load every name of a GeoNames-format TSV (defaults to GAZETTEER_PATH)'
+        )
+        parser.add_argument(
+            '--csv',
+            dest='csv_path',
+            help='CSV file with name,latitude,longitude[,address] columns'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per INSERT'
+        )
+        parser.add_argument(
+            '--overwrite',
+            action='store_true',
+            help='Replace coordinates of names that are already cached'
+        )
+
+    def handle(self, *args, **options):
+        if not (options['gazetteer'] or options['csv_path']):
+            raise CommandError('Nothing to load: pass --gazetteer and/or --csv')
+
+        if options['gazetteer']:
+            self._load('gazetteer', self._gazetteer_rows(options['gazetteer']), options)
+        if options['csv_path']:
+            self._load('csv', self._csv_rows(options['csv_path']), options)
+
+    def _gazetteer_rows(self, path):
+        # Largest place first so it wins shared names ("Paris" the city over Paris, Texas)
+        rows = sorted(iter_gazetteer_rows(Path(path)), key=lambda r: -r[4])
+        for key, name, lat, lng, population, country in rows:
+            yield key, name, lat, lng, '', 'gazetteer'
+
+    def _csv_rows(self, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if len(row) < 3 or row[0] == 'name':
+                    continue
+                try:
+                    lat, lng = float(row[1]), float(row[2])
+                except ValueError:
+                    self.stderr.write(f"Skipping row with invalid coordinates: {row}")
+                    continue
+                address = row[3] if len(row) > 3 else ''
+                yield normalize_place_name(row[0]), row[0], lat, lng, address, 'manual'
+
+    def _load(self, label, rows, options):
+        batch_size = options['batch_size']
+        seen = set()
+        batch = []
+        total = 0
+
+        def flush():
+            if not batch:
+                return 0
+            if options['overwrite']:
+                GeocodeCache.objects.bulk_create(
+                    batch,
+                    update_conflicts=True,
+                    unique_fields=['normalized_name'],
+                    update_fields=['name', 'latitude', 'longitude', 'address', 'source']
+                )
+            else:
+                GeocodeCache.objects.bulk_create(batch, ignore_conflicts=True)
+            count = len(batch)
+            batch.clear()
+            return count
+
+        for key, name, lat, lng, address, source in rows:
+            if not key or key in seen or lat is None or lng is None:
+                continue
+            seen.add(key)
+            batch.append(GeocodeCache(
+                normalized_name=key[:255],
+                name=name[:255],
+                latitude=lat,
+                longitude=lng,
+                address=address or '',
+                source=source
+            ))
+            if len(batch) >= batch_size:
+                total += flush()
+        total += flush()
+
+        self.stdout.write(self.style.SUCCESS(f"Loaded {total} {label} names into the geocode cache"))
@@ -0,0 +1,83 @@
+# apps/core/management/commands/run_job_worker.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from apps.core.services.job_queue import JobQueue
+import logging
+import signal
+import threading
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Run background job workers (reel analysis, imports, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'JOB_WORKER_CONCURRENCY', 4),
+            help='Number of worker threads in this process'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'JOB_WORKER_POLL_INTERVAL', 1.0),
+            help='Seconds to sleep when the queue is empty'
+        )
+        parser.add_argument(
+            '--job-type',
+            action='append',
+            dest='job_types',
+            help='Only run jobs of this type (can be repeated)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        poll_interval = options['poll_interval']
+        job_types = options['job_types']
+        once = options['once']
+        stop_event = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write('Stopping workers after current jobs...')
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        JobQueue().requeue_stale()
+
+        def work():
+            queue = JobQueue()
+            try:
+                while not stop_event.is_set():
+                    close_old_connections()
+                    job = queue.run_next(job_types)
+                    if job is None:
+                        if once:
+                            break
+                        stop_event.wait(poll_interval)
+            except Exception as e:
+                logger.error(f"Worker {queue.worker_id} crashed: {str(e)}", exc_info=True)
+            finally:
+                connection.close()
+
+        self.stdout.write(f'Starting {concurrency} job worker thread(s)')
+        threads = [
+            threading.Thread(target=work, name=f'job-worker-{i}', daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        # Join with a timeout so the main thread keeps receiving signals
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+
+        self.stdout.write(self.style.SUCCESS('Job workers stopped'))
@@ -0,0 +1,65 @@
+# apps/core/management/commands/run_outbox_dispatcher.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from apps.core.models import OutboxEvent
+from apps.core.services.outbox import OutboxDispatcher
+import signal
+import threading
+
+class Command(BaseCommand):
+    help = 'Push queued location changes from the outbox to the Firebase RTDB (run one per database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'OUTBOX_BATCH_SIZE', 500),
+            help='Events read, coalesced and sent per RTDB update'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'OUTBOX_POLL_INTERVAL', 1.0),
+            help='Seconds to sleep when the outbox is empty'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox and exit instead of polling forever'
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Queue events parked after repeated RTDB rejections again first'
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write('Stopping after the current batch...')
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        if options['retry_failed']:
+            count = OutboxEvent.objects.filter(failed_at__isnull=False).update(failed_at=None, attempts=0)
+            self.stdout.write(f'Requeued {count} parked event(s)')
+
+        dispatcher = OutboxDispatcher(batch_size=options['batch_size'])
+        dispatcher.poll_interval = options['poll_interval']
+        self.stdout.write('Dispatching outbox events')
+        try:
+            dispatcher.run(stop_event, once=options['once'])
+        except Exception as e:
+            raise CommandError(f'Outbox push failed: {str(e)}')
+        finally:
+            connection.close()
+
+        stats = dispatcher.stats
+        self.stdout.write(self.style.SUCCESS(
+            f"Pushed {stats['events']} event(s) in {stats['writes']} update(s) "
+            f"({stats['fields']} path(s), {stats['failures']} failure(s), {stats['dead']} parked)"
+        ))
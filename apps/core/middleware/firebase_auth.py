@@ -1,5 +1,4 @@
 #apps/core/middleware/firebase_auth.py
-from firebase_admin import auth
 from django.contrib.auth.models import User
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
@@ -13,6 +12,7 @@ class FirebaseAuthentication(BaseAuthentication):
         if not auth_header:
             return None
 
+        from firebase_admin import auth
         try:
             # Extract the token
             id_token = auth_header.split(' ').pop()
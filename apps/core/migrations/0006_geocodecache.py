@@ -0,0 +1,53 @@
+# Generated by Django 4.2 on 2026-10-19 10:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0005_backgroundjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GeocodeCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("normalized_name", models.CharField(max_length=255, unique=True)),
+                ("name", models.CharField(max_length=255)),
+                ("latitude", models.FloatField()),
+                ("longitude", models.FloatField()),
+                ("address", models.TextField(blank=True)),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("gazetteer", "Offline Gazetteer"),
+                            ("instagram", "Instagram Analysis"),
+                            ("search", "Place Search"),
+                            ("manual", "Manually Added"),
+                        ],
+                        default="gazetteer",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["normalized_name"],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0007_location_soft_delete_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backgroundjob",
+            name="progress_done",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="backgroundjob",
+            name="progress_total",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="backgroundjob",
+            name="job_type",
+            field=models.CharField(
+                choices=[
+                    ("reel_analysis", "Instagram Reel Analysis"),
+                    ("location_import", "Location Import"),
+                ],
+                max_length=50,
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# PostgreSQL only: PostGIS geography column and trigram search indexes on the
+# location mirror. SQLite keeps using the latitude/longitude index, so this
+# migration is a no-op there. See apps/core/services/spatial.py.
+
+from django.db import migrations
+
+FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS postgis",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # Generated from latitude/longitude, so the ORM never writes it and the
+    # Location model stays the same on every backend
+    """
+    ALTER TABLE core_location ADD COLUMN IF NOT EXISTS geog geography(Point, 4326)
+    GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS core_location_geog_gist ON core_location USING GIST (geog)",
+    "CREATE INDEX IF NOT EXISTS core_location_name_trgm ON core_location USING GIN (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS core_location_address_trgm ON core_location USING GIN (address gin_trgm_ops)",
+]
+
+BACKWARD = [
+    "DROP INDEX IF EXISTS core_location_address_trgm",
+    "DROP INDEX IF EXISTS core_location_name_trgm",
+    "DROP INDEX IF EXISTS core_location_geog_gist",
+    "ALTER TABLE core_location DROP COLUMN IF EXISTS geog",
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return apply
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0008_backgroundjob_progress"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(FORWARD), run(BACKWARD)),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 4.2 on 2026-10-19 09:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_location_postgis'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='location',
+            name='core_locati_latitud_367ccc_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='location',
+            name='core_locati_categor_4c1198_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='location',
+            name='core_locati_sync_st_297716_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='location',
+            name='core_locati_locatio_1406db_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='location',
+            name='core_locati_is_inst_d32d6c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='location',
+            name='core_locati_firebas_0bf8a7_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='location',
+            name='core_locati_created_367075_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='location',
+            name='core_locati_version_c29685_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='location',
+            name='core_locati_is_dele_1291d0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userlocation',
+            name='core_userlo_user_id_d662cd_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userlocation',
+            name='core_userlo_locatio_32028a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userlocation',
+            name='core_userlo_notify__a08c64_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userlocation',
+            name='core_userlo_user_id_20ee9e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userlocation',
+            name='core_userlo_sync_st_e7a6bb_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userlocation',
+            name='core_userlo_saved_a_6d3d2f_idx',
+        ),
+        migrations.AlterField(
+            model_name='userlocation',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='saved_locations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['latitude', 'longitude', 'id', 'name', 'category', 'is_deleted'], name='location_live_tile_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(condition=models.Q(('sync_status__lt', 2)), fields=['-created_at'], name='location_pending_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(condition=models.Q(('firebase_id__isnull', False)), fields=['firebase_id'], name='location_firebase_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userlocation',
+            index=models.Index(fields=['user', '-saved_at', '-id'], name='userlocation_user_saved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userlocation',
+            index=models.Index(condition=models.Q(('sync_status__lt', 2)), fields=['user', '-saved_at'], name='userlocation_pending_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userlocation',
+            index=models.Index(condition=models.Q(('firebase_id__isnull', False)), fields=['firebase_id'], name='userlocation_firebase_id_idx'),
+        ),
+    ]
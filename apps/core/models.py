@@ -4,6 +4,11 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Rows still to push (Not Synced or Syncing). Written as ``< 2`` rather than
+# ``IN (0, 1)`` so SQLite can prove it matches the partial sync indexes
+PENDING_SYNC = Q(sync_status__lt=2)
 
 class Location(models.Model):
     LOCATION_TYPES = [
@@ -56,25 +61,22 @@ class Location(models.Model):
         self.is_deleted = True
         self.save(update_fields=['is_deleted', 'updated_at'])
     class Meta:
+        # Only what the local queries use (``manage.py audit_queries``):
+        # every index is written on insert and on updates of its columns
         indexes = [
-            # Spatial indexes
-            models.Index(fields=['latitude', 'longitude']),
-            
-            # Category and type indexes
-            models.Index(fields=['category']),
-            models.Index(fields=['location_type']),
-            
-            # Instagram-related index
-            models.Index(fields=['is_instagram_source', 'instagram_url']),
-            
-            # Sync-related indexes
-            models.Index(fields=['sync_status']),
-            models.Index(fields=['firebase_id']),
-            
-            # Timestamp index
-            models.Index(fields=['-created_at']),
-            models.Index(fields=['version']),
-            models.Index(fields=['is_deleted', 'sync_status'])  # For ordering
+            # Map tiles and spatial fallback: bounding box over live rows,
+            # covering the tile columns so no table lookups are needed
+            # (is_deleted too: SQLite only treats an index as covering if
+            # it holds every column the query mentions)
+            models.Index(
+                fields=['latitude', 'longitude', 'id', 'name', 'category', 'is_deleted'],
+                condition=Q(is_deleted=False),
+                name='location_live_tile_idx'
+            ),
+            # Sync passes: only rows still to push, in default ordering
+            models.Index(fields=['-created_at'], condition=PENDING_SYNC, name='location_pending_sync_idx'),
+            # Pulls match RTDB keys; local-only rows have none
+            models.Index(fields=['firebase_id'], condition=Q(firebase_id__isnull=False), name='location_firebase_id_idx'),
         ]
         ordering = ['-created_at']
 
@@ -90,7 +92,8 @@ class UserLocation(models.Model):
     
     # Primary Fields
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(User, related_name='saved_locations', on_delete=models.CASCADE)
+    # Indexed by unique_together and the (user, saved_at) index, not on its own
+    user = models.ForeignKey(User, related_name='saved_locations', on_delete=models.CASCADE, db_index=False)
     location = models.ForeignKey(Location, related_name='saved_by', on_delete=models.CASCADE)
     
     # User customization
@@ -116,21 +119,14 @@ class UserLocation(models.Model):
     class Meta:
         unique_together = ['user', 'location']
         indexes = [
-            # User-related indexes
-            models.Index(fields=['user', 'sync_status']),
-            models.Index(fields=['user', 'saved_at']),  # Changed from created_at to saved_at
-            
-            # Location-related indexes
-            models.Index(fields=['location', 'is_favorite']),
-            
-            # Feature-specific indexes
-            models.Index(fields=['notify_enabled']),
-            models.Index(fields=['sync_status']),
-            
-            # Timestamp index
-            models.Index(fields=['-saved_at']),
-            # models.Index(fields=['version']),
-            # models.Index(fields=['is_deleted', 'sync_status'])  # For ordering
+            # Listing pages (UserLocationCursorPagination), exports, versions
+            models.Index(fields=['user', '-saved_at', '-id'], name='userlocation_user_saved_idx'),
+            # Sync passes: a user's rows still to push
+            models.Index(fields=['user', '-saved_at'], condition=PENDING_SYNC, name='userlocation_pending_sync_idx'),
+            # Pulls match RTDB keys
+            models.Index(
+                fields=['firebase_id'], condition=Q(firebase_id__isnull=False), name='userlocation_firebase_id_idx'
+            ),
         ]
         ordering = ['-saved_at']
 
@@ -157,4 +153,121 @@ class InstagramReel(models.Model):
         ordering = ['-date_posted']
 
     def __str__(self):
-        return f"Reel by {self.created_by.username} at {self.location.name}"
\ No newline at end of file
+        return f"Reel by {self.created_by.username} at {self.location.name}"
+
+class BackgroundJob(models.Model):
+    JOB_TYPES = [
+        ('reel_analysis', 'Instagram Reel Analysis'),
+        ('location_import', 'Location Import'),
+    ]
+
+    STATUS = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed')
+    ]
+
+    # Primary Fields
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job_type = models.CharField(max_length=50, choices=JOB_TYPES)
+    status = models.CharField(max_length=20, choices=STATUS, default='pending')
+    user = models.ForeignKey(User, related_name='background_jobs', on_delete=models.CASCADE)
+
+    # Job data
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    # Progress (units are job specific, e.g. rows for imports)
+    progress_done = models.IntegerField(default=0)
+    progress_total = models.IntegerField(default=0)
+
+    # Retry and locking
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    # Timestamps
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Worker claim query
+            models.Index(fields=['status', 'run_after']),
+            # Status lookups by owner
+            models.Index(fields=['user', 'created_at']),
+        ]
+        ordering = ['created_at']
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def __str__(self):
+        return f"{self.job_type} job {self.id} ({self.status})"
+
+class GeocodeCache(models.Model):
+    SOURCES = [
+        ('gazetteer', 'Offline Gazetteer'),
+        ('instagram', 'Instagram Analysis'),
+        ('search', 'Place Search'),
+        ('manual', 'Manually Added')
+    ]
+
+    # Lookup key, see services.geocoder.normalize_place_name
+    normalized_name = models.CharField(max_length=255, unique=True)
+    name = models.CharField(max_length=255)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    address = models.TextField(blank=True)
+    source = models.CharField(max_length=20, choices=SOURCES, default='gazetteer')
+
+    # Timestamps
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['normalized_name']
+
+    def __str__(self):
+        return f"{self.name} ({self.latitude}, {self.longitude})"
+
+class OutboxEvent(models.Model):
+    """A local change to push to the RTDB, written in the same transaction as the change"""
+    OPERATIONS = [
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete')
+    ]
+
+    # Dispatch order; the dispatcher reads and deletes by primary key only
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=50)  # model label, e.g. core.location
+    object_id = models.CharField(max_length=64)
+    path = models.CharField(max_length=255)  # RTDB path of the record
+    operation = models.CharField(max_length=10, choices=OPERATIONS)
+    # Changed fields under their RTDB names (every field for a create)
+    changes = models.JSONField(default=dict, blank=True)
+
+    # Failed pushes stay queued, in order, until the RTDB has rejected the
+    # path OUTBOX_MAX_ATTEMPTS times; then failed_at parks it (dead letter)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # The dispatcher's read: live events in id order
+            models.Index(fields=['id'], name='outbox_pending_idx', condition=Q(failed_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.operation} {self.path} ({self.id})"
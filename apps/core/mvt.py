@@ -0,0 +1,109 @@
+# apps/core/mvt.py
+"""Minimal Mapbox Vector Tile (v2.1) encoder for point layers.
+
+Writes the protobuf wire format directly; only what location layers need
+(POINT features, string/number/bool properties) is supported.
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+import struct
+
+MEDIA_TYPE = 'application/vnd.mapbox-vector-tile'
+DEFAULT_EXTENT = 4096
+
+# Geometry types and commands from vector_tile.proto
+POINT = 1
+MOVE_TO = 1
+
+# Protobuf wire types
+VARINT = 0
+FIXED64 = 1
+LENGTH_DELIMITED = 2
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+def _bytes_field(field: int, payload: bytes) -> bytes:
+    return _key(field, LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+def _varint_field(field: int, value: int) -> bytes:
+    return _key(field, VARINT) + _varint(value)
+
+def _packed_field(field: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(field, b''.join(_varint(value) for value in values))
+
+def _encode_value(value) -> bytes:
+    """Layer.Value message"""
+    if isinstance(value, bool):
+        return _varint_field(7, int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _varint_field(5, value)  # uint_value
+        return _varint_field(6, _zigzag(value))  # sint_value
+    if isinstance(value, float):
+        return _key(3, FIXED64) + struct.pack('<d', value)  # double_value
+    return _bytes_field(1, str(value).encode('utf-8'))  # string_value
+
+def point_geometry(points: Sequence[Tuple[int, int]]) -> List[int]:
+    """Command integers for a (multi)point in tile coordinates"""
+    geometry = [(MOVE_TO & 0x7) | (len(points) << 3)]
+    cursor_x = cursor_y = 0
+    for x, y in points:
+        geometry.append(_zigzag(x - cursor_x))
+        geometry.append(_zigzag(y - cursor_y))
+        cursor_x, cursor_y = x, y
+    return geometry
+
+def encode_layer(name: str, features: Iterable[Dict], extent: int = DEFAULT_EXTENT) -> bytes:
+    """One Layer message.
+
+    Each feature is ``{'points': [(x, y), ...], 'properties': {...}}`` with
+    an optional integer ``id``; coordinates are already in tile space
+    (0..extent). Property keys and values are de-duplicated per layer as
+    the spec requires.
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, object], int] = {}
+    encoded_features = []
+
+    for feature in features:
+        tags = []
+        for key, value in feature.get('properties', {}).items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+
+        message = b''
+        if feature.get('id') is not None:
+            message += _varint_field(1, feature['id'])
+        if tags:
+            message += _packed_field(2, tags)
+        message += _varint_field(3, POINT)
+        message += _packed_field(4, point_geometry(feature['points']))
+        encoded_features.append(_bytes_field(2, message))
+
+    layer = _varint_field(15, 2)  # version
+    layer += _bytes_field(1, name.encode('utf-8'))
+    layer += b''.join(encoded_features)
+    layer += b''.join(_bytes_field(3, key.encode('utf-8')) for key in keys)
+    layer += b''.join(_bytes_field(4, _encode_value(value)) for _, value in values)
+    layer += _varint_field(5, extent)
+    return layer
+
+def encode_tile(layers: Dict[str, Iterable[Dict]], extent: int = DEFAULT_EXTENT) -> bytes:
+    """Tile message with one layer per ``{name: features}`` entry"""
+    return b''.join(
+        _bytes_field(3, encode_layer(name, features, extent))
+        for name, features in layers.items()
+    )
@@ -0,0 +1,84 @@
+# apps/core/pagination.py
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from typing import Callable, Dict, List, Optional, Tuple
+import base64
+import json
+
+def encode_cursor(position: Dict) -> str:
+    """Opaque, URL-safe cursor for a page position"""
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Dict:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise NotFound('Invalid cursor')
+    if not isinstance(position, dict):
+        raise NotFound('Invalid cursor')
+    return position
+
+def get_page_size(request, page_size_query_param: str = 'page_size') -> int:
+    """Requested page size, clamped to LOCATION_MAX_PAGE_SIZE"""
+    default = getattr(settings, 'LOCATION_PAGE_SIZE', 50)
+    maximum = getattr(settings, 'LOCATION_MAX_PAGE_SIZE', 500)
+    try:
+        page_size = int(request.query_params.get(page_size_query_param, default))
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, maximum))
+
+class FirebaseKeyPagination:
+    """Keyset pagination over an RTDB path ordered by key.
+
+    ``fetch_page(page_size, start_key=None, end_before=None)`` must return
+    ``(items, keys, more_key)``: the page, the RTDB keys of its items in key
+    order, and the key just past the page in the direction that was read
+    (``None`` at either end). Forward cursors carry the first key of the next
+    page (inclusive, ``start_at``); backward cursors carry the first key of
+    the current page (exclusive, ``end_at`` + ``limit_to_last``).
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def paginate(self, request, fetch_page: Callable[..., Tuple[List, List[str], Optional[str]]]) -> Response:
+        self.request = request
+        page_size = get_page_size(request, self.page_size_query_param)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        position = decode_cursor(cursor) if cursor else {}
+        key = position.get('k')
+
+        if key and position.get('r'):
+            items, keys, more_key = fetch_page(page_size, end_before=key)
+            next_key = key
+            previous_key = keys[0] if more_key and keys else None
+        else:
+            items, keys, more_key = fetch_page(page_size, start_key=key)
+            next_key = more_key
+            previous_key = keys[0] if key and keys else None
+
+        return Response({
+            'next': self._link({'k': next_key}) if next_key else None,
+            'previous': self._link({'k': previous_key, 'r': 1}) if previous_key else None,
+            'results': items
+        })
+
+    def _link(self, position: Dict) -> str:
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(position))
+
+class UserLocationCursorPagination(CursorPagination):
+    """Keyset pagination for the local UserLocation mirror (newest first)"""
+
+    ordering = ('-saved_at', '-id')
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        return get_page_size(request, self.page_size_query_param)
@@ -0,0 +1,74 @@
+# apps/core/projection.py
+from rest_framework.exceptions import ValidationError
+from typing import Collection, Dict, Iterable, Optional
+import re
+
+FIELDS_QUERY_PARAM = 'fields'
+
+# Top-level names, or parent.child for one level of nesting
+FIELD_NAME = re.compile(r'^[A-Za-z_]\w*(\.[A-Za-z_]\w*)?$')
+
+MAX_FIELDS = 50
+
+class Projection:
+    """A ``?fields=`` selection applied to plain record dicts.
+
+    ``name`` keeps a top-level key; ``parent.child`` keeps only ``child`` of
+    a nested dict (``user_location.isFavorite``), and a bare ``parent``
+    keeps the nested dict whole.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self.top = tuple(name for name in self.fields if '.' not in name)
+        nested = {}
+        for name in self.fields:
+            if '.' in name:
+                parent, child = name.split('.', 1)
+                if parent not in self.top:
+                    nested.setdefault(parent, []).append(child)
+        self.nested = {parent: tuple(children) for parent, children in nested.items()}
+
+    def only(self, names: Collection[str]) -> bool:
+        """True when every selected key (or nested parent) is one of ``names``"""
+        return all(name in names for name in self.top) and all(name in names for name in self.nested)
+
+    def __call__(self, item: Dict) -> Dict:
+        projected = {name: item[name] for name in self.top if name in item}
+        for parent, children in self.nested.items():
+            value = item.get(parent)
+            if isinstance(value, dict):
+                projected[parent] = {child: value[child] for child in children if child in value}
+        return projected
+
+    def __repr__(self):
+        return f"Projection({','.join(self.fields)})"
+
+def get_requested_fields(request, allowed: Optional[Collection[str]] = None) -> Optional[tuple]:
+    """Field names from ``?fields=a,b,c``, or None for the full record.
+
+    Raises ValidationError (400) for malformed names or, when ``allowed`` is
+    given, names outside it.
+    """
+    raw = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not raw:
+        return None
+
+    names = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    if not names:
+        return None
+    if len(names) > MAX_FIELDS:
+        raise ValidationError({FIELDS_QUERY_PARAM: f"At most {MAX_FIELDS} fields can be requested"})
+
+    invalid = [
+        name for name in names
+        if not FIELD_NAME.match(name) or (allowed is not None and name not in allowed)
+    ]
+    if invalid:
+        raise ValidationError({FIELDS_QUERY_PARAM: f"Unknown fields: {', '.join(invalid)}"})
+    return names
+
+def get_projection(request) -> Optional[Projection]:
+    """Projection for schemaless (Firebase) records, or None"""
+    fields = get_requested_fields(request)
+    return Projection(fields) if fields else None
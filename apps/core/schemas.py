@@ -0,0 +1,857 @@
+# apps/core/schemas.py
+"""
+OpenAPI documentation of the core API.
+
+Building the schema trees (and importing drf_yasg) is only needed to render
+the docs, so none of it happens when the views are imported. Each
+``swagger_auto_schema`` is registered here against the view it documents
+and attached by ``apply_schemas()`` the first time the schema is generated.
+"""
+from drf_yasg import openapi
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from typing import Callable, List, Tuple
+from .projection import FIELDS_QUERY_PARAM
+from .services.export_service import EXPORT_FORMATS
+from .services.import_service import IMPORT_FORMATS
+from .services.map_clusters import MAX_ZOOM
+import threading
+
+_schemas: List[Tuple[str, Callable]] = []
+_applied = False
+_apply_lock = threading.Lock()
+
+def schema_for(target: str):
+    """Register a builder returning the ``swagger_auto_schema`` decorator for
+    ``target`` (a view function or ``ViewSet.method`` in apps.core.views)"""
+    def register(builder):
+        _schemas.append((target, builder))
+        return builder
+    return register
+
+def apply_schemas() -> None:
+    """Attach every registered schema to its view, once per process"""
+    global _applied
+    if _applied:
+        return
+    with _apply_lock:
+        if _applied:
+            return
+        from . import views
+        for target, builder in _schemas:
+            owner, _, name = target.rpartition('.')
+            holder = getattr(views, owner) if owner else views
+            builder()(getattr(holder, name))
+        _applied = True
+
+class CoreSchemaGenerator(OpenAPISchemaGenerator):
+    def get_schema(self, request=None, public=False):
+        apply_schemas()
+        return super().get_schema(request, public)
+
+schema_view = get_schema_view(
+    openapi.Info(
+        title="Memory Map API",
+        default_version='v1',
+        description="API documentation for Memory Map project",
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="contact@memorymap.com"),
+        license=openapi.License(name="BSD License"),
+    ),
+    public=True,
+    permission_classes=[permissions.AllowAny],
+    generator_class=CoreSchemaGenerator,
+)
+
+# Reusable response schemas
+location_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'id': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_UUID),
+        'name': openapi.Schema(type=openapi.TYPE_STRING),
+        'latitude': openapi.Schema(type=openapi.TYPE_NUMBER, format=openapi.FORMAT_FLOAT),
+        'longitude': openapi.Schema(type=openapi.TYPE_NUMBER, format=openapi.FORMAT_FLOAT),
+        'description': openapi.Schema(type=openapi.TYPE_STRING),
+        'category': openapi.Schema(type=openapi.TYPE_STRING),
+        'address': openapi.Schema(type=openapi.TYPE_STRING),
+        'is_instagram_source': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+        'instagram_url': openapi.Schema(type=openapi.TYPE_STRING),
+        'created_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+        'updated_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+    }
+)
+
+stream_parameter = openapi.Parameter(
+    'stream',
+    openapi.IN_QUERY,
+    description="Stream every result as a JSON array (json) or newline-delimited JSON (ndjson) instead of one page",
+    type=openapi.TYPE_STRING,
+    enum=['json', 'ndjson'],
+    required=False
+)
+
+fields_parameter = openapi.Parameter(
+    FIELDS_QUERY_PARAM,
+    openapi.IN_QUERY,
+    description="Comma-separated fields to return, e.g. id,name,latitude,longitude; parent.child selects a nested field",
+    type=openapi.TYPE_STRING,
+    required=False
+)
+
+paginated_location_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'next': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_URI, x_nullable=True),
+        'previous': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_URI, x_nullable=True),
+        'results': openapi.Schema(type=openapi.TYPE_ARRAY, items=location_response_schema)
+    }
+)
+
+@schema_for('LocationViewSet.search')
+def location_search():
+    return swagger_auto_schema(
+        operation_description="List all locations with optional filtering",
+        manual_parameters=[
+            openapi.Parameter(
+                'category',
+                openapi.IN_QUERY,
+                description="Filter by category",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'search',
+                openapi.IN_QUERY,
+                description="Search in name, description, and address",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            stream_parameter,
+            fields_parameter
+        ],
+        responses={
+            200: openapi.Response(
+                description="Successful response",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'id': openapi.Schema(
+                                type=openapi.TYPE_STRING,
+                                description="Unique identifier for the location",
+                                example="550e8400-e29b-41d4-a716-446655440000"
+                            ),
+                            'name': openapi.Schema(
+                                type=openapi.TYPE_STRING,
+                                description="Name of the location",
+                                example="Grand Canyon"
+                            ),
+                            'latitude': openapi.Schema(
+                                type=openapi.TYPE_NUMBER,
+                                description="Latitude coordinate",
+                                example=36.0544
+                            ),
+                            'longitude': openapi.Schema(
+                                type=openapi.TYPE_NUMBER,
+                                description="Longitude coordinate",
+                                example=-112.1401
+                            ),
+                            'description': openapi.Schema(
+                                type=openapi.TYPE_STRING,
+                                description="Location description",
+                                example="Beautiful view point of the canyon"
+                            ),
+                            'user_location': openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'custom_name': openapi.Schema(
+                                        type=openapi.TYPE_STRING,
+                                        description="User's custom name for location"
+                                    ),
+                                    'is_favorite': openapi.Schema(
+                                        type=openapi.TYPE_BOOLEAN,
+                                        description="Whether location is marked as favorite"
+                                    ),
+                                    'notify_radius': openapi.Schema(
+                                        type=openapi.TYPE_NUMBER,
+                                        description="Notification radius in kilometers"
+                                    )
+                                }
+                            )
+                        }
+                    )
+                ),
+                examples={
+                    'application/json': [
+                        {
+                            'id': '550e8400-e29b-41d4-a716-446655440000',
+                            'name': 'Grand Canyon',
+                            'latitude': 36.0544,
+                            'longitude': -112.1401,
+                            'description': 'Beautiful view point',
+                            'user_location': {
+                                'custom_name': 'My Favorite Spot',
+                                'is_favorite': True,
+                                'notify_radius': 1.0
+                            }
+                        }
+                    ]
+                }
+            ),
+            401: 'Authentication credentials were not provided',
+            404: 'Not found',
+            500: 'Internal server error'
+        }
+    )
+
+@schema_for('LocationViewSet.list')
+def location_list():
+    return swagger_auto_schema(
+        operation_description="List the user's locations, one cursor page at a time",
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              description="Opaque cursor from a previous page's next/previous link"),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False,
+                              description="Locations per page (capped by LOCATION_MAX_PAGE_SIZE)"),
+            stream_parameter,
+            fields_parameter
+        ],
+        responses={200: paginated_location_response_schema}
+    )
+
+@schema_for('UserLocationViewSet.list')
+def user_location_list():
+    return swagger_auto_schema(
+        operation_description="""
+        List user's saved locations with custom preferences.
+        
+        Returns:
+        - Custom names and descriptions
+        - Favorite status
+        - Notification settings
+        - Original location data
+        """,
+        manual_parameters=[
+            openapi.Parameter(
+                'is_favorite',
+                openapi.IN_QUERY,
+                description="Filter favorite locations",
+                type=openapi.TYPE_BOOLEAN,
+                required=False
+            ),
+            stream_parameter,
+            fields_parameter,
+            openapi.Parameter(
+                'page_size',
+                openapi.IN_QUERY,
+                description="Locations per page (capped by LOCATION_MAX_PAGE_SIZE)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="Success",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'next': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_URI, x_nullable=True),
+                        'previous': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_URI, x_nullable=True),
+                        'results': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'id': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'user_id': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'location_id': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'custom_name': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'custom_description': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'category': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'is_favorite': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                                    'notify_radius': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                    'notifications_enabled': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                                    'saved_at': openapi.Schema(type=openapi.TYPE_STRING, format='date-time'),
+                                    'last_updated': openapi.Schema(type=openapi.TYPE_STRING, format='date-time')
+                                }
+                            )
+                        )
+                    }
+                )
+            ),
+            401: 'Unauthorized'
+        }
+    )
+
+@schema_for('analyze_instagram_reel')
+def analyze_instagram_reel():
+    return swagger_auto_schema(
+        method='post',
+        operation_description="""
+    Analyze Instagram reel URL and extract locations without saving.
+    
+    This endpoint will:
+    1. Check if URL already exists in database
+    2. If new URL, extract locations from description
+    3. Return locations without saving
+    """,
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['url'],
+            properties={
+                'url': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description='Instagram reel URL',
+                    example='https://www.instagram.com/reel/ABC123/'
+                )
+            }
+        ),
+        responses={
+            200: openapi.Response(
+                description="Success",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'status': openapi.Schema(
+                            type=openapi.TYPE_STRING,
+                            enum=['existing', 'new'],
+                            description="Whether URL was previously analyzed"
+                        ),
+                        'locations': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'name': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'type': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'coordinates': openapi.Schema(
+                                        type=openapi.TYPE_OBJECT,
+                                        properties={
+                                            'latitude': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                            'longitude': openapi.Schema(type=openapi.TYPE_NUMBER)
+                                        }
+                                    ),
+                                    'category': openapi.Schema(type=openapi.TYPE_STRING)
+                                }
+                            )
+                        ),
+                        'url': openapi.Schema(type=openapi.TYPE_STRING),
+                        'metadata': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'date_posted': openapi.Schema(type=openapi.TYPE_STRING),
+                                'description': openapi.Schema(type=openapi.TYPE_STRING)
+                            }
+                        )
+                    }
+                ),
+                examples={
+                    'application/json': {
+                        'status': 'new',
+                        'locations': [
+                            {
+                                'name': 'Grand Canyon National Park',
+                                'type': 'national_park',
+                                'coordinates': {
+                                    'latitude': 36.0544,
+                                    'longitude': -112.1401
+                                },
+                                'category': 'nature'
+                            }
+                        ],
+                        'url': 'https://www.instagram.com/reel/ABC123/',
+                        'metadata': {
+                            'date_posted': '2024-11-19',
+                            'description': 'Beautiful day at the Grand Canyon!'
+                        }
+                    }
+                }
+            ),
+            400: 'Bad Request - Invalid URL or parsing error',
+            500: 'Server Error - Analysis failed'
+        }
+    )
+
+@schema_for('analyze_and_save_reel')
+def analyze_and_save_reel():
+    return swagger_auto_schema(
+        method='post',
+        operation_description="""
+    Analyze Instagram reel URL and immediately save extracted locations.
+    
+    This endpoint will:
+    1. Extract locations from Instagram reel
+    2. Save all extracted locations
+    3. Create user location references
+    """,
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['url'],  # Only specify required fields in this array
+            properties={
+                'url': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description='Instagram reel URL',
+                    example='https://www.instagram.com/reel/ABC123/'
+                ),
+                'category': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description='Default category for all locations'
+                ),
+                'is_favorite': openapi.Schema(
+                    type=openapi.TYPE_BOOLEAN,
+                    description='Mark all locations as favorite',
+                    default=False
+                ),
+                'notify_radius': openapi.Schema(
+                    type=openapi.TYPE_NUMBER,
+                    description='Notification radius in km',
+                    default=1.0
+                )
+            }
+        ),
+        responses={
+            200: openapi.Response(
+                description="Success",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'saved_locations': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={
+                                    'id': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'name': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'latitude': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                    'longitude': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                    'description': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'category': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'is_instagram_source': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                                    'instagram_url': openapi.Schema(type=openapi.TYPE_STRING),
+                                    'user_location': openapi.Schema(
+                                        type=openapi.TYPE_OBJECT,
+                                        properties={
+                                            'is_favorite': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                                            'notify_radius': openapi.Schema(type=openapi.TYPE_NUMBER)
+                                        }
+                                    )
+                                }
+                            )
+                        ),
+                    }
+                ),
+                examples={
+                    'application/json': {
+                        'saved_locations': [
+                            {
+                                'id': 'loc_123',
+                                'name': 'Grand Canyon',
+                                'latitude': 36.0544,
+                                'longitude': -112.1401,
+                                'category': 'nature',
+                                'is_instagram_source': True,
+                                'user_location': {
+                                    'is_favorite': False,
+                                    'notify_radius': 1.0
+                                }
+                            }
+                        ],
+                        'metadata': {
+                            'total_saved': 1,
+                            'instagram_url': 'https://www.instagram.com/reel/ABC123/',
+                            'date_processed': '2024-11-19T12:00:00Z'
+                        }
+                    }
+                }
+            ),
+            400: 'Bad Request - Invalid URL or parsing error',
+            500: 'Server Error - Save failed'
+        }
+    )
+
+@schema_for('submit_reel_job')
+def submit_reel_job():
+    return swagger_auto_schema(
+        method='post',
+        operation_description="""
+    Queue an Instagram reel for background analysis and saving.
+
+    Returns immediately with a job id. Poll the job status endpoint
+    (or listen on `jobs/{user_id}/{job_id}` in Firebase) for the result.
+    """,
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['url'],
+            properties={
+                'url': openapi.Schema(type=openapi.TYPE_STRING, description='Instagram reel URL'),
+                'category': openapi.Schema(type=openapi.TYPE_STRING),
+                'is_favorite': openapi.Schema(type=openapi.TYPE_BOOLEAN, default=False),
+                'notify_radius': openapi.Schema(type=openapi.TYPE_NUMBER, default=1.0)
+            }
+        ),
+        responses={
+            202: openapi.Response(
+                description="Job queued",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'job_id': openapi.Schema(type=openapi.TYPE_STRING),
+                        'status': openapi.Schema(type=openapi.TYPE_STRING),
+                        'status_url': openapi.Schema(type=openapi.TYPE_STRING)
+                    }
+                )
+            ),
+            400: 'Bad Request - URL missing'
+        }
+    )
+
+@schema_for('import_locations')
+def import_locations():
+    return swagger_auto_schema(
+        method='post',
+        operation_description="""
+    Import a GeoJSON FeatureCollection or CSV file of locations in the background.
+
+    Rows are validated in one pass, deduplicated against the user's saved
+    locations and written in batches. Poll status_url for progress; the
+    finished job's result lists per-row errors.
+    """,
+        manual_parameters=[
+            openapi.Parameter('file', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True,
+                              description="GeoJSON (.geojson/.json) or CSV file"),
+            openapi.Parameter('file_format', openapi.IN_FORM, type=openapi.TYPE_STRING, required=False,
+                              enum=list(IMPORT_FORMATS), description="Overrides detection from the file extension"),
+            openapi.Parameter('category', openapi.IN_FORM, type=openapi.TYPE_STRING, required=False,
+                              description="Category for rows that do not have one")
+        ],
+        responses={
+            202: openapi.Response(
+                description="Import queued",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'job_id': openapi.Schema(type=openapi.TYPE_STRING),
+                        'status': openapi.Schema(type=openapi.TYPE_STRING),
+                        'status_url': openapi.Schema(type=openapi.TYPE_STRING)
+                    }
+                )
+            ),
+            400: 'Bad Request - missing file or unsupported format'
+        }
+    )
+
+@schema_for('export_locations')
+def export_locations():
+    return swagger_auto_schema(
+        method='get',
+        operation_description="Download all of the user's saved locations as GeoJSON or NDJSON",
+        manual_parameters=[
+            openapi.Parameter(
+                'output',
+                openapi.IN_QUERY,
+                description="geojson (FeatureCollection, default) or ndjson (one record per line)",
+                type=openapi.TYPE_STRING,
+                enum=list(EXPORT_FORMATS),
+                required=False
+            ),
+            openapi.Parameter(
+                'compress',
+                openapi.IN_QUERY,
+                description="gzip to receive a .gz file compressed on the fly",
+                type=openapi.TYPE_STRING,
+                enum=['gzip'],
+                required=False
+            )
+        ],
+        responses={
+            200: 'Streamed export file',
+            400: 'Unsupported export format'
+        }
+    )
+
+@schema_for('map_viewport')
+def map_viewport():
+    return swagger_auto_schema(
+        method='get',
+        operation_description="""
+    Saved locations inside a map viewport, clustered for the zoom level.
+
+    Below MAP_CLUSTER_MAX_ZOOM nearby locations are merged into grid clusters
+    (properties.cluster = true with properties.point_count); from that
+    zoom on raw points are returned unless a tile is too dense. Results are
+    cached per tile and invalidated when the user's locations change.
+    """,
+        manual_parameters=[
+            openapi.Parameter(
+                'bbox',
+                openapi.IN_QUERY,
+                description="min_lng,min_lat,max_lng,max_lat",
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            openapi.Parameter(
+                'zoom',
+                openapi.IN_QUERY,
+                description=f"Map zoom level, 0-{MAX_ZOOM}",
+                type=openapi.TYPE_INTEGER,
+                required=True
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="GeoJSON FeatureCollection of clusters and points",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'type': openapi.Schema(type=openapi.TYPE_STRING, enum=['FeatureCollection']),
+                        'zoom': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'clustered': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        'features': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT))
+                    }
+                )
+            ),
+            400: 'Invalid bbox or zoom, or viewport too large for the zoom'
+        }
+    )
+
+spatial_results_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'postgis': openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Served by PostGIS indexes rather than the SQLite fallback"),
+        'results': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'id': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_UUID),
+                'name': openapi.Schema(type=openapi.TYPE_STRING),
+                'latitude': openapi.Schema(type=openapi.TYPE_NUMBER),
+                'longitude': openapi.Schema(type=openapi.TYPE_NUMBER),
+                'category': openapi.Schema(type=openapi.TYPE_STRING),
+                'address': openapi.Schema(type=openapi.TYPE_STRING),
+                'distance_km': openapi.Schema(type=openapi.TYPE_NUMBER, x_nullable=True)
+            }
+        ))
+    }
+)
+
+@schema_for('spatial_nearby')
+def spatial_nearby():
+    return swagger_auto_schema(
+        method='get',
+        operation_description="""
+    Locations of the local mirror near a point, nearest first.
+
+    With radius, every location within radius km (up to limit); without
+    it, the limit nearest locations. On PostgreSQL with PostGIS this is
+    ST_DWithin / KNN on a GiST index, on SQLite a bounding box scan.
+    """,
+        manual_parameters=[
+            openapi.Parameter('lat', openapi.IN_QUERY, type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('lng', openapi.IN_QUERY, type=openapi.TYPE_NUMBER, required=True),
+            openapi.Parameter('radius', openapi.IN_QUERY, description="Kilometers", type=openapi.TYPE_NUMBER, required=False),
+            openapi.Parameter('limit', openapi.IN_QUERY, description="At most 100, default 20", type=openapi.TYPE_INTEGER, required=False)
+        ],
+        responses={200: spatial_results_schema, 400: 'Invalid coordinates, radius or limit'}
+    )
+
+@schema_for('spatial_search')
+def spatial_search():
+    return swagger_auto_schema(
+        method='get',
+        operation_description="Locations whose name or address contains q; on PostgreSQL also near-miss names (trigram similarity), best match first",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('limit', openapi.IN_QUERY, description="At most 100, default 20", type=openapi.TYPE_INTEGER, required=False)
+        ],
+        responses={200: spatial_results_schema, 400: 'Missing q'}
+    )
+
+@schema_for('location_tile')
+def location_tile():
+    return swagger_auto_schema(
+        method='get',
+        operation_description="""
+    Mapbox Vector Tile (protobuf) of locations, one "locations" point layer.
+
+    scope=mine (default when signed in) renders the user's saved locations,
+    scope=public the shared location table. Below MAP_CLUSTER_MAX_ZOOM
+    features may be clusters (cluster=true, point_count). Responses carry an
+    ETag that changes when the underlying locations do.
+    """,
+        manual_parameters=[
+            openapi.Parameter(
+                'scope',
+                openapi.IN_QUERY,
+                description="mine or public",
+                type=openapi.TYPE_STRING,
+                enum=['mine', 'public'],
+                required=False
+            )
+        ],
+        responses={
+            200: openapi.Response(description="application/vnd.mapbox-vector-tile (empty body for an empty tile)"),
+            304: 'Not modified',
+            400: 'Unknown scope',
+            401: 'scope=mine without authentication',
+            404: 'Tile outside the zoom level'
+        }
+    )
+
+@schema_for('osm_tile')
+def osm_tile():
+    return swagger_auto_schema(
+        method='get',
+        operation_description="""
+    OpenStreetMap raster tile served through the local tile cache.
+
+    Use /api/tiles/osm/{z}/{x}/{y}.png as the map's tile URL instead of
+    tile.openstreetmap.org. Cached tiles are answered from disk, stale ones
+    are revalidated upstream, and neighbouring tiles are fetched in the
+    background.
+    """,
+        responses={
+            200: openapi.Response(description="image/png"),
+            304: 'Not modified',
+            404: 'Tile outside the zoom level',
+            502: 'Tile not cached and upstream unavailable'
+        }
+    )
+
+@schema_for('report_positions')
+def report_positions():
+    return swagger_auto_schema(
+        method='post',
+        operation_description="""
+    Report the user's position (or a batch of positions, oldest first) and
+    get the geofence transitions it caused.
+
+    Saved locations with notify_enabled are circles of notify_radius km. An
+    enter event is sent once when the user moves into a circle and an exit
+    event once when they leave it again.
+    """,
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'latitude': openapi.Schema(type=openapi.TYPE_NUMBER),
+                'longitude': openapi.Schema(type=openapi.TYPE_NUMBER),
+                'positions': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'latitude': openapi.Schema(type=openapi.TYPE_NUMBER),
+                            'longitude': openapi.Schema(type=openapi.TYPE_NUMBER)
+                        }
+                    )
+                )
+            }
+        ),
+        responses={
+            200: openapi.Response(
+                description="Transitions and the saved locations the user is now inside",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'events': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                        'inside': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING))
+                    }
+                )
+            ),
+            400: 'Malformed positions'
+        }
+    )
+
+@schema_for('location_events')
+def location_events():
+    return swagger_auto_schema(
+        method='get',
+        operation_description="""
+    Server-Sent Events stream of changes to the user's locations.
+
+    Replaces polling list/me: each event names what changed
+    (event: user_location or location, data: {"type", "id", "deleted"})
+    and the client refetches just that. event: resync means events were
+    dropped and everything should be refetched. Comment lines are sent as
+    heartbeats; the server ends the stream after REALTIME_STREAM_MAX_SECONDS
+    and EventSource reconnects on its own.
+    """,
+        responses={200: openapi.Response(description="text/event-stream")}
+    )
+
+@schema_for('listener_hub_stats')
+def listener_hub_stats():
+    return swagger_auto_schema(
+        method='get',
+        operation_description="RTDB listener hub metrics of this process: streams, queue depth, coalesced/dropped changes and dispatch lag (seconds)",
+        responses={
+            200: openapi.Response(
+                description="Listener hub statistics",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'streams': openapi.Schema(type=openapi.TYPE_OBJECT),
+                        'received': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'coalesced': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'keys': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'dispatched': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'dropped': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'errors': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'queued': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'queue_size': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'lag_avg': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'lag_max': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'lag_last': openapi.Schema(type=openapi.TYPE_NUMBER)
+                    }
+                )
+            )
+        }
+    )
+
+@schema_for('geocode_cache_stats')
+def geocode_cache_stats():
+    return swagger_auto_schema(
+        method='get',
+        operation_description="Hit/miss counters of the shared geocode cache in this process",
+        responses={
+            200: openapi.Response(
+                description="Cache statistics",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'memory_hits': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'db_hits': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'misses': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'writes': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'lookups': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'memory_size': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'hit_ratio': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'memory_hit_ratio': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'cached_places': openapi.Schema(type=openapi.TYPE_INTEGER)
+                    }
+                )
+            )
+        }
+    )
+
+@schema_for('save_instagram_locations')
+def save_instagram_locations():
+    return swagger_auto_schema(
+        method='post',
+        operation_description="Sync local data to Firebase",
+        responses={
+            200: openapi.Response(
+                description="Success",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'message': openapi.Schema(
+                            type=openapi.TYPE_STRING,
+                            example="Sync completed successfully"
+                        )
+                    }
+                )
+            )
+        }
+    )
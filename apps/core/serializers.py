@@ -1,6 +1,11 @@
 # apps/core/serializers.py
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Location, InstagramReel, UserLocation
+from .services.geofence import clean_notify_radius
+import datetime
 
 class InstagramReelSerializer(serializers.ModelSerializer):
     class Meta:
@@ -9,7 +14,17 @@ class InstagramReelSerializer(serializers.ModelSerializer):
                  'date_posted', 'date_extracted', 'location']
         read_only_fields = ['id', 'date_extracted']
 
-class LocationSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Keep only the serializer fields named in the ``fields`` keyword argument"""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class LocationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Location
         fields = [
@@ -62,11 +77,10 @@ class UserLocationSerializer(serializers.ModelSerializer):
         ]
 
     def validate_notify_radius(self, value):
-        if value <= 0:
-            raise serializers.ValidationError(
-                'Notification radius must be greater than 0'
-            )
-        return value
+        try:
+            return clean_notify_radius(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
 
 class LocationAnalysisSerializer(serializers.Serializer):
     """Serializer for Instagram reel analysis endpoint"""
@@ -74,4 +88,116 @@ class LocationAnalysisSerializer(serializers.Serializer):
     locations = LocationSerializer(many=True, read_only=True)
     likes = serializers.CharField(read_only=True)
     comments = serializers.CharField(read_only=True)
-    date_posted = serializers.DateTimeField(read_only=True)
\ No newline at end of file
+    date_posted = serializers.DateTimeField(read_only=True)
+
+def _format_datetime(value, tz):
+    """Same output as DRF's DateTimeField with the default ISO 8601 format"""
+    if not value:
+        return None
+    if tz is not None:
+        value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, datetime.timezone.utc)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+def _format_uuid(value, tz):
+    return None if value is None else str(value)
+
+def _compile_fields(model, field_names, prefix='', nested=()):
+    """(output name, values() column, converter) for each serializer field
+
+    Fields listed in ``nested`` get a ``None`` column and are filled in by
+    the caller.
+    """
+    mapping = []
+    for name in field_names:
+        model_field = model._meta.get_field(name)
+        converter = None
+        if name in nested:
+            column = None
+        elif model_field.is_relation:
+            # PrimaryKeyRelatedField renders the raw pk
+            column = f'{prefix}{model_field.attname}'
+        else:
+            column = f'{prefix}{name}'
+            if isinstance(model_field, models.UUIDField):
+                converter = _format_uuid
+            elif isinstance(model_field, models.DateTimeField):
+                converter = _format_datetime
+        mapping.append((name, column, converter))
+    return tuple(mapping)
+
+class UserLocationReadSerializer:
+    """Fast read-only equivalent of ``UserLocationSerializer`` for listings.
+
+    Rows come from ``values()`` and are turned into the same nested dicts
+    through a field mapping compiled once from the two ModelSerializers'
+    ``Meta.fields``, skipping per-row field binding and model instances.
+
+    ``fields`` restricts the output (and the columns read) to a sparse
+    fieldset: ``location`` keeps the nested location whole and
+    ``location.<name>`` picks single location fields.
+    """
+
+    all_fields = _compile_fields(
+        UserLocation,
+        [name for name in UserLocationSerializer.Meta.fields if name != 'location_id'],
+        nested=('location',)
+    )
+    all_location_fields = _compile_fields(Location, LocationSerializer.Meta.fields, 'location__')
+
+    def __init__(self, fields=None, required_columns=()):
+        if fields is None:
+            self.fields, self.location_fields = self.all_fields, self.all_location_fields
+        else:
+            wanted = set(fields)
+            location_names = {name.split('.', 1)[1] for name in wanted if name.startswith('location.')}
+            if location_names:
+                wanted.add('location')
+            if 'location' in fields:
+                location_names = {name for name, _, _ in self.all_location_fields}
+            self.fields = tuple(field for field in self.all_fields if field[0] in wanted)
+            self.location_fields = tuple(
+                field for field in self.all_location_fields if field[0] in location_names
+            )
+
+        columns = [column for _, column, _ in self.fields + self.location_fields if column]
+        # e.g. the pagination ordering key, read but not rendered
+        columns += [column for column in required_columns if column not in columns]
+        self.values_fields = tuple(columns)
+
+    @classmethod
+    def field_names(cls):
+        """Every name accepted in ``fields``"""
+        names = {name for name, _, _ in cls.all_fields}
+        names.update(f'location.{name}' for name, _, _ in cls.all_location_fields)
+        return names
+
+    def values(self, queryset):
+        return queryset.values(*self.values_fields)
+
+    @staticmethod
+    def current_timezone():
+        return timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def to_representation(self, row, tz=None):
+        tz = tz or self.current_timezone()
+        location = {}
+        for name, column, converter in self.location_fields:
+            value = row[column]
+            location[name] = converter(value, tz) if converter is not None else value
+        data = {}
+        for name, column, converter in self.fields:
+            if column is None:
+                data[name] = location
+                continue
+            value = row[column]
+            data[name] = converter(value, tz) if converter is not None else value
+        return data
+
+    def many(self, rows):
+        tz = self.current_timezone()
+        return [self.to_representation(row, tz) for row in rows]
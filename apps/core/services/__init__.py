@@ -1,5 +1,10 @@
 # apps/core/services/__init__.py
-from .sync_service import SyncService
-
 __all__ = ['SyncService']
-__all__ = ['FirebaseService']
\ No newline at end of file
+
+def __getattr__(name):
+    # Resolved on first use: sync_service imports firebase_admin, which
+    # would otherwise be paid by every import of a services submodule
+    if name == 'SyncService':
+        from .sync_service import SyncService
+        return SyncService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
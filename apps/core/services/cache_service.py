@@ -2,7 +2,7 @@
 
 from django.core.cache import cache
 from typing import Optional, Any
-import json
+from .. import fastjson
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,9 +15,9 @@ class CacheService:
             if result is None:
                 result = await callback()
                 if result is not None:
-                    cache.set(key, json.dumps(result), timeout=timeout)
+                    cache.set(key, fastjson.dumps(result), timeout=timeout)
                 return result
-            return json.loads(result)
+            return fastjson.loads(result)
         except Exception as e:
             logger.warning(f"Cache operation failed: {str(e)}")
-            return await callback()
\ No newline at end of file
+            return await callback()
@@ -0,0 +1,105 @@
+# apps/core/services/export_service.py
+from django.conf import settings
+from typing import Dict, Iterator
+from ..models import UserLocation
+from ..streaming import encode_json, gzip_chunks, buffered_chunks
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    'geojson': ('application/geo+json', 'geojson'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+EXPORT_FIELDS = (
+    'id', 'location_id', 'custom_name', 'custom_description', 'custom_category',
+    'notes', 'is_favorite', 'notify_enabled', 'notify_radius', 'saved_at',
+    'location__name', 'location__latitude', 'location__longitude',
+    'location__description', 'location__category', 'location__address',
+    'location__location_type', 'location__is_instagram_source',
+    'location__instagram_url', 'location__created_at',
+)
+
+class LocationExportService:
+    """Stream a user's saved locations as GeoJSON or NDJSON.
+
+    Rows are read as plain dicts with ``values().iterator(chunk_size)`` and
+    encoded one at a time, so memory stays flat however many locations the
+    account has.
+    """
+
+    def __init__(self, user, chunk_size: int = None):
+        self.user = user
+        self.chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """One flat record per saved location"""
+        queryset = UserLocation.objects.filter(
+            user=self.user,
+            location__is_deleted=False
+        ).order_by('saved_at', 'id').values(*EXPORT_FIELDS)
+
+        for row in queryset.iterator(chunk_size=self.chunk_size):
+            yield {
+                'id': str(row['id']),
+                'location_id': str(row['location_id']),
+                'name': row['custom_name'] or row['location__name'],
+                'location_name': row['location__name'],
+                'latitude': row['location__latitude'],
+                'longitude': row['location__longitude'],
+                'description': row['custom_description'] or row['location__description'],
+                'category': row['custom_category'] or row['location__category'],
+                'address': row['location__address'],
+                'location_type': row['location__location_type'],
+                'is_instagram_source': row['location__is_instagram_source'],
+                'instagram_url': row['location__instagram_url'],
+                'notes': row['notes'],
+                'is_favorite': row['is_favorite'],
+                'notify_enabled': row['notify_enabled'],
+                'notify_radius': row['notify_radius'],
+                'saved_at': row['saved_at'],
+                'created_at': row['location__created_at'],
+            }
+
+    @staticmethod
+    def to_feature(row: Dict) -> Dict:
+        properties = {k: v for k, v in row.items() if k not in ('id', 'latitude', 'longitude')}
+        return {
+            'type': 'Feature',
+            'id': row['id'],
+            'geometry': {
+                'type': 'Point',
+                'coordinates': [row['longitude'], row['latitude']]
+            },
+            'properties': properties
+        }
+
+    def iter_geojson(self) -> Iterator[str]:
+        """A single FeatureCollection, written feature by feature"""
+        yield '{"type":"FeatureCollection","features":['
+        first = True
+        for row in self.iter_rows():
+            feature = encode_json(self.to_feature(row))
+            yield feature if first else ',' + feature
+            first = False
+        yield ']}'
+
+    def iter_ndjson(self) -> Iterator[str]:
+        for row in self.iter_rows():
+            yield encode_json(row) + '\n'
+
+    def iter_bytes(self, output: str = 'geojson', compress: bool = False) -> Iterator[bytes]:
+        """Encoded export body, optionally gzipped on the fly"""
+        if output not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {output}")
+
+        pieces = self.iter_geojson() if output == 'geojson' else self.iter_ndjson()
+        chunks = buffered_chunks(pieces)
+        if compress:
+            chunks = gzip_chunks(chunks)
+        return chunks
+
+    def filename(self, output: str = 'geojson', compress: bool = False) -> str:
+        name = f"memory-map-{self.user.username}.{EXPORT_FORMATS[output][1]}"
+        return f"{name}.gz" if compress else name
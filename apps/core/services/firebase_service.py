@@ -1,18 +1,22 @@
 # apps/core/services/firebase_service.py
-import firebase_admin
-from firebase_admin import credentials, db, auth
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from typing import Dict, List, Optional, Tuple, ClassVar
+from typing import Dict, Iterator, List, Optional, Tuple, ClassVar
 from datetime import datetime, timedelta, timezone
 from .firebase_logging import firebase_operation_logger
+from .geocode_cache import get_geocode_cache
+from .geofence import clean_notify_radius
+from .location_versions import get_location_versions
+from ..projection import Projection
 from math import sin, cos, sqrt, atan2, radians
 import json
 import random
 import logging
 import iso8601
 import asyncio
+import threading
+import time
 from functools import wraps
 import functools
 from asgiref.sync import sync_to_async
@@ -100,14 +104,14 @@ def handle_firebase_operation(operation_name: str, max_retries: int = 3):
 
 class FirebaseService:
     _instance = None
+    _init_lock = threading.Lock()
     # Class level constants
     TEST_USER_ID: ClassVar[str] = "test_user_123" 
      # Update test user constants
     TEST_USER_IDS = ['test_user_123', 'test_user_id']  # List of all test user IDs
     DEFAULT_TEST_USER_ID = 'test_user_123' # Default test user ID
     def __init__(self):
-        """Initialize Firebase service"""
-        self._initialize()
+        """Initialize Firebase service; the Admin SDK itself is set up on first use of ``db``"""
         self.test_user_id = self.TEST_USER_ID
 
     def _parse_date(self, date_str: str) -> datetime:
@@ -222,6 +226,10 @@ class FirebaseService:
             saved_locations = []
             current_time = datetime.now(timezone.utc).isoformat()
 
+            # The LLM rarely returns coordinates; resolve them from the shared
+            # geocode cache (backed by the offline gazetteer) in one pass
+            await sync_to_async(get_geocode_cache().fill_missing_coordinates)(locations)
+
             for location in locations:
                 # Safely get coordinates
                 coordinates = location.get('coordinates', {})
@@ -298,6 +306,7 @@ class FirebaseService:
 
             if not saved_locations:
                 raise FirebaseDataError("No locations were saved successfully")
+            get_location_versions().bump(user_id)
 
             return saved_locations
 
@@ -357,11 +366,9 @@ class FirebaseService:
         # Validate notify_radius if present
         if user_location_data.get('notify_radius') is not None:
             try:
-                radius = float(user_location_data['notify_radius'])
-                if radius <= 0:
-                    raise FirebaseDataError("Notify radius must be greater than 0")
-            except ValueError:
-                raise FirebaseDataError("Invalid notify radius value")    
+                clean_notify_radius(user_location_data['notify_radius'])
+            except ValueError as e:
+                raise FirebaseDataError(str(e))    
     async def delete_user_location(self, user_id: str, location_id: str) -> bool:
         """Delete user location while preserving the main location"""
         try:
@@ -391,23 +398,6 @@ class FirebaseService:
         except Exception as e:
             logger.error(f"Failed to delete user location: {str(e)}", exc_info=True)
             raise FirebaseServiceError(str(e))
-    def _initialize(self):
-        """Initialize Firebase Admin SDK and setup test configuration"""
-        try:
-            if not firebase_admin._apps:
-                cred = credentials.Certificate(settings.FIREBASE_ADMIN_CREDENTIALS)
-                firebase_admin.initialize_app(cred, {
-                    'databaseURL': settings.FIREBASE_DATABASE_URL
-                })
-            self.db = db.reference()
-            
-            # Get test user ID from settings or use default
-            self.test_user_id = getattr(settings, 'FIREBASE_TEST_USER_ID', self.TEST_USER_ID)
-            
-            logger.info("Firebase initialized successfully")
-        except Exception as e:
-            logger.error(f"Firebase initialization error: {str(e)}")
-            raise FirebaseConnectionError(f"Failed to initialize Firebase: {str(e)}")
     async def get_locations_by_instagram_url(self, url: str) -> List[Dict]:
         """Get existing locations by Instagram URL"""
         try:
@@ -499,33 +489,25 @@ class FirebaseService:
             raise FirebaseDataError(f"Validation error: {str(e)}")
     # Improve real-time updates handling
     def setup_realtime_listeners(self):
-        """Setup listeners for real-time updates"""
+        """Subscribe the cache handlers to the process-wide listener hub.
+
+        The hub owns the one RTDB stream per path and runs the handlers on
+        its worker threads, so calling this again (every FirebaseService
+        user may) neither opens more streams nor registers handlers twice.
+        """
+        from .listener_hub import get_listener_hub
         try:
-            def location_callback(event):
-                if event.type == 'put':
-                    self._handle_location_update(event.path, event.data)
-                    
-            def user_location_callback(event):
-                if event.type == 'put':
-                    self._handle_user_location_update(event.path, event.data)
-            
-            # Setup listeners
-            self.db.child('locations').listen(location_callback)
-            self.db.child('user_locations').listen(user_location_callback)
-            
+            hub = get_listener_hub()
+            hub.subscribe('locations', self._handle_location_change, key_depth=1)
+            hub.subscribe('user_locations', self._handle_user_location_change, key_depth=2)
         except Exception as e:
             logger.error(f"Failed to setup listeners: {str(e)}")
             raise FirebaseServiceError("Failed to setup real-time listeners")
     def _setup_database_listeners(self):
         """Setup Firebase Realtime Database listeners"""
         try:
-            # Listen for location changes
-            self.db.child('locations').listen(self._handle_location_change)
-            
-            # Listen for user location changes
-            self.db.child('userLocations').listen(self._handle_user_location_change)
-            
-        except Exception as e:
+            self.setup_realtime_listeners()
+        except FirebaseServiceError as e:
             logger.error(f"Failed to setup database listeners: {str(e)}")
     def handle_firebase_operation(operation_name: str, max_retries: int = 3, base_delay: float = 0.5):
         """Enhanced decorator for handling Firebase operations with exponential backoff"""
@@ -565,60 +547,104 @@ class FirebaseService:
             return wrapper
         return decorator
     def _handle_location_change(self, event):
-        """Handle location change events from Firebase"""
+        """Handle coalesced location changes (listener hub events) from Firebase"""
         try:
-            if event.event_type == 'put':
-                location_id = event.path.split('/')[-1]
-                try:
-                    # Try to use cache if Redis is available
-                    cache_key = f'location_{location_id}'
-                    if event.data is None:
-                        cache.delete(cache_key)
-                    else:
-                        cache.set(cache_key, event.data, timeout=3600)
-                except Exception as cache_error:
-                    logger.warning(f"Cache operation failed: {str(cache_error)}")
-                    
+            if event.overflow or not event.key:
+                logger.warning("Location changes were dropped; cached copies expire on their own")
+                return
+            location_id = event.key
+            try:
+                # Try to use cache if Redis is available
+                cache_key = f'location_{location_id}'
+                data = event.changes.get(location_id)
+                if list(event.changes) == [location_id] and data is not None:
+                    cache.set(cache_key, data, timeout=3600)
+                else:
+                    # Deleted, or only some fields changed: drop the stale copy
+                    cache.delete(cache_key)
+            except Exception as cache_error:
+                logger.warning(f"Cache operation failed: {str(cache_error)}")
+
         except Exception as e:
             logger.error(f"Error handling location change: {str(e)}")
 
     def _handle_user_location_change(self, event):
-        """Handle user location change events from Firebase"""
+        """Handle coalesced user location changes (listener hub events) from Firebase"""
         try:
-            if event.event_type == 'put':
-                path_parts = event.path.split('/')
-                if len(path_parts) >= 2:
-                    user_id = path_parts[-2]
-                    location_id = path_parts[-1]
-                    try:
-                        # Try to use cache if Redis is available
-                        cache_key = f'user_locations_{user_id}'
-                        cache.delete(cache_key)  # Invalidate the cache for this user's locations
-                    except Exception as cache_error:
-                        logger.warning(f"Cache operation failed: {str(cache_error)}")
-                        
+            if event.overflow or not event.key:
+                logger.warning("User location changes were dropped; versions expire on their own")
+                return
+            user_id = event.key.split('/')[0]
+            try:
+                # Try to use cache if Redis is available
+                cache_key = f'user_locations_{user_id}'
+                cache.delete(cache_key)  # Invalidate the cache for this user's locations
+            except Exception as cache_error:
+                logger.warning(f"Cache operation failed: {str(cache_error)}")
+            get_location_versions().bump(user_id)
+
         except Exception as e:
             logger.error(f"Error handling user location change: {str(e)}")
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(FirebaseService, cls).__new__(cls)
-            cls._instance._initialize()
+            with cls._init_lock:
+                if cls._instance is None:
+                    cls._instance = super(FirebaseService, cls).__new__(cls)
         return cls._instance
 
+    @property
+    def db(self):
+        """Root RTDB reference; initializes the Admin SDK on first access"""
+        ref = self.__dict__.get('_db')
+        if ref is None:
+            with self._init_lock:
+                ref = self.__dict__.get('_db')
+                if ref is None:
+                    ref = self._initialize()
+        return ref
+
+    @db.setter
+    def db(self, ref):
+        self._db = ref
+
+    @property
+    def initialized(self) -> bool:
+        return self.__dict__.get('_db') is not None
+
     def _initialize(self):
         """Initialize Firebase Admin SDK"""
+        # Imported here: firebase_admin and google-auth add ~150 ms to every
+        # process that imports this module
+        import firebase_admin
+        from firebase_admin import credentials, db
         try:
+            start = time.perf_counter()
             if not firebase_admin._apps:
                 cred = credentials.Certificate(settings.FIREBASE_ADMIN_CREDENTIALS)
                 firebase_admin.initialize_app(cred, {
                     'databaseURL': settings.FIREBASE_DATABASE_URL
                 })
-            self.db = db.reference()
-            logger.info("Firebase initialized successfully")
+            self._db = db.reference()
+            logger.info(f"Firebase initialized in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return self._db
         except Exception as e:
             logger.error(f"Firebase initialization error: {str(e)}")
             raise
+
+    @classmethod
+    def warm_up(cls) -> bool:
+        """Initialize the Admin SDK now rather than on the first request.
+
+        Meant for server start-up (FIREBASE_EAGER_INIT) or a post-fork hook;
+        failures are logged and the next use of ``db`` tries again.
+        """
+        try:
+            cls().db
+            return True
+        except Exception as e:
+            logger.warning(f"Firebase warm-up failed: {str(e)}")
+            return False
     def _matches_text_search(self, location: Dict, query: str) -> bool:
         """Helper to perform text search"""
         searchable_text = ' '.join([
@@ -928,6 +954,7 @@ class FirebaseService:
             safe_cache_operation(
                 lambda: cache.set(cache_key, location_record, timeout=3600)
             )
+            get_location_versions().bump(location_data['user_id'])
 
             return location_id, location_record
 
@@ -967,6 +994,7 @@ class FirebaseService:
                 .child(user_id)\
                 .child(location_id)\
                 .delete()
+            get_location_versions().bump(user_id)
 
             return True
 
@@ -1027,6 +1055,148 @@ class FirebaseService:
         except Exception as e:
             logger.error(f"Failed to get user locations: {str(e)}", exc_info=True)
             raise FirebaseServiceError(str(e))
+
+    def _fetch_user_locations_page(
+        self,
+        user_id: str,
+        page_size: int,
+        start_key: Optional[str] = None,
+        end_before: Optional[str] = None,
+        projection: Optional[Projection] = None
+    ) -> Tuple[List[Dict], List[str], Optional[str]]:
+        """Blocking read of one page of ``user_locations/{uid}`` in key order.
+
+        When ``projection`` selects nothing from the location record itself
+        (only ``id`` and/or ``user_location``) the per-location reads of
+        ``locations/{id}`` are skipped.
+        """
+        query = self.db.child('user_locations').child(user_id).order_by_key()
+        if end_before:
+            snapshot = query.end_at(end_before).limit_to_last(page_size + 2).get() or {}
+            keys = [key for key in snapshot if key != end_before]
+            more_key = keys[-page_size - 1] if len(keys) > page_size else None
+            keys = keys[-page_size:]
+        else:
+            if start_key:
+                query = query.start_at(start_key)
+            snapshot = query.limit_to_first(page_size + 1).get() or {}
+            keys = list(snapshot)
+            more_key = keys[page_size] if len(keys) > page_size else None
+            keys = keys[:page_size]
+
+        read_locations = projection is None or not projection.only(('id', 'user_location'))
+
+        locations = []
+        for ul_id in keys:
+            ul_data = snapshot[ul_id]
+            if not isinstance(ul_data, dict):
+                continue
+
+            # save_location keys user locations by location id
+            location_id = ul_data.get('location_id') or ul_id
+            if read_locations:
+                location_data = self.db.child('locations').child(location_id).get()
+                if not location_data:
+                    continue
+            else:
+                location_data = {}
+
+            location = {
+                'id': location_id,
+                **location_data,
+                'user_location': {
+                    'id': ul_id,
+                    **ul_data
+                }
+            }
+            locations.append(projection(location) if projection else location)
+        return locations, keys, more_key
+
+    async def get_user_locations_page(
+        self,
+        user_id: str,
+        page_size: int,
+        start_key: Optional[str] = None,
+        end_before: Optional[str] = None,
+        projection: Optional[Projection] = None
+    ) -> Tuple[List[Dict], List[str], Optional[str]]:
+        """Get one page of a user's locations in key order.
+
+        Reads forward from ``start_key`` (inclusive) or backward from
+        ``end_before`` (exclusive) with ``order_by_key`` so only one page of
+        ``user_locations/{uid}`` is transferred. Returns the combined
+        locations, their keys and the key just past the page (or None).
+        """
+        try:
+            return await sync_to_async(self._fetch_user_locations_page)(
+                user_id, page_size, start_key=start_key, end_before=end_before, projection=projection
+            )
+        except Exception as e:
+            logger.error(f"Failed to get user locations page: {str(e)}", exc_info=True)
+            raise FirebaseServiceError(str(e))
+
+    def iter_user_locations(
+        self,
+        user_id: str,
+        page_size: int = 200,
+        projection: Optional[Projection] = None
+    ) -> Iterator[Dict]:
+        """Yield all of a user's locations, holding one page in memory at a time.
+
+        Ids only (``?fields=id``) still pages ``user_locations/{uid}``: the id
+        is the record's ``location_id`` where it has one, not its key, so a
+        shallow read of the keys would not match the listing.
+        """
+        start_key = None
+        while True:
+            locations, keys, start_key = self._fetch_user_locations_page(
+                user_id, page_size, start_key=start_key, projection=projection
+            )
+            yield from locations
+            if not start_key:
+                return
+
+    def iter_search_locations(
+        self,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        page_size: int = 500,
+        projection: Optional[Projection] = None
+    ) -> Iterator[Dict]:
+        """Streaming variant of search_locations for text/category filters.
+
+        Walks ``locations`` in key order one page at a time instead of
+        loading the whole node, so results are yielded unsorted.
+        """
+        if projection is not None and projection.only(('id',)) and not (query or category):
+            keys = self.db.child('locations').get(shallow=True) or {}
+            for key in sorted(keys):
+                yield {'id': key}
+            return
+
+        start_key = None
+        while True:
+            ref = self.db.child('locations').order_by_key()
+            if start_key:
+                ref = ref.start_at(start_key)
+            page = ref.limit_to_first(page_size + 1).get() or {}
+            keys = list(page)
+            start_key = keys[page_size] if len(keys) > page_size else None
+
+            for loc_id in keys[:page_size]:
+                loc_data = page[loc_id]
+                if not isinstance(loc_data, dict):
+                    continue
+                if category and loc_data.get('category') != category:
+                    continue
+                loc_data['id'] = loc_id
+                if query and not self._matches_text_search(loc_data, query):
+                    continue
+                yield projection(loc_data) if projection else loc_data
+
+            if not start_key:
+                return
+
     # Add new method for handling optimistic locking
     async def update_with_optimistic_lock(self, location_id: str, user_id: str, data: Dict) -> Dict:
         """Update with optimistic locking to prevent conflicts"""
@@ -1205,6 +1375,7 @@ class FirebaseService:
                 cache.set(cache_key, updated_data, timeout=3600)
             except Exception as cache_error:
                 logger.warning(f"Cache operation failed: {str(cache_error)}")
+            get_location_versions().bump(user_id)
 
             return updated_data
 
@@ -0,0 +1,202 @@
+# apps/core/services/geocode_cache.py
+from django.conf import settings
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from ..models import GeocodeCache
+from .geocoder import fill_missing_coordinates, get_geocoder, location_coordinates, normalize_place_name
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CACHE_FIELDS = ('normalized_name', 'name', 'latitude', 'longitude', 'address', 'source')
+
+# Entries are shared by every user and keyed by name alone, so only sources
+# that are right for everyone are stored: the gazetteer and what operators
+# load (preload_geocode_cache). Coordinates from the LLM or a user's search
+# ("Starbucks") would otherwise fill in the same spot for every user.
+TRUSTED_SOURCES = ('gazetteer', 'manual')
+
+# Memory front marker for names the gazetteer has no match for
+MISS = {}
+
+class GeocodeCacheService:
+    """Place name -> coordinates cache shared by every user.
+
+    Lookups go through a per-process LRU first and then the ``GeocodeCache``
+    table, so a place extracted from many reels is resolved once and then
+    served from memory. Entries are immutable in practice (a place does not
+    move), so the memory front is never invalidated across processes. Names
+    nothing resolves are remembered as misses in memory only, so the next
+    load of the gazetteer or the table can still find them.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or getattr(settings, 'GEOCODE_CACHE_SIZE', 10000)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0, 'writes': 0}
+
+    def _memory_get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _memory_put(self, key: str, entry: Dict) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += n
+
+    def get_many(self, names: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Look up a batch of names with at most one database query"""
+        return {name: entry or None for name, entry in self._lookup(names).items()}
+
+    def _lookup(self, names: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Like get_many, with MISS for names known not to resolve"""
+        keys = {name: normalize_place_name(name) for name in names if name}
+        found: Dict[str, Dict] = {}
+        missing_keys = set()
+        for key in set(keys.values()):
+            entry = self._memory_get(key)
+            if entry is not None:
+                found[key] = entry
+            elif key:
+                missing_keys.add(key)
+        # A remembered miss saves the query but is still a miss
+        known_misses = sum(1 for entry in found.values() if entry is MISS)
+        self._count('memory_hits', len(found) - known_misses)
+        self._count('misses', known_misses)
+
+        if missing_keys:
+            rows = GeocodeCache.objects.filter(normalized_name__in=missing_keys, source__in=TRUSTED_SOURCES)\
+                .values(*CACHE_FIELDS)
+            for row in rows:
+                found[row['normalized_name']] = row
+                self._memory_put(row['normalized_name'], row)
+            db_hits = len(found.keys() & missing_keys)
+            self._count('db_hits', db_hits)
+            self._count('misses', len(missing_keys) - db_hits)
+
+        return {name: found.get(key) for name, key in keys.items()}
+
+    def get(self, name: str) -> Optional[Dict]:
+        return self.get_many([name]).get(name)
+
+    def remember_many(self, entries: List[Dict], source: str = 'manual') -> int:
+        """Store resolved places; existing names keep their first coordinates.
+
+        Names already in the memory front are skipped, so re-saving a popular
+        place costs nothing. New rows are picked up by the next lookup.
+        """
+        objs = {}
+        for entry in entries:
+            key = normalize_place_name(entry.get('name', ''))
+            if not key or entry.get('latitude') is None or entry.get('longitude') is None:
+                continue
+            if entry.get('source', source) not in TRUSTED_SOURCES:
+                continue
+            if self._memory_get(key):
+                continue
+            objs[key] = GeocodeCache(
+                normalized_name=key[:255],
+                name=entry['name'][:255],
+                latitude=float(entry['latitude']),
+                longitude=float(entry['longitude']),
+                address=entry.get('address') or '',
+                source=entry.get('source', source)
+            )
+        if not objs:
+            return 0
+
+        GeocodeCache.objects.bulk_create(objs.values(), ignore_conflicts=True)
+        with self._lock:
+            for key in objs:
+                if self._entries.get(key) is MISS:
+                    del self._entries[key]
+        self._count('writes', len(objs))
+        return len(objs)
+
+    def remember(self, name: str, latitude: float, longitude: float,
+                 address: str = '', source: str = 'manual') -> None:
+        self.remember_many([{
+            'name': name,
+            'latitude': latitude,
+            'longitude': longitude,
+            'address': address
+        }], source=source)
+
+    def resolve_many(self, names: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Resolve names from the cache, falling back to the offline gazetteer"""
+        results = self._lookup(names)
+        unresolved = [name for name, entry in results.items() if entry is None]
+        if unresolved:
+            matches = get_geocoder().geocode_many(unresolved)
+            resolved = [
+                {**match, 'name': name}
+                for name, match in matches.items() if match
+            ]
+            self.remember_many(resolved, source='gazetteer')
+            for name, match in matches.items():
+                results[name] = match
+                if not match:
+                    self._memory_put(normalize_place_name(name), MISS)
+        return {name: entry or None for name, entry in results.items()}
+
+    def resolve(self, name: str) -> Optional[Dict]:
+        return self.resolve_many([name]).get(name)
+
+    def fill_missing_coordinates(self, locations: List[Dict]) -> int:
+        """Geocode locations without coordinates through the cache"""
+        return fill_missing_coordinates(locations, resolve=self.resolve_many)
+
+    def complete_location(self, location_data: Dict) -> Dict:
+        """Fill coordinates of a single location from the cache when it has none"""
+        name = location_data.get('name', '')
+        lat, lng = location_coordinates(location_data)
+        if lat not in (None, '') and lng not in (None, ''):
+            return location_data
+
+        for candidate in (name, location_data.get('address')):
+            match = self.resolve(candidate) if candidate else None
+            if match:
+                location_data['latitude'] = match['latitude']
+                location_data['longitude'] = match['longitude']
+                if not location_data.get('address') and match.get('address'):
+                    location_data['address'] = match['address']
+                break
+        return location_data
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_size'] = len(self._entries)
+        lookups = stats['memory_hits'] + stats['db_hits'] + stats['misses']
+        stats['lookups'] = lookups
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['db_hits']) / lookups, 4) if lookups else None
+        stats['memory_hit_ratio'] = round(stats['memory_hits'] / lookups, 4) if lookups else None
+        return stats
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+_geocode_cache = None
+_geocode_cache_lock = threading.Lock()
+
+def get_geocode_cache() -> GeocodeCacheService:
+    """Process-wide geocode cache"""
+    global _geocode_cache
+    if _geocode_cache is None:
+        with _geocode_cache_lock:
+            if _geocode_cache is None:
+                _geocode_cache = GeocodeCacheService()
+    return _geocode_cache
@@ -0,0 +1,365 @@
+# apps/core/services/geocoder.py
+from django.conf import settings
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b'MMGAZ001'
+# magic, entry count
+HEADER = struct.Struct('<8sI')
+# latitude, longitude, population, key length, name length, country code
+RECORD = struct.Struct('<ddIHH2s')
+OFFSET = struct.Struct('<I')
+
+NON_WORD_RE = re.compile(r'[^\w]+')
+HAS_DIGIT_RE = re.compile(r'\d')
+
+# GeoNames column positions
+COL_NAME = 1
+COL_ASCIINAME = 2
+COL_ALTERNATENAMES = 3
+COL_LATITUDE = 4
+COL_LONGITUDE = 5
+COL_COUNTRY = 8
+COL_POPULATION = 14
+
+def normalize_place_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    if not name:
+        return ''
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = NON_WORD_RE.sub(' ', text.lower()).replace('_', ' ')
+    return ' '.join(text.split())
+
+def iter_gazetteer_rows(tsv_path: Path) -> Iterator[Tuple[str, str, float, float, int, str]]:
+    """Yield (key, name, lat, lng, population, country) for every name of every place"""
+    with open(tsv_path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip() or line.startswith('#'):
+                continue
+            cols = line.rstrip('\n').split('\t')
+            try:
+                name = cols[COL_NAME]
+                lat = float(cols[COL_LATITUDE])
+                lng = float(cols[COL_LONGITUDE])
+                population = int(cols[COL_POPULATION] or 0) if len(cols) > COL_POPULATION else 0
+                country = cols[COL_COUNTRY] if len(cols) > COL_COUNTRY else ''
+            except (IndexError, ValueError):
+                logger.warning(f"Skipping malformed gazetteer line {line_no} in {tsv_path}")
+                continue
+
+            names = {name, cols[COL_ASCIINAME]}
+            if cols[COL_ALTERNATENAMES]:
+                names.update(cols[COL_ALTERNATENAMES].split(','))
+
+            keys = {normalize_place_name(n) for n in names}
+            for key in keys:
+                if key:
+                    yield key, name, lat, lng, population, country
+
+def build_gazetteer_index(tsv_path, index_path) -> int:
+    """Compile a GeoNames-format TSV into the binary index used by OfflineGeocoder.
+
+    Layout: header, a table of uint32 record offsets sorted by (key, -population),
+    then the packed records. The file is written to a temp file and renamed so
+    readers never see a partial index.
+    """
+    tsv_path, index_path = Path(tsv_path), Path(index_path)
+    entries = sorted(
+        iter_gazetteer_rows(tsv_path),
+        key=lambda e: (e[0].encode('utf-8'), -e[4])
+    )
+
+    records = bytearray()
+    offsets = []
+    for key, name, lat, lng, population, country in entries:
+        key_bytes = key.encode('utf-8')
+        name_bytes = name.encode('utf-8')
+        offsets.append(len(records))
+        records += RECORD.pack(
+            lat, lng, min(population, 0xFFFFFFFF),
+            len(key_bytes), len(name_bytes),
+            country.encode('ascii', 'ignore')[:2].ljust(2)
+        )
+        records += key_bytes
+        records += name_bytes
+
+    data_start = HEADER.size + OFFSET.size * len(offsets)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=index_path.parent, prefix='.gazetteer-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(INDEX_MAGIC, len(offsets)))
+            f.write(b''.join(OFFSET.pack(data_start + o) for o in offsets))
+            f.write(records)
+        os.replace(tmp_path, index_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+    logger.info(f"Built gazetteer index with {len(offsets)} names at {index_path}")
+    return len(offsets)
+
+class OfflineGeocoder:
+    """Name -> coordinates lookup over a memory-mapped gazetteer index.
+
+    Exact and prefix lookups binary-search the sorted key table directly in
+    the mapped file, so the index is shared between processes through the
+    page cache and nothing is parsed at startup.
+    """
+
+    FUZZY_THRESHOLD = 0.85
+    FUZZY_MAX_CANDIDATES = 5000
+
+    def __init__(self, tsv_path, index_path=None):
+        self.tsv_path = Path(tsv_path)
+        self.index_path = Path(index_path) if index_path else self.tsv_path.with_suffix('.idx')
+        self._mmap = None
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self) -> None:
+        if self._mmap is not None:
+            return
+        with self._lock:
+            if self._mmap is not None:
+                return
+            if (not self.index_path.exists()
+                    or self.index_path.stat().st_mtime < self.tsv_path.stat().st_mtime):
+                build_gazetteer_index(self.tsv_path, self.index_path)
+
+            with open(self.index_path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count = HEADER.unpack_from(mapped, 0)
+            if magic != INDEX_MAGIC:
+                mapped.close()
+                raise ValueError(f"Not a gazetteer index: {self.index_path}")
+            self._count = count
+            self._mmap = mapped
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return self._count
+
+    def _record_offset(self, i: int) -> int:
+        return OFFSET.unpack_from(self._mmap, HEADER.size + OFFSET.size * i)[0]
+
+    def _key_at(self, i: int) -> bytes:
+        offset = self._record_offset(i)
+        key_len = struct.unpack_from('<H', self._mmap, offset + 20)[0]
+        start = offset + RECORD.size
+        return self._mmap[start:start + key_len]
+
+    def _entry_at(self, i: int) -> Dict:
+        offset = self._record_offset(i)
+        lat, lng, population, key_len, name_len, country = RECORD.unpack_from(self._mmap, offset)
+        start = offset + RECORD.size
+        return {
+            'key': self._mmap[start:start + key_len].decode('utf-8'),
+            'name': self._mmap[start + key_len:start + key_len + name_len].decode('utf-8'),
+            'latitude': lat,
+            'longitude': lng,
+            'population': population,
+            'country_code': country.decode('ascii').strip(),
+        }
+
+    def _lower_bound(self, key: bytes) -> int:
+        # bisect over a lazily-evaluated view of the key table
+        keys = _KeyView(self)
+        return bisect_left(keys, key)
+
+    def _iter_prefix(self, prefix: bytes) -> Iterator[int]:
+        i = self._lower_bound(prefix)
+        while i < self._count and self._key_at(i).startswith(prefix):
+            yield i
+            i += 1
+
+    def exact(self, name: str) -> Optional[Dict]:
+        """Best match for an exact (normalized) name, preferring larger places"""
+        self._ensure_loaded()
+        key = normalize_place_name(name).encode('utf-8')
+        if not key:
+            return None
+        i = self._lower_bound(key)
+        if i < self._count and self._key_at(i) == key:
+            return {**self._entry_at(i), 'match': 'exact'}
+        return None
+
+    def prefix(self, name: str, limit: int = 10) -> List[Dict]:
+        """Places whose name starts with ``name``, largest first"""
+        self._ensure_loaded()
+        key = normalize_place_name(name).encode('utf-8')
+        if not key:
+            return []
+        matches = []
+        for n, i in enumerate(self._iter_prefix(key)):
+            if n >= self.FUZZY_MAX_CANDIDATES:
+                break
+            matches.append(self._entry_at(i))
+        matches.sort(key=lambda e: -e['population'])
+        return [{**m, 'match': 'prefix'} for m in matches[:limit]]
+
+    def fuzzy(self, name: str, threshold: Optional[float] = None) -> Optional[Dict]:
+        """Closest name sharing the first two characters, if similar enough"""
+        self._ensure_loaded()
+        key = normalize_place_name(name)
+        if len(key) < 4:
+            return None
+        threshold = threshold or self.FUZZY_THRESHOLD
+
+        matcher = SequenceMatcher(a=key, autojunk=False)
+        best, best_score = None, threshold
+        for n, i in enumerate(self._iter_prefix(key[:2].encode('utf-8'))):
+            if n >= self.FUZZY_MAX_CANDIDATES:
+                break
+            candidate = self._key_at(i).decode('utf-8')
+            matcher.set_seq2(candidate)
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best, best_score = i, score
+
+        if best is None:
+            return None
+        return {**self._entry_at(best), 'match': 'fuzzy', 'score': round(best_score, 3)}
+
+    def geocode(self, name: str) -> Optional[Dict]:
+        """Resolve a free-form location name such as the ones the LLM returns.
+
+        Tries the full name, then each comma-separated part from most to
+        least specific ("Statue of Hachiko, 2-14-3 Dogenzaka, Shibuya-ku, Tokyo"
+        falls back to the statue, then Shibuya, then Tokyo). Fuzzy matching
+        is only used for the full name and its first part.
+        """
+        if not name:
+            return None
+
+        parts = [p.strip() for p in name.split(',') if p.strip()]
+        candidates = [name] + parts if len(parts) > 1 else [name]
+
+        for i, candidate in enumerate(candidates):
+            # Street addresses ("2-14-3 Dogenzaka") never match a place name
+            if i > 0 and HAS_DIGIT_RE.search(candidate):
+                continue
+            match = self.exact(candidate)
+            if match:
+                return match
+
+        for candidate in candidates[:2]:
+            match = self.fuzzy(candidate)
+            if match:
+                return match
+        return None
+
+    def geocode_many(self, names: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Geocode a batch of names, resolving each distinct name once"""
+        results = {}
+        for name in names:
+            if name not in results:
+                results[name] = self.geocode(name)
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+
+class _KeyView:
+    """Sequence of index keys for bisect, read from the mapped file on demand"""
+
+    def __init__(self, geocoder: OfflineGeocoder):
+        self.geocoder = geocoder
+
+    def __len__(self) -> int:
+        return self.geocoder._count
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.geocoder._key_at(i)
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+def get_geocoder() -> OfflineGeocoder:
+    """Process-wide geocoder for the configured gazetteer"""
+    global _geocoder
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                _geocoder = OfflineGeocoder(
+                    settings.GAZETTEER_PATH,
+                    getattr(settings, 'GAZETTEER_INDEX_PATH', None)
+                )
+    return _geocoder
+
+def location_coordinates(location: Dict) -> Tuple[Optional[float], Optional[float]]:
+    """Latitude and longitude of an extracted location, nested or flat (0.0 is a coordinate)"""
+    coordinates = location.get('coordinates') or {}
+    lat = coordinates.get('latitude')
+    if lat is None:
+        lat = location.get('latitude')
+    lng = coordinates.get('longitude')
+    if lng is None:
+        lng = location.get('longitude')
+    return lat, lng
+
+def _has_coordinates(location: Dict) -> bool:
+    lat, lng = location_coordinates(location)
+    return lat is not None and lng is not None
+
+def fill_missing_coordinates(
+    locations: List[Dict],
+    geocoder: Optional[OfflineGeocoder] = None,
+    resolve: Optional[Callable[[Iterable[str]], Dict[str, Optional[Dict]]]] = None
+) -> int:
+    """Fill latitude/longitude in place for locations the LLM left without coordinates.
+
+    ``resolve`` maps a batch of names to matches and defaults to the
+    gazetteer's ``geocode_many`` (the geocode cache passes its own).
+    Returns the number of locations that were geocoded. Failures are logged
+    and leave the locations untouched so saving still goes ahead.
+    """
+    missing = [
+        loc for loc in locations
+        if isinstance(loc, dict) and loc.get('name') and not _has_coordinates(loc)
+    ]
+    if not missing:
+        return 0
+
+    try:
+        if resolve is None:
+            resolve = (geocoder or get_geocoder()).geocode_many
+        matches = resolve([loc['name'] for loc in missing])
+    except Exception as e:
+        logger.error(f"Offline geocoding failed: {str(e)}")
+        return 0
+
+    filled = 0
+    for loc in missing:
+        match = matches.get(loc['name'])
+        if not match:
+            logger.debug(f"No gazetteer match for location: {loc['name']}")
+            continue
+        loc['latitude'] = match['latitude']
+        loc['longitude'] = match['longitude']
+        loc['coordinates'] = {
+            'latitude': match['latitude'],
+            'longitude': match['longitude']
+        }
+        filled += 1
+
+    logger.info(f"Geocoded {filled}/{len(missing)} locations without coordinates")
+    return filled
@@ -0,0 +1,304 @@
+# apps/core/services/geofence.py
+from django.conf import settings
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from ..models import UserLocation
+from .location_versions import get_location_versions
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+# Keeps longitude spans finite for fences right at the poles
+MIN_COS_LATITUDE = 0.01
+
+ENTER = 'enter'
+EXIT = 'exit'
+
+def distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance (haversine)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def clean_notify_radius(value) -> float:
+    """notify_radius as km in (0, GEOFENCE_MAX_RADIUS_KM], ValueError otherwise"""
+    maximum = getattr(settings, 'GEOFENCE_MAX_RADIUS_KM', 50.0)
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("notify_radius must be a number")
+    if not 0 < radius <= maximum:
+        raise ValueError(f"notify_radius must be greater than 0 and at most {maximum:g} km")
+    return radius
+
+def parse_positions(data, max_positions: int = 1000) -> List[Tuple[float, float]]:
+    """``{"latitude", "longitude"}`` or ``{"positions": [...]}`` -> (lat, lng) pairs, ValueError when malformed"""
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    items = data['positions'] if 'positions' in data else [data]
+    if not isinstance(items, list) or not items:
+        raise ValueError("positions must be a non-empty list")
+    if len(items) > max_positions:
+        raise ValueError(f"At most {max_positions} positions per request")
+
+    positions = []
+    for item in items:
+        try:
+            lat, lng = float(item['latitude']), float(item['longitude'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Each position needs numeric latitude and longitude")
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError("latitude/longitude out of range")
+        positions.append((lat, lng))
+    return positions
+
+class Fence:
+    """A notify-enabled saved location: circle of ``radius_km`` around a point"""
+
+    __slots__ = ('id', 'latitude', 'longitude', 'radius_km', 'name', 'cos_lat')
+
+    def __init__(self, fence_id: str, latitude: float, longitude: float, radius_km: float, name: str = ''):
+        self.id = fence_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius_km = radius_km
+        self.name = name
+        self.cos_lat = max(math.cos(math.radians(latitude)), MIN_COS_LATITUDE)
+
+    def distance_km(self, lat: float, lng: float) -> float:
+        """Equirectangular distance, accurate to well under 1% at fence scale"""
+        dlng = (lng - self.longitude + 180.0) % 360.0 - 180.0  # shortest way round
+        dx = dlng * self.cos_lat
+        dy = lat - self.latitude
+        return math.sqrt(dx * dx + dy * dy) * KM_PER_DEGREE
+
+class GeofenceIndex:
+    """Uniform lat/lng grid of one user's fences.
+
+    Each fence is registered in every cell its bounding box touches, so a
+    position only has to test the fences of the one cell it falls in.
+    Longitude cells wrap around the antimeridian. Fences that would cover
+    more than ``max_cells`` cells (radii stored before the cap, or synced
+    from other clients) are kept in ``wide`` and tested for every position
+    instead, so memory and build time stay bounded.
+    """
+
+    def __init__(self, fences: Iterable[Fence], cell_degrees: float = 0.05, max_cells: int = 1024):
+        self.cell = cell_degrees
+        self.max_cells = max_cells
+        self.lng_cells = int(math.ceil(360.0 / cell_degrees))
+        self.fences: Dict[str, Fence] = {}
+        self.cells: Dict[Tuple[int, int], List[Fence]] = {}
+        self.wide: List[Fence] = []
+        for fence in fences:
+            self.add(fence)
+
+    def __len__(self) -> int:
+        return len(self.fences)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell)), int(math.floor((lng + 180.0) / self.cell)) % self.lng_cells
+
+    def add(self, fence: Fence) -> None:
+        self.fences[fence.id] = fence
+        dlat = fence.radius_km / KM_PER_DEGREE
+        dlng = min(dlat / fence.cos_lat, 180.0)
+        lat_start = int(math.floor(max(fence.latitude - dlat, -90.0) / self.cell))
+        lat_end = int(math.floor(min(fence.latitude + dlat, 90.0) / self.cell))
+        lng_start = int(math.floor((fence.longitude - dlng + 180.0) / self.cell))
+        lng_end = int(math.floor((fence.longitude + dlng + 180.0) / self.cell))
+        if lng_end - lng_start >= self.lng_cells:
+            lng_start, lng_end = 0, self.lng_cells - 1
+        if (lat_end - lat_start + 1) * (lng_end - lng_start + 1) > self.max_cells:
+            self.wide.append(fence)
+            return
+        for i in range(lat_start, lat_end + 1):
+            for j in range(lng_start, lng_end + 1):
+                self.cells.setdefault((i, j % self.lng_cells), []).append(fence)
+
+    def containing(self, lat: float, lng: float) -> List[Fence]:
+        """Fences whose circle contains the position"""
+        candidates = self.cells.get(self._cell(lat, lng), [])
+        if self.wide:
+            candidates = candidates + self.wide
+        return [fence for fence in candidates if fence.distance_km(lat, lng) <= fence.radius_km]
+
+class _UserFences:
+    __slots__ = ('index', 'version', 'checked_at', 'inside')
+
+    def __init__(self, index: GeofenceIndex, version: Optional[str]):
+        self.index = index
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.inside: Set[str] = set()
+
+class GeofenceEngine:
+    """Turn a stream of user positions into enter/exit events.
+
+    Every user gets a ``GeofenceIndex`` of their notify-enabled saved
+    locations, built on first use and kept in an LRU of ``max_users``.
+    An index is rebuilt when the model signals invalidate it in this process,
+    or when the user's location version token has moved on. The token is
+    checked at most every ``refresh_seconds``, so writes made by other
+    processes are picked up without a cache round trip per position.
+
+    The engine remembers which fences each user is inside and only reports
+    transitions. Exiting needs the user to be ``exit_margin`` (a fraction of
+    the radius) beyond the circle, so GPS jitter on the edge does not
+    produce enter/exit pairs.
+    """
+
+    def __init__(
+        self,
+        cell_degrees: Optional[float] = None,
+        exit_margin: Optional[float] = None,
+        max_users: Optional[int] = None,
+        refresh_seconds: Optional[float] = None
+    ):
+        self.cell_degrees = cell_degrees or getattr(settings, 'GEOFENCE_CELL_DEGREES', 0.05)
+        self.max_fence_cells = getattr(settings, 'GEOFENCE_MAX_FENCE_CELLS', 1024)
+        self.exit_margin = exit_margin if exit_margin is not None else getattr(settings, 'GEOFENCE_EXIT_MARGIN', 0.1)
+        self.max_users = max_users or getattr(settings, 'GEOFENCE_MAX_USERS', 10000)
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else getattr(settings, 'GEOFENCE_REFRESH_SECONDS', 30)
+        self._users: 'OrderedDict[str, _UserFences]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load_fences(self, user_id) -> List[Fence]:
+        rows = UserLocation.objects.filter(
+            user_id=user_id,
+            notify_enabled=True,
+            location__is_deleted=False
+        ).values_list('id', 'location__latitude', 'location__longitude', 'notify_radius', 'custom_name', 'location__name')
+        return [
+            Fence(str(ul_id), lat, lng, radius, custom_name or name)
+            for ul_id, lat, lng, radius, custom_name, name in rows.iterator(chunk_size=2000)
+            if radius and radius > 0
+        ]
+
+    def _version(self, user_id) -> Optional[str]:
+        found = get_location_versions().get(user_id)
+        return found[0] if found else None
+
+    def set_fences(self, user_id, fences: Iterable[Fence], version: Optional[str] = None) -> _UserFences:
+        """Install a user's fences directly; the inside-state of kept fences survives"""
+        user_id = str(user_id)
+        entry = _UserFences(GeofenceIndex(fences, self.cell_degrees, self.max_fence_cells), version)
+        with self._lock:
+            previous = self._users.pop(user_id, None)
+            if previous is not None:
+                entry.inside = previous.inside & entry.index.fences.keys()
+            self._users[user_id] = entry
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return entry
+
+    def invalidate(self, user_id) -> None:
+        """Force a rebuild of the user's index on their next position"""
+        with self._lock:
+            entry = self._users.get(str(user_id))
+            if entry is not None:
+                entry.checked_at = float('-inf')
+                entry.version = None
+
+    def _entry(self, user_id: str) -> _UserFences:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None:
+                self._users.move_to_end(user_id)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.refresh_seconds:
+            return entry
+
+        version = self._version(user_id)
+        if entry is not None and entry.version is not None and entry.version == version:
+            entry.checked_at = now
+            return entry
+
+        try:
+            fences = self.load_fences(user_id)
+        except Exception as e:
+            logger.error(f"Failed to load geofences for user {user_id}: {str(e)}")
+            if entry is not None:
+                return entry
+            fences = []
+        return self.set_fences(user_id, fences, version)
+
+    def update(self, user_id, latitude: float, longitude: float) -> List[Dict]:
+        """Enter/exit events caused by one position of ``user_id``"""
+        user_id = str(user_id)
+        entry = self._entry(user_id)
+        events = []
+
+        # Positions of one user can arrive on several request threads at
+        # once; the check-and-set of the inside-state has to be atomic or
+        # both would report the same enter. Take the newest entry, since a
+        # rebuild may have replaced (and copied the state of) this one.
+        with self._lock:
+            entry = self._users.get(user_id, entry)
+            index = entry.index
+            inside = entry.inside
+
+            for fence in index.containing(latitude, longitude):
+                if fence.id not in inside:
+                    inside.add(fence.id)
+                    events.append(self._event(ENTER, user_id, fence, latitude, longitude))
+
+            if inside:
+                margin = 1.0 + self.exit_margin
+                for fence_id in list(inside):
+                    fence = index.fences.get(fence_id)
+                    if fence is None:
+                        inside.discard(fence_id)
+                        continue
+                    if fence.distance_km(latitude, longitude) > fence.radius_km * margin:
+                        inside.discard(fence_id)
+                        events.append(self._event(EXIT, user_id, fence, latitude, longitude))
+        return events
+
+    def process(self, updates: Iterable[Sequence]) -> List[Dict]:
+        """Events for a batch of ``(user_id, latitude, longitude)`` updates, in order"""
+        events = []
+        for user_id, latitude, longitude in updates:
+            events.extend(self.update(user_id, latitude, longitude))
+        return events
+
+    def inside(self, user_id) -> Set[str]:
+        """Fence ids the user is currently inside"""
+        with self._lock:
+            entry = self._users.get(str(user_id))
+            return set(entry.inside) if entry else set()
+
+    @staticmethod
+    def _event(kind: str, user_id: str, fence: Fence, latitude: float, longitude: float) -> Dict:
+        return {
+            'type': kind,
+            'user_id': user_id,
+            'user_location_id': fence.id,
+            'name': fence.name,
+            'radius_km': fence.radius_km,
+            'distance_km': round(fence.distance_km(latitude, longitude), 4),
+        }
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_geofence_engine() -> GeofenceEngine:
+    """Process-wide geofence engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = GeofenceEngine()
+    return _engine
+
+def invalidate_geofences(user_id) -> None:
+    """Drop a user's cached fences if this process has built any"""
+    if _engine is not None:
+        _engine.invalidate(user_id)
@@ -0,0 +1,332 @@
+# apps/core/services/import_service.py
+from django.conf import settings
+from django.db import transaction
+from datetime import datetime, timezone
+from typing import Callable, Dict, IO, List, Optional, Tuple
+from ..models import Location, UserLocation
+from .geocoder import normalize_place_name
+from .location_versions import PUBLIC_SCOPE, get_location_versions
+import csv
+import io
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('geojson', 'csv')
+
+# Accepted column names for each field, first match wins
+CSV_COLUMNS = {
+    'name': ('name', 'title', 'place'),
+    'latitude': ('latitude', 'lat'),
+    'longitude': ('longitude', 'lng', 'lon', 'long'),
+    'category': ('category', 'type'),
+    'description': ('description', 'comment'),
+    'address': ('address',),
+    'notes': ('notes', 'note'),
+    'is_favorite': ('is_favorite', 'favorite', 'starred'),
+}
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+
+class ImportFileError(ValueError):
+    """Raised when an import file cannot be parsed at all"""
+    pass
+
+def _empty_columns() -> Dict[str, List]:
+    return {field: [] for field in ('row', *CSV_COLUMNS)}
+
+def parse_geojson(stream: IO[bytes]) -> Dict[str, List]:
+    """Read a FeatureCollection of Points into column lists"""
+    try:
+        data = json.load(stream)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ImportFileError(f"Invalid GeoJSON: {str(e)}")
+
+    features = data.get('features') if isinstance(data, dict) else None
+    if not isinstance(features, list):
+        raise ImportFileError("GeoJSON must be a FeatureCollection")
+
+    columns = _empty_columns()
+    for i, feature in enumerate(features, 1):
+        if not isinstance(feature, dict):
+            raise ImportFileError(f"Feature {i} must be an object")
+        props = feature.get('properties') or {}
+        geometry = feature.get('geometry') or {}
+        if not isinstance(props, dict) or not isinstance(geometry, dict):
+            raise ImportFileError(f"Feature {i}: properties and geometry must be objects")
+        coords = geometry.get('coordinates') if geometry.get('type') == 'Point' else None
+        lng, lat = (coords[0], coords[1]) if isinstance(coords, list) and len(coords) >= 2 else (None, None)
+
+        columns['row'].append(i)
+        columns['name'].append(props.get('name') or props.get('title'))
+        columns['latitude'].append(lat)
+        columns['longitude'].append(lng)
+        for field in ('category', 'description', 'address', 'notes', 'is_favorite'):
+            columns[field].append(props.get(field))
+    return columns
+
+def parse_csv(stream: IO[bytes]) -> Dict[str, List]:
+    """Read a CSV with a header row into column lists"""
+    try:
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        header = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f"Invalid CSV: {str(e)}")
+
+    sources = {
+        field: next((header[alias] for alias in aliases if alias in header), None)
+        for field, aliases in CSV_COLUMNS.items()
+    }
+    if not sources['name']:
+        raise ImportFileError("CSV needs a 'name' column")
+
+    columns = _empty_columns()
+    try:
+        for i, record in enumerate(reader, 2):  # header is line 1
+            columns['row'].append(i)
+            for field, source in sources.items():
+                columns[field].append(record.get(source) if source else None)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f"Invalid CSV: {str(e)}")
+    return columns
+
+def parse_import_file(stream: IO[bytes], file_format: str) -> Dict[str, List]:
+    if file_format == 'geojson':
+        return parse_geojson(stream)
+    if file_format == 'csv':
+        return parse_csv(stream)
+    raise ImportFileError(f"Unsupported import format: {file_format}")
+
+def _to_float(value) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def _text(value) -> str:
+    return '' if value is None else str(value).strip()
+
+class LocationImportService:
+    """Validate, dedupe and write a whole file of locations for one user.
+
+    Validation runs column by column over the parsed file. Valid rows are
+    written in chunks: one multi-path ``update()`` on the RTDB root per chunk
+    (instead of a ``push()`` and two ``set()`` calls per location) followed by
+    ``bulk_create`` on the local mirror. Rows already in the user's local
+    mirror are skipped, so a retried job resumes after the last chunk that
+    made it to both stores. With ``id_namespace`` (the job id) every row
+    gets the same key on each attempt, so a chunk that reached the RTDB but
+    not the mirror is overwritten on retry instead of written twice.
+    """
+
+    MAX_REPORTED_ERRORS = 1000
+
+    def __init__(
+        self,
+        user,
+        firebase_service=None,
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        id_namespace: Optional[uuid.UUID] = None
+    ):
+        self.user = user
+        self.id_namespace = id_namespace
+        self._firebase_service = firebase_service
+        self.chunk_size = chunk_size or getattr(settings, 'IMPORT_CHUNK_SIZE', 500)
+        self.progress_callback = progress_callback
+
+    @property
+    def firebase_service(self):
+        if self._firebase_service is None:
+            from .firebase_service import FirebaseService
+            self._firebase_service = FirebaseService()
+        return self._firebase_service
+
+    def validate(self, columns: Dict[str, List], default_category: str = 'uncategorized') -> Tuple[List[Dict], List[Dict]]:
+        """Return (valid rows, per-row errors)"""
+        rows = columns['row']
+        names = [_text(v)[:255] for v in columns['name']]
+        lats = [_to_float(v) for v in columns['latitude']]
+        lngs = [_to_float(v) for v in columns['longitude']]
+
+        # Fill missing coordinates from the shared geocode cache in one batch
+        missing = [i for i in range(len(rows)) if names[i] and (lats[i] is None or lngs[i] is None)]
+        if missing:
+            from .geocode_cache import get_geocode_cache
+            matches = get_geocode_cache().resolve_many([names[i] for i in missing])
+            for i in missing:
+                match = matches.get(names[i])
+                if match:
+                    lats[i], lngs[i] = match['latitude'], match['longitude']
+
+        errors = {}
+        for i, name in enumerate(names):
+            if not name:
+                errors[i] = 'name is required'
+        for i, (lat, lng) in enumerate(zip(lats, lngs)):
+            if i in errors:
+                continue
+            if lat is None or lng is None:
+                errors[i] = 'coordinates missing and place name not found'
+            elif lat != lat or lng != lng:  # NaN from unparsable input
+                errors[i] = 'latitude and longitude must be numbers'
+            elif not -90 <= lat <= 90:
+                errors[i] = 'latitude must be between -90 and 90'
+            elif not -180 <= lng <= 180:
+                errors[i] = 'longitude must be between -180 and 180'
+
+        categories = [_text(v)[:100] or default_category for v in columns['category']]
+        favorites = [
+            v if isinstance(v, bool) else _text(v).lower() in TRUE_VALUES
+            for v in columns['is_favorite']
+        ]
+
+        valid = [
+            {
+                'row': rows[i],
+                'name': names[i],
+                'latitude': lats[i],
+                'longitude': lngs[i],
+                'category': categories[i],
+                'description': _text(columns['description'][i]),
+                'address': _text(columns['address'][i]),
+                'notes': _text(columns['notes'][i]),
+                'is_favorite': favorites[i],
+            }
+            for i in range(len(rows)) if i not in errors
+        ]
+        return valid, [{'row': rows[i], 'error': error} for i, error in sorted(errors.items())]
+
+    @staticmethod
+    def _dedupe_key(name: str, lat: float, lng: float) -> Tuple[str, float, float]:
+        return normalize_place_name(name), round(lat, 5), round(lng, 5)
+
+    def dedupe(self, rows: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Drop rows repeated in the file or already saved by the user"""
+        seen = {
+            self._dedupe_key(name, lat, lng)
+            for name, lat, lng in UserLocation.objects.filter(user=self.user)
+            .values_list('location__name', 'location__latitude', 'location__longitude')
+            .iterator(chunk_size=2000)
+        }
+        unique, duplicates = [], []
+        for row in rows:
+            key = self._dedupe_key(row['name'], row['latitude'], row['longitude'])
+            if key in seen:
+                duplicates.append(row)
+                continue
+            seen.add(key)
+            unique.append(row)
+        return unique, duplicates
+
+    def write_chunk(self, rows: List[Dict]) -> None:
+        """Write one chunk to Firebase with a single update, then mirror it locally"""
+        user_id = str(self.user.id)
+        now = datetime.now(timezone.utc)
+        timestamp = now.isoformat()
+
+        updates = {}
+        locations, user_locations = [], []
+        for row in rows:
+            if self.id_namespace is not None:
+                location_id = uuid.uuid5(self.id_namespace, str(row['row']))
+            else:
+                location_id = uuid.uuid4()
+            key = str(location_id)
+            updates[f'locations/{key}'] = {
+                'name': row['name'],
+                'latitude': row['latitude'],
+                'longitude': row['longitude'],
+                'description': row['description'],
+                'address': row['address'],
+                'category': row['category'],
+                'isInstagramSource': False,
+                'instagramUrl': '',
+                'datePosted': timestamp,
+                'createdAt': timestamp,
+                'createdBy': user_id,
+                'version': 1,
+                'isDeleted': False,
+                'lastModified': timestamp,
+                'sourceType': 'import'
+            }
+            updates[f'user_locations/{user_id}/{key}'] = {
+                'customName': '',
+                'customDescription': '',
+                'customCategory': '',
+                'notes': row['notes'],
+                'isFavorite': row['is_favorite'],
+                'notifyEnabled': False,
+                'notifyRadius': 1.0,
+                'savedAt': timestamp,
+                'lastUpdated': timestamp
+            }
+
+            location = Location(
+                id=location_id,
+                name=row['name'],
+                latitude=row['latitude'],
+                longitude=row['longitude'],
+                description=row['description'],
+                address=row['address'],
+                category=row['category'],
+                sync_status=2,
+                last_synced=now,
+                firebase_id=key
+            )
+            locations.append(location)
+            user_locations.append(UserLocation(
+                user=self.user,
+                location=location,
+                notes=row['notes'],
+                is_favorite=row['is_favorite'],
+                sync_status=2,
+                last_synced=now,
+                firebase_id=key
+            ))
+
+        self.firebase_service.db.update(updates)
+        with transaction.atomic():
+            Location.objects.bulk_create(locations)
+            UserLocation.objects.bulk_create(user_locations)
+        # bulk_create sends no post_save signals
+        versions = get_location_versions()
+        versions.bump(self.user.id)
+        versions.bump(PUBLIC_SCOPE)
+
+    def run(self, columns: Dict[str, List], default_category: str = 'uncategorized') -> Dict:
+        """Import parsed columns and return a summary with per-row errors"""
+        total = len(columns['row'])
+        valid, errors = self.validate(columns, default_category)
+        unique, duplicates = self.dedupe(valid)
+        logger.info(
+            f"Importing {len(unique)} of {total} rows for user {self.user.id} "
+            f"({len(errors)} invalid, {len(duplicates)} duplicates)"
+        )
+
+        done = total - len(unique)
+        self._report(done, total)
+        imported = 0
+        for start in range(0, len(unique), self.chunk_size):
+            chunk = unique[start:start + self.chunk_size]
+            self.write_chunk(chunk)
+            imported += len(chunk)
+            done += len(chunk)
+            self._report(done, total)
+
+        return {
+            'total': total,
+            'imported': imported,
+            'duplicates': len(duplicates),
+            'invalid': len(errors),
+            'errors': errors[:self.MAX_REPORTED_ERRORS],
+            'errors_truncated': len(errors) > self.MAX_REPORTED_ERRORS
+        }
+
+    def _report(self, done: int, total: int) -> None:
+        if self.progress_callback is not None:
+            self.progress_callback(done, total)
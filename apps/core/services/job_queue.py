@@ -0,0 +1,218 @@
+# apps/core/services/job_queue.py
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+from asgiref.sync import async_to_sync
+from ..models import BackgroundJob
+import logging
+import os
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+# job_type -> handler(job) returning a JSON-serializable result
+JOB_HANDLERS: Dict[str, Callable] = {}
+
+def register_job_handler(job_type: str):
+    """Register the function that executes jobs of ``job_type``"""
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+class JobQueueError(Exception):
+    """Raised when a job cannot be enqueued or executed"""
+    pass
+
+class JobQueue:
+    """Database-backed job queue.
+
+    Jobs are claimed with a conditional ``UPDATE ... WHERE status='pending'``
+    so several worker processes (and threads) can share one table without
+    running the same job twice.
+    """
+
+    CLAIM_BATCH = 10
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+    def enqueue(self, job_type: str, user, payload: Dict, max_attempts: Optional[int] = None) -> BackgroundJob:
+        """Create a pending job and return it immediately"""
+        if job_type not in JOB_HANDLERS:
+            raise JobQueueError(f"Unknown job type: {job_type}")
+
+        job = BackgroundJob.objects.create(
+            job_type=job_type,
+            user=user,
+            payload=payload,
+            max_attempts=max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+        )
+        logger.info(f"Enqueued {job_type} job {job.id} for user {user.id}")
+        return job
+
+    def claim(self, job_types=None) -> Optional[BackgroundJob]:
+        """Claim the oldest runnable job, or return None if the queue is empty"""
+        now = timezone.now()
+        candidates = BackgroundJob.objects.filter(
+            status='pending',
+            run_after__lte=now
+        )
+        if job_types:
+            candidates = candidates.filter(job_type__in=job_types)
+
+        candidate_ids = list(
+            candidates.order_by('created_at').values_list('id', flat=True)[:self.CLAIM_BATCH]
+        )
+        for job_id in candidate_ids:
+            with transaction.atomic():
+                claimed = BackgroundJob.objects.filter(
+                    id=job_id,
+                    status='pending'
+                ).update(
+                    status='running',
+                    locked_by=self.worker_id,
+                    locked_at=now,
+                    started_at=now,
+                    attempts=F('attempts') + 1
+                )
+            if claimed:
+                return BackgroundJob.objects.select_related('user').get(id=job_id)
+        return None
+
+    def run(self, job: BackgroundJob) -> BackgroundJob:
+        """Execute a claimed job and record its outcome"""
+        handler = JOB_HANDLERS.get(job.job_type)
+        try:
+            if handler is None:
+                raise JobQueueError(f"No handler registered for job type: {job.job_type}")
+
+            result = handler(job)
+            job.status = 'succeeded'
+            job.result = result
+            job.error = ''
+            job.finished_at = timezone.now()
+            logger.info(f"Job {job.id} succeeded after {job.attempts} attempt(s)")
+
+        except Exception as e:
+            job.error = str(e)
+            if will_retry(job, e):
+                # Transient failure: back off exponentially and retry
+                job.status = 'pending'
+                job.run_after = timezone.now() + timedelta(seconds=2 ** job.attempts)
+                logger.warning(f"Job {job.id} failed (attempt {job.attempts}/{job.max_attempts}), retrying: {str(e)}")
+            else:
+                job.status = 'failed'
+                job.finished_at = timezone.now()
+                logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+
+        job.locked_by = ''
+        job.locked_at = None
+        job.save(update_fields=[
+            'status', 'result', 'error', 'run_after',
+            'finished_at', 'locked_by', 'locked_at'
+        ])
+
+        if job.is_finished:
+            self._publish_status(job)
+        return job
+
+    def run_next(self, job_types=None) -> Optional[BackgroundJob]:
+        """Claim and run a single job. Returns the job or None if idle."""
+        job = self.claim(job_types)
+        if job is None:
+            return None
+        return self.run(job)
+
+    def requeue_stale(self, timeout_seconds: Optional[int] = None) -> int:
+        """Return jobs whose worker died mid-run to the pending state"""
+        timeout_seconds = timeout_seconds or getattr(settings, 'JOB_STALE_TIMEOUT', 600)
+        cutoff = timezone.now() - timedelta(seconds=timeout_seconds)
+        count = BackgroundJob.objects.filter(
+            status='running',
+            locked_at__lt=cutoff
+        ).update(status='pending', locked_by='', locked_at=None)
+        if count:
+            logger.warning(f"Requeued {count} stale job(s)")
+        return count
+
+    def _publish_status(self, job: BackgroundJob) -> None:
+        """Push the final job status to Firebase so clients can listen for it"""
+        try:
+            from .firebase_service import FirebaseService
+            FirebaseService().db.child('jobs')\
+                .child(str(job.user_id))\
+                .child(str(job.id))\
+                .set(serialize_job(job, include_result=False))
+        except Exception as e:
+            logger.warning(f"Failed to publish status for job {job.id}: {str(e)}")
+
+def will_retry(job: BackgroundJob, error: Exception) -> bool:
+    """Whether a job that just raised ``error`` goes back to pending"""
+    return job.attempts < job.max_attempts and not isinstance(error, (ValueError, JobQueueError))
+
+def serialize_job(job: BackgroundJob, include_result: bool = True) -> Dict:
+    """Public representation of a job for the status endpoint"""
+    data = {
+        'id': str(job.id),
+        'job_type': job.job_type,
+        'status': job.status,
+        'attempts': job.attempts,
+        'progress': {
+            'done': job.progress_done,
+            'total': job.progress_total
+        },
+        'error': job.error or None,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if include_result:
+        data['result'] = job.result
+    return data
+
+@register_job_handler('reel_analysis')
+def run_reel_analysis(job: BackgroundJob) -> Dict:
+    """Analyze an Instagram reel and save its locations to Firebase"""
+    from .reel_service import ReelService
+
+    payload = job.payload
+    return async_to_sync(ReelService().analyze_and_save)(
+        url=payload['url'],
+        user_id=str(job.user_id),
+        category=payload.get('category', 'uncategorized'),
+        is_favorite=payload.get('is_favorite', False),
+        notify_radius=float(payload.get('notify_radius', 1.0))
+    )
+
+@register_job_handler('location_import')
+def run_location_import(job: BackgroundJob) -> Dict:
+    """Import an uploaded GeoJSON/CSV file of locations for the job's user"""
+    from django.core.files.storage import default_storage
+    from .import_service import LocationImportService, parse_import_file
+
+    payload = job.payload
+
+    def report_progress(done: int, total: int) -> None:
+        job.progress_done, job.progress_total = done, total
+        BackgroundJob.objects.filter(id=job.id).update(progress_done=done, progress_total=total)
+
+    try:
+        with default_storage.open(payload['path'], 'rb') as f:
+            columns = parse_import_file(f, payload['format'])
+
+        # Keys derived from the job id, so a retry rewrites what it already sent
+        result = LocationImportService(job.user, progress_callback=report_progress, id_namespace=job.id).run(
+            columns,
+            default_category=payload.get('category') or 'uncategorized'
+        )
+    except Exception as e:
+        if not will_retry(job, e):
+            default_storage.delete(payload['path'])
+        raise
+    default_storage.delete(payload['path'])
+    return result
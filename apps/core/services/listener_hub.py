@@ -0,0 +1,313 @@
+# apps/core/services/listener_hub.py
+from django.conf import settings
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def changed_paths(event) -> List[Tuple[str, object]]:
+    """(path relative to the listened node, new data) for a put or patch event"""
+    base = (event.path or '/').strip('/')
+    if event.event_type == 'patch' and isinstance(event.data, dict):
+        return [(f'{base}/{key}'.strip('/'), value) for key, value in event.data.items()]
+    if event.event_type == 'put':
+        return [(base, event.data)]
+    return []
+
+@dataclass
+class HubEvent:
+    """Coalesced changes under one key of a listened path.
+
+    ``changes`` maps each changed sub-path (relative to ``path``) to its
+    latest value, in the order they were last written. ``overflow`` events
+    carry no key: changes were dropped and subscribers should resync.
+    """
+    path: str
+    key: Optional[str]
+    changes: Dict[str, object] = field(default_factory=dict)
+    first_seen: float = 0.0
+    count: int = 1
+    overflow: bool = False
+
+    @property
+    def deleted(self) -> bool:
+        """The node at ``key`` itself was removed"""
+        return self.key is not None and self.key in self.changes and self.changes[self.key] is None
+
+class _Stream:
+    def __init__(self, path: str, key_depth: int):
+        self.path = path
+        self.key_depth = key_depth
+        self.subscribers: Dict[Callable, Callable] = {}
+        self.registration = None
+        self.primed = False
+        self.received = 0
+
+class _Shard:
+    def __init__(self, lock):
+        self.keys = deque()
+        self.condition = threading.Condition(lock)
+
+class ListenerHub:
+    """Exactly one RTDB stream per path per process, shared by all subscribers.
+
+    The SDK calls back on its own listener thread, which must not block, so
+    the callback only records the change: events are split into changed
+    paths, grouped by key (the first ``key_depth`` path segments) and
+    coalesced while the key waits in the queue, so a burst of ``put`` /
+    ``patch`` events on one location is dispatched once with its latest
+    values. Worker threads dispatch to subscribers; a key always goes to
+    the same worker, so events for one key are delivered in order.
+
+    The queue holds at most ``queue_size`` keys. Beyond that new keys are
+    dropped and counted, and once the backlog drains every subscriber of
+    the affected paths gets an ``overflow`` event telling it to resync.
+    """
+
+    def __init__(
+        self,
+        ref: Optional[Callable[[str], object]] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None
+    ):
+        self._ref = ref
+        self.workers = workers or getattr(settings, 'LISTENER_HUB_WORKERS', 2)
+        self.queue_size = queue_size or getattr(settings, 'LISTENER_HUB_QUEUE_SIZE', 10000)
+        self._lock = threading.Lock()
+        self._stream_lock = threading.RLock()
+        self._streams: Dict[str, _Stream] = {}
+        self._shards = [_Shard(self._lock) for _ in range(self.workers)]
+        self._threads: List[threading.Thread] = []
+        self._pending: Dict[Tuple[str, str], HubEvent] = {}
+        self._overflowed: Set[str] = set()
+        self._queued = 0
+        self._busy = 0
+        self._stopping = False
+        self._stats = {
+            'received': 0, 'coalesced': 0, 'keys': 0, 'dispatched': 0, 'dropped': 0, 'errors': 0,
+            'lag_total': 0.0, 'lag_max': 0.0, 'lag_last': 0.0
+        }
+
+    def _reference(self, path: str):
+        if self._ref is not None:
+            return self._ref(path)
+        from .firebase_service import FirebaseService
+        return FirebaseService().db.child(path)
+
+    # Subscriptions
+
+    def subscribe(self, path: str, callback: Callable[[HubEvent], None], key_depth: int = 1) -> None:
+        """Call ``callback(HubEvent)`` for changes under ``path``; opens the stream on first use.
+
+        Subscribing the same callback twice is a no-op. ``key_depth`` is
+        fixed by the first subscriber of a path.
+        """
+        path = path.strip('/')
+        with self._stream_lock:
+            stream = self._streams.get(path)
+            if stream is None:
+                stream = _Stream(path, key_depth)
+                with self._lock:
+                    self._streams[path] = stream  # before listen(): the snapshot may arrive at once
+                try:
+                    stream.registration = self._reference(path).listen(
+                        lambda event: self._on_event(stream, event)
+                    )
+                except Exception:
+                    with self._lock:
+                        del self._streams[path]
+                    raise
+                logger.info(f"Opened RTDB stream on /{path}")
+            elif stream.key_depth != key_depth:
+                logger.warning(f"Stream /{path} groups by {stream.key_depth} segments, not {key_depth}")
+            with self._lock:
+                stream.subscribers[callback] = callback
+        self._start_workers()
+
+    def unsubscribe(self, path: str, callback: Callable) -> None:
+        """Remove a subscriber; the stream is closed with its last subscriber"""
+        path = path.strip('/')
+        with self._stream_lock:
+            with self._lock:
+                stream = self._streams.get(path)
+                if stream is None:
+                    return
+                stream.subscribers.pop(callback, None)
+                if stream.subscribers:
+                    return
+                del self._streams[path]
+            self._close(stream)
+
+    def _close(self, stream: _Stream) -> None:
+        try:
+            stream.registration.close()
+            logger.info(f"Closed RTDB stream on /{stream.path}")
+        except Exception as e:
+            logger.warning(f"Failed to close RTDB stream on /{stream.path}: {str(e)}")
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return sorted(self._streams)
+
+    # SDK listener thread
+
+    def _on_event(self, stream: _Stream, event) -> None:
+        """Record one SDK event; never blocks on subscribers"""
+        now = time.monotonic()
+        changes = changed_paths(event)
+        with self._lock:
+            if self._streams.get(stream.path) is not stream:
+                return  # closed meanwhile
+            self._stats['received'] += 1
+            stream.received += 1
+            if not stream.primed:
+                stream.primed = True
+                if changes and changes[0][0] == '':
+                    return  # the initial snapshot of the whole tree, not a change
+
+            for subpath, data in changes:
+                key = '/'.join(subpath.split('/')[:stream.key_depth])
+                pending_key = (stream.path, key)
+                pending = self._pending.get(pending_key)
+                if pending is not None:
+                    # A write to a node supersedes earlier writes below it
+                    prefix = subpath + '/'
+                    for earlier in [p for p in pending.changes if p == subpath or p.startswith(prefix)]:
+                        del pending.changes[earlier]
+                    pending.changes[subpath] = data
+                    pending.count += 1
+                    self._stats['coalesced'] += 1
+                    continue
+
+                if self._queued >= self.queue_size:
+                    self._stats['dropped'] += 1
+                    self._overflowed.add(stream.path)
+                    continue
+
+                self._pending[pending_key] = HubEvent(stream.path, key, {subpath: data}, now)
+                shard = self._shards[hash(pending_key) % len(self._shards)]
+                shard.keys.append(pending_key)
+                self._queued += 1
+                shard.condition.notify()
+
+    # Workers
+
+    def _start_workers(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping = False
+            for i, shard in enumerate(self._shards):
+                thread = threading.Thread(
+                    target=self._work, args=(shard,), name=f'listener-hub-{i}', daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+
+    def _next(self, shard: _Shard) -> Optional[List[Tuple[HubEvent, List[Callable]]]]:
+        """Block for the next batch of (event, callbacks); None when stopping"""
+        with self._lock:
+            while not self._stopping:
+                if shard.keys:
+                    pending_key = shard.keys.popleft()
+                    event = self._pending.pop(pending_key)
+                    self._queued -= 1
+                    self._busy += 1
+                    stream = self._streams.get(event.path)
+                    lag = time.monotonic() - event.first_seen
+                    self._stats['keys'] += 1
+                    self._stats['lag_total'] += lag
+                    self._stats['lag_last'] = lag
+                    self._stats['lag_max'] = max(self._stats['lag_max'], lag)
+                    return [(event, list(stream.subscribers) if stream else [])]
+                if self._overflowed and self._queued == 0:
+                    overflowed, self._overflowed = self._overflowed, set()
+                    self._busy += 1
+                    return [
+                        (HubEvent(path, None, overflow=True, first_seen=time.monotonic(), count=0),
+                         list(self._streams[path].subscribers))
+                        for path in overflowed if path in self._streams
+                    ]
+                shard.condition.wait()
+            return None
+
+    def _work(self, shard: _Shard) -> None:
+        while True:
+            batch = self._next(shard)
+            if batch is None:
+                return
+            errors = dispatched = 0
+            for event, callbacks in batch:
+                for callback in callbacks:
+                    try:
+                        callback(event)
+                        dispatched += 1
+                    except Exception as e:
+                        errors += 1
+                        logger.error(f"Listener hub subscriber failed on /{event.path}/{event.key}: {str(e)}", exc_info=True)
+            with self._lock:
+                self._busy -= 1
+                self._stats['dispatched'] += dispatched
+                self._stats['errors'] += errors
+                if self._overflowed and self._queued == 0:
+                    for other in self._shards:
+                        other.condition.notify()
+
+    def flush(self, timeout: float = 5) -> bool:
+        """Wait until everything queued has been dispatched (tests, shutdown)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._queued == 0 and self._busy == 0 and not self._overflowed:
+                    return True
+            time.sleep(0.005)
+        return False
+
+    def stop(self) -> None:
+        """Close every stream and stop the workers"""
+        with self._stream_lock:
+            with self._lock:
+                streams, self._streams = list(self._streams.values()), {}
+            for stream in streams:
+                self._close(stream)
+        with self._lock:
+            self._stopping = True
+            for shard in self._shards:
+                shard.condition.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout=5)
+
+    def stats(self) -> Dict:
+        """Counters, queue depth and dispatch lag (seconds from SDK event to dispatch).
+
+        ``received`` counts SDK events; ``coalesced`` and ``dropped`` count
+        changed paths merged into a queued key or lost to a full queue.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            lag_total = stats.pop('lag_total')
+            stats.update({
+                'streams': {path: {'subscribers': len(s.subscribers), 'received': s.received}
+                            for path, s in self._streams.items()},
+                'queued': self._queued,
+                'queue_size': self.queue_size,
+                'lag_avg': lag_total / stats['keys'] if stats['keys'] else 0.0,
+            })
+        return stats
+
+_hub = None
+_hub_lock = threading.Lock()
+
+def get_listener_hub() -> ListenerHub:
+    """Process-wide listener hub"""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = ListenerHub()
+    return _hub
@@ -0,0 +1,88 @@
+# apps/core/services/location_versions.py
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from ..models import UserLocation
+import hashlib
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Version key shared by views of the whole Location table (public tiles)
+PUBLIC_SCOPE = 'public'
+
+class LocationVersionService:
+    """Validators for a user's saved locations, used for ETag/Last-Modified.
+
+    ``fingerprint`` covers the local UserLocation mirror with one aggregate
+    query (row count, summed location versions, latest modification
+    times), so it changes whenever a row is added, edited or removed.
+
+    Firebase-backed listings cannot be aggregated cheaply, so they use a
+    random token kept in the cache and replaced by ``bump`` on every write
+    that goes through this app (and on RTDB listener events). A missing
+    token is replaced with a fresh one rather than recomputed, so an
+    evicted key can only cause one extra download, never a stale 304.
+    """
+
+    KEY_PREFIX = 'location_version'
+
+    def __init__(self, timeout: Optional[int] = None):
+        self.timeout = timeout or getattr(settings, 'LOCATION_VERSION_TIMEOUT', 86400)
+
+    def _key(self, user_id) -> str:
+        return f'{self.KEY_PREFIX}:{user_id}'
+
+    @staticmethod
+    def _new_version() -> Dict:
+        return {'token': uuid.uuid4().hex[:16], 'modified': datetime.now(timezone.utc).timestamp()}
+
+    def fingerprint(self, user_id) -> Tuple[str, Optional[datetime]]:
+        """Token and last modification time of the user's local rows"""
+        stats = UserLocation.objects.filter(user_id=user_id).aggregate(
+            count=Count('id'),
+            versions=Sum('location__version'),
+            updated=Max('updated_at'),
+            modified=Max('location__last_modified')
+        )
+        token = hashlib.blake2b(repr(sorted(stats.items())).encode('utf-8'), digest_size=8).hexdigest()
+        times = [value for value in (stats['updated'], stats['modified']) if value is not None]
+        return token, max(times) if times else None
+
+    def get(self, user_id) -> Optional[Tuple[str, datetime]]:
+        """Cached (token, last modified) for the user, or None if the cache is down"""
+        key = self._key(user_id)
+        try:
+            version = cache.get(key)
+            if not version:
+                version = self._new_version()
+                if not cache.add(key, version, timeout=self.timeout):
+                    version = cache.get(key) or version
+        except Exception as e:
+            logger.warning(f"Cache operation failed: {str(e)}")
+            return None
+        return version['token'], datetime.fromtimestamp(version['modified'], tz=timezone.utc)
+
+    def bump(self, user_id) -> None:
+        """Record that one of the user's locations changed"""
+        try:
+            cache.set(self._key(user_id), self._new_version(), timeout=self.timeout)
+        except Exception as e:
+            # Without a cache get() returns None, so nothing stale is served
+            logger.warning(f"Cache operation failed: {str(e)}")
+
+_location_versions = None
+_location_versions_lock = threading.Lock()
+
+def get_location_versions() -> LocationVersionService:
+    """Process-wide location version service"""
+    global _location_versions
+    if _location_versions is None:
+        with _location_versions_lock:
+            if _location_versions is None:
+                _location_versions = LocationVersionService()
+    return _location_versions
@@ -0,0 +1,262 @@
+# apps/core/services/map_clusters.py
+from django.conf import settings
+from django.core.cache import cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..models import Location, UserLocation
+from .location_versions import PUBLIC_SCOPE, get_location_versions
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# Web Mercator stops at +-85.0511 degrees
+MAX_LATITUDE = 85.0511287798
+MAX_ZOOM = 22
+
+def clamp_latitude(lat: float) -> float:
+    return max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+
+def lnglat_to_world(lng: float, lat: float) -> Tuple[float, float]:
+    """Web Mercator position in [0, 1) x [0, 1), y growing southwards"""
+    sin_lat = math.sin(math.radians(clamp_latitude(lat)))
+    x = (lng + 180.0) / 360.0
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0 - 1e-12), min(max(y, 0.0), 1.0 - 1e-12)
+
+def lnglat_to_tile(lng: float, lat: float, zoom: int) -> Tuple[int, int]:
+    x, y = lnglat_to_world(lng, lat)
+    scale = 1 << zoom
+    return int(x * scale), int(y * scale)
+
+def tile_to_lnglat(x: float, y: float, zoom: int) -> Tuple[float, float]:
+    """Longitude/latitude of a (fractional) tile position's top-left corner"""
+    scale = 1 << zoom
+    lng = x / scale * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / scale))))
+    return lng, lat
+
+def tile_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(min_lng, min_lat, max_lng, max_lat) of a tile"""
+    min_lng, max_lat = tile_to_lnglat(x, y, zoom)
+    max_lng, min_lat = tile_to_lnglat(x + 1, y + 1, zoom)
+    return min_lng, min_lat, max_lng, max_lat
+
+def tiles_for_bbox(bbox: Tuple[float, float, float, float], zoom: int) -> List[Tuple[int, int]]:
+    """Tiles covering a (min_lng, min_lat, max_lng, max_lat) viewport"""
+    min_lng, min_lat, max_lng, max_lat = bbox
+    min_x, min_y = lnglat_to_tile(min_lng, max_lat, zoom)
+    max_x, max_y = lnglat_to_tile(max_lng, min_lat, zoom)
+    return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+def parse_bbox(value: Optional[str]) -> Tuple[float, float, float, float]:
+    """``min_lng,min_lat,max_lng,max_lat`` -> floats, ValueError when malformed"""
+    if not value:
+        raise ValueError("bbox is required")
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+    if not (-180 <= min_lng <= max_lng <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise ValueError("bbox is out of range or inverted")
+    return min_lng, min_lat, max_lng, max_lat
+
+class MapClusterService:
+    """Per-tile grid clustering of a user's saved locations.
+
+    Each Web Mercator tile is split into ``grid`` x ``grid`` cells; cells
+    holding more than one location become a cluster (count, centroid,
+    member bounds), single locations stay points. From ``max_zoom`` on,
+    tiles return raw points unless they hold more than ``point_limit``, in
+    which case they are clustered too, so one tile never yields more than
+    ``max(point_limit, grid ** 2)`` features however dense the data is.
+
+    Tiles are read with a latitude/longitude range query (served by the
+    ``(latitude, longitude)`` index) and cached per (user, data version,
+    zoom, x, y); the version comes from ``LocationVersionService`` so any
+    write to the user's locations retires every cached tile at once.
+    With ``user=None`` the public ``Location`` table is clustered instead.
+    """
+
+    CACHE_PREFIX = 'map_tile'
+
+    def __init__(
+        self,
+        user=None,
+        grid: Optional[int] = None,
+        max_zoom: Optional[int] = None,
+        point_limit: Optional[int] = None
+    ):
+        self.user = user
+        self.grid = grid or getattr(settings, 'MAP_CLUSTER_GRID', 8)
+        self.max_zoom = max_zoom if max_zoom is not None else getattr(settings, 'MAP_CLUSTER_MAX_ZOOM', 16)
+        self.point_limit = point_limit or getattr(settings, 'MAP_TILE_POINT_LIMIT', 200)
+        self.timeout = getattr(settings, 'MAP_TILE_CACHE_TIMEOUT', 3600)
+        self._version = None
+
+    @property
+    def scope(self) -> str:
+        return PUBLIC_SCOPE if self.user is None else str(self.user.id)
+
+    @property
+    def version(self) -> Optional[str]:
+        """Data version the cached tiles belong to (None: cache unavailable)"""
+        if self._version is None:
+            versions = get_location_versions()
+            if self.user is None:
+                # The whole table has no cheap aggregate; use the bumped token
+                found = versions.get(PUBLIC_SCOPE)
+                self._version = found[0] if found else ''
+            else:
+                self._version, _ = versions.fingerprint(self.user.id)
+        return self._version or None
+
+    def cache_key(self, kind: str, zoom: int, x: int, y: int) -> str:
+        # Clustering parameters are part of the key so a settings change never serves old shapes
+        params = f'{self.grid}.{self.max_zoom}.{self.point_limit}'
+        return f'{kind}:{self.scope}:{self.version}:{params}:{zoom}:{x}:{y}'
+
+    def _points(self, zoom: int, x: int, y: int) -> Iterable[Dict]:
+        min_lng, min_lat, max_lng, max_lat = tile_bounds(zoom, x, y)
+        if self.user is None:
+            rows = Location.objects.filter(
+                is_deleted=False,
+                latitude__gte=min_lat,
+                latitude__lte=max_lat,
+                longitude__gte=min_lng,
+                longitude__lte=max_lng
+            ).order_by().values_list('id', 'name', 'category', 'latitude', 'longitude')
+            for location_id, name, category, lat, lng in rows.iterator(chunk_size=2000):
+                yield {
+                    'id': str(location_id),
+                    'location_id': str(location_id),
+                    'name': name,
+                    'category': category,
+                    'latitude': lat,
+                    'longitude': lng,
+                }
+            return
+
+        rows = UserLocation.objects.filter(
+            user=self.user,
+            location__is_deleted=False,
+            location__latitude__gte=min_lat,
+            location__latitude__lte=max_lat,
+            location__longitude__gte=min_lng,
+            location__longitude__lte=max_lng
+        ).order_by().values_list(
+            'id', 'location_id', 'custom_name', 'location__name', 'location__category',
+            'custom_category', 'is_favorite', 'location__latitude', 'location__longitude'
+        )
+        for ul_id, location_id, custom_name, name, category, custom_category, is_favorite, lat, lng in rows.iterator(chunk_size=2000):
+            yield {
+                'id': str(ul_id),
+                'location_id': str(location_id),
+                'name': custom_name or name,
+                'category': custom_category or category,
+                'is_favorite': is_favorite,
+                'latitude': lat,
+                'longitude': lng,
+            }
+
+    def build_tile(self, zoom: int, x: int, y: int) -> Dict[str, List[Dict]]:
+        """Clusters and points of one tile (uncached)"""
+        scale = 1 << zoom
+        cells: Dict[Tuple[int, int], List[Dict]] = {}
+        points = []
+        for point in self._points(zoom, x, y):
+            wx, wy = lnglat_to_world(point['longitude'], point['latitude'])
+            tx, ty = wx * scale - x, wy * scale - y
+            if not (0 <= tx < 1 and 0 <= ty < 1):
+                continue  # on the shared edge, owned by the neighbouring tile
+            points.append(point)
+            cells.setdefault((int(tx * self.grid), int(ty * self.grid)), []).append(point)
+
+        if zoom >= self.max_zoom and len(points) <= self.point_limit:
+            return {'clusters': [], 'points': points}
+
+        clusters, singles = [], []
+        for (cx, cy), members in cells.items():
+            if len(members) == 1:
+                singles.append(members[0])
+                continue
+            lats = [member['latitude'] for member in members]
+            lngs = [member['longitude'] for member in members]
+            clusters.append({
+                'id': f'{zoom}/{x}/{y}/{cx}/{cy}',
+                'point_count': len(members),
+                'latitude': sum(lats) / len(lats),
+                'longitude': sum(lngs) / len(lngs),
+                'bbox': [min(lngs), min(lats), max(lngs), max(lats)],
+                'expansion_zoom': min(zoom + 1, MAX_ZOOM) if zoom < self.max_zoom else zoom,
+            })
+        return {'clusters': clusters, 'points': singles}
+
+    def get_tiles(self, zoom: int, tiles: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Dict]:
+        """Tile contents, read from the cache where possible (one get_many / set_many)"""
+        keys = {self.cache_key(self.CACHE_PREFIX, zoom, x, y): (x, y) for x, y in tiles}
+        try:
+            cached = cache.get_many(list(keys))
+        except Exception as e:
+            logger.warning(f"Cache operation failed: {str(e)}")
+            cached = {}
+
+        results = {keys[key]: value for key, value in cached.items()}
+        built = {}
+        for key, (x, y) in keys.items():
+            if (x, y) not in results:
+                results[(x, y)] = built[key] = self.build_tile(zoom, x, y)
+
+        if built:
+            try:
+                cache.set_many(built, timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"Cache operation failed: {str(e)}")
+        return results
+
+    def viewport(self, bbox: Tuple[float, float, float, float], zoom: int) -> Dict:
+        """GeoJSON FeatureCollection of clusters and points inside ``bbox``"""
+        max_tiles = getattr(settings, 'MAP_MAX_VIEWPORT_TILES', 64)
+        tiles = tiles_for_bbox(bbox, zoom)
+        if len(tiles) > max_tiles:
+            raise ValueError(f"Viewport covers {len(tiles)} tiles at zoom {zoom} (max {max_tiles}); zoom in")
+
+        min_lng, min_lat, max_lng, max_lat = bbox
+        features = []
+        for tile in self.get_tiles(zoom, tiles).values():
+            for cluster in tile['clusters']:
+                # Keep clusters with members in view even if their centroid is not
+                west, south, east, north = cluster['bbox']
+                if west <= max_lng and east >= min_lng and south <= max_lat and north >= min_lat:
+                    features.append(self.cluster_feature(cluster))
+            for point in tile['points']:
+                if min_lng <= point['longitude'] <= max_lng and min_lat <= point['latitude'] <= max_lat:
+                    features.append(self.point_feature(point))
+
+        return {
+            'type': 'FeatureCollection',
+            'zoom': zoom,
+            'clustered': zoom < self.max_zoom,
+            'features': features
+        }
+
+    @staticmethod
+    def cluster_feature(cluster: Dict) -> Dict:
+        properties = {key: value for key, value in cluster.items() if key not in ('latitude', 'longitude')}
+        properties['cluster'] = True
+        return {
+            'type': 'Feature',
+            'id': cluster['id'],
+            'geometry': {'type': 'Point', 'coordinates': [cluster['longitude'], cluster['latitude']]},
+            'properties': properties
+        }
+
+    @staticmethod
+    def point_feature(point: Dict) -> Dict:
+        properties = {key: value for key, value in point.items() if key not in ('latitude', 'longitude')}
+        properties['cluster'] = False
+        return {
+            'type': 'Feature',
+            'id': point['id'],
+            'geometry': {'type': 'Point', 'coordinates': [point['longitude'], point['latitude']]},
+            'properties': properties
+        }
@@ -0,0 +1,339 @@
+# apps/core/services/outbox.py
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from typing import Dict, Iterable, List, Optional
+from ..models import Location, OutboxEvent, UserLocation
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Local field -> RTDB field, in the schema FirebaseService.save_location and
+# the importer write. Sync bookkeeping (sync_status, last_synced,
+# firebase_id) is not mirrored, so marking rows synced queues nothing.
+LOCATION_FIELDS = {
+    'name': 'name',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'description': 'description',
+    'address': 'address',
+    'category': 'category',
+    'is_instagram_source': 'isInstagramSource',
+    'instagram_url': 'instagramUrl',
+    'date_posted': 'datePosted',
+    'created_at': 'createdAt',
+    'version': 'version',
+    'is_deleted': 'isDeleted',
+    'last_modified': 'lastModified',
+}
+
+USER_LOCATION_FIELDS = {
+    'custom_name': 'customName',
+    'custom_description': 'customDescription',
+    'custom_category': 'customCategory',
+    'notes': 'notes',
+    'is_favorite': 'isFavorite',
+    'notify_enabled': 'notifyEnabled',
+    'notify_radius': 'notifyRadius',
+    'saved_at': 'savedAt',
+    'updated_at': 'lastUpdated',
+}
+
+TRACKED_FIELDS = {
+    Location: LOCATION_FIELDS,
+    UserLocation: USER_LOCATION_FIELDS,
+}
+
+# auto_now timestamps move on every save(); they are only worth sending
+# along with a change to some other mirrored field
+AUTO_NOW_FIELDS = {'lastModified', 'lastUpdated'}
+
+# FirebaseError codes worth retrying as they are; anything else is the RTDB
+# rejecting the write (rules, validation, bad path)
+TRANSIENT_ERROR_CODES = {'UNAVAILABLE', 'DEADLINE_EXCEEDED', 'INTERNAL', 'UNKNOWN', 'RESOURCE_EXHAUSTED'}
+
+_state = threading.local()
+
+@contextmanager
+def suppress_outbox():
+    """Don't queue changes made in this block (e.g. rows pulled from the RTDB)"""
+    _state.suppressed = getattr(_state, 'suppressed', 0) + 1
+    try:
+        yield
+    finally:
+        _state.suppressed -= 1
+
+def outbox_enabled() -> bool:
+    return getattr(settings, 'OUTBOX_ENABLED', True) and not getattr(_state, 'suppressed', 0)
+
+def _rtdb_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def location_key(location: Location) -> str:
+    return location.firebase_id or str(location.pk)
+
+def record_path(instance) -> str:
+    """RTDB path of a mirrored row"""
+    if isinstance(instance, Location):
+        return f'locations/{location_key(instance)}'
+    # Saves live under the location's key (see FirebaseService.save_location)
+    key = instance.firebase_id or location_key(instance.location)
+    return f'user_locations/{instance.user_id}/{key}'
+
+def snapshot(instance) -> None:
+    """Remember the loaded values, to diff against on the next save"""
+    values = instance.__dict__
+    instance._outbox_snapshot = {
+        field: values[field] for field in TRACKED_FIELDS[type(instance)] if field in values
+    }
+
+def changed_fields(instance, created: bool, update_fields: Optional[Iterable[str]]) -> Dict[str, object]:
+    """RTDB field -> new value for the tracked fields this save wrote and changed"""
+    fields = TRACKED_FIELDS[type(instance)]
+    if update_fields is not None:
+        fields = {field: name for field, name in fields.items() if field in update_fields}
+    previous = {} if created else getattr(instance, '_outbox_snapshot', {})
+    missing = object()
+    changes = {}
+    for field, name in fields.items():
+        value = instance.__dict__.get(field, missing)
+        if value is missing:
+            continue  # deferred and never loaded, so not written either
+        if created or previous.get(field, missing) != value:
+            changes[name] = _rtdb_value(value)
+    if not created and changes.keys() <= AUTO_NOW_FIELDS:
+        return {}
+    return changes
+
+def record_save(instance, created: bool, update_fields: Optional[Iterable[str]] = None) -> Optional[OutboxEvent]:
+    """Queue the changed fields of a saved Location/UserLocation"""
+    if not outbox_enabled():
+        return None
+    changes = changed_fields(instance, created, update_fields)
+    snapshot(instance)
+    if not changes:
+        return None
+    return OutboxEvent.objects.create(
+        model=instance._meta.label_lower,
+        object_id=str(instance.pk),
+        path=record_path(instance),
+        operation='create' if created else 'update',
+        changes=changes
+    )
+
+def record_delete(instance) -> Optional[OutboxEvent]:
+    if not outbox_enabled():
+        return None
+    return OutboxEvent.objects.create(
+        model=instance._meta.label_lower,
+        object_id=str(instance.pk),
+        path=record_path(instance),
+        operation='delete'
+    )
+
+class PendingChange:
+    """The net effect of consecutive events for one RTDB path"""
+
+    def __init__(self, event: OutboxEvent):
+        self.path = event.path
+        self.model = event.model
+        self.object_id = event.object_id
+        self.replace = event.operation == 'create'
+        self.deleted = event.operation == 'delete'
+        self.changes = dict(event.changes)
+        self.event_ids = [event.id]
+
+    def add(self, event: OutboxEvent) -> None:
+        self.event_ids.append(event.id)
+        if event.operation == 'delete':
+            self.replace, self.deleted, self.changes = False, True, {}
+        elif event.operation == 'create' or self.deleted:
+            # Recreated: the new record replaces whatever was there
+            self.replace, self.deleted, self.changes = True, False, dict(event.changes)
+        else:
+            self.changes.update(event.changes)
+
+    def updates(self) -> Dict[str, object]:
+        """Entries of a multi-path update() on the RTDB root"""
+        if self.deleted:
+            return {self.path: None}
+        if self.replace:
+            return {self.path: self.changes}
+        return {f'{self.path}/{name}': value for name, value in self.changes.items()}
+
+def is_transient(error: Exception) -> bool:
+    """Connection problems and RTDB outages, as opposed to a rejected write"""
+    # requests' exceptions are OSErrors too
+    return isinstance(error, OSError) or getattr(error, 'code', None) in TRANSIENT_ERROR_CODES
+
+def coalesce(events: Iterable[OutboxEvent]) -> List[PendingChange]:
+    """Merge the events of each path, in order of first appearance"""
+    pending: Dict[str, PendingChange] = {}
+    for event in events:
+        if event.path in pending:
+            pending[event.path].add(event)
+        else:
+            pending[event.path] = PendingChange(event)
+    return list(pending.values())
+
+class OutboxDispatcher:
+    """Pushes queued changes to the RTDB, oldest first.
+
+    Each batch is read in primary key order, coalesced per record (ten
+    edits of a save become one write of the fields that changed, an edit
+    followed by a delete becomes the delete) and sent as a single
+    multi-path ``update()``, which the RTDB applies atomically. The events
+    are deleted and the rows marked synced only after the update succeeds.
+
+    When the RTDB is unreachable the events stay queued, in order, and are
+    retried with backoff. When it rejects the batch, one bad path fails the
+    whole update, so the batch is resent one path at a time: the others go
+    through, and a path rejected ``max_attempts`` times is parked with
+    ``failed_at`` (see ``run_outbox_dispatcher --retry-failed``) instead of
+    holding up the queue.
+
+    Only events older than ``settle_seconds`` are read. Ids come from the
+    insert, and on PostgreSQL a transaction holding an older id can commit
+    after a newer one; the wait keeps such an event from being pushed after
+    (and over) a later change of the same record.
+
+    Run one dispatcher per database: a second one would push the same
+    events twice.
+    """
+
+    MODELS = {model._meta.label_lower: model for model in TRACKED_FIELDS}
+
+    def __init__(self, ref=None, batch_size: Optional[int] = None):
+        self._ref = ref
+        self.batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', 500)
+        self.poll_interval = getattr(settings, 'OUTBOX_POLL_INTERVAL', 1.0)
+        self.max_backoff = getattr(settings, 'OUTBOX_MAX_BACKOFF', 60)
+        self.max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+        self.settle_seconds = getattr(settings, 'OUTBOX_SETTLE_SECONDS', 2)
+        self.stats = {'events': 0, 'writes': 0, 'fields': 0, 'failures': 0, 'dead': 0}
+
+    @property
+    def ref(self):
+        if self._ref is None:
+            from .firebase_service import FirebaseService
+            self._ref = FirebaseService().db
+        return self._ref
+
+    def pending_events(self):
+        """Settled events still to dispatch, in order (reads outbox_pending_idx)"""
+        settled = timezone.now() - timedelta(seconds=self.settle_seconds)
+        return OutboxEvent.objects.filter(failed_at__isnull=True, created_at__lte=settled).order_by('id')
+
+    def dispatch_batch(self) -> int:
+        """Push the next batch; returns the number of events sent (0 when the outbox is empty)"""
+        events = list(self.pending_events()[:self.batch_size])
+        if not events:
+            return 0
+        pending = coalesce(events)
+        try:
+            self._send(pending)
+        except Exception as e:
+            if len(pending) == 1 or is_transient(e):
+                self._failed(pending, e)
+                raise
+            logger.warning(f"RTDB rejected a batch of {len(pending)} path(s), sending them one by one: {str(e)}")
+            return self._isolate(pending, e)
+        self._complete(pending)
+        return len(events)
+
+    def _send(self, pending: List[PendingChange]) -> None:
+        updates = {}
+        for change in pending:
+            updates.update(change.updates())
+        self.ref.update(updates)
+        self.stats['writes'] += 1
+        self.stats['fields'] += len(updates)
+
+    def _complete(self, pending: List[PendingChange]) -> None:
+        ids = [event_id for change in pending for event_id in change.event_ids]
+        with transaction.atomic():
+            OutboxEvent.objects.filter(id__in=ids).delete()
+            self._mark_synced(pending)
+        self.stats['events'] += len(ids)
+        logger.debug(f"Pushed {len(ids)} outbox event(s) as {len(pending)} RTDB record(s)")
+
+    def _failed(self, pending: List[PendingChange], error: Exception) -> None:
+        self.stats['failures'] += 1
+        ids = [event_id for change in pending for event_id in change.event_ids]
+        OutboxEvent.objects.filter(id__in=ids).update(attempts=F('attempts') + 1, error=str(error)[:1000])
+        if is_transient(error):
+            return  # an outage says nothing about the events themselves
+        dead = OutboxEvent.objects.filter(id__in=ids, attempts__gte=self.max_attempts)\
+            .update(failed_at=timezone.now())
+        if dead:
+            self.stats['dead'] += dead
+            paths = ', '.join(change.path for change in pending)
+            logger.error(f"Parked {dead} outbox event(s) for {paths} after {self.max_attempts} rejections: {str(error)}")
+
+    def _isolate(self, pending: List[PendingChange], error: Exception) -> int:
+        """Send each path on its own so the ones the RTDB accepts are not held up"""
+        sent = 0
+        for change in pending:
+            try:
+                self._send([change])
+            except Exception as e:
+                self._failed([change], e)
+                if is_transient(e):
+                    raise
+                error = e
+                continue
+            self._complete([change])
+            sent += len(change.event_ids)
+        if not sent:
+            raise error
+        return sent
+
+    def _mark_synced(self, pending: List[PendingChange]) -> None:
+        now = timezone.now()
+        by_model: Dict[str, List[str]] = {}
+        for change in pending:
+            if change.deleted:
+                continue
+            by_model.setdefault(change.model, []).append(change.object_id)
+            if change.replace:
+                # Remember the key the record was created under
+                model = self.MODELS[change.model]
+                model.objects.filter(pk=change.object_id, firebase_id__isnull=True)\
+                    .update(firebase_id=change.path.rsplit('/', 1)[-1])
+        for label, object_ids in by_model.items():
+            self.MODELS[label].objects.filter(pk__in=object_ids).update(sync_status=2, last_synced=now)
+
+    def drain(self) -> int:
+        """Dispatch until the outbox is empty; returns the number of events sent"""
+        sent = 0
+        while True:
+            count = self.dispatch_batch()
+            if not count:
+                return sent
+            sent += count
+
+    def run(self, stop_event: threading.Event, once: bool = False) -> None:
+        """Dispatch until ``stop_event`` is set (or the outbox is empty, with ``once``)"""
+        failures = 0
+        while not stop_event.is_set():
+            try:
+                count = self.dispatch_batch()
+                failures = 0
+            except Exception as e:
+                if once:
+                    raise
+                failures += 1
+                delay = min(self.poll_interval * 2 ** failures, self.max_backoff)
+                logger.warning(f"Outbox push failed ({failures} in a row), retrying in {delay:.0f}s: {str(e)}")
+                stop_event.wait(delay)
+                continue
+            if not count:
+                if once and not OutboxEvent.objects.filter(failed_at__isnull=True).exists():
+                    return  # nothing left, not even events still settling
+                stop_event.wait(self.poll_interval)
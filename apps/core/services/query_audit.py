@@ -0,0 +1,178 @@
+# apps/core/services/query_audit.py
+from contextlib import contextmanager
+from django.db import connections
+from django.db.models import QuerySet
+from typing import Dict, List, Optional, Set
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Plan lines that mean every row of a table is read, or rows are sorted after the fact
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)\b(?: USING (?:COVERING )?INDEX (\w+))?')
+SQLITE_SORT = re.compile(r'USE TEMP B-TREE FOR ')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+POSTGRES_SORT = re.compile(r'^\s*(?:->\s*)?Sort\b')
+
+STATEMENTS = ('SELECT', 'UPDATE', 'DELETE')
+
+class AuditedQuery:
+    def __init__(self, label: str, sql: str, params):
+        self.label = label
+        self.sql = sql
+        self.params = params
+        self.count = 1
+        self.plan: List[str] = []
+        self.problems: List[str] = []
+
+class QueryAudit:
+    """Captures the SQL a code path runs and explains how the database executes it.
+
+    Statements are recorded through ``connection.execute_wrapper`` while a
+    ``capture()`` block runs (or compiled from a queryset without running
+    it), de-duplicated by SQL text, then passed to ``EXPLAIN QUERY PLAN``
+    on SQLite or ``EXPLAIN`` on PostgreSQL. Plans that read a whole table
+    (``SCAN core_location``, ``Seq Scan``; a SQLite scan of a partial index
+    only reads the rows it holds and is fine) or sort rows the index could
+    have returned in order (``USE TEMP B-TREE``, ``Sort``) are reported as
+    problems.
+    """
+
+    def __init__(self, using: str = 'default'):
+        self.using = using
+        self.queries: Dict[str, AuditedQuery] = {}
+        self._partial_indexes = None
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def _record(self, label: str, sql: str, params) -> None:
+        if not sql.lstrip().upper().startswith(STATEMENTS):
+            return
+        found = self.queries.get(sql)
+        if found is None:
+            self.queries[sql] = AuditedQuery(label, sql, params)
+        else:
+            found.count += 1
+
+    @contextmanager
+    def capture(self, label: str):
+        """Record every statement run on the connection inside the block"""
+        def wrapper(execute, sql, params, many, context):
+            self._record(label, sql, params)
+            return execute(sql, params, many, context)
+
+        with self.connection.execute_wrapper(wrapper):
+            yield
+
+    def add_queryset(self, label: str, queryset: QuerySet) -> None:
+        """Record the SELECT a queryset would run, without running it"""
+        sql, params = queryset.query.get_compiler(using=self.using).as_sql()
+        self._record(label, sql, params)
+
+    def explain(self, sql: str, params) -> List[str]:
+        """Plan lines for one statement, nested steps indented"""
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                depth, lines = {0: -1}, []
+                for node, parent, _, detail in cursor.fetchall():
+                    depth[node] = depth.get(parent, -1) + 1
+                    lines.append('  ' * depth[node] + detail)
+                return lines
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def partial_indexes(self) -> Set[str]:
+        """Names of SQLite partial indexes: scanning one whole reads only the rows it was built for"""
+        if self._partial_indexes is None:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'")
+                self._partial_indexes = {row[0] for row in cursor.fetchall()}
+        return self._partial_indexes
+
+    def problems(self, plan: List[str]) -> List[str]:
+        found = []
+        for line in plan:
+            if self.connection.vendor == 'sqlite':
+                scan, sort = SQLITE_SCAN.match(line.strip()), SQLITE_SORT.search(line)
+                if scan and scan.group(2) in self.partial_indexes():
+                    scan = None
+            else:
+                scan, sort = POSTGRES_SCAN.search(line), POSTGRES_SORT.match(line)
+            if scan:
+                found.append(f'full scan of {scan.group(1)}')
+            if sort:
+                found.append('sort not served by an index')
+        return found
+
+    def report(self) -> List[AuditedQuery]:
+        """Explain every captured statement, in capture order"""
+        for query in self.queries.values():
+            try:
+                query.plan = self.explain(query.sql, query.params)
+                query.problems = self.problems(query.plan)
+            except Exception as e:
+                logger.warning(f"Could not explain query for {query.label}: {str(e)}")
+                query.plan, query.problems = [], [f'not explained: {str(e)}']
+        return list(self.queries.values())
+
+def audit_app_queries(user, audit: Optional[QueryAudit] = None) -> QueryAudit:
+    """Run (or compile) the local-mirror queries the app issues, as ``user``.
+
+    Listing and sync querysets are compiled only; the export, version,
+    geofence, map tile, realtime and spatial paths run for real (reading
+    at most one chunk each) so the SQL is exactly what they send.
+    """
+    from ..models import Location, PENDING_SYNC, UserLocation
+    from ..pagination import UserLocationCursorPagination
+    from .export_service import LocationExportService
+    from .geofence import get_geofence_engine
+    from .location_versions import get_location_versions
+    from .map_clusters import MapClusterService
+    from .outbox import OutboxDispatcher
+    from .realtime import get_broadcaster
+    from .spatial import SpatialQueries
+    import uuid
+
+    audit = audit or QueryAudit()
+    ordering = UserLocationCursorPagination.ordering
+    user_locations = UserLocation.objects.filter(user=user).select_related('location')
+
+    # Sync passes (SyncManager.sync_to_firebase, the sync endpoint) and pulls
+    audit.add_queryset('sync: unsynced locations', Location.objects.filter(PENDING_SYNC))
+    audit.add_queryset(
+        'sync: unsynced user locations',
+        UserLocation.objects.filter(PENDING_SYNC, user=user).select_related('location')
+    )
+    by_key = {'firebase_id': '-key'}
+    audit.add_queryset('sync: location by firebase_id', Location.objects.filter(**by_key).order_by('firebase_id')[:1])
+    audit.add_queryset(
+        'sync: user location by firebase_id',
+        UserLocation.objects.filter(**by_key).order_by('firebase_id')[:1]
+    )
+
+    # UserLocationViewSet
+    audit.add_queryset('list: saved locations page', user_locations.order_by(*ordering)[:50])
+    audit.add_queryset('list: favorites page', user_locations.filter(is_favorite=True).order_by(*ordering)[:50])
+
+    with audit.capture('export: first chunk'):
+        next(LocationExportService(user, chunk_size=1).iter_rows(), None)
+    with audit.capture('versions: fingerprint'):
+        get_location_versions().fingerprint(user.pk)
+    with audit.capture('geofence: load fences'):
+        get_geofence_engine().load_fences(user.pk)
+    with audit.capture('map: public tile'):
+        list(MapClusterService()._points(12, 3638, 1612))
+    with audit.capture('map: user tile'):
+        list(MapClusterService(user=user)._points(12, 3638, 1612))
+    with audit.capture('realtime: savers of a location'):
+        match = get_broadcaster().savers_match(str(uuid.UUID(int=0)))
+        list(UserLocation.objects.filter(match).order_by().values_list('user_id', flat=True))
+    with audit.capture('signals: savers of a changed location'):
+        list(UserLocation.objects.filter(location_id=Location().pk).order_by().values_list('user_id', flat=True))
+    with audit.capture('spatial: nearby'):
+        SpatialQueries(using=audit.using).within_radius(35.68, 139.76, 2, limit=20)
+    audit.add_queryset('outbox: next batch', OutboxDispatcher(ref=object()).pending_events()[:500])
+    return audit
@@ -0,0 +1,261 @@
+# apps/core/services/realtime.py
+from django.conf import settings
+from django.db.models import Q
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from ..models import Location, UserLocation
+from .. import fastjson
+from .listener_hub import HubEvent, ListenerHub, get_listener_hub
+import itertools
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Event types sent to clients; each one means "refetch this", not the new data
+USER_LOCATION_CHANGED = 'user_location'
+LOCATION_CHANGED = 'location'
+RESYNC = 'resync'  # events were dropped, refetch everything
+
+class Subscription:
+    """One client's bounded queue of pending change events.
+
+    Events are keyed by (type, id); an event already waiting in the queue
+    is not queued again, so a burst of writes to one location reaches the
+    client once. If the queue overflows it is replaced by a single RESYNC.
+    """
+
+    def __init__(self, user_id: str, max_pending: int = 100):
+        self.user_id = user_id
+        self.max_pending = max_pending
+        self._pending: 'OrderedDict[Tuple[str, str], Dict]' = OrderedDict()
+        self._condition = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def push(self, event: Dict) -> bool:
+        """Queue an event; False when it was coalesced into one already pending"""
+        key = (event['type'], event.get('id') or '')
+        with self._condition:
+            if self.closed or key in self._pending:
+                return False
+            if (RESYNC, '') in self._pending:
+                return False  # the client refetches everything anyway
+            if key == (RESYNC, ''):
+                self._pending.clear()
+            elif len(self._pending) >= self.max_pending:
+                self.dropped += len(self._pending)
+                self._pending.clear()
+                key, event = (RESYNC, ''), {'type': RESYNC}
+            self._pending[key] = event
+            self._condition.notify()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Next event, or None after ``timeout`` seconds / once closed"""
+        with self._condition:
+            if not self._pending and not self.closed:
+                self._condition.wait(timeout)
+            if not self._pending:
+                return None
+            return self._pending.popitem(last=False)[1]
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+class LocationChangeBroadcaster:
+    """Fan location changes out to the users they concern.
+
+    The process-wide ``ListenerHub`` streams of ``locations`` and
+    ``user_locations`` (subscribed with the first client) feed every
+    connected client, and local model writes are published through the
+    model signals. A change to
+    ``user_locations/<user>/...`` only reaches that user's subscriptions; a
+    change to a shared location reaches the subscribed users who saved it.
+    """
+
+    def __init__(self, max_pending: Optional[int] = None, firebase_listener: Optional[bool] = None):
+        self.max_pending = max_pending or getattr(settings, 'REALTIME_MAX_PENDING', 100)
+        self.firebase_listener = (
+            firebase_listener if firebase_listener is not None
+            else getattr(settings, 'REALTIME_FIREBASE_LISTENER', True)
+        )
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._hub: Optional[ListenerHub] = None
+
+    def subscribe(self, user_id) -> Subscription:
+        subscription = Subscription(str(user_id), self.max_pending)
+        with self._lock:
+            self._subscriptions.setdefault(subscription.user_id, set()).add(subscription)
+        if self.firebase_listener:
+            self.start_listening()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscribed_users(self) -> Set[str]:
+        with self._lock:
+            return set(self._subscriptions)
+
+    def publish(self, user_ids: Iterable, event: Dict) -> int:
+        """Queue ``event`` for the given users' subscriptions; returns how many received it"""
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in {str(user_id) for user_id in user_ids}
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+        return sum(1 for subscription in targets if subscription.push(event))
+
+    def publish_user_location(self, user_id, location_id, deleted: bool = False) -> int:
+        return self.publish([user_id], {
+            'type': USER_LOCATION_CHANGED,
+            'id': str(location_id) if location_id else None,
+            'deleted': deleted
+        })
+
+    def publish_location(self, location_key: str, deleted: bool = False, user_ids: Optional[Iterable] = None) -> int:
+        """Notify subscribed users who saved the location (looked up locally if not given)"""
+        if user_ids is None:
+            user_ids = self.savers(location_key)
+        return self.publish(user_ids, {'type': LOCATION_CHANGED, 'id': str(location_key), 'deleted': deleted})
+
+    @staticmethod
+    def savers_match(location_key: str) -> Q:
+        """UserLocation filter for the location with this id or Firebase key.
+
+        The Firebase key is matched through a subquery rather than a join so
+        both branches of the OR are lookups on the location_id index.
+        """
+        match = Q(location_id__in=Location.objects.filter(firebase_id=location_key).values('id'))
+        try:
+            match |= Q(location_id=uuid.UUID(str(location_key)))
+        except ValueError:
+            pass
+        return match
+
+    def savers(self, location_key: str) -> List[str]:
+        """Subscribed users who saved the location with this id or Firebase key"""
+        subscribed = self.subscribed_users()
+        if not subscribed:
+            return []
+        user_ids = UserLocation.objects.filter(self.savers_match(location_key))\
+            .order_by().values_list('user_id', flat=True)
+        return [str(user_id) for user_id in user_ids if str(user_id) in subscribed]
+
+    # RTDB listener
+
+    def start_listening(self, hub: Optional[ListenerHub] = None) -> None:
+        """Subscribe to the shared RTDB streams once"""
+        with self._lock:
+            if self._hub is not None:
+                return
+            self._hub = hub = hub or get_listener_hub()
+        try:
+            hub.subscribe('locations', self.handle_location_event, key_depth=1)
+            hub.subscribe('user_locations', self.handle_user_location_event, key_depth=2)
+        except Exception as e:
+            # Local writes still arrive through the model signals
+            logger.error(f"Failed to start realtime listeners: {str(e)}")
+
+    def stop_listening(self) -> None:
+        with self._lock:
+            hub, self._hub = self._hub, None
+        if hub is not None:
+            hub.unsubscribe('locations', self.handle_location_event)
+            hub.unsubscribe('user_locations', self.handle_user_location_event)
+
+    def resync_all(self) -> int:
+        return self.publish(self.subscribed_users(), {'type': RESYNC})
+
+    def handle_user_location_event(self, event: HubEvent) -> None:
+        """``user_locations/<user>/<location>`` changes go to that user only"""
+        try:
+            if event.overflow or not event.key:
+                self.resync_all()  # dropped events, or the whole tree was replaced
+                return
+            parts = event.key.split('/')
+            location_id = parts[1] if len(parts) > 1 else None
+            self.publish_user_location(parts[0], location_id, deleted=event.deleted)
+        except Exception as e:
+            logger.error(f"Error routing user location change: {str(e)}")
+
+    def handle_location_event(self, event: HubEvent) -> None:
+        """``locations/<key>`` changes go to the subscribed users who saved it"""
+        try:
+            if event.overflow or not event.key:
+                self.resync_all()
+                return
+            self.publish_location(event.key, event.deleted)
+        except Exception as e:
+            logger.error(f"Error routing location change: {str(e)}")
+
+_sequence = itertools.count(1)
+
+def format_sse(event: Dict) -> str:
+    """One Server-Sent Events message"""
+    data = fastjson.dumps(event).decode('utf-8')
+    return f"id: {next(_sequence)}\nevent: {event['type']}\ndata: {data}\n\n"
+
+def iter_sse(
+    broadcaster: LocationChangeBroadcaster,
+    user_id,
+    heartbeat: float = 15,
+    max_seconds: Optional[float] = None
+) -> Iterator[str]:
+    """Event stream for one user, with comment heartbeats.
+
+    Ends after ``max_seconds`` so a worker is never held forever; the
+    ``retry`` hint makes EventSource reconnect right away. The subscription
+    is only made once the stream is iterated, so a response that is never
+    sent (client gone, middleware error) leaves nothing behind.
+    """
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    subscription = broadcaster.subscribe(user_id)
+    try:
+        yield f"retry: {int(getattr(settings, 'REALTIME_RETRY_MS', 3000))}\n"
+        yield format_sse({'type': 'ready'})
+        while not subscription.closed:
+            timeout = heartbeat
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                timeout = min(timeout, remaining)
+            event = subscription.get(timeout)
+            yield format_sse(event) if event is not None else ': keepalive\n\n'
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+def get_broadcaster() -> LocationChangeBroadcaster:
+    """Process-wide broadcaster"""
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                _broadcaster = LocationChangeBroadcaster()
+    return _broadcaster
+
+def notify_user_location_change(user_id, location_id, deleted: bool = False) -> None:
+    """Publish a local write if anyone in this process is listening"""
+    if _broadcaster is not None:
+        _broadcaster.publish_user_location(user_id, location_id, deleted)
+
+def notify_location_change(location_key, user_ids: Iterable, deleted: bool = False) -> None:
+    if _broadcaster is not None:
+        _broadcaster.publish_location(location_key, deleted, user_ids)
@@ -0,0 +1,105 @@
+# apps/core/services/reel_service.py
+from django.conf import settings
+from datetime import datetime
+from typing import Dict, List
+from .firebase_service import FirebaseService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ReelService:
+    """Analyze an Instagram reel and save its locations for a user.
+
+    Shared by the synchronous ``analyze-save-reel`` endpoint and the
+    background job worker so both paths produce the same result payload.
+    """
+
+    def __init__(self, firebase_service: FirebaseService = None):
+        self.firebase_service = firebase_service or FirebaseService()
+
+    def _build_locations_to_save(
+        self,
+        locations: List[Dict],
+        category: str,
+        is_favorite: bool,
+        notify_radius: float
+    ) -> List[Dict]:
+        """Attach user settings to analyzer locations"""
+        locations_to_save = []
+        for loc in locations:
+            if not isinstance(loc, dict):
+                logger.warning(f"Skipping invalid location data: {loc}")
+                continue
+
+            loc_data = {
+                **loc,  # Original location data
+                'latitude': loc.get('coordinates', {}).get('latitude') if loc.get('coordinates') else None,
+                'longitude': loc.get('coordinates', {}).get('longitude') if loc.get('coordinates') else None,
+                'user_settings': {
+                    'is_favorite': is_favorite,
+                    'notify_radius': notify_radius,
+                    'category': category
+                }
+            }
+            locations_to_save.append(loc_data)
+        return locations_to_save
+
+    async def analyze_and_save(
+        self,
+        url: str,
+        user_id: str,
+        category: str = 'uncategorized',
+        is_favorite: bool = False,
+        notify_radius: float = 1.0
+    ) -> Dict:
+        """Analyze reel URL and save extracted locations to Firebase"""
+        # First check if URL exists
+        existing = await self.firebase_service.get_locations_by_instagram_url(url)
+        if existing:
+            return {
+                'status': 'existing',
+                'saved_locations': existing,
+                'metadata': {
+                    'total_saved': len(existing),
+                    'instagram_url': url,
+                    'date_processed': datetime.now().isoformat()
+                }
+            }
+
+        # Analyze new URL
+        from ..instagram.analyzer import InstagramReelAnalyzer
+        analyzer = InstagramReelAnalyzer(settings.GOOGLE_API_KEY)
+        result = analyzer.analyze_reel(url)
+
+        logger.debug(f"Analyzer result: {result}")  # Debug log
+
+        if not result or not isinstance(result, dict):
+            raise ValueError("Invalid analyzer result format")
+
+        locations = result.get('locations', [])
+        if not locations:
+            raise ValueError("No locations found in reel")
+
+        # Prepare locations with user settings
+        locations_to_save = self._build_locations_to_save(
+            locations, category, is_favorite, notify_radius
+        )
+        if not locations_to_save:
+            raise ValueError("No valid locations to save")
+
+        # Save all locations
+        saved = await self.firebase_service.save_instagram_locations(
+            locations=locations_to_save,
+            user_id=str(user_id),
+            instagram_url=url
+        )
+
+        return {
+            'status': 'saved',
+            'saved_locations': saved,
+            'metadata': {
+                'total_saved': len(saved),
+                'instagram_url': url,
+                'date_processed': datetime.now().isoformat()
+            }
+        }
@@ -0,0 +1,196 @@
+# apps/core/services/spatial.py
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from math import cos, degrees, radians
+from typing import List, Optional
+from ..models import Location
+from .geofence import distance_km
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_DISTANCE_KM = 20038.0  # half the equator: nothing on Earth is farther
+
+class SpatialQueries:
+    """Radius, nearest-neighbour and text search over the local Location mirror.
+
+    On PostgreSQL with migration 0009 applied, ``core_location.geog`` is a
+    generated PostGIS geography column with a GiST index: radius queries use
+    ``ST_DWithin`` and nearest-neighbour queries order by ``<->`` (KNN on
+    the index), and name/address search uses the pg_trgm GIN indexes. On
+    SQLite, or PostgreSQL without the column, the same calls fall back to a
+    bounding box on the latitude/longitude index plus an exact haversine
+    check. Results are Location instances with a ``distance_km`` attribute,
+    nearest first.
+    """
+
+    def __init__(self, using: str = 'default'):
+        self.using = using
+        self._postgis = None
+        self._lock = threading.Lock()
+
+    @property
+    def postgis(self) -> bool:
+        """The database has the geography column (checked once)"""
+        if self._postgis is None:
+            with self._lock:
+                if self._postgis is None:
+                    self._postgis = self._detect_postgis()
+        return self._postgis
+
+    def _detect_postgis(self) -> bool:
+        connection = connections[self.using]
+        if connection.vendor != 'postgresql':
+            return False
+        try:
+            with connection.cursor() as cursor:
+                columns = connection.introspection.get_table_description(cursor, Location._meta.db_table)
+            return any(column.name == 'geog' for column in columns)
+        except Exception as e:
+            logger.warning(f"Could not inspect {Location._meta.db_table} for PostGIS: {str(e)}")
+            return False
+
+    def _queryset(self, queryset: Optional[QuerySet]) -> QuerySet:
+        if queryset is None:
+            queryset = Location.objects.filter(is_deleted=False)
+        return queryset.using(self.using)
+
+    # PostGIS
+
+    @staticmethod
+    def _geog() -> str:
+        return f'"{Location._meta.db_table}"."geog"'
+
+    @staticmethod
+    def _point_sql() -> str:
+        return 'ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography'
+
+    def _with_distance(self, queryset: QuerySet, lat: float, lng: float) -> QuerySet:
+        return queryset.annotate(distance_m=RawSQL(
+            f'ST_Distance({self._geog()}, {self._point_sql()})', (lng, lat), output_field=FloatField()
+        ))
+
+    @staticmethod
+    def _distances_from_annotation(locations: List[Location]) -> List[Location]:
+        for location in locations:
+            location.distance_km = location.distance_m / 1000
+        return locations
+
+    # Fallback
+
+    @staticmethod
+    def bounding_box(lat: float, lng: float, radius_km: float) -> Q:
+        """Latitude/longitude ranges containing every point within ``radius_km``"""
+        dlat = degrees(radius_km / EARTH_RADIUS_KM)
+        match = Q(latitude__gte=lat - dlat, latitude__lte=lat + dlat)
+        if lat + dlat >= 90 or lat - dlat <= -90:
+            return match  # the circle contains a pole: every longitude
+        dlng = dlat / cos(radians(lat))
+        if dlng >= 180:
+            return match
+        west, east = lng - dlng, lng + dlng
+        if west < -180:
+            return match & (Q(longitude__gte=west + 360) | Q(longitude__lte=east))
+        if east > 180:
+            return match & (Q(longitude__gte=west) | Q(longitude__lte=east - 360))
+        return match & Q(longitude__gte=west, longitude__lte=east)
+
+    def _scan_radius(self, queryset: QuerySet, lat: float, lng: float, radius_km: float) -> List[Location]:
+        found = []
+        for location in queryset.filter(self.bounding_box(lat, lng, radius_km)).order_by():
+            location.distance_km = distance_km(lat, lng, location.latitude, location.longitude)
+            if location.distance_km <= radius_km:
+                found.append(location)
+        found.sort(key=lambda location: location.distance_km)
+        return found
+
+    # Queries
+
+    def within_radius(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        limit: Optional[int] = None,
+        queryset: Optional[QuerySet] = None
+    ) -> List[Location]:
+        """Locations within ``radius_km`` of the point, nearest first"""
+        queryset = self._queryset(queryset)
+        if self.postgis:
+            queryset = self._with_distance(queryset.filter(RawSQL(
+                f'ST_DWithin({self._geog()}, {self._point_sql()}, %s)',
+                (lng, lat, radius_km * 1000), output_field=BooleanField()
+            )), lat, lng).order_by('distance_m')
+            return self._distances_from_annotation(list(queryset[:limit] if limit else queryset))
+        found = self._scan_radius(queryset, lat, lng, radius_km)
+        return found[:limit] if limit else found
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        limit: int = 10,
+        max_km: Optional[float] = None,
+        queryset: Optional[QuerySet] = None
+    ) -> List[Location]:
+        """The ``limit`` locations closest to the point (within ``max_km`` if given)"""
+        queryset = self._queryset(queryset)
+        if self.postgis:
+            if max_km is not None:
+                queryset = queryset.filter(RawSQL(
+                    f'ST_DWithin({self._geog()}, {self._point_sql()}, %s)',
+                    (lng, lat, max_km * 1000), output_field=BooleanField()
+                ))
+            queryset = self._with_distance(queryset, lat, lng).order_by(
+                RawSQL(f'{self._geog()} <-> {self._point_sql()}', (lng, lat))
+            )
+            return self._distances_from_annotation(list(queryset[:limit]))
+
+        # Grow the search circle until it holds enough locations: anything
+        # outside it is farther than everything inside
+        ceiling = min(max_km, MAX_DISTANCE_KM) if max_km is not None else MAX_DISTANCE_KM
+        radius = min(1.0, ceiling)
+        while True:
+            found = self._scan_radius(queryset, lat, lng, radius)
+            if len(found) >= limit or radius >= ceiling:
+                return found[:limit]
+            radius = min(radius * 4, ceiling)
+
+    def search(self, query: str, limit: int = 20, queryset: Optional[QuerySet] = None) -> List[Location]:
+        """Locations whose name or address contains ``query``, best matches first.
+
+        On PostgreSQL names within trigram similarity also match, so small
+        typos still find the place.
+        """
+        queryset = self._queryset(queryset)
+        query = query.strip()
+        if not query:
+            return []
+        if self.postgis:
+            table = Location._meta.db_table
+            pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            queryset = queryset.filter(RawSQL(
+                f'("{table}"."name" ILIKE %s OR "{table}"."address" ILIKE %s OR "{table}"."name" %% %s)',
+                (pattern, pattern, query), output_field=BooleanField()
+            )).annotate(similarity=RawSQL(
+                f'similarity("{table}"."name", %s)', (query,), output_field=FloatField()
+            )).order_by('-similarity', 'name')
+            return list(queryset[:limit])
+        return list(
+            queryset.filter(Q(name__icontains=query) | Q(address__icontains=query)).order_by('name')[:limit]
+        )
+
+_spatial = None
+_spatial_lock = threading.Lock()
+
+def get_spatial_queries() -> SpatialQueries:
+    """Process-wide spatial query helper"""
+    global _spatial
+    if _spatial is None:
+        with _spatial_lock:
+            if _spatial is None:
+                _spatial = SpatialQueries()
+    return _spatial
@@ -2,7 +2,8 @@
 from django.utils import timezone
 from django.db import transaction
 from .firebase_service import FirebaseService
-from ..models import Location, UserLocation
+from ..models import Location, PENDING_SYNC, UserLocation
+from .outbox import suppress_outbox
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,7 +18,7 @@ class SyncManager:
             with transaction.atomic():
                 # Sync locations
                 locations = Location.objects.filter(
-                    sync_status__in=[0, 1]  # Not synced or syncing
+                    PENDING_SYNC  # Not synced or syncing
                 ).select_related('created_by')
 
                 for location in locations:
@@ -36,8 +37,8 @@ class SyncManager:
 
                 # Sync user locations
                 user_locations = UserLocation.objects.filter(
-                    user_id=user_id,
-                    sync_status__in=[0, 1]
+                    PENDING_SYNC,
+                    user_id=user_id
                 ).select_related('location')
 
                 for user_location in user_locations:
@@ -79,6 +80,8 @@ class SyncManager:
             logger.error(f"Error in sync_to_firebase: {str(e)}")
             raise
 
+    # Rows written here came from the RTDB: don't queue them to go back
+    @suppress_outbox()
     def sync_from_firebase(self, user_id):
         """Sync data from Firebase to local database"""
         try:
@@ -89,9 +92,10 @@ class SyncManager:
                 if firebase_locations:
                     for firebase_id, data in firebase_locations.items():
                         try:
+                            # Ordered by the key itself so first() needs no sort
                             location = Location.objects.filter(
                                 firebase_id=firebase_id
-                            ).first()
+                            ).order_by('firebase_id').first()
 
                             if location:
                                 # Update existing location
@@ -121,7 +125,7 @@ class SyncManager:
                         try:
                             user_location = UserLocation.objects.filter(
                                 firebase_id=firebase_id
-                            ).first()
+                            ).order_by('firebase_id').first()
 
                             if user_location:
                                 # Update existing user location
@@ -9,6 +9,7 @@ import json
 from typing import Dict
 import asyncio
 from .firebase_service import FirebaseSyncError
+from .outbox import suppress_outbox
 
 logger = logging.getLogger(__name__)
 
@@ -156,6 +157,8 @@ class SyncService:
             logger.error(f"Error syncing user location {user_location.id}: {str(e)}")
             return False
 
+    # Rows written here came from the RTDB: don't queue them to go back
+    @suppress_outbox()
     def sync_from_firebase(self, user_id):
         """Sync data from Firebase to local database"""
         try:
@@ -0,0 +1,581 @@
+# apps/core/services/tile_proxy.py
+from django.conf import settings
+from django.utils.http import http_date
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import logging
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: the index is then only safe within one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b'MMTIL001'
+# magic, slot count, occupied slots (live + deleted), live entries, stored bytes
+HEADER = struct.Struct('<8sIIIQ')
+HEADER_SIZE = 32
+# state, zoom, etag length, x, y, size, fetched_at, expires_at, last_modified, last_access, etag
+SLOT = struct.Struct('<BBHIIIdddd48s')
+LAST_ACCESS_OFFSET = 40  # of the last_access double inside a slot
+MAX_ETAG = 48
+
+EMPTY, LIVE, DELETED = 0, 1, 2
+
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+TileKey = Tuple[int, int, int]
+
+class TileProxyError(Exception):
+    """Raised when a tile is neither cached nor obtainable upstream"""
+    pass
+
+@dataclass
+class CachedTile:
+    data: bytes
+    etag: str
+    fetched_at: float
+    expires_at: float
+    last_modified: float
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+class TileIndex:
+    """Open-addressed hash table of cached tiles in a memory-mapped file.
+
+    One fixed-size slot per tile holds its size, validators and last access
+    time, so lookups and LRU bookkeeping never touch the tile files and the
+    table is shared by every worker process through the page cache.
+    Mutations hold a thread lock plus an ``flock`` on the index file.
+    """
+
+    MAX_LOAD = 0.75
+
+    def __init__(self, path, slots: int = 1 << 16):
+        self.path = Path(path)
+        self.slots = slots
+        self._mmap = None
+        self._file = None
+        self._lock = threading.RLock()
+
+    @property
+    def file_size(self) -> int:
+        return HEADER_SIZE + SLOT.size * self.slots
+
+    def open(self) -> bool:
+        """Map the index, creating it if missing or unreadable; False when created"""
+        if self._mmap is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        with self._file_lock():
+            valid = os.fstat(self._file.fileno()).st_size == self.file_size
+            if valid:
+                self._mmap = mmap.mmap(self._file.fileno(), self.file_size)
+                magic, slots, _, _, _ = HEADER.unpack_from(self._mmap, 0)
+                valid = magic == INDEX_MAGIC and slots == self.slots
+                if not valid:
+                    self._mmap.close()
+            if not valid:
+                logger.warning(f"Creating tile index at {self.path}")
+                self._file.truncate(0)
+                self._file.truncate(self.file_size)
+                self._mmap = mmap.mmap(self._file.fileno(), self.file_size)
+                HEADER.pack_into(self._mmap, 0, INDEX_MAGIC, self.slots, 0, 0, 0)
+        return valid
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._file.close()
+                self._mmap = self._file = None
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def locked(self):
+        with self._lock, self._file_lock():
+            yield
+
+    def header(self) -> Tuple[int, int, int]:
+        """(occupied slots, live entries, stored bytes)"""
+        _, _, occupied, count, total = HEADER.unpack_from(self._mmap, 0)
+        return occupied, count, total
+
+    def _set_header(self, occupied: int, count: int, total: int) -> None:
+        HEADER.pack_into(self._mmap, 0, INDEX_MAGIC, self.slots, occupied, count, total)
+
+    def _offset(self, slot: int) -> int:
+        return HEADER_SIZE + SLOT.size * slot
+
+    def _read(self, slot: int) -> tuple:
+        return SLOT.unpack_from(self._mmap, self._offset(slot))
+
+    def _probe(self, key: TileKey):
+        z, x, y = key
+        start = ((x * 73856093) ^ (y * 19349663) ^ (z * 83492791)) % self.slots
+        for i in range(self.slots):
+            yield (start + i) % self.slots
+
+    def find(self, key: TileKey) -> Optional[int]:
+        """Slot of a live entry, caller holds the lock"""
+        z, x, y = key
+        for slot in self._probe(key):
+            state, zoom, _, sx, sy = struct.unpack_from('<BBHII', self._mmap, self._offset(slot))
+            if state == EMPTY:
+                return None
+            if state == LIVE and (zoom, sx, sy) == (z, x, y):
+                return slot
+        return None
+
+    def get(self, key: TileKey, touch: bool = False) -> Optional[Dict]:
+        """Entry for ``key``; ``touch`` records the access for LRU eviction"""
+        with self.locked():
+            slot = self.find(key)
+            if slot is None:
+                return None
+            if touch:
+                struct.pack_into('<d', self._mmap, self._offset(slot) + LAST_ACCESS_OFFSET, time.time())
+            return self._entry(slot)
+
+    def _entry(self, slot: int) -> Dict:
+        _, z, etag_len, x, y, size, fetched_at, expires_at, last_modified, last_access, etag = self._read(slot)
+        return {
+            'slot': slot, 'key': (z, x, y), 'size': size,
+            'fetched_at': fetched_at, 'expires_at': expires_at,
+            'last_modified': last_modified, 'last_access': last_access,
+            'etag': etag[:etag_len].decode('latin-1'),
+        }
+
+    def put(self, key: TileKey, size: int, fetched_at: float, expires_at: float,
+            last_modified: float, etag: str) -> int:
+        """Insert or replace an entry; returns the size it replaced (caller holds the lock)"""
+        z, x, y = key
+        etag_bytes = etag.encode('latin-1', 'ignore')
+        if len(etag_bytes) > MAX_ETAG:
+            etag_bytes = b''  # unusable for revalidation, Last-Modified still works
+        occupied, count, total = self.header()
+
+        target, replaced, existing = None, 0, False
+        for slot in self._probe(key):
+            state, zoom, _, sx, sy, old_size = struct.unpack_from('<BBHIII', self._mmap, self._offset(slot))
+            if state == LIVE and (zoom, sx, sy) == (z, x, y):
+                target, replaced, existing = slot, old_size, True
+                break
+            if state == DELETED and target is None:
+                target = slot  # reuse the first tombstone on the probe path
+            if state == EMPTY:
+                if target is None:
+                    target = slot
+                    occupied += 1
+                break
+        if target is None:
+            raise TileProxyError("Tile index is full")
+        if not existing:
+            count += 1
+
+        SLOT.pack_into(
+            self._mmap, self._offset(target), LIVE, z, len(etag_bytes), x, y, size,
+            fetched_at, expires_at, last_modified, time.time(), etag_bytes
+        )
+        self._set_header(occupied, count, total - replaced + size)
+        if occupied > self.slots * self.MAX_LOAD:
+            self._rehash()
+        return replaced
+
+    def remove(self, slot: int) -> int:
+        """Drop a live entry and return its size (caller holds the lock)"""
+        state, _, _, _, _, size = struct.unpack_from('<BBHIII', self._mmap, self._offset(slot))
+        if state != LIVE:
+            return 0
+        struct.pack_into('<B', self._mmap, self._offset(slot), DELETED)
+        occupied, count, total = self.header()
+        self._set_header(occupied, count - 1, total - size)
+        return size
+
+    def entries(self) -> List[Dict]:
+        """Every live entry (caller holds the lock)"""
+        return [
+            self._entry(slot) for slot in range(self.slots)
+            if self._mmap[self._offset(slot)] == LIVE
+        ]
+
+    def _rehash(self) -> None:
+        """Rewrite the table without tombstones"""
+        live = [self._read(slot) for slot in range(self.slots) if self._mmap[self._offset(slot)] == LIVE]
+        self._mmap[HEADER_SIZE:] = bytes(SLOT.size * self.slots)
+        total = 0
+        for record in live:
+            key = (record[1], record[3], record[4])
+            slot = next(s for s in self._probe(key) if self._mmap[self._offset(s)] == EMPTY)
+            SLOT.pack_into(self._mmap, self._offset(slot), *record)
+            total += record[5]
+        self._set_header(len(live), len(live), total)
+
+class TileStore:
+    """Sharded on-disk tile cache with an LRU byte budget.
+
+    Tile bodies live in 256 shard directories picked by a hash of z/x/y so
+    no directory grows unbounded; metadata lives in ``TileIndex``. When the
+    stored bytes exceed ``max_bytes`` the least recently used tiles are
+    deleted until usage is back under ``low_water`` of the budget.
+    """
+
+    LOW_WATER = 0.9
+
+    def __init__(self, root, max_bytes: int, index_slots: int = 1 << 16):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.index = TileIndex(self.root / 'index.bin', index_slots)
+        self._open_lock = threading.Lock()
+        self._opened = False
+
+    def _ensure_open(self) -> None:
+        if self._opened:
+            return
+        with self._open_lock:
+            if self._opened:
+                return
+            if not self.index.open():
+                # A new index knows nothing about tiles left on disk
+                shutil.rmtree(self.root / 'tiles', ignore_errors=True)
+            self._opened = True
+
+    def path_for(self, key: TileKey) -> Path:
+        z, x, y = key
+        shard = hashlib.blake2b(f'{z}/{x}/{y}'.encode('ascii'), digest_size=1).hexdigest()
+        return self.root / 'tiles' / shard / f'{z}_{x}_{y}.png'
+
+    def get(self, key: TileKey) -> Optional[CachedTile]:
+        self._ensure_open()
+        entry = self.index.get(key, touch=True)
+        if entry is None:
+            return None
+        try:
+            data = self.path_for(key).read_bytes()
+        except OSError:
+            # Evicted by another process between the lookup and the read
+            with self.index.locked():
+                slot = self.index.find(key)
+                if slot is not None:
+                    self.index.remove(slot)
+            return None
+        return CachedTile(data, entry['etag'], entry['fetched_at'], entry['expires_at'], entry['last_modified'])
+
+    def is_fresh(self, key: TileKey) -> bool:
+        self._ensure_open()
+        entry = self.index.get(key)
+        return entry is not None and entry['expires_at'] > time.time()
+
+    def put(self, key: TileKey, tile: CachedTile) -> None:
+        self._ensure_open()
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tile-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(tile.data)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+        with self.index.locked():
+            self.index.put(key, len(tile.data), tile.fetched_at, tile.expires_at, tile.last_modified, tile.etag)
+        self.evict()
+
+    def refresh(self, key: TileKey, tile: CachedTile) -> None:
+        """Store new validators after a 304, keeping the body on disk"""
+        self._ensure_open()
+        with self.index.locked():
+            if self.index.find(key) is not None:
+                self.index.put(key, len(tile.data), tile.fetched_at, tile.expires_at, tile.last_modified, tile.etag)
+
+    def evict(self) -> int:
+        """Delete least recently used tiles while over budget; returns tiles removed.
+
+        Besides ``max_bytes`` the tile count is capped below the index
+        capacity so the hash table never fills up with small tiles.
+        """
+        self._ensure_open()
+        max_tiles = int(self.index.slots * TileIndex.MAX_LOAD * self.LOW_WATER)
+        with self.index.locked():
+            _, count, total = self.index.header()
+            if total <= self.max_bytes and count <= max_tiles:
+                return 0
+            target_bytes = self.max_bytes * self.LOW_WATER
+            target_count = max_tiles * self.LOW_WATER
+            victims = []
+            for entry in sorted(self.index.entries(), key=lambda e: e['last_access']):
+                if total <= target_bytes and count <= target_count:
+                    break
+                total -= self.index.remove(entry['slot'])
+                count -= 1
+                victims.append(entry['key'])
+
+        for key in victims:
+            try:
+                self.path_for(key).unlink()
+            except OSError:
+                pass
+        logger.info(f"Evicted {len(victims)} tiles from {self.root}")
+        return len(victims)
+
+    def usage(self) -> Dict:
+        self._ensure_open()
+        with self.index.locked():
+            _, count, total = self.index.header()
+        return {'tiles': count, 'bytes': total, 'max_bytes': self.max_bytes}
+
+class TileProxyService:
+    """Serve OpenStreetMap raster tiles from a local cache.
+
+    Fresh tiles are answered from disk. Stale ones are revalidated with
+    ``If-None-Match`` / ``If-Modified-Since`` so an unchanged tile costs the
+    upstream a 304 instead of a body, and are still served if the upstream
+    is down. Concurrent requests for one tile share a single upstream
+    fetch, and the tiles around a requested one are fetched in the
+    background so panning mostly hits the cache.
+    """
+
+    def __init__(
+        self,
+        store: TileStore,
+        upstream_url: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        timeout: Optional[float] = None,
+        min_ttl: Optional[int] = None,
+        max_zoom: Optional[int] = None,
+        prefetch_radius: Optional[int] = None,
+        prefetch_workers: Optional[int] = None
+    ):
+        self.store = store
+        self.upstream_url = upstream_url or getattr(
+            settings, 'TILE_UPSTREAM_URL', 'https://tile.openstreetmap.org/{z}/{x}/{y}.png'
+        )
+        self.timeout = timeout or getattr(settings, 'TILE_UPSTREAM_TIMEOUT', 10)
+        self.min_ttl = min_ttl if min_ttl is not None else getattr(settings, 'TILE_CACHE_MIN_TTL', 86400)
+        self.max_zoom = max_zoom if max_zoom is not None else getattr(settings, 'TILE_MAX_ZOOM', 19)
+        self.prefetch_radius = prefetch_radius if prefetch_radius is not None else getattr(settings, 'TILE_PREFETCH_RADIUS', 1)
+        import requests  # only processes that serve tiles need it
+        # OSM's tile usage policy requires an identifying User-Agent
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent or getattr(
+            settings, 'TILE_PROXY_USER_AGENT', 'memory-map-tile-proxy/1.0'
+        )
+
+        workers = prefetch_workers or getattr(settings, 'TILE_PREFETCH_WORKERS', 2)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tile-prefetch')
+        self._max_pending = workers * 16
+        self._lock = threading.Lock()
+        self._inflight: Dict[TileKey, threading.Event] = {}
+        self._pending = set()
+        self._stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stale': 0, 'prefetched': 0}
+
+    def in_range(self, z: int, x: int, y: int) -> bool:
+        return 0 <= z <= self.max_zoom and 0 <= x < (1 << z) and 0 <= y < (1 << z)
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get_tile(self, z: int, x: int, y: int, prefetch: bool = True) -> CachedTile:
+        """Tile bytes and validators, raises TileProxyError when unavailable"""
+        key = (z, x, y)
+        cached = self.store.get(key)
+        if cached is not None and cached.fresh:
+            self._count('hits')
+        else:
+            cached = self._fetch_once(key, cached)
+        if prefetch and self.prefetch_radius:
+            self.prefetch(z, x, y)
+        return cached
+
+    def _fetch_once(self, key: TileKey, cached: Optional[CachedTile]) -> CachedTile:
+        """Fetch ``key`` upstream unless another thread already is"""
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+
+        if not leader:
+            event.wait(self.timeout)
+            fetched = self.store.get(key)
+            if fetched is not None:
+                return fetched
+
+        try:
+            return self._fetch(key, cached)
+        finally:
+            if leader:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+
+    def _fetch(self, key: TileKey, cached: Optional[CachedTile]) -> CachedTile:
+        z, x, y = key
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = http_date(cached.last_modified)
+
+        import requests
+        try:
+            response = self.session.get(self.upstream_url.format(z=z, x=x, y=y), headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            return self._stale(key, cached, f"Tile fetch failed for {z}/{x}/{y}: {str(e)}")
+
+        now = time.time()
+        if response.status_code == 304 and cached is not None:
+            self._count('revalidated')
+            cached.fetched_at = now
+            cached.expires_at = self._expires_at(response, now)
+            cached.etag = response.headers.get('ETag', cached.etag)
+            self.store.refresh(key, cached)
+            return cached
+
+        if response.status_code != 200:
+            return self._stale(key, cached, f"Tile upstream returned {response.status_code} for {z}/{x}/{y}")
+
+        self._count('misses')
+        tile = CachedTile(
+            data=response.content,
+            etag=response.headers.get('ETag', ''),
+            fetched_at=now,
+            expires_at=self._expires_at(response, now),
+            last_modified=_parse_http_date(response.headers.get('Last-Modified'))
+        )
+        try:
+            self.store.put(key, tile)
+        except Exception as e:
+            logger.error(f"Failed to cache tile {z}/{x}/{y}: {str(e)}")
+        return tile
+
+    def _stale(self, key: TileKey, cached: Optional[CachedTile], message: str) -> CachedTile:
+        if cached is None:
+            logger.error(message)
+            raise TileProxyError(message)
+        logger.warning(f"{message}; serving stale copy")
+        self._count('stale')
+        return cached
+
+    def _expires_at(self, response, now: float) -> float:
+        ttl = None
+        match = MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        if match:
+            ttl = int(match.group(1))
+        elif response.headers.get('Expires'):
+            expires = _parse_http_date(response.headers['Expires'])
+            ttl = expires - now if expires else None
+        return now + max(ttl or 0, self.min_ttl)
+
+    def neighbours(self, z: int, x: int, y: int) -> List[TileKey]:
+        """Tiles within ``prefetch_radius`` at the same zoom, x wrapping around the antimeridian"""
+        size = 1 << z
+        radius = self.prefetch_radius
+        keys = []
+        for dy in range(-radius, radius + 1):
+            ny = y + dy
+            if not 0 <= ny < size:
+                continue
+            for dx in range(-radius, radius + 1):
+                key = (z, (x + dx) % size, ny)
+                if key != (z, x, y) and key not in keys:
+                    keys.append(key)
+        return keys
+
+    def prefetch(self, z: int, x: int, y: int) -> None:
+        """Queue background fetches of missing neighbouring tiles"""
+        for key in self.neighbours(z, x, y):
+            with self._lock:
+                if key in self._pending or key in self._inflight or len(self._pending) >= self._max_pending:
+                    continue
+                self._pending.add(key)
+            if self.store.is_fresh(key):
+                with self._lock:
+                    self._pending.discard(key)
+                continue
+            self._executor.submit(self._prefetch_one, key)
+
+    def _prefetch_one(self, key: TileKey) -> None:
+        try:
+            self.get_tile(*key, prefetch=False)
+            self._count('prefetched')
+        except Exception as e:
+            logger.debug(f"Prefetch of tile {key} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def wait_for_prefetch(self, timeout: float = 10) -> None:
+        """Block until queued prefetches finish (tests and benchmarks)"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if not self._pending:
+                    return
+            time.sleep(0.01)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(self.store.usage())
+        return stats
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.session.close()
+        self.store.index.close()
+
+def _parse_http_date(value: Optional[str]) -> float:
+    if not value:
+        return 0.0
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+_tile_proxy = None
+_tile_proxy_lock = threading.Lock()
+
+def get_tile_proxy() -> TileProxyService:
+    """Process-wide tile proxy over the configured cache directory"""
+    global _tile_proxy
+    if _tile_proxy is None:
+        with _tile_proxy_lock:
+            if _tile_proxy is None:
+                store = TileStore(
+                    settings.TILE_CACHE_DIR,
+                    getattr(settings, 'TILE_CACHE_MAX_BYTES', 1024 * 1024 * 1024),
+                    getattr(settings, 'TILE_CACHE_INDEX_SLOTS', 1 << 16)
+                )
+                _tile_proxy = TileProxyService(store)
+    return _tile_proxy
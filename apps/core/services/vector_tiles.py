@@ -0,0 +1,79 @@
+# apps/core/services/vector_tiles.py
+from django.conf import settings
+from django.core.cache import cache
+from typing import Dict, List, Optional
+from .. import mvt
+from .map_clusters import MapClusterService, lnglat_to_world
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LocationTileService:
+    """Mapbox Vector Tiles of saved (or, with ``user=None``, public) locations.
+
+    Tile contents come from ``MapClusterService.build_tile`` (index-backed
+    range query, grid clusters below the clustering zoom) and are encoded
+    into a single ``locations`` point layer. Encoded tiles are cached under
+    the same versioned key scheme as the JSON viewport tiles, so writes to
+    the underlying locations retire them without explicit deletes.
+    """
+
+    LAYER = 'locations'
+    CACHE_PREFIX = 'mvt'
+
+    def __init__(self, user=None, extent: Optional[int] = None):
+        self.clusters = MapClusterService(user)
+        self.extent = extent or getattr(settings, 'MAP_TILE_EXTENT', mvt.DEFAULT_EXTENT)
+        self.timeout = getattr(settings, 'MAP_TILE_CACHE_TIMEOUT', 3600)
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.clusters.version
+
+    def _tile_position(self, zoom: int, x: int, y: int, lng: float, lat: float):
+        scale = 1 << zoom
+        wx, wy = lnglat_to_world(lng, lat)
+        px = int((wx * scale - x) * self.extent)
+        py = int((wy * scale - y) * self.extent)
+        return min(max(px, 0), self.extent - 1), min(max(py, 0), self.extent - 1)
+
+    def features(self, zoom: int, x: int, y: int) -> List[Dict]:
+        tile = self.clusters.build_tile(zoom, x, y)
+        features = []
+        for cluster in tile['clusters']:
+            features.append({
+                'points': [self._tile_position(zoom, x, y, cluster['longitude'], cluster['latitude'])],
+                'properties': {
+                    'cluster': True,
+                    'cluster_id': cluster['id'],
+                    'point_count': cluster['point_count'],
+                    'expansion_zoom': cluster['expansion_zoom'],
+                }
+            })
+        for point in tile['points']:
+            properties = {key: value for key, value in point.items() if key not in ('latitude', 'longitude')}
+            properties['cluster'] = False
+            features.append({
+                'points': [self._tile_position(zoom, x, y, point['longitude'], point['latitude'])],
+                'properties': properties
+            })
+        return features
+
+    def render(self, zoom: int, x: int, y: int) -> bytes:
+        """Encoded tile, from the cache when this data version was rendered before"""
+        key = self.clusters.cache_key(f'{self.CACHE_PREFIX}.{self.extent}', zoom, x, y)
+        try:
+            tile = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Cache operation failed: {str(e)}")
+            tile = None
+        if tile is not None:
+            return tile
+
+        features = self.features(zoom, x, y)
+        tile = mvt.encode_tile({self.LAYER: features}, self.extent) if features else b''
+        try:
+            cache.set(key, tile, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Cache operation failed: {str(e)}")
+        return tile
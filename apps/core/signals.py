@@ -0,0 +1,53 @@
+# apps/core/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .models import Location, UserLocation
+from .services.geofence import invalidate_geofences
+from .services.location_versions import PUBLIC_SCOPE, get_location_versions
+from .services.outbox import record_delete, record_save, snapshot
+from .services.realtime import notify_location_change, notify_user_location_change
+
+@receiver(post_save, sender=UserLocation)
+@receiver(post_delete, sender=UserLocation)
+def bump_user_location_version(sender, instance, signal, **kwargs):
+    """A saved location changed: the owner's listings have a new version"""
+    get_location_versions().bump(instance.user_id)
+    invalidate_geofences(instance.user_id)
+    deleted = signal is post_delete
+    transaction.on_commit(
+        lambda: notify_user_location_change(instance.user_id, instance.location_id, deleted)
+    )
+
+@receiver(post_save, sender=Location)
+def bump_location_savers_version(sender, instance, created, **kwargs):
+    """A shared location changed: every user who saved it sees a new version"""
+    versions = get_location_versions()
+    versions.bump(PUBLIC_SCOPE)
+    if created:
+        return  # nobody has saved it yet
+    user_ids = list(UserLocation.objects.filter(location_id=instance.pk).order_by().values_list('user_id', flat=True))
+    for user_id in user_ids:
+        versions.bump(user_id)
+        invalidate_geofences(user_id)
+    transaction.on_commit(lambda: notify_location_change(instance.pk, user_ids))
+
+@receiver(post_delete, sender=Location)
+def bump_public_version(sender, instance, **kwargs):
+    get_location_versions().bump(PUBLIC_SCOPE)
+
+@receiver(post_init, sender=Location)
+@receiver(post_init, sender=UserLocation)
+def remember_mirrored_values(sender, instance, **kwargs):
+    snapshot(instance)
+
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=UserLocation)
+def queue_mirrored_save(sender, instance, created, update_fields=None, **kwargs):
+    """Changed fields go to the outbox in the save's transaction (see services.outbox)"""
+    record_save(instance, created, update_fields)
+
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=UserLocation)
+def queue_mirrored_delete(sender, instance, **kwargs):
+    record_delete(instance)
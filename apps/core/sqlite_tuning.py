@@ -0,0 +1,52 @@
+# apps/core/sqlite_tuning.py
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from typing import Dict, Optional
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Applied in this order: journal_mode first, since it decides whether the
+# synchronous level is safe
+PRAGMA_ORDER = ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store')
+
+_NAME = re.compile(r'^[a-z_]+$')
+_VALUE = re.compile(r'^-?\d+$|^[A-Za-z_]+$')
+
+def apply_pragmas(connection, pragmas: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    """Run the tuning PRAGMAs on a SQLite connection; returns the values now in effect.
+
+    ``journal_mode=WAL`` is stored in the database file, the rest only last
+    as long as the connection, which is why this runs on every new one.
+    """
+    if connection.vendor != 'sqlite':
+        return {}
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {}) if pragmas is None else pragmas
+    names = [name for name in PRAGMA_ORDER if name in pragmas] + sorted(set(pragmas) - set(PRAGMA_ORDER))
+    in_effect = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            value = pragmas[name]
+            if value is None or value == '':
+                continue
+            if not _NAME.match(name) or not _VALUE.match(str(value)):
+                logger.warning(f"Ignoring invalid SQLite pragma {name}={value!r}")
+                continue
+            cursor.execute(f'PRAGMA {name} = {value}')
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            in_effect[name] = row[0] if row else None
+    requested = str(pragmas.get('journal_mode') or '').lower()
+    if requested and str(in_effect.get('journal_mode', '')).lower() not in (requested, 'memory'):
+        # e.g. WAL on a network file system, or another connection holding the file
+        logger.warning(f"SQLite journal_mode is {in_effect.get('journal_mode')}, not {requested}")
+    return in_effect
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    try:
+        apply_pragmas(connection)
+    except Exception as e:
+        logger.error(f"Failed to apply SQLite pragmas: {str(e)}")
@@ -0,0 +1,103 @@
+# apps/core/streaming.py
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from typing import Callable, Iterable, Iterator, Optional
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Encoded items are buffered into chunks of roughly this size so the WSGI
+# server is not handed one tiny write per location.
+CHUNK_SIZE = 64 * 1024
+
+_encoder = DjangoJSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+def encode_json(item) -> str:
+    """Compact JSON for one streamed element (dates, UUIDs and Decimals allowed)"""
+    return _encoder.encode(item)
+
+def buffered_chunks(pieces: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Join small encoded pieces into UTF-8 chunks of about ``chunk_size`` bytes"""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def iter_json_array(items: Iterable, transform: Optional[Callable] = None) -> Iterator[str]:
+    """Encode items as a JSON array one element at a time"""
+    yield '['
+    first = True
+    try:
+        for item in items:
+            if transform is not None:
+                item = transform(item)
+            yield encode_json(item) if first else ',' + encode_json(item)
+            first = False
+    except Exception as e:
+        # Headers are already sent; end the array so the body stays valid JSON
+        logger.error(f"Error while streaming JSON array: {str(e)}", exc_info=True)
+        yield (',' if not first else '') + encode_json({'error': str(e)})
+    yield ']'
+
+def iter_ndjson(items: Iterable, transform: Optional[Callable] = None) -> Iterator[str]:
+    """Encode items as newline-delimited JSON"""
+    try:
+        for item in items:
+            if transform is not None:
+                item = transform(item)
+            yield encode_json(item) + '\n'
+    except Exception as e:
+        logger.error(f"Error while streaming NDJSON: {str(e)}", exc_info=True)
+        yield encode_json({'error': str(e)}) + '\n'
+
+def get_stream_format(request) -> Optional[str]:
+    """``json`` or ``ndjson`` when the client asked for a streamed body via ?stream="""
+    stream = request.query_params.get('stream')
+    if stream in STREAM_FORMATS:
+        return stream
+    return None
+
+def streaming_json_response(
+    items: Iterable,
+    stream_format: str = 'json',
+    transform: Optional[Callable] = None,
+    filename: Optional[str] = None
+) -> StreamingHttpResponse:
+    """Stream ``items`` (any generator or queryset iterator) as JSON or NDJSON.
+
+    Only the current chunk is held in memory, so peak memory does not grow
+    with the number of results.
+    """
+    if stream_format == 'ndjson':
+        pieces = iter_ndjson(items, transform)
+    else:
+        pieces = iter_json_array(items, transform)
+
+    response = StreamingHttpResponse(
+        buffered_chunks(pieces),
+        content_type=f"{STREAM_FORMATS[stream_format]}; charset=utf-8"
+    )
+    response['X-Accel-Buffering'] = 'no'
+    if filename:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,90 @@
+"""
+Geofence engine throughput on one core.
+
+Usage:
+    python apps/core/tests/bench_geofence.py [--users 1000] [--fences 50] [--updates 200000]
+
+Gives every user ``--fences`` notify-enabled circles (0.2-2 km) scattered
+over a city, then feeds ``--updates`` positions from per-user random walks
+through the engine and reports updates/s. The grid index is compared with a
+linear scan over all of the user's fences, which is what evaluating
+proximity without an index costs.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+django.setup()
+
+from apps.core.services.geofence import Fence, GeofenceEngine, GeofenceIndex
+
+CENTER = (35.68, 139.76)
+SPREAD = 0.15  # degrees, roughly a 30 km wide city
+
+class LinearIndex(GeofenceIndex):
+    """Baseline: test every fence for every position"""
+
+    def containing(self, lat, lng):
+        return [fence for fence in self.fences.values() if fence.distance_km(lat, lng) <= fence.radius_km]
+
+def make_engine(args, rng, index_class) -> GeofenceEngine:
+    engine = GeofenceEngine(refresh_seconds=3600)
+    engine._version = lambda user_id: 'bench'  # no cache round trips in the loop
+    for user_id in range(args.users):
+        fences = [
+            Fence(f'{user_id}-{i}', CENTER[0] + rng.uniform(-SPREAD, SPREAD),
+                  CENTER[1] + rng.uniform(-SPREAD, SPREAD), rng.uniform(0.2, 2.0))
+            for i in range(args.fences)
+        ]
+        engine.set_fences(user_id, [], version='bench')
+        engine._users[str(user_id)].index = index_class(fences, engine.cell_degrees)
+    return engine
+
+def make_updates(args, rng):
+    positions = {
+        user_id: [CENTER[0] + rng.uniform(-SPREAD, SPREAD), CENTER[1] + rng.uniform(-SPREAD, SPREAD)]
+        for user_id in range(args.users)
+    }
+    updates = []
+    for _ in range(args.updates):
+        user_id = rng.randrange(args.users)
+        position = positions[user_id]
+        position[0] += rng.gauss(0, 0.002)  # ~200 m steps
+        position[1] += rng.gauss(0, 0.002)
+        updates.append((user_id, position[0], position[1]))
+    return updates
+
+def run(engine, updates):
+    start = time.perf_counter()
+    events = engine.process(updates)
+    return time.perf_counter() - start, events
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--fences', type=int, default=50)
+    parser.add_argument('--updates', type=int, default=200000)
+    args = parser.parse_args()
+
+    updates = make_updates(args, random.Random(1))
+    print(f"{args.users} users x {args.fences} fences, {args.updates} position updates")
+    print(f"{'index':>10}{'seconds':>10}{'updates/s':>12}{'events':>10}")
+
+    results = {}
+    for name, index_class in (('linear', LinearIndex), ('grid', GeofenceIndex)):
+        engine = make_engine(args, random.Random(2), index_class)
+        elapsed, events = run(engine, updates)
+        results[name] = [(e['type'], e['user_location_id']) for e in events]
+        print(f"{name:>10}{elapsed:>10.3f}{args.updates / elapsed:>12.0f}{len(events):>10}")
+
+    assert results['linear'] == results['grid'], "grid index changed the events"
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Import time of a worker start-up, from ``python -X importtime``.
+
+Usage:
+    python apps/core/tests/bench_importtime.py [--runs 5] [--top 15] [--budget-ms 450]
+
+Each run is a fresh interpreter doing what a WSGI worker or management
+command does before serving anything: ``django.setup()`` and loading the
+URLconf (and with it every view). Reports the median total import time,
+the slowest imports, and exits non-zero when
+
+- the median exceeds ``--budget-ms``, or
+- a module that should only load on first use was imported: drf_yasg's
+  views and schema objects (built by apps.core.schemas for the docs),
+  the Firebase Admin SDK and google-auth (FirebaseService.db), and the
+  Instagram analyzer.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+
+STARTUP = 'import django; django.setup(); import config.urls'
+
+DEFERRED = [
+    'apps.core.schemas',
+    'drf_yasg.views',
+    'drf_yasg.openapi',
+    'firebase_admin',
+    'google.auth',
+    'apps.core.instagram.analyzer',
+]
+
+def measure():
+    """(total seconds, {module: (self, cumulative)}) for one fresh start-up"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'))
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP],
+        env=env, cwd=ROOT, check=True, capture_output=True, text=True
+    ).stderr
+    modules, total = {}, 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        name = name.strip()
+        modules[name] = (int(own), int(cumulative))
+        if depth == 0:
+            total += int(cumulative)
+    return total / 1e6, modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, default=450)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    totals = [total * 1000 for total, _ in runs]
+    median = statistics.median(totals)
+    modules = runs[-1][1]
+
+    print(f"{STARTUP!r}, {args.runs} fresh processes")
+    print(f"import time: median {median:.1f} ms (min {min(totals):.1f}, max {max(totals):.1f}), "
+          f"budget {args.budget_ms:.0f} ms")
+
+    print(f"\nslowest imports (cumulative ms, last run)")
+    ours = sorted(
+        ((cumulative, name) for name, (_, cumulative) in modules.items()
+         if name.split('.')[0] in ('apps', 'config')),
+        reverse=True
+    )
+    for cumulative, name in ours[:args.top]:
+        print(f"{cumulative / 1000:>10.1f}  {name}")
+
+    failures = []
+    loaded = [name for name in DEFERRED if name in modules]
+    print(f"\ndeferred modules loaded at start-up: {', '.join(loaded) or 'none'}")
+    if loaded:
+        failures.append(f"imported at start-up: {', '.join(loaded)}")
+    if median > args.budget_ms:
+        failures.append(f"median import time {median:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
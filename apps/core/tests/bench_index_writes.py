@@ -0,0 +1,218 @@
+"""
+Write amplification of the Location/UserLocation indexes, before and after 0010.
+
+Usage:
+    python apps/core/tests/bench_index_writes.py [--rows 20000] [--edits 2000] [--batch 100]
+
+``before`` is the index set of migration 0009 (single-column indexes on
+sync_status, firebase_id, version, category, ... plus the user_id foreign
+key index), read from the migration state; ``after`` is the current models
+(partial and covering indexes from 0010). For each, a throwaway file
+database in WAL mode with automatic checkpoints off runs the write paths
+of the app:
+
+- ``insert``: ``--rows`` locations and saves (bulk import), ``--batch`` rows per INSERT;
+- ``sync``: every row marked syncing, then synced with its firebase_id and
+  last_synced (SyncManager / SyncService), ``--batch`` rows per transaction;
+- ``pull``: ``--edits`` locations rewritten with a full save() (sync_from_firebase);
+- ``edit``: ``--edits`` saves updated with a full save(), one per
+  transaction (UserLocationViewSet.update);
+- ``delete``: ``--edits`` locations soft deleted, one per transaction.
+
+The WAL is truncated before each step, so its size afterwards is what the
+step wrote: table and index pages, each page once per transaction. Reported
+per row along with the time, and the final size of every index (dbstat).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+from apps.core.models import Location, UserLocation
+
+USERS = 50
+BEFORE = ('core', '0009_location_postgis')
+
+class NoMigrations(dict):
+    """Build tables straight from the models, like pytest --nomigrations"""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+def use_index_set(state):
+    """Swap the current model indexes for those of a migration state"""
+    old_apps = state.apps
+    with connection.schema_editor() as editor:
+        # First: SQLite rebuilds the table, with the current indexes
+        old_field = old_apps.get_model('core', 'UserLocation')._meta.get_field('user')
+        editor.alter_field(UserLocation, UserLocation._meta.get_field('user'), old_field)
+        for model in (Location, UserLocation):
+            old_model = old_apps.get_model('core', model.__name__)
+            for index in model._meta.indexes:
+                editor.remove_index(model, index)
+            for index in old_model._meta.indexes:
+                editor.add_index(old_model, index)
+
+def wal_bytes(path) -> int:
+    try:
+        return os.path.getsize(f'{path}-wal')
+    except OSError:
+        return 0
+
+def checkpoint():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+def step(results, name, rows, path, work):
+    checkpoint()
+    start = time.perf_counter()
+    work()
+    elapsed = time.perf_counter() - start
+    results[name] = {'rows': rows, 'seconds': elapsed, 'bytes': wal_bytes(path)}
+
+def batches(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def run(args, mode, before_state, directory):
+    path = os.path.join(directory, 'bench.sqlite3')
+    connection.settings_dict.setdefault('TEST', {})['NAME'] = path
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        if mode == 'before':
+            use_index_set(before_state)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND tbl_name = 'core_location'")
+            location_indexes = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND tbl_name = 'core_userlocation'")
+            user_location_indexes = cursor.fetchone()[0]
+
+        User.objects.bulk_create([User(username=f'bench{i}') for i in range(USERS)])
+        user_ids = list(User.objects.filter(username__startswith='bench').values_list('id', flat=True))
+        now = timezone.now()
+        results = {}
+
+        locations = [
+            Location(
+                name=f'Place {i}', latitude=35.0 + i / args.rows, longitude=139.0 + i / args.rows,
+                description='A spot someone saved from a reel', category='food',
+                address=f'{i} Example Street, Tokyo', date_posted=now
+            )
+            for i in range(args.rows)
+        ]
+        saves = [
+            UserLocation(user_id=user_ids[i % USERS], location=location, saved_at=now, notes='')
+            for i, location in enumerate(locations)
+        ]
+
+        def insert():
+            for batch in batches(locations, args.batch):
+                Location.objects.bulk_create(batch)
+            for batch in batches(saves, args.batch):
+                UserLocation.objects.bulk_create(batch)
+
+        def sync():
+            for model, rows in ((Location, locations), (UserLocation, saves)):
+                for batch in batches(rows, args.batch):
+                    with transaction.atomic():
+                        for row in batch:
+                            row.sync_status = 1  # Syncing
+                            row.save(update_fields=['sync_status'])
+                            row.sync_status = 2  # Synced
+                            row.firebase_id = str(row.pk)
+                            row.last_synced = timezone.now()
+                            row.save(update_fields=['sync_status', 'last_synced', 'firebase_id'])
+
+        def pull():
+            for location in locations[:args.edits]:
+                location.description = 'Updated in another client'
+                location.last_synced = timezone.now()
+                location.save()
+
+        def edit():
+            for save in saves[:args.edits]:
+                save.notes = 'Go early, it gets busy'
+                save.is_favorite = True
+                save.save()
+
+        def delete():
+            for location in locations[-args.edits:]:
+                location.soft_delete()
+
+        step(results, 'insert', args.rows * 2, path, insert)
+        step(results, 'sync', args.rows * 2, path, sync)
+        step(results, 'pull', args.edits, path, pull)
+        step(results, 'edit', args.edits, path, edit)
+        step(results, 'delete', args.edits, path, delete)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT m.tbl_name, d.name, SUM(d.pgsize) FROM dbstat d "
+                "JOIN sqlite_master m ON m.name = d.name AND m.type = 'index' "
+                "WHERE m.tbl_name IN ('core_location', 'core_userlocation') GROUP BY d.name ORDER BY 1, 3 DESC"
+            )
+            sizes = cursor.fetchall()
+        connection.close()
+        return {
+            'indexes': (location_indexes, user_location_indexes),
+            'steps': results,
+            'sizes': sizes,
+        }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--edits', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    # Read before the migrations are switched off for the test databases
+    before_state = MigrationLoader(connection, ignore_no_migrations=True).project_state(BEFORE)
+    settings.MIGRATION_MODULES = NoMigrations()
+    # The save signals bump location versions in the cache; keep Redis out of the timings
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    settings.SQLITE_PRAGMAS = dict(settings.SQLITE_PRAGMAS, journal_mode='wal', wal_autocheckpoint=0)
+
+    results = {}
+    for mode in ('before', 'after'):
+        with tempfile.TemporaryDirectory() as directory:
+            results[mode] = run(args, mode, before_state, directory)
+
+    print(f"{args.rows} locations + {args.rows} saves, {args.edits} edits per step")
+    for mode, r in results.items():
+        print(f"{mode}: {r['indexes'][0]} indexes on core_location, {r['indexes'][1]} on core_userlocation")
+    print(f"\n{'step':>8}{'rows':>8}{'before KB/row':>15}{'after KB/row':>14}{'before us/row':>15}{'after us/row':>14}")
+    for name, before in results['before']['steps'].items():
+        after = results['after']['steps'][name]
+        rows = before['rows']
+        print(f"{name:>8}{rows:>8}{before['bytes'] / rows / 1024:>15.2f}{after['bytes'] / rows / 1024:>14.2f}"
+              f"{before['seconds'] / rows * 1e6:>15.0f}{after['seconds'] / rows * 1e6:>14.0f}")
+
+    for mode, r in results.items():
+        total = sum(size for _, _, size in r['sizes'])
+        print(f"\n{mode} index sizes ({total / 1024 / 1024:.1f} MiB)")
+        for table, name, size in r['sizes']:
+            print(f"{size / 1024:>10.0f} KiB  {table}.{name}")
+
+if __name__ == '__main__':
+    main()
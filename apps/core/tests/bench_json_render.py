@@ -0,0 +1,102 @@
+"""
+DRF's JSONRenderer vs ORJSONRenderer on a realistic location payload.
+
+Usage:
+    python apps/core/tests/bench_json_render.py [--locations 1000] [--repeat 200]
+
+The payload mirrors a paginated ``/locations/`` page: combined location +
+user_location dicts with UUIDs, aware datetimes and Decimals, wrapped in
+the ``{next, previous, results}`` envelope. Also times the cache layer's
+dumps/loads round trip against the stdlib json module it replaced.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+django.setup()
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from apps.core import fastjson
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import ORJSONRenderer
+
+def make_payload(count: int):
+    saved = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    results = []
+    for i in range(count):
+        results.append({
+            'id': uuid.uuid4(),
+            'name': f'Place {i}',
+            'latitude': 35.0 + i / count,
+            'longitude': 139.0 + i / count,
+            'description': 'A spot someone saved from a reel, café and ramen nearby. ' * 2,
+            'category': 'food',
+            'address': f'{i} Example Street, Shibuya, Tokyo',
+            'location_type': 'instagram',
+            'is_instagram_source': True,
+            'instagram_url': f'https://www.instagram.com/reel/C{i:09d}/',
+            'created_at': saved + timedelta(minutes=i),
+            'user_location': {
+                'id': uuid.uuid4(),
+                'custom_name': '',
+                'notes': 'go on a weekday',
+                'is_favorite': bool(i % 2),
+                'notify_enabled': False,
+                'notify_radius': Decimal('1.0'),
+                'saved_at': saved + timedelta(hours=i),
+            }
+        })
+    return {'next': 'http://testserver/api/locations/?cursor=eyJrIjoieCJ9', 'previous': None, 'results': results}
+
+def timed(func, repeat: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--locations', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    payload = make_payload(args.locations)
+    stock_body = JSONRenderer().render(payload)
+    fast_body = ORJSONRenderer().render(payload)
+    assert json.loads(stock_body) == json.loads(fast_body)
+
+    # Cached values are what serializers return: plain JSON types
+    cached = json.loads(stock_body)
+
+    rows = [
+        ('render', 'drf json', lambda: JSONRenderer().render(payload)),
+        ('render', 'orjson', lambda: ORJSONRenderer().render(payload)),
+        ('parse', 'drf json', lambda: JSONParser().parse(io.BytesIO(stock_body))),
+        ('parse', 'orjson', lambda: ORJSONParser().parse(io.BytesIO(fast_body))),
+        ('cache', 'json', lambda: json.loads(json.dumps(cached))),
+        ('cache', 'orjson', lambda: fastjson.loads(fastjson.dumps(cached))),
+    ]
+
+    print(f"{args.locations} locations, body {len(stock_body) / 1024:.0f} KB (drf) / {len(fast_body) / 1024:.0f} KB (orjson)")
+    print(f"{'step':>8}{'encoder':>10}{'ms/op':>10}{'speedup':>10}")
+    baseline = None
+    for step, name, func in rows:
+        ms = timed(func, args.repeat)
+        baseline = ms if baseline is None or name in ('drf json', 'json') else baseline
+        print(f"{step:>8}{name:>10}{ms:>10.2f}{baseline / ms:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
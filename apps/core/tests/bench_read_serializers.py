@@ -0,0 +1,112 @@
+"""
+UserLocationSerializer vs UserLocationReadSerializer on a large listing.
+
+Usage:
+    python apps/core/tests/bench_read_serializers.py [--rows 10000] [--repeat 3]
+
+Creates a throwaway test database, saves ``--rows`` locations for one user
+and times reading + serializing them the way UserLocationViewSet used to
+(model instances through the nested ModelSerializer) against the values()
+read path it uses now, and against a sparse ``?fields=`` listing. Output of
+the two full paths is compared before timing.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+from apps.core import fastjson
+from apps.core.models import Location, UserLocation
+from apps.core.serializers import UserLocationReadSerializer, UserLocationSerializer
+
+class NoMigrations(dict):
+    """Build tables straight from the models, like pytest --nomigrations"""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+def populate(rows: int) -> User:
+    user = User.objects.create_user(username='bench', password='BenchPass123!')
+    now = timezone.now()
+    locations = Location.objects.bulk_create([
+        Location(
+            name=f'Place {i}', latitude=35.0 + i / rows, longitude=139.0 + i / rows,
+            description='A spot someone saved from a reel ' * 3, category='food',
+            address=f'{i} Example Street, Tokyo', is_instagram_source=True,
+            instagram_url=f'https://www.instagram.com/reel/C{i:09d}/', date_posted=now
+        )
+        for i in range(rows)
+    ], batch_size=1000)
+    UserLocation.objects.bulk_create([
+        UserLocation(user=user, location=location, notes='go on a weekday',
+                     is_favorite=bool(i % 2), saved_at=now - timedelta(seconds=i))
+        for i, location in enumerate(locations)
+    ], batch_size=1000)
+    return user
+
+def model_serializer(queryset):
+    return UserLocationSerializer(queryset.select_related('location'), many=True).data
+
+def read_serializer(queryset):
+    reader = UserLocationReadSerializer()
+    return reader.many(reader.values(queryset))
+
+def sparse_serializer(fields):
+    def serialize(queryset):
+        reader = UserLocationReadSerializer(fields)
+        return reader.many(reader.values(queryset))
+    return serialize
+
+def best_of(func, queryset, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = func(queryset)
+        times.append(time.perf_counter() - start)
+    return min(times), len(fastjson.dumps(data))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--fields', default='id,location.name,location.latitude,location.longitude')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    settings.MIGRATION_MODULES = NoMigrations()
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        user = populate(args.rows)
+        queryset = UserLocation.objects.filter(user=user).order_by('-saved_at', '-id')
+        assert model_serializer(queryset) == read_serializer(queryset)
+
+        print(f"{args.rows} rows, best of {args.repeat}")
+        print(f"{'serializer':>24}{'seconds':>10}{'rows/s':>12}{'speedup':>10}{'body KB':>10}")
+        baseline = None
+        for name, func in (('UserLocationSerializer', model_serializer),
+                           ('UserLocationReadSer.', read_serializer),
+                           ('?fields= (sparse)', sparse_serializer(args.fields.split(',')))):
+            elapsed, size = best_of(func, queryset, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{name:>24}{elapsed:>10.3f}{args.rows / elapsed:>12.0f}{baseline / elapsed:>9.1f}x{size / 1024:>10.0f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare full-page and streaming og:description extraction.
+
+Usage:
+    python apps/core/tests/bench_reel_fetch.py [--pad-kb 512] [--runs 50]
+
+Serves the saved HTML fixtures from a local HTTP server and reports, per
+mode, wall time per reel, bytes read by the client, bytes the server got
+to write before the connection closed, and peak Python memory. Server
+writes include whatever fitted into the loopback socket buffers before
+the client hung up, so they overstate what a remote server would send.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from apps.core.instagram.analyzer import InstagramReelDescriptionExtractor
+from apps.core.tests.html_fixture_server import FIXTURE_DIR, serve_fixtures
+
+def run_mode(stream: bool, urls, runs: int, stats: dict):
+    extractor = InstagramReelDescriptionExtractor(stream=stream)
+    stats.clear()
+    bytes_read = 0
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(runs):
+        extractor.fetch_og_description(urls[i % len(urls)])
+        bytes_read += extractor.last_bytes_read
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    time.sleep(0.2)  # Let server threads record what they managed to send
+    return {
+        'ms_per_reel': elapsed / runs * 1000,
+        'client_kb_per_reel': bytes_read / runs / 1024,
+        'server_kb_per_reel': stats.get('bytes_sent', 0) / runs / 1024,
+        'peak_kb': peak / 1024,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pad-kb', type=int, default=512)
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    pages = sorted(p.name for p in FIXTURE_DIR.glob('*.html'))
+    with serve_fixtures(pad_kb=args.pad_kb) as (base_url, stats):
+        urls = [f'{base_url}/{page}' for page in pages]
+        run_mode(False, urls, len(urls), stats)  # Warm up fixture bodies
+        results = {
+            'full': run_mode(False, urls, args.runs, stats),
+            'stream': run_mode(True, urls, args.runs, stats),
+        }
+
+    print(f"{'mode':<8}{'ms/reel':>10}{'client KB':>12}{'server KB':>12}{'peak KB':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['ms_per_reel']:>10.2f}{r['client_kb_per_reel']:>12.1f}"
+              f"{r['server_kb_per_reel']:>12.1f}{r['peak_kb']:>10.1f}")
+
+if __name__ == '__main__':
+    main()
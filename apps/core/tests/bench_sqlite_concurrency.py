@@ -0,0 +1,186 @@
+"""
+Parallel readers against a bulk sync writer on SQLite, default vs SQLITE_PRAGMAS.
+
+Usage:
+    python apps/core/tests/bench_sqlite_concurrency.py [--readers 4] [--seconds 8] [--rows 20000] [--batch 50] [--think-ms 5]
+
+For each mode a throwaway file database (not in-memory: journaling is what
+is being measured) gets ``--rows`` locations saved by 50 users. Then for
+``--seconds``:
+
+- ``--readers`` processes (web workers) list a random user's saved
+  locations the way UserLocationViewSet does (join, 50 rows), with
+  ``--think-ms`` of other request work between queries;
+- one writer process marks locations synced the way SyncManager.sync_to_firebase
+  does: two single-row UPDATEs per location, ``--batch`` locations per
+  transaction.
+
+``default`` runs with no pragmas (rollback journal, synchronous=FULL);
+``tuned`` applies settings.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, mmap,
+cache, busy_timeout, temp_store) through the connection_created hook.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection, transaction
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+from apps.core.models import Location, UserLocation
+
+USERS = 50
+
+class NoMigrations(dict):
+    """Build tables straight from the models, like pytest --nomigrations"""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+def populate(rows: int):
+    users = User.objects.bulk_create([User(username=f'bench{i}') for i in range(USERS)])
+    users = list(User.objects.filter(username__startswith='bench').values_list('id', flat=True))
+    now = timezone.now()
+    locations = Location.objects.bulk_create([
+        Location(
+            name=f'Place {i}', latitude=35.0 + i / rows, longitude=139.0 + i / rows,
+            description='A spot someone saved from a reel', category='food',
+            address=f'{i} Example Street, Tokyo', date_posted=now
+        )
+        for i in range(rows)
+    ], batch_size=1000)
+    UserLocation.objects.bulk_create([
+        UserLocation(user_id=users[i % USERS], location=location, saved_at=now)
+        for i, location in enumerate(locations)
+    ], batch_size=1000)
+    return users, [location.pk for location in locations]
+
+def reader(user_ids, think, stop, results):
+    rng = random.Random()
+    latencies, errors = [], 0
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                list(
+                    UserLocation.objects.filter(user_id=rng.choice(user_ids))
+                    .select_related('location')
+                    .order_by('-saved_at')
+                    .values('id', 'notes', 'is_favorite', 'location__name',
+                            'location__latitude', 'location__longitude')[:50]
+                )
+                latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                errors += 1
+            time.sleep(think)
+    finally:
+        connection.close()
+    results.put(('read', latencies, errors))
+
+def writer(location_ids, batch, stop, results):
+    synced = errors = 0
+    position = 0
+    try:
+        while not stop.is_set():
+            ids = location_ids[position:position + batch]
+            position = (position + batch) % len(location_ids)
+            try:
+                with transaction.atomic():
+                    for location in Location.objects.filter(pk__in=ids).only('id', 'sync_status'):
+                        location.sync_status = 1  # Syncing
+                        location.save(update_fields=['sync_status'])
+                        location.sync_status = 2  # Synced
+                        location.last_synced = timezone.now()
+                        location.save(update_fields=['sync_status', 'last_synced'])
+                synced += len(ids)
+            except OperationalError:
+                errors += 1
+    finally:
+        connection.close()
+    results.put(('write', synced, errors))
+
+def run(args, pragmas, directory):
+    settings.SQLITE_PRAGMAS = pragmas
+    connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(directory, 'bench.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        user_ids, location_ids = populate(args.rows)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        connection.close()  # not shared with the forked workers
+
+        context = multiprocessing.get_context('fork')
+        stop, results = context.Event(), context.Queue()
+        workers = [context.Process(target=reader, args=(user_ids, args.think_ms / 1000, stop, results))
+                   for _ in range(args.readers)]
+        workers.append(context.Process(target=writer, args=(location_ids, args.batch, stop, results)))
+        for worker in workers:
+            worker.start()
+        time.sleep(args.seconds)
+        stop.set()
+        reported = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        read_results = [(latencies, errors) for kind, latencies, errors in reported if kind == 'read']
+        write_results = [(synced, errors) for kind, synced, errors in reported if kind == 'write']
+
+        latencies = sorted(latency for thread_latencies, _ in read_results for latency in thread_latencies)
+        return {
+            'journal': journal_mode,
+            'reads': len(latencies) / args.seconds,
+            'p50': statistics.median(latencies) * 1000 if latencies else 0.0,
+            'p99': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+            'synced': write_results[0][0] / args.seconds,
+            'errors': sum(errors for _, errors in read_results) + write_results[0][1],
+        }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=8)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=50)
+    parser.add_argument('--think-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    settings.MIGRATION_MODULES = NoMigrations()
+    # The save signals bump location versions in the cache; keep Redis out of the timings
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    tuned = dict(settings.SQLITE_PRAGMAS)
+
+    print(f"{args.readers} readers + 1 sync writer ({args.batch} locations/transaction), "
+          f"{args.rows} locations, {args.seconds:g} s per mode")
+    print(f"{'mode':>8}{'journal':>9}{'reads/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'synced/s':>10}{'errors':>8}")
+    results = {}
+    for mode, pragmas in (('default', {}), ('tuned', tuned)):
+        with tempfile.TemporaryDirectory() as directory:
+            r = results[mode] = run(args, pragmas, directory)
+        print(f"{mode:>8}{r['journal']:>9}{r['reads']:>10.0f}{r['p50']:>9.2f}{r['p99']:>9.2f}"
+              f"{r['synced']:>10.0f}{r['errors']:>8}")
+
+    for key, label in (('reads', 'read throughput'), ('synced', 'sync throughput')):
+        if results['default'][key]:
+            print(f"{label}: {results['tuned'][key] / results['default'][key]:.1f}x")
+
+if __name__ == '__main__':
+    main()
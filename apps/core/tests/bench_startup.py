@@ -0,0 +1,123 @@
+"""
+Process start-up time with lazy and eager Firebase initialization.
+
+Usage:
+    python apps/core/tests/bench_startup.py [--runs 5] [--fake-credentials]
+
+Each run is a fresh interpreter (as a new worker process would be) that
+times ``django.setup()``, importing the URLconf (and with it the views),
+and the first use of ``FirebaseService().db``. ``lazy`` is the default;
+``eager`` sets FIREBASE_EAGER_INIT so the SDK is initialized in
+``CoreConfig.ready``. The difference in time to a routable app is what
+every process that never touches the RTDB (management commands, job
+workers, tile or geofence only workers) saves.
+
+Without a service account key the SDK fails to initialize (quickly), so
+``--fake-credentials`` generates a throwaway key: parsing it and setting up
+the app is the same work as with a real one, and nothing goes over the
+network until the first read.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+
+def child():
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    timings = {}
+    start = time.perf_counter()
+    import django
+    django.setup()
+    timings['setup'] = time.perf_counter() - start
+
+    mark = time.perf_counter()
+    import config.urls  # noqa: F401
+    timings['urls'] = time.perf_counter() - mark
+    timings['ready'] = time.perf_counter() - start
+
+    from apps.core.services.firebase_service import FirebaseService
+    service = FirebaseService()
+    initialized = service.initialized
+    mark = time.perf_counter()
+    warmed = FirebaseService.warm_up()
+    timings['first_use'] = time.perf_counter() - mark
+    timings['total'] = time.perf_counter() - start
+    print(json.dumps({'timings': timings, 'initialized_at_ready': initialized, 'warmed': warmed}))
+
+def fake_credentials(directory: str) -> str:
+    """Write a syntactically valid service account key that is not registered anywhere"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode('ascii')
+    path = os.path.join(directory, 'serviceAccountKey.json')
+    with open(path, 'w') as f:
+        json.dump({
+            'type': 'service_account',
+            'project_id': 'bench-startup',
+            'private_key_id': 'bench',
+            'private_key': pem,
+            'client_email': 'bench@bench-startup.iam.gserviceaccount.com',
+            'client_id': '0',
+            'token_uri': 'https://oauth2.googleapis.com/token',
+        }, f)
+    return path
+
+def run(mode: str, extra_env: dict) -> dict:
+    env = dict(os.environ, FIREBASE_EAGER_INIT='True' if mode == 'eager' else 'False', **extra_env)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    output = subprocess.run(
+        [sys.executable, __file__, '--child'], env=env, cwd=ROOT,
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--fake-credentials', action='store_true')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        extra_env = {}
+        if args.fake_credentials:
+            extra_env['FIREBASE_ADMIN_SDK_PATH'] = fake_credentials(directory)
+        compare(args, extra_env)
+
+def compare(args, extra_env: dict) -> None:
+    print(f"median of {args.runs} fresh processes, milliseconds")
+    print(f"{'mode':>6}{'setup':>10}{'urls':>10}{'ready':>10}{'first use':>11}{'total':>10}  firebase")
+    medians = {}
+    for mode in ('lazy', 'eager'):
+        results = [run(mode, extra_env) for _ in range(args.runs)]
+        medians[mode] = {
+            phase: statistics.median(r['timings'][phase] for r in results) * 1000
+            for phase in ('setup', 'urls', 'ready', 'first_use', 'total')
+        }
+        m = medians[mode]
+        state = 'initialized' if all(r['warmed'] for r in results) else 'failed (no credentials?)'
+        print(f"{mode:>6}{m['setup']:>10.1f}{m['urls']:>10.1f}{m['ready']:>10.1f}"
+              f"{m['first_use']:>11.1f}{m['total']:>10.1f}  {state}")
+        if mode == 'lazy':
+            assert not any(r['initialized_at_ready'] for r in results), "Firebase was initialized at start-up"
+
+    saved = medians['eager']['ready'] - medians['lazy']['ready']
+    print(f"\nstart-up saved per process that never uses the RTDB: {saved:.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Peak memory of buffered vs streamed location listings.
+
+Usage:
+    python apps/core/tests/bench_streaming.py [--rows 10000 50000 100000]
+
+For each size, builds the combined location dicts the list endpoints
+return and measures peak Python memory of (a) collecting them in a list
+and JSON-encoding the whole response, as Response does today, and (b)
+streaming them from a generator through streaming_json_response.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+django.setup()
+
+from apps.core.streaming import streaming_json_response
+
+def make_locations(rows: int):
+    for i in range(rows):
+        yield {
+            'name': f'Place {i}',
+            'latitude': 35.0 + i / rows,
+            'longitude': 139.0 + i / rows,
+            'description': 'A spot someone saved from a reel ' * 3,
+            'category': 'food',
+            'address': f'{i} Example Street, Tokyo',
+            'user_location': {'id': f'ul-{i}', 'is_favorite': bool(i % 2), 'notify_radius': 1.0}
+        }
+
+def buffered(rows: int) -> int:
+    locations = list(make_locations(rows))
+    return len(json.dumps(locations).encode('utf-8'))
+
+def streamed(rows: int) -> int:
+    response = streaming_json_response(make_locations(rows))
+    return sum(len(chunk) for chunk in response.streaming_content)
+
+def measure(func, rows: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = func(rows)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}{'mode':>10}{'body MB':>10}{'seconds':>10}{'peak MB':>10}")
+    for rows in args.rows:
+        for name, func in (('buffered', buffered), ('streamed', streamed)):
+            size, elapsed, peak = measure(func, rows)
+            print(f"{rows:>8}{name:>10}{size / 2**20:>10.1f}{elapsed:>10.2f}{peak / 2**20:>10.1f}")
+
+if __name__ == '__main__':
+    main()
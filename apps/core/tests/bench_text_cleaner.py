@@ -0,0 +1,44 @@
+"""
+Throughput benchmark for the Instagram caption cleaner.
+
+Usage:
+    python apps/core/tests/bench_text_cleaner.py [--captions 5000] [--repeat 5]
+
+Reports captions per second for the precompiled cleaner using the golden
+corpus, replicated to the requested size.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from apps.core.instagram.text_cleaner import extract_metadata_and_clean
+
+GOLDEN_FILE = Path(__file__).parent / 'fixtures' / 'captions_golden.json'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--captions', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(GOLDEN_FILE, encoding='utf-8') as f:
+        corpus = [case['input'] for case in json.load(f)]
+    captions = (corpus * (args.captions // len(corpus) + 1))[:args.captions]
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for caption in captions:
+            extract_metadata_and_clean(caption)
+        best = min(best, time.perf_counter() - start)
+
+    print(f"captions: {len(captions)}")
+    print(f"best of {args.repeat}: {best * 1000:.1f} ms")
+    print(f"throughput: {len(captions) / best:,.0f} captions/s")
+
+if __name__ == '__main__':
+    main()
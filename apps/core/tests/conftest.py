@@ -26,4 +26,11 @@ def firebase_service():
 @pytest.fixture(autouse=True)
 def cleanup_firebase(firebase_service):
     """Cleanup Firebase data after each test"""
-    yield
\ No newline at end of file
+    yield
+
+@pytest.fixture
+def locmem_cache(settings):
+    """Per-process cache instead of Redis, emptied for each test"""
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    from django.core.cache import cache
+    cache.clear()
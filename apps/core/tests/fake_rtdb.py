@@ -0,0 +1,59 @@
+# apps/core/tests/fake_rtdb.py
+
+class FakeQuery:
+    """Just enough of an RTDB key-ordered query for pagination"""
+
+    def __init__(self, data, start=None, end=None, first=None, last=None):
+        self.data, self.start, self.end, self.first, self.last = data, start, end, first, last
+
+    def _with(self, **kwargs):
+        params = dict(start=self.start, end=self.end, first=self.first, last=self.last)
+        params.update(kwargs)
+        return FakeQuery(self.data, **params)
+
+    def order_by_key(self):
+        return self
+
+    def start_at(self, key):
+        return self._with(start=key)
+
+    def end_at(self, key):
+        return self._with(end=key)
+
+    def limit_to_first(self, n):
+        return self._with(first=n)
+
+    def limit_to_last(self, n):
+        return self._with(last=n)
+
+    def child(self, key):
+        return FakeQuery(self.data.get(key, {}))
+
+    def update(self, values):
+        """Multi-path update relative to this node"""
+        self.updates = getattr(self, 'updates', 0) + 1
+        for path, value in values.items():
+            node = self.data
+            *parents, leaf = path.strip('/').split('/')
+            for key in parents:
+                node = node.setdefault(key, {})
+            node[leaf] = value
+
+    def get(self, shallow=False):
+        if shallow:
+            return {k: True for k in self.data} or None
+        keys = sorted(k for k in self.data
+                      if (self.start is None or k >= self.start) and (self.end is None or k <= self.end))
+        if self.first:
+            keys = keys[:self.first]
+        if self.last:
+            keys = keys[-self.last:]
+        return {k: self.data[k] for k in keys}
+
+def make_firebase_service(data):
+    """FirebaseService reading from an in-memory tree instead of the RTDB"""
+    from apps.core.services.firebase_service import FirebaseService
+
+    service = object.__new__(FirebaseService)
+    service.db = FakeQuery(data)
+    return service
@@ -0,0 +1,71 @@
+"""
+Local HTTP server for saved Instagram HTML fixtures.
+
+Real reel pages carry several hundred KB of inline JSON after </head>.
+The saved fixtures only keep a realistic <head>, so the server expands
+the ``<!-- BODY_PADDING -->`` marker to ``pad_kb`` of filler at request
+time.
+"""
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'html'
+PADDING_MARKER = b'<!-- BODY_PADDING -->'
+WRITE_CHUNK = 16 * 1024
+
+def _make_handler(directory: Path, pad_kb: int, stats: dict):
+    filler = b'<div class="x1n2onr6">' + b'{"media":{"id":"3141592653589793"}}' * 28 + b'</div>\n'
+
+    bodies = {}
+
+    def load_body(path: Path) -> bytes:
+        # Built once per fixture so serving does not allocate per request
+        if path not in bodies:
+            padding = (filler * (pad_kb * 1024 // len(filler) + 1))[:pad_kb * 1024]
+            bodies[path] = path.read_bytes().replace(PADDING_MARKER, padding)
+        return bodies[path]
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = directory / self.path.lstrip('/').split('?')[0]
+            if not path.is_file():
+                self.send_error(404)
+                return
+
+            body = load_body(path)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+
+            view = memoryview(body)
+            sent = 0
+            try:
+                for i in range(0, len(body), WRITE_CHUNK):
+                    self.wfile.write(view[i:i + WRITE_CHUNK])
+                    sent += len(view[i:i + WRITE_CHUNK])
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Client closed the connection early
+            finally:
+                stats['bytes_sent'] = stats.get('bytes_sent', 0) + sent
+                stats['body_bytes'] = stats.get('body_bytes', 0) + len(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+@contextmanager
+def serve_fixtures(pad_kb: int = 512, directory: Path = FIXTURE_DIR):
+    """Serve fixtures on an ephemeral port; yields (base_url, stats)"""
+    stats = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _make_handler(directory, pad_kb, stats))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}', stats
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,74 @@
+# apps/core/tests/test_conditional.py
+import pytest
+from datetime import datetime, timezone
+from django.contrib.auth.models import User
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from apps.core.conditional import conditional
+from apps.core.models import Location, UserLocation
+from apps.core.services.location_versions import LocationVersionService, get_location_versions
+
+MODIFIED = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+class VersionedView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    renders = 0
+    token = 'v1'
+
+    @conditional(lambda view, request, *args, **kwargs: (VersionedView.token, MODIFIED))
+    def get(self, request):
+        VersionedView.renders += 1
+        return Response({'results': [1, 2, 3]})
+
+def get(path='/api/locations/', **headers):
+    return VersionedView.as_view()(APIRequestFactory().get(path, **headers))
+
+def test_if_none_match_returns_304_without_rendering():
+    VersionedView.renders, VersionedView.token = 0, 'v1'
+    first = get()
+    assert first.status_code == 200
+    assert first['Cache-Control'] == 'private, no-cache'
+    assert first['Last-Modified'] == 'Wed, 01 May 2024 12:00:00 GMT'
+
+    second = get(HTTP_IF_NONE_MATCH=first['ETag'])
+    assert second.status_code == 304
+    assert second['ETag'] == first['ETag']
+    assert VersionedView.renders == 1
+
+    assert get(HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code == 304
+
+def test_etag_depends_on_token_and_query():
+    VersionedView.token = 'v1'
+    etag = get()['ETag']
+    assert get('/api/locations/?cursor=abc', HTTP_IF_NONE_MATCH=etag).status_code == 200
+    VersionedView.token = 'v2'
+    assert get(HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+def test_cached_token_changes_on_bump(locmem_cache):
+    versions = LocationVersionService()
+    token, modified = versions.get(42)
+    assert versions.get(42)[0] == token
+    versions.bump(42)
+    assert versions.get(42)[0] != token
+
+@pytest.mark.django_db
+def test_fingerprint_and_signals_follow_writes(locmem_cache):
+    user = User.objects.create_user(username='etag', password='EtagPass123!')
+    versions = get_location_versions()
+    empty, _ = versions.fingerprint(user.id)
+
+    location = Location.objects.create(name='Cafe', latitude=1.0, longitude=2.0, category='food')
+    saved = UserLocation.objects.create(user=user, location=location)
+    after_save, modified = versions.fingerprint(user.id)
+    assert after_save != empty and modified is not None
+
+    cached, _ = versions.get(user.id)
+    location.version += 1
+    location.save()
+    assert versions.fingerprint(user.id)[0] != after_save
+    assert versions.get(user.id)[0] != cached  # Location post_save bumped its savers
+
+    saved.delete()
+    assert versions.fingerprint(user.id)[0] == empty
@@ -0,0 +1,49 @@
+# apps/core/tests/test_export.py
+import gzip
+import json
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from apps.core.models import Location, UserLocation
+from apps.core.services.export_service import LocationExportService
+
+@pytest.fixture
+def user(db):
+    user = User.objects.create_user(username='exporter', password='ExportPass123!')
+    for i, deleted in enumerate([False, False, True]):
+        location = Location.objects.create(
+            name=f'Place {i}', latitude=35.0 + i, longitude=139.0 + i,
+            category='food', is_deleted=deleted
+        )
+        UserLocation.objects.create(user=user, location=location, custom_name='Ramen' if i == 1 else '')
+    return user
+
+def read(exporter, output, compress=False):
+    data = b''.join(exporter.iter_bytes(output, compress=compress))
+    return gzip.decompress(data) if compress else data
+
+@pytest.mark.django_db
+class TestLocationExport:
+    def test_geojson_feature_collection(self, user):
+        collection = json.loads(read(LocationExportService(user, chunk_size=1), 'geojson'))
+        assert collection['type'] == 'FeatureCollection'
+        features = collection['features']
+        assert len(features) == 2  # soft-deleted locations are skipped
+        assert features[0]['geometry'] == {'type': 'Point', 'coordinates': [139.0, 35.0]}
+        assert features[1]['properties']['name'] == 'Ramen'
+        assert features[1]['properties']['location_name'] == 'Place 1'
+
+    def test_gzipped_ndjson(self, user):
+        lines = read(LocationExportService(user), 'ndjson', compress=True).splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [r['location_name'] for r in records] == ['Place 0', 'Place 1']
+        assert records[0]['latitude'] == 35.0
+
+    def test_empty_export_is_valid(self, db):
+        nobody = User.objects.create_user(username='nobody', password='NobodyPass123!')
+        assert json.loads(read(LocationExportService(nobody), 'geojson'))['features'] == []
+
+    def test_management_command(self, user, tmp_path):
+        target = tmp_path / 'map.geojson.gz'
+        call_command('export_locations', 'exporter', '--gzip', '--file', str(target), stderr=None)
+        assert len(json.loads(gzip.decompress(target.read_bytes()))['features']) == 2
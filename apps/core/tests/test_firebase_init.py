@@ -0,0 +1,69 @@
+# apps/core/tests/test_firebase_init.py
+import threading
+import firebase_admin
+import pytest
+from firebase_admin import credentials, db
+from apps.core.services.firebase_service import FirebaseService
+
+class FakeSDK:
+    """Counts Admin SDK initializations; fails while ``broken`` is set"""
+
+    def __init__(self):
+        self.apps = {}
+        self.initialized = 0
+        self.broken = False
+
+    def initialize_app(self, cred, options):
+        if self.broken:
+            raise ValueError('no credentials')
+        self.initialized += 1
+        self.apps['[DEFAULT]'] = options
+
+@pytest.fixture
+def sdk(monkeypatch):
+    sdk = FakeSDK()
+    monkeypatch.setattr(firebase_admin, '_apps', sdk.apps)
+    monkeypatch.setattr(firebase_admin, 'initialize_app', sdk.initialize_app)
+    monkeypatch.setattr(credentials, 'Certificate', lambda value: 'cert')
+    monkeypatch.setattr(db, 'reference', lambda: 'root')
+    monkeypatch.setattr(FirebaseService, '_instance', None)
+    return sdk
+
+def test_construction_does_not_touch_the_sdk(sdk):
+    service = FirebaseService()
+    assert FirebaseService() is service
+    assert not service.initialized and sdk.initialized == 0
+
+    threads = [threading.Thread(target=lambda: service.db) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert service.db == 'root' and service.initialized
+    assert sdk.initialized == 1
+
+def test_warm_up_logs_failures_and_retries(sdk):
+    sdk.broken = True
+    assert FirebaseService.warm_up() is False
+    assert not FirebaseService().initialized
+
+    sdk.broken = False
+    assert FirebaseService.warm_up() is True
+    assert FirebaseService().initialized and sdk.initialized == 1
+
+def test_assigned_reference_skips_initialization(sdk):
+    service = FirebaseService()
+    service.db = 'fake'
+    assert service.db == 'fake' and sdk.initialized == 0
+
+def test_ready_initializes_only_when_eager(sdk, settings):
+    from django.apps import apps
+    config = apps.get_app_config('core')
+
+    settings.FIREBASE_EAGER_INIT = False
+    config.ready()
+    assert not FirebaseService().initialized
+
+    settings.FIREBASE_EAGER_INIT = True
+    config.ready()
+    assert FirebaseService().initialized and sdk.initialized == 1
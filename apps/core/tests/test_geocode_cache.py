@@ -0,0 +1,74 @@
+# apps/core/tests/test_geocode_cache.py
+import pytest
+from django.core.management import call_command
+from apps.core.models import GeocodeCache
+from apps.core.services.geocode_cache import GeocodeCacheService
+
+@pytest.fixture
+def geocode_cache():
+    return GeocodeCacheService(max_size=100)
+
+@pytest.mark.django_db
+class TestGeocodeCache:
+    def test_gazetteer_result_is_persisted_and_served_from_memory(self, geocode_cache):
+        first = geocode_cache.resolve('Eiffel Tower, Paris')
+        assert first['latitude'] == pytest.approx(48.8584)
+        assert GeocodeCache.objects.filter(normalized_name='eiffel tower paris').exists()
+
+        # A different spelling of the same name hits the table, then memory
+        assert geocode_cache.get('eiffel tower  PARIS')['latitude'] == pytest.approx(48.8584)
+        assert geocode_cache.get('Eiffel Tower, Paris') is not None
+
+        stats = geocode_cache.stats()
+        assert stats['misses'] == 1
+        assert stats['db_hits'] == 1
+        assert stats['memory_hits'] == 1
+        assert stats['hit_ratio'] == pytest.approx(2 / 3, abs=1e-3)
+
+    def test_first_coordinates_win(self, geocode_cache):
+        geocode_cache.remember('Hidden Cafe', 10.0, 20.0)
+        geocode_cache.remember('Hidden Cafe', 11.0, 21.0)
+        entry = GeocodeCache.objects.get(normalized_name='hidden cafe')
+        assert (entry.latitude, entry.longitude) == (10.0, 20.0)
+
+    def test_fill_missing_coordinates_uses_cached_places(self, geocode_cache):
+        geocode_cache.remember('Hidden Cafe, Tokyo', 35.1, 139.1)
+        locations = [
+            {'name': 'Hidden Cafe, Tokyo', 'coordinates': None},
+            {'name': 'New Spot', 'coordinates': {'latitude': 1.5, 'longitude': 2.5}},
+        ]
+        assert geocode_cache.fill_missing_coordinates(locations) == 1
+        assert locations[0]['latitude'] == 35.1
+        assert locations[1]['coordinates'] == {'latitude': 1.5, 'longitude': 2.5}
+
+    def test_user_coordinates_are_not_shared(self, geocode_cache):
+        geocode_cache.remember('Starbucks', 10.0, 20.0, source='search')
+        geocode_cache.complete_location({'name': 'Starbucks', 'latitude': 0.0, 'longitude': 0.0})
+        assert not GeocodeCache.objects.filter(normalized_name='starbucks').exists()
+
+        # Rows stored from untrusted sources before are not served either
+        GeocodeCache.objects.create(normalized_name='starbucks', name='Starbucks', latitude=1, longitude=2, source='search')
+        assert geocode_cache.get('Starbucks') is None
+
+    def test_misses_are_remembered(self, geocode_cache, django_assert_num_queries):
+        assert geocode_cache.resolve('Nowhere In Particular') is None
+        with django_assert_num_queries(0):
+            assert geocode_cache.resolve('nowhere in particular') is None
+        stats = geocode_cache.stats()
+        assert (stats['memory_hits'], stats['misses'], stats['hit_ratio']) == (0, 2, 0)
+        # A place loaded later still wins over the remembered miss
+        geocode_cache.remember('Nowhere In Particular', 1.0, 2.0)
+        assert geocode_cache.resolve('Nowhere In Particular')['latitude'] == 1.0
+
+    def test_complete_location_for_search(self, geocode_cache):
+        geocode_cache.remember('Hidden Cafe', 10.0, 20.0, address='1 Main St')
+        data = geocode_cache.complete_location({'name': 'Hidden Cafe'})
+        assert data['latitude'] == 10.0
+        assert data['address'] == '1 Main St'
+
+    def test_preload_command(self, tmp_path):
+        csv_path = tmp_path / 'places.csv'
+        csv_path.write_text('name,latitude,longitude,address\nHidden Cafe,10,20,1 Main St\nBad,x,y\n')
+        call_command('preload_geocode_cache', '--gazetteer', '--csv', str(csv_path), stdout=None, stderr=None)
+        assert GeocodeCache.objects.get(normalized_name='tour eiffel').name == 'Eiffel Tower'
+        assert GeocodeCache.objects.get(normalized_name='hidden cafe').address == '1 Main St'
@@ -0,0 +1,56 @@
+# apps/core/tests/test_geocoder.py
+import pytest
+from django.conf import settings
+from apps.core.services.geocoder import (
+    OfflineGeocoder,
+    fill_missing_coordinates,
+    normalize_place_name
+)
+
+@pytest.fixture(scope='module')
+def geocoder(tmp_path_factory):
+    index_path = tmp_path_factory.mktemp('gazetteer') / 'gazetteer.idx'
+    geocoder = OfflineGeocoder(settings.GAZETTEER_PATH, index_path)
+    yield geocoder
+    geocoder.close()
+
+def test_normalize_place_name():
+    assert normalize_place_name('  Sacré-Cœur ') == 'sacre cœur'
+    assert normalize_place_name("St. Peter's Basilica") == 'st peter s basilica'
+
+def test_exact_match_uses_alternate_names(geocoder):
+    match = geocoder.exact('Tour Eiffel')
+    assert match['name'] == 'Eiffel Tower'
+    assert match['latitude'] == pytest.approx(48.8584)
+
+def test_prefix_orders_by_population(geocoder):
+    names = [m['name'] for m in geocoder.prefix('sh')]
+    assert names.index('Shanghai') < names.index('Shibuya')
+
+def test_fuzzy_match_tolerates_typos(geocoder):
+    match = geocoder.geocode('Colloseum')
+    assert match['name'] == 'Colosseum'
+    assert match['match'] == 'fuzzy'
+
+def test_llm_style_name_falls_back_through_parts(geocoder):
+    match = geocoder.geocode('Statue of Hachiko, 2-14-3 Dogenzaka, Shibuya-ku, Tokyo')
+    assert match['name'] == 'Statue of Hachiko'
+
+    match = geocoder.geocode('Some Ramen Shop, Shinjuku, Tokyo')
+    assert match['name'] == 'Shinjuku'
+
+def test_unknown_place_returns_none(geocoder):
+    assert geocoder.geocode('Qwxz Nowhere') is None
+
+def test_fill_missing_coordinates_keeps_existing(geocoder):
+    locations = [
+        {'name': 'Pena Palace, Sintra', 'coordinates': None},
+        {'name': 'Eiffel Tower', 'coordinates': {'latitude': 1.0, 'longitude': 2.0}},
+        {'name': 'Nowhere In Particular', 'coordinates': None},
+        {'name': 'Pena Palace', 'coordinates': {'latitude': 0.0, 'longitude': 0.0}},
+    ]
+    assert fill_missing_coordinates(locations, geocoder) == 1
+    assert locations[0]['latitude'] == pytest.approx(38.7876)
+    assert locations[1]['coordinates'] == {'latitude': 1.0, 'longitude': 2.0}
+    assert 'latitude' not in locations[2]
+    assert locations[3]['coordinates'] == {'latitude': 0.0, 'longitude': 0.0} and 'latitude' not in locations[3]
@@ -0,0 +1,125 @@
+# apps/core/tests/test_geofence.py
+import random
+import threading
+import pytest
+from django.contrib.auth.models import User
+from apps.core.models import Location, UserLocation
+from apps.core.services.geofence import (
+    ENTER, EXIT, Fence, GeofenceEngine, GeofenceIndex, clean_notify_radius, distance_km, parse_positions
+)
+
+def test_index_matches_brute_force():
+    rng = random.Random(7)
+    fences = [
+        Fence(str(i), 35.6 + rng.uniform(-0.3, 0.3), 139.7 + rng.uniform(-0.3, 0.3), rng.uniform(0.1, 5))
+        for i in range(300)
+    ]
+    index = GeofenceIndex(fences, cell_degrees=0.05)
+    for _ in range(500):
+        lat, lng = 35.6 + rng.uniform(-0.35, 0.35), 139.7 + rng.uniform(-0.35, 0.35)
+        expected = {f.id for f in fences if distance_km(lat, lng, f.latitude, f.longitude) <= f.radius_km * 0.999}
+        found = {f.id for f in index.containing(lat, lng)}
+        # the planar approximation may only disagree right on the edge
+        assert expected <= found
+        assert all(distance_km(lat, lng, fences[int(i)].latitude, fences[int(i)].longitude) <= fences[int(i)].radius_km * 1.001 for i in found)
+
+def test_index_wraps_antimeridian():
+    index = GeofenceIndex([Fence('fiji', -17.0, 179.99, 5.0)])
+    assert [f.id for f in index.containing(-17.0, -179.98)] == ['fiji']
+    assert index.containing(-17.0, -179.5) == []
+
+def test_huge_fences_are_not_registered_per_cell():
+    polar = Fence('pole', 89.9, 0.0, 50.0)
+    continent = Fence('continent', 35.0, 139.0, 3000.0)
+    index = GeofenceIndex([Fence('cafe', 35.0, 139.0, 1.0), polar, continent], cell_degrees=0.05, max_cells=1024)
+    assert index.wide == [polar, continent]
+    assert sum(len(fences) for fences in index.cells.values()) <= 4
+    assert {f.id for f in index.containing(35.0, 139.0)} == {'cafe', 'continent'}
+    assert [f.id for f in index.containing(90.0, 1.0)] == ['pole']
+    assert index.containing(0.0, 0.0) == []
+
+def test_notify_radius_is_capped(settings):
+    settings.GEOFENCE_MAX_RADIUS_KM = 50
+    assert clean_notify_radius('2.5') == 2.5
+    for bad in (0, -1, 51, 'far', None):
+        with pytest.raises(ValueError):
+            clean_notify_radius(bad)
+
+def test_enter_exit_deduped_with_hysteresis():
+    engine = GeofenceEngine(exit_margin=0.1, refresh_seconds=3600)
+    engine.set_fences(1, [Fence('cafe', 35.0, 139.0, 1.0, 'Cafe')], version='v1')
+    engine._version = lambda user_id: 'v1'
+
+    step = 1.0 / 111.2  # about 1 km of latitude
+    track = [2.0, 0.5, 0.2, 0.99, 1.05, 0.98, 1.2, 1.5, 0.5]
+    kinds = []
+    for offset in track:
+        kinds.extend(event['type'] for event in engine.update(1, 35.0 + offset * step, 139.0))
+    # jitter around the edge (0.99 -> 1.05 -> 0.98) produces nothing
+    assert kinds == [ENTER, EXIT, ENTER]
+    assert engine.inside(1) == {'cafe'}
+
+def test_concurrent_positions_enter_once():
+    engine = GeofenceEngine(refresh_seconds=3600)
+    engine.set_fences(1, [Fence(str(i), 35.0, 139.0, 1.0) for i in range(200)], version='v1')
+    engine._version = lambda user_id: 'v1'
+    barrier = threading.Barrier(8)
+    events = []
+
+    def walk():
+        barrier.wait()
+        events.extend(engine.update(1, 35.0, 139.0))
+
+    threads = [threading.Thread(target=walk) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(events) == 200
+
+def test_rebuild_survives_eviction_by_other_users():
+    class BusyEngine(GeofenceEngine):
+        def set_fences(self, user_id, fences, version=None):
+            entry = super().set_fences(user_id, fences, version)
+            if str(user_id) == '1':
+                super().set_fences(2, [], version)  # another request fills the LRU
+            return entry
+
+    engine = BusyEngine(max_users=1, refresh_seconds=3600)
+    engine.load_fences = lambda user_id: [Fence('cafe', 35.0, 139.0, 1.0)]
+    engine._version = lambda user_id: 'v1'
+    assert [e['type'] for e in engine.update(1, 35.0, 139.0)] == [ENTER]
+
+def test_parse_positions():
+    assert parse_positions({'latitude': '1.5', 'longitude': 2}) == [(1.5, 2.0)]
+    assert parse_positions({'positions': [{'latitude': 1, 'longitude': 2}] * 2}) == [(1.0, 2.0)] * 2
+    for bad in ({}, {'positions': []}, {'latitude': 91, 'longitude': 0}, [1, 2]):
+        with pytest.raises(ValueError):
+            parse_positions(bad)
+    with pytest.raises(ValueError):
+        parse_positions({'positions': [{'latitude': 0, 'longitude': 0}] * 3}, max_positions=2)
+
+@pytest.mark.django_db
+def test_fences_load_from_db_and_follow_writes(locmem_cache):
+    user = User.objects.create_user(username='walker', password='WalkerPass123!')
+    park = Location.objects.create(name='Park', latitude=35.0, longitude=139.0, category='park')
+    shop = Location.objects.create(name='Shop', latitude=35.0, longitude=139.001, category='food')
+    saved = UserLocation.objects.create(user=user, location=park, notify_enabled=True, notify_radius=0.5)
+    UserLocation.objects.create(user=user, location=shop, notify_enabled=False)
+
+    engine = GeofenceEngine(refresh_seconds=3600)
+    events = engine.process([(user.id, 35.0, 139.0005), (user.id, 35.0, 139.0006)])
+    assert [(e['type'], e['user_location_id'], e['name']) for e in events] == [(ENTER, str(saved.id), 'Park')]
+
+    # update() sends no signals, so the cached index is used until invalidated
+    UserLocation.objects.filter(user=user, location=shop).update(notify_enabled=True, notify_radius=0.5)
+    assert engine.update(user.id, 35.0, 139.0005) == []
+    engine.invalidate(user.id)
+    assert [e['name'] for e in engine.update(user.id, 35.0, 139.0005)] == ['Shop']
+    assert len(engine.inside(user.id)) == 2
+
+    saved.notify_enabled = False
+    saved.save()
+    engine.refresh_seconds = 0
+    assert engine.update(user.id, 35.0, 139.0005) == []
+    assert engine.inside(user.id) == {str(UserLocation.objects.get(location=shop).id)}
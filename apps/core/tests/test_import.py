@@ -0,0 +1,133 @@
+# apps/core/tests/test_import.py
+import io
+import json
+import pytest
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from apps.core.models import BackgroundJob, Location, UserLocation
+from apps.core.services.import_service import ImportFileError, LocationImportService, parse_csv, parse_geojson
+from apps.core.services.job_queue import JobQueue
+from .fake_rtdb import make_firebase_service
+
+CSV = b"""Name,Lat,Lng,Category,Favorite
+Ramen Spot,35.66,139.70,food,yes
+No Coordinates,,,park,no
+,1,2,,
+Bad Latitude,95,10,,
+Eiffel Tower,,,,
+Ramen Spot,35.66,139.70,food,yes
+"""
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='importer', password='ImportPass123!')
+
+@pytest.fixture
+def firebase_service():
+    return make_firebase_service({})
+
+@pytest.mark.django_db
+class TestLocationImport:
+    def test_csv_validation_and_dedupe(self, user, firebase_service):
+        existing = Location.objects.create(name='Old Favourite', latitude=1.0, longitude=2.0, category='food')
+        UserLocation.objects.create(user=user, location=existing)
+        columns = parse_csv(io.BytesIO(CSV + b"old favourite,1.0,2.0,,\n"))
+
+        progress = []
+        service = LocationImportService(
+            user, firebase_service, chunk_size=1,
+            progress_callback=lambda done, total: progress.append((done, total))
+        )
+        summary = service.run(columns)
+
+        assert summary['total'] == 7
+        assert summary['imported'] == 2  # Ramen Spot + geocoded Eiffel Tower
+        assert summary['duplicates'] == 2
+        assert summary['errors'] == [
+            {'row': 3, 'error': 'coordinates missing and place name not found'},
+            {'row': 4, 'error': 'name is required'},
+            {'row': 5, 'error': 'latitude must be between -90 and 90'},
+        ]
+        assert progress[-1] == (7, 7)
+
+        # One multi-path update per chunk, mirrored locally
+        assert firebase_service.db.updates == 2
+        saved = firebase_service.db.data['user_locations'][str(user.id)]
+        assert len(saved) == 2
+        ramen = UserLocation.objects.get(user=user, location__name='Ramen Spot')
+        assert ramen.is_favorite and ramen.location.category == 'food'
+        assert str(ramen.location_id) in saved
+        eiffel = Location.objects.get(name='Eiffel Tower')
+        assert firebase_service.db.data['locations'][str(eiffel.id)]['latitude'] == pytest.approx(48.8584)
+
+    def test_geojson_import_job(self, user, firebase_service, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        collection = {'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [2.2945, 48.8584]},
+             'properties': {'name': 'Eiffel Tower', 'notes': 'sunset'}},
+            {'type': 'Feature', 'geometry': None, 'properties': {'name': 'Nowhere Known'}},
+        ]}
+        (tmp_path / 'imports').mkdir()
+        (tmp_path / 'imports' / 'upload.geojson').write_text(json.dumps(collection))
+
+        job = JobQueue().enqueue('location_import', user, {
+            'path': 'imports/upload.geojson', 'format': 'geojson', 'category': 'trip'
+        })
+        with patch('apps.core.services.firebase_service.FirebaseService', return_value=firebase_service), \
+                patch.object(JobQueue, '_publish_status'):
+            JobQueue().run_next()
+
+        job.refresh_from_db()
+        assert job.status == 'succeeded'
+        assert (job.progress_done, job.progress_total) == (2, 2)
+        assert job.result['imported'] == 1
+        assert job.result['errors'][0]['row'] == 2
+        assert UserLocation.objects.get(user=user).notes == 'sunset'
+        assert Location.objects.get().category == 'trip'
+        assert not (tmp_path / 'imports' / 'upload.geojson').exists()
+
+    def test_malformed_files_are_rejected(self):
+        with pytest.raises(ImportFileError):
+            parse_geojson(io.BytesIO(b'{"type": "Feature"}'))
+        with pytest.raises(ImportFileError):
+            parse_geojson(io.BytesIO(b'{"features": [{"properties": "x"}]}'))
+        with pytest.raises(ImportFileError):
+            parse_geojson(io.BytesIO(b'{"features": [{"geometry": [1, 2]}]}'))
+        with pytest.raises(ImportFileError):
+            parse_csv(io.BytesIO(b'lat,lng\n1,2\n'))
+
+    def test_invalid_file_fails_without_retry(self, user, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        (tmp_path / 'imports').mkdir()
+        (tmp_path / 'imports' / 'upload.geojson').write_text('{"features": [{"properties": "x"}]}')
+
+        job = JobQueue().enqueue('location_import', user, {'path': 'imports/upload.geojson', 'format': 'geojson'})
+        with patch.object(JobQueue, '_publish_status'):
+            JobQueue().run_next()
+
+        job.refresh_from_db()
+        assert (job.status, job.attempts) == ('failed', 1)
+        assert 'properties' in job.error
+        assert not (tmp_path / 'imports' / 'upload.geojson').exists()
+
+    def test_retry_after_mirror_failure_writes_the_same_keys(self, user, firebase_service, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        (tmp_path / 'imports').mkdir()
+        (tmp_path / 'imports' / 'upload.csv').write_bytes(b'name,lat,lng\nRamen Spot,35.66,139.70\n')
+
+        job = JobQueue().enqueue('location_import', user, {'path': 'imports/upload.csv', 'format': 'csv'}, max_attempts=2)
+        with patch('apps.core.services.firebase_service.FirebaseService', return_value=firebase_service), \
+                patch.object(JobQueue, '_publish_status'):
+            with patch.object(UserLocation.objects, 'bulk_create', side_effect=ConnectionError('database is locked')):
+                JobQueue().run_next()
+            job.refresh_from_db()
+            assert job.status == 'pending'
+            assert (tmp_path / 'imports' / 'upload.csv').exists()  # kept for the retry
+
+            BackgroundJob.objects.filter(id=job.id).update(run_after=job.created_at)
+            JobQueue().run_next()
+
+        job.refresh_from_db()
+        assert job.status == 'succeeded'
+        assert list(firebase_service.db.data['locations']) == [str(UserLocation.objects.get(user=user).location_id)]
+        assert not (tmp_path / 'imports' / 'upload.csv').exists()
@@ -0,0 +1,94 @@
+# apps/core/tests/test_job_queue.py
+import pytest
+from unittest.mock import AsyncMock, patch
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from apps.core.models import BackgroundJob
+from apps.core.services.job_queue import JobQueue, JOB_HANDLERS
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='job_tester', password='JobPass123!')
+
+@pytest.fixture
+def fake_handler():
+    """Replace the reel handler so no network calls are made"""
+    calls = []
+
+    def handler(job):
+        calls.append(job.id)
+        return {'status': 'saved', 'url': job.payload['url']}
+
+    with patch.dict(JOB_HANDLERS, {'reel_analysis': handler}):
+        yield calls
+
+@pytest.mark.django_db
+class TestJobQueue:
+    def test_enqueue_returns_pending_job(self, user, fake_handler):
+        job = JobQueue().enqueue('reel_analysis', user, {'url': 'https://instagram.com/reel/x/'})
+        assert job.status == 'pending'
+        assert fake_handler == []  # nothing runs inside the request
+
+    def test_claim_is_exclusive(self, user, fake_handler):
+        JobQueue().enqueue('reel_analysis', user, {'url': 'https://instagram.com/reel/x/'})
+        first = JobQueue(worker_id='a').claim()
+        second = JobQueue(worker_id='b').claim()
+        assert first is not None
+        assert first.status == 'running'
+        assert first.attempts == 1
+        assert second is None
+
+    def test_run_next_records_result(self, user, fake_handler):
+        job = JobQueue().enqueue('reel_analysis', user, {'url': 'https://instagram.com/reel/x/'})
+        with patch.object(JobQueue, '_publish_status') as publish:
+            JobQueue().run_next()
+        job.refresh_from_db()
+        assert job.status == 'succeeded'
+        assert job.result['url'] == 'https://instagram.com/reel/x/'
+        assert job.finished_at is not None
+        publish.assert_called_once()
+
+    def test_transient_failure_is_retried(self, user):
+        def flaky(job):
+            raise ConnectionError("firebase unavailable")
+
+        with patch.dict(JOB_HANDLERS, {'reel_analysis': flaky}):
+            job = JobQueue().enqueue('reel_analysis', user, {'url': 'https://instagram.com/reel/x/'})
+            JobQueue().run_next()
+        job.refresh_from_db()
+        assert job.status == 'pending'
+        assert job.attempts == 1
+        assert 'firebase unavailable' in job.error
+
+    def test_validation_error_fails_immediately(self, user):
+        def invalid(job):
+            raise ValueError("No locations found in reel")
+
+        with patch.dict(JOB_HANDLERS, {'reel_analysis': invalid}):
+            job = JobQueue().enqueue('reel_analysis', user, {'url': 'https://instagram.com/reel/x/'})
+            with patch.object(JobQueue, '_publish_status'):
+                JobQueue().run_next()
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert BackgroundJob.objects.filter(status='pending').count() == 0
+
+    def test_submit_parses_form_booleans(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        for value, expected in (('false', False), ('0', False), ('true', True)):
+            response = client.post('/api/v1/reel-jobs/', {'url': 'https://instagram.com/reel/x/', 'is_favorite': value})
+            assert response.status_code == 202
+            assert BackgroundJob.objects.get(id=response.json()['job_id']).payload['is_favorite'] is expected
+        response = client.post('/api/v1/reel-jobs/', {'url': 'https://instagram.com/reel/x/', 'is_favorite': 'maybe'})
+        assert response.status_code == 400
+
+    def test_analyze_and_save_parses_form_booleans(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        with patch('apps.core.views.ReelService') as service:
+            service.return_value.analyze_and_save = AsyncMock(return_value={'status': 'saved'})
+            response = client.post('/api/v1/analyze-save-reel/', {'url': 'https://instagram.com/reel/x/', 'is_favorite': 'false'})
+            assert response.status_code == 200
+            assert service.return_value.analyze_and_save.call_args.kwargs['is_favorite'] is False
+            response = client.post('/api/v1/analyze-save-reel/', {'url': 'https://instagram.com/reel/x/', 'is_favorite': 'maybe'})
+            assert response.status_code == 400
@@ -0,0 +1,125 @@
+# apps/core/tests/test_listener_hub.py
+import threading
+from types import SimpleNamespace
+import pytest
+from apps.core.services import listener_hub
+from apps.core.services.listener_hub import ListenerHub
+from .fake_rtdb import make_firebase_service
+
+class CountingRef:
+    """RTDB reference stand-in recording listen()/close() per path"""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.opened = []
+
+    def __call__(self, path):
+        ref = self
+
+        class Reference:
+            def listen(self, callback):
+                ref.opened.append(path)
+                ref.callbacks[path] = callback
+                return SimpleNamespace(close=lambda: ref.callbacks.pop(path, None))
+        return Reference()
+
+    def fire(self, path, event_type, subpath, data):
+        self.callbacks[path](SimpleNamespace(event_type=event_type, path=subpath, data=data))
+
+@pytest.fixture
+def ref():
+    return CountingRef()
+
+@pytest.fixture
+def hub(ref):
+    hub = ListenerHub(ref=ref, workers=2, queue_size=50)
+    yield hub
+    hub.stop()
+
+def test_one_stream_per_path(hub, ref):
+    first, second = [], []
+    hub.subscribe('locations', first.append)
+    hub.subscribe('locations', first.append)  # no-op
+    hub.subscribe('/locations/', second.append)
+    assert ref.opened == ['locations']
+    assert hub.stats()['streams'] == {'locations': {'subscribers': 2, 'received': 0}}
+
+    ref.fire('locations', 'put', '/', {'a': {}})  # initial snapshot is skipped
+    ref.fire('locations', 'put', '/a', {'name': 'A'})
+    assert hub.flush()
+    assert [e.key for e in first] == [e.key for e in second] == ['a']
+
+    hub.unsubscribe('locations', first.append)
+    assert 'locations' in ref.callbacks
+    hub.unsubscribe('locations', second.append)
+    assert hub.paths() == [] and 'locations' not in ref.callbacks
+
+def test_bursts_are_coalesced_per_key(ref):
+    hub = ListenerHub(ref=ref, workers=1, queue_size=50)
+    gate, received = threading.Event(), []
+
+    def slow(event):
+        gate.wait(5)
+        received.append(event)
+
+    hub.subscribe('user_locations', slow, key_depth=2)
+    ref.fire('user_locations', 'put', '/', None)
+    ref.fire('user_locations', 'put', '/u1/blocker', {})
+    for i in range(20):
+        ref.fire('user_locations', 'put', '/u1/loc/notes', f'note {i}')
+    ref.fire('user_locations', 'patch', '/u1/loc', {'isFavorite': True, 'notes': 'final'})
+    ref.fire('user_locations', 'put', '/u2/loc', None)
+    gate.set()
+    assert hub.flush()
+    hub.stop()
+
+    events = {event.key: event for event in received}
+    assert set(events) == {'u1/blocker', 'u1/loc', 'u2/loc'}
+    assert events['u1/loc'].changes == {'u1/loc/isFavorite': True, 'u1/loc/notes': 'final'}
+    assert events['u1/loc'].count == 22
+    assert events['u2/loc'].deleted and not events['u1/loc'].deleted
+
+    stats = hub.stats()
+    assert stats['received'] == 24 and stats['coalesced'] == 21 and stats['dropped'] == 0
+    assert stats['keys'] == 3 and stats['queued'] == 0
+    assert stats['lag_max'] >= stats['lag_avg'] > 0
+
+def test_full_queue_drops_and_sends_overflow(ref):
+    hub = ListenerHub(ref=ref, workers=1, queue_size=5)
+    gate, received = threading.Event(), []
+    hub.subscribe('locations', lambda event: (gate.wait(5), received.append(event)))
+    ref.fire('locations', 'put', '/', None)
+    for i in range(10):
+        ref.fire('locations', 'put', f'/loc{i}', {})
+    gate.set()
+    assert hub.flush()
+    hub.stop()
+
+    assert hub.stats()['dropped'] >= 4
+    assert received[-1].overflow and received[-1].key is None
+    assert all(not event.overflow for event in received[:-1])
+
+def test_failing_subscriber_does_not_stop_dispatch(hub, ref):
+    received = []
+
+    def broken(event):
+        raise RuntimeError('boom')
+
+    hub.subscribe('locations', broken)
+    hub.subscribe('locations', received.append)
+    ref.fire('locations', 'put', '/', None)
+    for i in range(3):
+        ref.fire('locations', 'put', f'/loc{i}', {'n': i})
+    assert hub.flush()
+    assert len(received) == 3
+    assert hub.stats()['errors'] == 3 and hub.stats()['dispatched'] == 3
+
+def test_firebase_listeners_share_the_hub(hub, ref, monkeypatch):
+    monkeypatch.setattr(listener_hub, '_hub', hub)
+    service = make_firebase_service({})
+    service.setup_realtime_listeners()
+    service._setup_database_listeners()
+    assert sorted(ref.opened) == ['locations', 'user_locations']
+    assert {path: s['subscribers'] for path, s in hub.stats()['streams'].items()} == {
+        'locations': 1, 'user_locations': 1
+    }
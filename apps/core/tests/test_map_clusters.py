@@ -0,0 +1,73 @@
+# apps/core/tests/test_map_clusters.py
+import pytest
+from django.contrib.auth.models import User
+from apps.core.models import Location, UserLocation
+from apps.core.services.map_clusters import (
+    MapClusterService, lnglat_to_tile, parse_bbox, tile_bounds, tiles_for_bbox
+)
+
+TOKYO = (139.70, 35.66)
+
+@pytest.fixture
+def user(db, locmem_cache):
+    user = User.objects.create_user(username='mapper', password='MapperPass123!')
+    locations = Location.objects.bulk_create([
+        Location(name=f'Shibuya {i}', latitude=TOKYO[1] + i * 0.0001, longitude=TOKYO[0] + i * 0.0001, category='food')
+        for i in range(300)
+    ] + [Location(name='Paris', latitude=48.8566, longitude=2.3522, category='sight')])
+    UserLocation.objects.bulk_create([UserLocation(user=user, location=location) for location in locations])
+    return user
+
+def test_tile_math_round_trips():
+    x, y = lnglat_to_tile(*TOKYO, 10)
+    min_lng, min_lat, max_lng, max_lat = tile_bounds(10, x, y)
+    assert min_lng <= TOKYO[0] < max_lng and min_lat < TOKYO[1] <= max_lat
+    assert tiles_for_bbox((-180, -85, 180, 85), 1) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    with pytest.raises(ValueError):
+        parse_bbox('10,10,5,5')
+
+@pytest.mark.django_db
+def test_low_zoom_clusters_dense_areas(user):
+    data = MapClusterService(user).viewport((-180, -85, 180, 85), 3)
+    clusters = [f for f in data['features'] if f['properties']['cluster']]
+    points = [f for f in data['features'] if not f['properties']['cluster']]
+    assert [c['properties']['point_count'] for c in clusters] == [300]
+    assert [p['properties']['name'] for p in points] == ['Paris']
+
+@pytest.mark.django_db
+def test_clusters_at_the_viewport_edge_are_kept(user):
+    # The Shibuya cluster's centroid is outside, some of its members inside
+    bbox = (TOKYO[0] - 1, TOKYO[1] - 1, TOKYO[0] + 0.005, TOKYO[1] + 0.005)
+    features = MapClusterService(user).viewport(bbox, 3)['features']
+    assert [f['properties']['point_count'] for f in features] == [300]
+
+@pytest.mark.django_db
+def test_high_zoom_returns_points_but_stays_bounded(user):
+    service = MapClusterService(user, max_zoom=15, point_limit=500)
+    bbox = (TOKYO[0] - 0.001, TOKYO[1] - 0.001, TOKYO[0] + 0.031, TOKYO[1] + 0.031)
+    features = service.viewport(bbox, 15)['features']
+    assert len(features) == 300 and not any(f['properties']['cluster'] for f in features)
+
+    dense = MapClusterService(user, max_zoom=15, point_limit=10, grid=2)
+    features = dense.viewport(bbox, 15)['features']
+    assert sum(f['properties'].get('point_count', 1) for f in features) == 300
+    assert len(features) <= 2 * 2 * len(tiles_for_bbox(bbox, 15))
+
+@pytest.mark.django_db
+def test_tiles_are_cached_until_locations_change(user):
+    service = MapClusterService(user)
+    service.viewport((-180, -85, 180, 85), 2)
+    calls = []
+    service.build_tile = lambda *args: calls.append(args)
+    service.viewport((-180, -85, 180, 85), 2)
+    assert calls == []
+
+    Location.objects.create(name='Berlin', latitude=52.52, longitude=13.405, category='sight')
+    UserLocation.objects.create(user=user, location=Location.objects.get(name='Berlin'))
+    fresh = MapClusterService(user)
+    names = [f['properties'].get('name') for f in fresh.viewport((-180, -85, 180, 85), 2)['features']]
+    assert 'Berlin' in names
+
+def test_viewport_too_large_for_zoom():
+    with pytest.raises(ValueError):
+        MapClusterService(user=None).viewport((-180, -85, 180, 85), 12)
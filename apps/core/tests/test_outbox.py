@@ -0,0 +1,160 @@
+# apps/core/tests/test_outbox.py
+import threading
+import pytest
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from datetime import timedelta
+from apps.core.models import Location, OutboxEvent, UserLocation
+from apps.core.services.outbox import OutboxDispatcher, suppress_outbox
+from apps.core.services.query_audit import QueryAudit
+
+class Rejected(Exception):
+    code = 'INVALID_ARGUMENT'
+
+class RecordingRef:
+    """RTDB root stand-in keeping every multi-path update()"""
+
+    def __init__(self, fail=0, reject=()):
+        self.updates = []
+        self.fail = fail
+        self.reject = reject
+
+    def update(self, values):
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError('RTDB unavailable')
+        if self.reject and any(path.startswith(self.reject) for path in values):
+            raise Rejected('Permission denied')
+        self.updates.append(values)
+
+@pytest.fixture
+def user(db, settings, locmem_cache):
+    settings.OUTBOX_ENABLED = True
+    settings.OUTBOX_SETTLE_SECONDS = 0
+    return User.objects.create_user(username='outbox', password='pw')
+
+@pytest.fixture
+def saved(user):
+    location = Location.objects.create(name='Cafe', latitude=35.0, longitude=139.0, category='food')
+    return UserLocation.objects.create(user=user, location=location, notes='')
+
+def test_creates_are_pushed_whole_and_marked_synced(saved):
+    key = str(saved.location_id)
+    assert list(OutboxEvent.objects.values_list('operation', 'path')) == [
+        ('create', f'locations/{key}'),
+        ('create', f'user_locations/{saved.user_id}/{key}'),
+    ]
+
+    ref = RecordingRef()
+    assert OutboxDispatcher(ref=ref).drain() == 2
+    [update] = ref.updates
+    assert update[f'locations/{key}']['name'] == 'Cafe'
+    assert update[f'locations/{key}']['isDeleted'] is False
+    assert update[f'user_locations/{saved.user_id}/{key}']['isFavorite'] is False
+    assert not OutboxEvent.objects.exists()
+
+    location = Location.objects.get(pk=saved.location_id)
+    assert (location.sync_status, location.firebase_id) == (2, key)
+    assert UserLocation.objects.get(pk=saved.pk).firebase_id == key
+
+def test_edits_are_coalesced_to_changed_fields(saved):
+    OutboxDispatcher(ref=RecordingRef()).drain()
+    saved = UserLocation.objects.get(pk=saved.pk)  # as loaded by a request
+    for i in range(5):
+        saved.notes = f'note {i}'
+        saved.save()
+    saved.is_favorite = True
+    saved.save(update_fields=['is_favorite'])
+    saved.save()  # nothing changed but updated_at
+    saved.sync_status = 1
+    saved.save(update_fields=['sync_status'])  # bookkeeping is not mirrored
+    saved.sync_status = 2
+    saved.save()  # nor is a full save of it
+    assert OutboxEvent.objects.count() == 6
+
+    ref = RecordingRef()
+    OutboxDispatcher(ref=ref).drain()
+    path = f'user_locations/{saved.user_id}/{saved.firebase_id}'
+    [update] = ref.updates
+    assert set(update) == {f'{path}/notes', f'{path}/isFavorite', f'{path}/lastUpdated'}
+    assert update[f'{path}/notes'] == 'note 4' and update[f'{path}/isFavorite'] is True
+
+def test_edit_then_delete_sends_the_delete(saved):
+    OutboxDispatcher(ref=RecordingRef()).drain()
+    key = str(saved.location_id)
+    location = Location.objects.get(pk=key)
+    location.soft_delete()
+    location.delete()  # cascades to the save
+
+    ref = RecordingRef()
+    OutboxDispatcher(ref=ref).drain()
+    assert ref.updates == [{f'locations/{key}': None, f'user_locations/{saved.user_id}/{key}': None}]
+
+def test_recent_events_wait_to_settle(saved, settings):
+    settings.OUTBOX_SETTLE_SECONDS = 60
+    ref = RecordingRef()
+    assert OutboxDispatcher(ref=ref).dispatch_batch() == 0
+    OutboxEvent.objects.update(created_at=F('created_at') - timedelta(seconds=61))
+    assert OutboxDispatcher(ref=ref).dispatch_batch() == 2
+
+    # --once waits for events still settling instead of exiting
+    location = Location.objects.get(pk=saved.location_id)
+    location.name = 'Renamed'
+    location.save()
+    dispatcher = OutboxDispatcher(ref=ref)
+    dispatcher.settle_seconds, dispatcher.poll_interval = 0.2, 0.05
+    dispatcher.run(threading.Event(), once=True)
+    assert not OutboxEvent.objects.exists()
+
+def test_pulls_and_rollbacks_queue_nothing(user):
+    with suppress_outbox():
+        Location.objects.create(name='From RTDB', latitude=1.0, longitude=2.0, category='food', firebase_id='-abc')
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            Location.objects.create(name='Rolled back', latitude=1.0, longitude=2.0, category='food')
+            raise RuntimeError
+    assert not OutboxEvent.objects.exists()
+
+def test_failed_push_keeps_events_in_order(saved):
+    dispatcher = OutboxDispatcher(ref=RecordingRef(fail=1))
+    with pytest.raises(ConnectionError):
+        dispatcher.dispatch_batch()
+    assert list(OutboxEvent.objects.values_list('attempts', flat=True)) == [1, 1]
+    assert OutboxEvent.objects.first().error == 'RTDB unavailable'
+
+    assert dispatcher.drain() == 2
+    assert dispatcher.stats == {'events': 2, 'writes': 1, 'fields': 2, 'failures': 1, 'dead': 0}
+
+def test_rejected_path_is_isolated_then_parked(saved, settings):
+    settings.OUTBOX_MAX_ATTEMPTS = 2
+    location_path = f'locations/{saved.location_id}'
+    ref = RecordingRef(reject=location_path)
+    dispatcher = OutboxDispatcher(ref=ref)
+
+    # The save goes through on its own; the rejected location waits
+    assert dispatcher.dispatch_batch() == 1
+    assert [list(update) for update in ref.updates] == [[f'user_locations/{saved.user_id}/{saved.location_id}']]
+    [event] = OutboxEvent.objects.all()
+    assert (event.path, event.attempts, event.failed_at) == (location_path, 1, None)
+
+    with pytest.raises(Rejected):
+        dispatcher.dispatch_batch()
+    event.refresh_from_db()
+    assert event.failed_at is not None and dispatcher.stats['dead'] == 1
+
+    # Parked events no longer hold up the queue
+    location = Location.objects.get(pk=saved.location_id)
+    location.name = 'Renamed'
+    location.save()
+    ref.reject = ()
+    assert dispatcher.drain() == 1
+    assert ref.updates[-1] == {f'{location_path}/name': 'Renamed', f'{location_path}/lastModified': location.last_modified.isoformat()}
+    assert OutboxEvent.objects.get().id == event.id
+
+def test_dispatcher_reads_the_pending_index(user):
+    audit = QueryAudit()
+    audit.add_queryset('outbox: next batch', OutboxDispatcher(ref=RecordingRef()).pending_events()[:500])
+    [query] = audit.report()
+    assert query.problems == []
+    assert 'outbox_pending_idx' in '\n'.join(query.plan)
@@ -0,0 +1,57 @@
+# apps/core/tests/test_pagination.py
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.core.models import Location, UserLocation
+from apps.core.pagination import UserLocationCursorPagination, decode_cursor, encode_cursor
+from .fake_rtdb import make_firebase_service
+
+@pytest.fixture
+def firebase_service():
+    keys = [f"loc{i:02d}" for i in range(7)]
+    return make_firebase_service({
+        'user_locations': {'u1': {k: {'is_favorite': False} for k in keys}},
+        'locations': {k: {'name': k} for k in keys}
+    })
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor({'k': '-Nabc', 'r': 1})) == {'k': '-Nabc', 'r': 1}
+    with pytest.raises(NotFound):
+        decode_cursor('not a cursor!')
+
+def test_firebase_pages_walk_forward_and_back(firebase_service):
+    page = async_to_sync(firebase_service.get_user_locations_page)
+    items, keys, more = page('u1', 3)
+    assert keys == ['loc00', 'loc01', 'loc02'] and more == 'loc03'
+    # user_locations written by save_location are keyed by location id
+    assert items[0]['name'] == 'loc00'
+
+    items, keys, more = page('u1', 3, start_key='loc06')
+    assert keys == ['loc06'] and more is None
+
+    items, keys, more = page('u1', 3, end_before='loc05')
+    assert keys == ['loc02', 'loc03', 'loc04'] and more == 'loc01'
+
+    items, keys, more = page('u1', 3, end_before='loc02')
+    assert keys == ['loc00', 'loc01'] and more is None
+
+@pytest.mark.django_db
+def test_user_location_keyset_pages(settings):
+    settings.LOCATION_MAX_PAGE_SIZE = 2
+    user = User.objects.create_user(username='pager', password='PagerPass123!')
+    for i in range(5):
+        location = Location.objects.create(name=f'Place {i}', latitude=1.0, longitude=2.0, category='food')
+        UserLocation.objects.create(user=user, location=location)
+
+    queryset = UserLocation.objects.filter(user=user)
+    url, seen = '/api/user-locations/?page_size=10', []
+    while url:
+        paginator = UserLocationCursorPagination()
+        page = paginator.paginate_queryset(queryset, Request(APIRequestFactory().get(url)))
+        assert len(page) <= 2
+        seen += [ul.id for ul in page]
+        url = paginator.get_next_link()
+    assert len(seen) == len(set(seen)) == 5
@@ -0,0 +1,66 @@
+# apps/core/tests/test_projection.py
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.core.projection import Projection, get_requested_fields
+from .fake_rtdb import make_firebase_service
+
+def request_with(**params):
+    return Request(APIRequestFactory().get('/api/locations/', params))
+
+def test_projection_keeps_top_level_and_nested_fields():
+    item = {'id': 'a', 'name': 'Cafe', 'description': 'long', 'user_location': {'id': 'a', 'isFavorite': True, 'notes': 'x'}}
+    assert Projection(['id', 'name'])(item) == {'id': 'a', 'name': 'Cafe'}
+    assert Projection(['id', 'user_location.isFavorite'])(item) == {'id': 'a', 'user_location': {'isFavorite': True}}
+    assert Projection(['user_location', 'user_location.notes'])(item) == {'user_location': item['user_location']}
+    assert Projection(['id', 'user_location']).only(('id', 'user_location'))
+    assert not Projection(['id', 'name']).only(('id',))
+
+def test_requested_fields_are_validated():
+    assert get_requested_fields(request_with()) is None
+    assert get_requested_fields(request_with(fields='id, name,,id')) == ('id', 'name')
+    with pytest.raises(ValidationError):
+        get_requested_fields(request_with(fields='id,bad-name'))
+    with pytest.raises(ValidationError):
+        get_requested_fields(request_with(fields='id,secret'), allowed={'id', 'name'})
+
+@pytest.fixture
+def firebase_service():
+    keys = [f"loc{i}" for i in range(5)]
+    return make_firebase_service({
+        'user_locations': {'u1': {k: {'isFavorite': i == 0} for i, k in enumerate(keys)}},
+        'locations': {k: {'name': k, 'latitude': 1.0, 'longitude': 2.0, 'description': 'd' * 100} for k in keys}
+    })
+
+def test_firebase_page_is_projected(firebase_service):
+    page = async_to_sync(firebase_service.get_user_locations_page)
+    items, keys, _ = page('u1', 2, projection=Projection(['id', 'name', 'latitude', 'longitude']))
+    assert items == [
+        {'id': 'loc0', 'name': 'loc0', 'latitude': 1.0, 'longitude': 2.0},
+        {'id': 'loc1', 'name': 'loc1', 'latitude': 1.0, 'longitude': 2.0},
+    ]
+
+def test_ids_only_skips_location_reads(firebase_service):
+    del firebase_service.db.data['locations']
+    items, _, _ = firebase_service._fetch_user_locations_page(
+        'u1', 2, projection=Projection(['id', 'user_location.isFavorite'])
+    )
+    assert items == [{'id': 'loc0', 'user_location': {'isFavorite': True}},
+                     {'id': 'loc1', 'user_location': {'isFavorite': False}}]
+
+    ids = list(firebase_service.iter_user_locations('u1', projection=Projection(['id'])))
+    assert ids == [{'id': f'loc{i}'} for i in range(5)]
+
+    # Records saved under their own key give their location_id, as in the listing
+    firebase_service.db.data['user_locations']['u2'] = {'-push': {'location_id': 'loc3'}}
+    ids = list(firebase_service.iter_user_locations('u2', projection=Projection(['id'])))
+    items, _, _ = firebase_service._fetch_user_locations_page('u2', 2, projection=Projection(['id']))
+    assert ids == items == [{'id': 'loc3'}]
+
+def test_search_stream_projection(firebase_service):
+    ids = list(firebase_service.iter_search_locations(projection=Projection(['id'])))
+    assert [item['id'] for item in ids] == [f'loc{i}' for i in range(5)]
+    named = list(firebase_service.iter_search_locations(query='loc3', projection=Projection(['id', 'name'])))
+    assert named == [{'id': 'loc3', 'name': 'loc3'}]
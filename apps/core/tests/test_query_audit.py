@@ -0,0 +1,37 @@
+# apps/core/tests/test_query_audit.py
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from apps.core.models import Location
+from apps.core.services.query_audit import QueryAudit, audit_app_queries
+
+@pytest.fixture
+def user(db, locmem_cache):
+    return User.objects.create_user(username='auditor', password='pw')
+
+def test_app_queries_use_the_indexes(user):
+    queries = audit_app_queries(user).report()
+    assert len(queries) >= 10
+    assert {query.label: query.problems for query in queries if query.problems} == {}
+
+    plans = {query.label: '\n'.join(query.plan) for query in queries}
+    assert 'location_pending_sync_idx' in plans['sync: unsynced locations']
+    assert 'userlocation_pending_sync_idx' in plans['sync: unsynced user locations']
+    assert 'userlocation_firebase_id_idx' in plans['sync: user location by firebase_id']
+    assert 'COVERING INDEX location_live_tile_idx' in plans['map: public tile']
+
+def test_scans_and_sorts_are_flagged(user):
+    audit = QueryAudit()
+    audit.add_queryset('by description', Location.objects.filter(description='x'))
+    with audit.capture('captured'):
+        list(Location.objects.filter(firebase_id='-key'))
+        list(Location.objects.filter(firebase_id='-key'))
+    queries = {query.label: query for query in audit.report()}
+
+    assert queries['by description'].problems == ['full scan of core_location', 'sort not served by an index']
+    assert queries['captured'].count == 2
+    assert queries['captured'].problems == ['sort not served by an index']
+
+def test_command_fails_on_problems(user, capsys):
+    call_command('audit_queries', '--fail-on-problems', '--user', 'auditor')
+    assert '0 flagged' in capsys.readouterr().out
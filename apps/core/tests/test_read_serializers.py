@@ -0,0 +1,71 @@
+# apps/core/tests/test_read_serializers.py
+import pytest
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.core.models import Location, UserLocation
+from apps.core.pagination import UserLocationCursorPagination
+from apps.core.serializers import UserLocationReadSerializer, UserLocationSerializer
+
+@pytest.fixture
+def user(db):
+    user = User.objects.create_user(username='reader', password='ReaderPass123!')
+    now = timezone.now()
+    for i in range(5):
+        location = Location.objects.create(
+            name=f'Place {i}', latitude=35.5 + i, longitude=139.25 + i,
+            category='food', is_instagram_source=bool(i % 2),
+            instagram_url='https://www.instagram.com/reel/ABC/' if i % 2 else '',
+            date_posted=now if i == 0 else None
+        )
+        UserLocation.objects.create(
+            user=user, location=location, custom_name='Ramen' if i == 1 else '',
+            is_favorite=i % 2 == 0, saved_at=now - timedelta(hours=i)
+        )
+    return user
+
+@pytest.mark.django_db
+def test_matches_model_serializer(user):
+    queryset = UserLocation.objects.filter(user=user).select_related('location').order_by('saved_at')
+    expected = UserLocationSerializer(queryset, many=True).data
+    reader = UserLocationReadSerializer()
+    rows = reader.many(reader.values(queryset))
+    assert rows == expected
+    assert list(rows[0]) == list(expected[0])  # same key order too
+
+@pytest.mark.django_db
+def test_cursor_pagination_over_values(user):
+    paginator = UserLocationCursorPagination()
+    request = Request(APIRequestFactory().get('/api/user-locations/', {'page_size': 2}))
+    queryset = UserLocationReadSerializer().values(UserLocation.objects.filter(user=user))
+    page = paginator.paginate_queryset(queryset, request)
+    assert [row['location__name'] for row in page] == ['Place 0', 'Place 1']
+
+    next_request = Request(APIRequestFactory().get(paginator.get_next_link()))
+    page = paginator.paginate_queryset(queryset, next_request)
+    assert [row['location__name'] for row in page] == ['Place 2', 'Place 3']
+
+@pytest.mark.django_db
+def test_sparse_fieldset_reads_only_requested_columns(user):
+    reader = UserLocationReadSerializer(
+        ['id', 'is_favorite', 'location.name', 'location.latitude', 'location.longitude'],
+        required_columns=('saved_at',)
+    )
+    assert reader.values_fields == (
+        'id', 'is_favorite', 'location__name', 'location__latitude', 'location__longitude', 'saved_at'
+    )
+    rows = reader.many(reader.values(UserLocation.objects.filter(user=user).order_by('saved_at')))
+    assert rows[0] == {
+        'id': rows[0]['id'], 'is_favorite': True,
+        'location': {'name': 'Place 4', 'latitude': 39.5, 'longitude': 143.25}
+    }
+    assert 'location.description' in UserLocationReadSerializer.field_names()
+
+@pytest.mark.django_db
+def test_whole_location_with_sparse_user_location(user):
+    reader = UserLocationReadSerializer(['notes', 'location'])
+    row = reader.many(reader.values(UserLocation.objects.filter(user=user)[:1]))[0]
+    assert list(row) == ['location', 'notes']
+    assert len(row['location']) == len(UserLocationReadSerializer.all_location_fields)
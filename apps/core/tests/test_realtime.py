@@ -0,0 +1,122 @@
+# apps/core/tests/test_realtime.py
+from types import SimpleNamespace
+import pytest
+from django.contrib.auth.models import User
+from apps.core.models import Location, UserLocation
+from apps.core.services import realtime
+from apps.core.services.listener_hub import HubEvent, ListenerHub
+from apps.core.services.realtime import (
+    LOCATION_CHANGED, RESYNC, USER_LOCATION_CHANGED,
+    LocationChangeBroadcaster, Subscription, iter_sse
+)
+
+class ListeningRef:
+    def __init__(self, listeners, path):
+        self.listeners, self.path = listeners, path
+
+    def child(self, path):
+        return ListeningRef(self.listeners, path)
+
+    def listen(self, callback):
+        self.listeners[self.path] = callback
+        return SimpleNamespace(close=lambda: self.listeners.pop(self.path, None))
+
+def event(event_type, path, data):
+    return SimpleNamespace(event_type=event_type, path=path, data=data)
+
+def drain(subscription):
+    events = []
+    while True:
+        found = subscription.get(timeout=0)
+        if found is None:
+            return events
+        events.append(found)
+
+def test_subscription_coalesces_and_overflows_to_resync():
+    subscription = Subscription('1', max_pending=3)
+    assert subscription.push({'type': USER_LOCATION_CHANGED, 'id': 'a'})
+    assert not subscription.push({'type': USER_LOCATION_CHANGED, 'id': 'a'})
+    subscription.push({'type': USER_LOCATION_CHANGED, 'id': 'b'})
+    assert [e['id'] for e in drain(subscription)] == ['a', 'b']
+
+    for key in 'abcd':
+        subscription.push({'type': USER_LOCATION_CHANGED, 'id': key})
+    subscription.push({'type': USER_LOCATION_CHANGED, 'id': 'e'})
+    assert drain(subscription) == [{'type': RESYNC}]
+    assert subscription.dropped == 3
+
+def test_rtdb_events_reach_only_affected_users():
+    listeners = {}
+    hub = ListenerHub(ref=ListeningRef(listeners, '').child, workers=1)
+    broadcaster = LocationChangeBroadcaster(firebase_listener=False)
+    broadcaster.start_listening(hub)
+    alice, bob = broadcaster.subscribe('1'), broadcaster.subscribe('2')
+
+    on_user_locations = listeners['user_locations']
+    on_user_locations(event('put', '/', {'1': {'x': {}}}))  # initial snapshot
+    on_user_locations(event('put', '/1/loc-a', None))
+    on_user_locations(event('put', '/1/loc-b/isFavorite', True))
+    on_user_locations(event('patch', '/', {'2/loc-c': {'notes': ''}, '3/loc-d': {}}))
+    assert hub.flush()
+
+    assert [(e['id'], e['deleted']) for e in drain(alice)] == [('loc-a', True), ('loc-b', False)]
+    assert [e['id'] for e in drain(bob)] == ['loc-c']
+
+    broadcaster.publish_location('loc-x', user_ids=['2'])
+    assert drain(alice) == [] and drain(bob)[0]['type'] == LOCATION_CHANGED
+
+    broadcaster.unsubscribe(alice)
+    assert broadcaster.subscribed_users() == {'2'}
+    broadcaster.stop_listening()
+    assert listeners == {}
+    hub.stop()
+
+def test_sse_format_and_unsubscribe_on_close():
+    broadcaster = LocationChangeBroadcaster(firebase_listener=False)
+    stream = iter_sse(broadcaster, '1', heartbeat=0.01)
+
+    assert next(stream).startswith('retry: ')
+    assert broadcaster.subscribed_users() == {'1'}
+    broadcaster.publish_user_location('1', 'loc-a')
+    assert 'event: ready' in next(stream)
+    message = next(stream)
+    assert message.startswith('id: ') and message.endswith('\n\n')
+    assert 'event: user_location\n' in message and '"id":"loc-a"' in message
+    assert next(stream) == ': keepalive\n\n'
+    stream.close()
+    assert broadcaster.subscribed_users() == set()
+
+    # A response closed before it was ever iterated never subscribed
+    iter_sse(broadcaster, '1').close()
+    assert broadcaster.subscribed_users() == set()
+
+@pytest.mark.django_db
+def test_model_writes_notify_savers(locmem_cache, monkeypatch, django_capture_on_commit_callbacks):
+    broadcaster = LocationChangeBroadcaster(firebase_listener=False)
+    monkeypatch.setattr(realtime, '_broadcaster', broadcaster)
+
+    owner = User.objects.create_user(username='owner', password='OwnerPass123!')
+    other = User.objects.create_user(username='other', password='OtherPass123!')
+    location = Location.objects.create(name='Bakery', latitude=1.0, longitude=2.0, category='food')
+    subscription = broadcaster.subscribe(owner.id)
+    bystander = broadcaster.subscribe(other.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        saved = UserLocation.objects.create(user=owner, location=location)
+    assert drain(subscription) == [{'type': USER_LOCATION_CHANGED, 'id': str(location.id), 'deleted': False}]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        location.name = 'Better Bakery'
+        location.save()
+    assert drain(subscription) == [{'type': LOCATION_CHANGED, 'id': str(location.id), 'deleted': False}]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        saved.delete()
+    assert drain(subscription)[0]['deleted'] is True
+    assert drain(bystander) == []
+
+    # Savers are looked up locally for location changes coming from the RTDB
+    UserLocation.objects.create(user=other, location=location)
+    drain(bystander)
+    broadcaster.handle_location_event(HubEvent('locations', str(location.id), {f'{location.id}/name': 'Renamed'}))
+    assert [e['id'] for e in drain(bystander)] == [str(location.id)]
@@ -0,0 +1,36 @@
+# apps/core/tests/test_reel_streaming.py
+import pytest
+from apps.core.instagram.analyzer import InstagramReelDescriptionExtractor
+from .html_fixture_server import serve_fixtures
+
+@pytest.fixture(scope='module')
+def fixture_server():
+    with serve_fixtures(pad_kb=512) as (base_url, stats):
+        yield base_url, stats
+
+@pytest.mark.parametrize('page', ['reel_paris.html', 'reel_tokyo.html'])
+def test_streaming_matches_full_download(fixture_server, page):
+    base_url, _ = fixture_server
+    full = InstagramReelDescriptionExtractor(stream=False)
+    streamed = InstagramReelDescriptionExtractor(stream=True)
+
+    full_description = full.fetch_og_description(f'{base_url}/{page}')
+    streamed_description = streamed.fetch_og_description(f'{base_url}/{page}')
+
+    assert streamed_description is not None
+    assert streamed_description == full_description
+    # Only the <head> (plus at most one chunk) should have been read
+    assert streamed.last_bytes_read < full.last_bytes_read / 10
+
+def test_tag_split_across_chunks(fixture_server):
+    base_url, _ = fixture_server
+    full = InstagramReelDescriptionExtractor(stream=False)
+    streamed = InstagramReelDescriptionExtractor(stream=True)
+    streamed.STREAM_CHUNK_SIZE = 7  # Force the tag to straddle many chunks
+
+    assert streamed.fetch_og_description(f'{base_url}/reel_paris.html') == \
+        full.fetch_og_description(f'{base_url}/reel_paris.html')
+
+def test_missing_page_returns_none(fixture_server):
+    base_url, _ = fixture_server
+    assert InstagramReelDescriptionExtractor().fetch_og_description(f'{base_url}/missing.html') is None
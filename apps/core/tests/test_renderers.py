@@ -0,0 +1,71 @@
+# apps/core/tests/test_renderers.py
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import pytest
+from asgiref.sync import async_to_sync
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from apps.core import fastjson
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import ORJSONRenderer
+from apps.core.services.cache_service import CacheService
+
+PAYLOAD = {
+    'id': uuid.UUID('7d7c8a36-3c57-4d0f-b6f8-6a3b0f1b7c11'),
+    'name': 'Café de Flore',
+    'latitude': 48.854, 'longitude': 2.3325,
+    'notify_radius': Decimal('1.50'),
+    'saved_at': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    'created_at': datetime(2024, 5, 1, 12, 30),
+    'ttl': timedelta(minutes=5),
+    'label': gettext_lazy('Favorites'),
+    'tags': ('food', 'paris'),
+    'notes': None,
+}
+
+def test_renderer_matches_drf_output():
+    fast = ORJSONRenderer().render(PAYLOAD)
+    stock = JSONRenderer().render(PAYLOAD)
+    assert json.loads(fast) == json.loads(stock)
+    assert json.loads(fast)['saved_at'] == '2024-05-01T12:30:15.123456Z'
+
+def test_renderer_indent_and_empty_body():
+    renderer = ORJSONRenderer()
+    indented = renderer.render({'a': [1]}, 'application/json; indent=4')
+    assert indented.startswith(b'{\n  "a"')
+    assert renderer.render(None) == b''
+
+def test_renderer_escapes_line_separators():
+    data = {'notes': 'line\u2028break\u2029end'}
+    fast = ORJSONRenderer().render(data)
+    assert fast == JSONRenderer().render(data)
+    assert json.loads(fast) == data
+
+def test_renderer_writes_non_finite_floats_as_null():
+    assert ORJSONRenderer().render({'distance': float('nan')}) == b'{"distance":null}'
+
+def test_parser_round_trip_and_errors():
+    parser = ORJSONParser()
+    body = ORJSONRenderer().render({'name': 'Zoë', 'latitude': 1.5})
+    assert parser.parse(io.BytesIO(body)) == {'name': 'Zoë', 'latitude': 1.5}
+    latin = '{"name": "Zoë"}'.encode('latin-1')
+    assert parser.parse(io.BytesIO(latin), parser_context={'encoding': 'latin-1'}) == {'name': 'Zoë'}
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"name": '))
+
+def test_cache_service_stores_orjson(locmem_cache):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return {'id': PAYLOAD['id'], 'saved_at': PAYLOAD['saved_at']}
+
+    first = async_to_sync(CacheService.get_or_set)('renderer-test', load)
+    second = async_to_sync(CacheService.get_or_set)('renderer-test', load)
+    assert len(calls) == 1
+    assert first['id'] == PAYLOAD['id']
+    assert second == fastjson.loads(fastjson.dumps(first))
@@ -0,0 +1,32 @@
+# apps/core/tests/test_schemas.py
+import os
+import subprocess
+import sys
+from pathlib import Path
+from django.test import Client
+
+ROOT = Path(__file__).resolve().parents[3]
+
+def test_url_conf_does_not_load_docs_or_firebase():
+    code = (
+        "import sys, django; django.setup(); import config.urls; "
+        "print(' '.join(m for m in ('apps.core.schemas', 'drf_yasg.openapi', 'drf_yasg.views', "
+        "'firebase_admin', 'apps.core.instagram.analyzer') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, check=True, capture_output=True, text=True,
+        env=dict(os.environ, DJANGO_SETTINGS_MODULE='config.settings')
+    ).stdout
+    assert output.strip() == ''
+
+def test_docs_attach_schemas_on_first_request():
+    from apps.core import views
+
+    response = Client().get('/swagger/?format=openapi')
+    assert response.status_code == 200
+    paths = response.json()['paths']
+    assert 'Report the user' in paths['/geofence/positions/']['post']['description']
+    assert [p['name'] for p in paths['/locations/search/']['get']['parameters']][:2] == ['category', 'search']
+    assert views.location_tile._swagger_auto_schema['get']['operation_description']
+
+    assert Client().get('/redoc/').status_code == 200
@@ -0,0 +1,110 @@
+# apps/core/tests/test_spatial.py
+import importlib
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from rest_framework.test import APIClient
+from apps.core.models import Location
+from apps.core.services import spatial
+from apps.core.services.spatial import SpatialQueries
+
+PLACES = [
+    ('Tokyo Tower', 35.6586, 139.7454, 'Shibakoen, Minato'),
+    ('Shibuya Crossing', 35.6595, 139.7005, 'Dogenzaka, Shibuya'),
+    ('Tokyo Skytree', 35.7101, 139.8107, 'Oshiage, Sumida'),
+    ('Yokohama Chinatown', 35.4437, 139.6380, 'Yamashita, Naka'),
+    ('Fiji West', -17.0, 179.95, 'near the antimeridian'),
+    ('Fiji East', -17.0, -179.95, 'across the antimeridian'),
+]
+
+@pytest.fixture
+def places(db, locmem_cache):
+    locations = {
+        name: Location.objects.create(name=name, latitude=lat, longitude=lng, address=address, category='sight')
+        for name, lat, lng, address in PLACES
+    }
+    Location.objects.create(name='Tokyo Station (deleted)', latitude=35.681, longitude=139.767,
+                            category='sight', is_deleted=True)
+    return locations
+
+def names(locations):
+    return [location.name for location in locations]
+
+def test_radius_and_nearest_fall_back_to_bounding_box(places):
+    queries = SpatialQueries()
+    assert not queries.postgis
+
+    found = queries.within_radius(35.6586, 139.7454, 5)
+    assert names(found) == ['Tokyo Tower', 'Shibuya Crossing']
+    assert found[0].distance_km == pytest.approx(0, abs=1e-6)
+    assert found[1].distance_km == pytest.approx(4.1, abs=0.1)
+    assert names(queries.within_radius(35.6586, 139.7454, 50, limit=3)) == [
+        'Tokyo Tower', 'Shibuya Crossing', 'Tokyo Skytree'
+    ]
+
+    assert names(queries.nearest(35.68, 139.77, limit=3)) == ['Tokyo Tower', 'Tokyo Skytree', 'Shibuya Crossing']
+    assert names(queries.nearest(35.68, 139.77, limit=10, max_km=20)) == [
+        'Tokyo Tower', 'Tokyo Skytree', 'Shibuya Crossing'
+    ]
+    assert len(queries.nearest(0, 0, limit=10)) == 6  # grows to cover the globe
+
+def test_radius_wraps_around_the_antimeridian(places):
+    found = SpatialQueries().within_radius(-17.0, 179.99, 20)
+    assert names(found) == ['Fiji West', 'Fiji East']
+    assert found[1].distance_km == pytest.approx(6.4, abs=0.1)
+
+def test_search_matches_name_or_address(places):
+    queries = SpatialQueries()
+    assert names(queries.search('tokyo')) == ['Tokyo Skytree', 'Tokyo Tower']
+    assert names(queries.search('shibuya')) == ['Shibuya Crossing']
+    assert queries.search('  ') == []
+
+def test_nearby_endpoint(places, monkeypatch):
+    monkeypatch.setattr(spatial, '_spatial', SpatialQueries())
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user(username='walker', password='WalkerPass123!'))
+
+    response = client.get('/api/v1/spatial/nearby/', {'lat': 35.6586, 'lng': 139.7454, 'radius': 5})
+    assert response.status_code == 200
+    assert [r['name'] for r in response.json()['results']] == ['Tokyo Tower', 'Shibuya Crossing']
+
+    response = client.get('/api/v1/spatial/nearby/', {'lat': 35.68, 'lng': 139.77, 'limit': 1})
+    assert [r['name'] for r in response.json()['results']] == ['Tokyo Tower']
+    assert client.get('/api/v1/spatial/nearby/', {'lat': 95, 'lng': 0}).status_code == 400
+    assert client.get('/api/v1/spatial/search/', {'q': 'chinatown'}).json()['results'][0]['name'] == 'Yokohama Chinatown'
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason="needs DATABASE_ENGINE=postgres with PostGIS")
+class TestPostGIS:
+    @pytest.fixture
+    def postgis(self, places):
+        migration = importlib.import_module('apps.core.migrations.0009_location_postgis')
+        with connection.cursor() as cursor:
+            for statement in migration.FORWARD:  # also under --nomigrations
+                cursor.execute(statement)
+        queries = SpatialQueries()
+        assert queries.postgis
+        return queries
+
+    def test_matches_the_fallback(self, postgis):
+        fallback = SpatialQueries()
+        fallback._postgis = False
+        for lat, lng, radius in ((35.6586, 139.7454, 5), (35.68, 139.77, 50), (-17.0, 179.99, 20)):
+            assert names(postgis.within_radius(lat, lng, radius)) == names(fallback.within_radius(lat, lng, radius))
+        assert names(postgis.nearest(35.68, 139.77, limit=3)) == names(fallback.nearest(35.68, 139.77, limit=3))
+        assert postgis.nearest(35.68, 139.77, limit=1)[0].distance_km == pytest.approx(
+            fallback.nearest(35.68, 139.77, limit=1)[0].distance_km, rel=1e-2
+        )
+
+    def test_trigram_search_tolerates_typos(self, postgis):
+        assert names(postgis.search('Skytre'))[0] == 'Tokyo Skytree'
+        assert 'Yokohama Chinatown' in names(postgis.search('Yokohoma Chinatown'))
+
+    def test_queries_can_use_the_gist_index(self, postgis):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+            cursor.execute(
+                'EXPLAIN SELECT id FROM core_location ORDER BY geog <-> '
+                'ST_SetSRID(ST_MakePoint(139.77, 35.68), 4326)::geography LIMIT 3'
+            )
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        assert 'core_location_geog_gist' in plan
@@ -0,0 +1,51 @@
+# apps/core/tests/test_sqlite_tuning.py
+from types import SimpleNamespace
+import pytest
+from django.db.utils import ConnectionHandler
+from apps.core.sqlite_tuning import apply_pragmas
+
+def file_connection(path):
+    return ConnectionHandler({'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path)}})['default']
+
+@pytest.fixture(autouse=True)
+def unblocked(django_db_blocker):
+    """These tests open their own file databases, not the test database"""
+    with django_db_blocker.unblock():
+        yield
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+def test_new_connections_are_tuned(tmp_path, settings):
+    settings.SQLITE_PRAGMAS = {
+        'journal_mode': 'wal', 'synchronous': 'normal', 'busy_timeout': '2500',
+        'cache_size': '-8192', 'mmap_size': str(1 << 20), 'temp_store': 'memory',
+    }
+    connection = file_connection(tmp_path / 'tuned.sqlite3')
+    try:
+        connection.ensure_connection()
+        assert pragma(connection, 'journal_mode') == 'wal'
+        assert pragma(connection, 'synchronous') == 1  # NORMAL
+        assert pragma(connection, 'busy_timeout') == 2500
+        assert pragma(connection, 'cache_size') == -8192
+        assert pragma(connection, 'mmap_size') == 1 << 20
+        assert pragma(connection, 'temp_store') == 2  # MEMORY
+    finally:
+        connection.close()
+
+def test_invalid_and_empty_pragmas_are_skipped(tmp_path, settings):
+    settings.SQLITE_PRAGMAS = {}
+    connection = file_connection(tmp_path / 'plain.sqlite3')
+    try:
+        connection.ensure_connection()
+        assert pragma(connection, 'journal_mode') == 'delete'
+        in_effect = apply_pragmas(connection, {
+            'journal_mode': '', 'synchronous': 'off; DROP TABLE x', 'cache_size': '-4096'
+        })
+        assert in_effect == {'cache_size': -4096}
+        assert pragma(connection, 'synchronous') == 2  # FULL, untouched
+    finally:
+        connection.close()
+    assert apply_pragmas(SimpleNamespace(vendor='postgresql'), {'synchronous': 'off'}) == {}
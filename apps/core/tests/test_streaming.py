@@ -0,0 +1,37 @@
+# apps/core/tests/test_streaming.py
+import json
+from apps.core.streaming import streaming_json_response
+from .fake_rtdb import make_firebase_service
+
+def body(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+def test_json_array_is_valid_for_any_length():
+    assert json.loads(body(streaming_json_response(iter([])))) == []
+    items = ({'id': i, 'name': f'Place {i}'} for i in range(5000))
+    assert len(json.loads(body(streaming_json_response(items)))) == 5000
+
+def test_ndjson_one_object_per_line():
+    response = streaming_json_response(iter([{'a': 1}, {'b': 'é'}]), 'ndjson', transform=dict)
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    assert [json.loads(line) for line in body(response).splitlines()] == [{'a': 1}, {'b': 'é'}]
+
+def test_error_mid_stream_keeps_json_valid():
+    def items():
+        yield {'id': 1}
+        raise RuntimeError('firebase went away')
+
+    data = json.loads(body(streaming_json_response(items())))
+    assert data == [{'id': 1}, {'error': 'firebase went away'}]
+
+def test_iter_user_locations_reads_page_by_page():
+    keys = [f"loc{i:03d}" for i in range(25)]
+    service = make_firebase_service({
+        'user_locations': {'u1': {k: {'location_id': k} for k in keys}},
+        'locations': {k: {'name': k, 'category': 'food' if i % 2 else 'park'} for i, k in enumerate(keys)}
+    })
+    names = [loc['name'] for loc in service.iter_user_locations('u1', page_size=4)]
+    assert names == keys
+
+    parks = list(service.iter_search_locations(category='park', query='LOC00', page_size=3))
+    assert [loc['id'] for loc in parks] == [k for i, k in enumerate(keys) if i % 2 == 0 and i < 10]
@@ -0,0 +1,18 @@
+# apps/core/tests/test_text_cleaner.py
+import json
+from pathlib import Path
+import pytest
+from apps.core.instagram.text_cleaner import extract_metadata_and_clean
+
+GOLDEN_FILE = Path(__file__).parent / 'fixtures' / 'captions_golden.json'
+
+def load_golden_cases():
+    with open(GOLDEN_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+@pytest.mark.parametrize('case', load_golden_cases())
+def test_cleaner_matches_golden_output(case):
+    """Cleaned text and metadata must stay byte-for-byte identical"""
+    description, metadata = extract_metadata_and_clean(case['input'])
+    assert description == case['description']
+    assert metadata == case['metadata']
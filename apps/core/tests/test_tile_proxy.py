@@ -0,0 +1,196 @@
+# apps/core/tests/test_tile_proxy.py
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from apps.core import views
+from apps.core.services.tile_proxy import TileIndex, TileProxyError, TileProxyService, TileStore
+from apps.core.throttling import TileAnonThrottle
+
+class StubTileServer:
+    """Local stand-in for tile.openstreetmap.org that counts requests"""
+
+    def __init__(self, max_age=86400, tile_size=1000):
+        self.max_age = max_age
+        self.tile_size = tile_size
+        self.status = 200
+        self.delay = 0
+        self.requests = Counter()
+        self.conditional = Counter()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.lstrip('/')
+                server.requests[path] += 1
+                if server.delay:
+                    time.sleep(server.delay)
+                if server.status != 200:
+                    self.send_error(server.status)
+                    return
+                etag = f'"{path}"'
+                if self.headers.get('If-None-Match') == etag:
+                    server.conditional[path] += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Cache-Control', f'max-age={server.max_age}')
+                    self.end_headers()
+                    return
+                body = (path.encode() * server.tile_size)[:server.tile_size]
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', f'max-age={server.max_age}')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/{{z}}/{{x}}/{{y}}.png'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def upstream():
+    server = StubTileServer()
+    yield server
+    server.close()
+
+def make_proxy(upstream, tmp_path, max_bytes=10 ** 6, **kwargs):
+    kwargs.setdefault('prefetch_radius', 0)
+    kwargs.setdefault('min_ttl', 0)
+    return TileProxyService(TileStore(tmp_path, max_bytes, index_slots=64), upstream_url=upstream.url, **kwargs)
+
+def test_tiles_are_cached_on_disk(upstream, tmp_path):
+    proxy = make_proxy(upstream, tmp_path)
+    first = proxy.get_tile(3, 4, 2)
+    second = proxy.get_tile(3, 4, 2)
+    assert first.data == second.data and len(first.data) == 1000
+    assert upstream.requests['3/4/2.png'] == 1
+    assert proxy.stats()['hits'] == 1 and proxy.stats()['tiles'] == 1
+    assert list((tmp_path / 'tiles').glob('*/3_4_2.png'))
+    proxy.close()
+
+    # The memory-mapped index survives a restart
+    reopened = make_proxy(upstream, tmp_path)
+    assert reopened.get_tile(3, 4, 2).data == first.data
+    assert upstream.requests['3/4/2.png'] == 1
+    reopened.close()
+
+def test_stale_tiles_are_revalidated(upstream, tmp_path):
+    upstream.max_age = 0
+    proxy = make_proxy(upstream, tmp_path)
+    first = proxy.get_tile(1, 0, 1)
+    again = proxy.get_tile(1, 0, 1)
+    assert again.data == first.data
+    assert upstream.conditional['1/0/1.png'] == 1
+    assert proxy.stats()['revalidated'] == 1
+    proxy.close()
+
+def test_stale_tile_served_when_upstream_fails(upstream, tmp_path):
+    upstream.max_age = 0
+    proxy = make_proxy(upstream, tmp_path)
+    cached = proxy.get_tile(2, 1, 1)
+    upstream.status = 503
+    assert proxy.get_tile(2, 1, 1).data == cached.data
+    assert proxy.stats()['stale'] == 1
+    with pytest.raises(TileProxyError):
+        proxy.get_tile(2, 3, 3)
+    proxy.close()
+
+def test_lru_eviction_keeps_byte_budget(upstream, tmp_path):
+    proxy = make_proxy(upstream, tmp_path, max_bytes=5000)
+    for x in range(5):
+        proxy.get_tile(4, x, 0)
+    proxy.get_tile(4, 0, 0)  # most recently used now
+    proxy.get_tile(4, 5, 0)  # over budget: evict down to 90%
+
+    usage = proxy.store.usage()
+    assert usage['bytes'] <= 4500
+    assert proxy.store.index.get((4, 0, 0)) is not None
+    assert proxy.store.index.get((4, 1, 0)) is None
+    assert not list((tmp_path / 'tiles').glob('*/4_1_0.png'))
+    proxy.close()
+
+def test_index_reuses_slots_after_eviction(tmp_path):
+    index = TileIndex(tmp_path / 'index.bin', slots=8)
+    index.open()
+    with index.locked():
+        for i in range(40):
+            index.put((5, i, i), 10, 0.0, 0.0, 0.0, f'"{i}"')
+            if i >= 3:
+                index.remove(index.find((5, i - 3, i - 3)))
+        assert index.header()[1:] == (3, 30)
+    assert index.get((5, 39, 39))['etag'] == '"39"'
+    assert index.get((5, 0, 0)) is None
+    index.close()
+
+def test_neighbours_are_prefetched(upstream, tmp_path):
+    proxy = make_proxy(upstream, tmp_path, prefetch_radius=1)
+    proxy.get_tile(2, 0, 0)
+    proxy.wait_for_prefetch()
+    # x wraps around the antimeridian, y stops at the top edge
+    assert set(upstream.requests) == {f'2/{x}/{y}.png' for x in (3, 0, 1) for y in (0, 1)}
+    assert proxy.stats()['prefetched'] == 5
+
+    proxy.get_tile(2, 1, 1, prefetch=False)
+    assert upstream.requests['2/1/1.png'] == 1
+    proxy.close()
+
+def test_concurrent_misses_share_one_fetch(upstream, tmp_path):
+    upstream.delay = 0.2
+    proxy = make_proxy(upstream, tmp_path)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(proxy.get_tile(6, 7, 8))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 5 and len({r.data for r in results}) == 1
+    assert upstream.requests['6/7/8.png'] == 1
+    proxy.close()
+
+@pytest.mark.django_db
+def test_endpoint_limits_anonymous_callers(upstream, tmp_path, locmem_cache, monkeypatch):
+    proxy = make_proxy(upstream, tmp_path, prefetch_radius=1)
+    monkeypatch.setattr(views, 'get_tile_proxy', lambda: proxy)
+    monkeypatch.setattr(TileAnonThrottle, 'THROTTLE_RATES', {'osm_tile_anon': '2/minute'})
+    client = APIClient()
+
+    assert client.get('/api/v1/tiles/osm/2/0/0.png').status_code == 200
+    assert client.get('/api/v1/tiles/osm/2/1/1.png').status_code == 200
+    assert client.get('/api/v1/tiles/osm/2/2/2.png').status_code == 429
+    proxy.wait_for_prefetch()
+    assert set(upstream.requests) == {'2/0/0.png', '2/1/1.png'}  # no prefetching
+
+    client.force_authenticate(User.objects.create_user(username='tiler', password='TilerPass123!'))
+    assert client.get('/api/v1/tiles/osm/2/2/2.png').status_code == 200
+    proxy.wait_for_prefetch()
+    assert proxy.stats()['prefetched'] > 0
+    proxy.close()
+
+@pytest.mark.django_db
+def test_stale_tile_is_not_cached_by_browsers(upstream, tmp_path, locmem_cache, monkeypatch):
+    upstream.max_age = 0
+    proxy = make_proxy(upstream, tmp_path, min_ttl=3600)
+    monkeypatch.setattr(views, 'get_tile_proxy', lambda: proxy)
+    client = APIClient()
+    fresh = client.get('/api/v1/tiles/osm/1/0/0.png')['Cache-Control']
+    assert 3590 <= int(fresh.split('max-age=')[1].split(',')[0]) <= 3600
+
+    cached = proxy.store.get((1, 0, 0))
+    cached.fetched_at, cached.expires_at = cached.fetched_at - 7200, cached.expires_at - 7200
+    proxy.store.refresh((1, 0, 0), cached)
+    upstream.status = 503
+    response = client.get('/api/v1/tiles/osm/1/0/0.png')
+    assert response.status_code == 200 and 'max-age=0' in response['Cache-Control']
+    proxy.close()
@@ -0,0 +1,124 @@
+# apps/core/tests/test_vector_tiles.py
+import struct
+import pytest
+from django.contrib.auth.models import User
+from apps.core import mvt
+from apps.core.models import Location, UserLocation
+from apps.core.services.map_clusters import lnglat_to_tile
+from apps.core.services.vector_tiles import LocationTileService
+
+def read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+def read_fields(data):
+    """(field, value) pairs of one protobuf message"""
+    pos, fields = 0, []
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = struct.unpack('<d', data[pos:pos + 8])[0], pos + 8
+        else:
+            length, pos = read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        fields.append((field, value))
+    return fields
+
+def packed(data):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+def decode_value(data):
+    field, value = read_fields(data)[0]
+    if field == 1:
+        return value.decode('utf-8')
+    if field == 7:
+        return bool(value)
+    return value
+
+def decode_tile(data):
+    layers = {}
+    for _, layer_bytes in read_fields(data):
+        layer = read_fields(layer_bytes)
+        keys = [value.decode() for field, value in layer if field == 3]
+        values = [decode_value(value) for field, value in layer if field == 4]
+        features = []
+        for field, value in layer:
+            if field != 2:
+                continue
+            feature = dict(read_fields(value))
+            tags = packed(feature.get(2, b''))
+            geometry = packed(feature[4])
+            features.append({
+                'type': feature[3],
+                'geometry': geometry,
+                'properties': {keys[k]: values[v] for k, v in zip(tags[::2], tags[1::2])}
+            })
+        layers[dict(layer)[1].decode()] = {
+            'version': dict(layer)[15], 'extent': dict(layer)[5], 'features': features
+        }
+    return layers
+
+def test_encoder_round_trip():
+    data = mvt.encode_tile({'places': [
+        {'points': [(10, 20)], 'properties': {'name': 'Café', 'count': 3, 'starred': True, 'score': -1.5}},
+        {'points': [(4095, 0)], 'properties': {'name': 'Café', 'offset': -7}},
+    ]})
+    layer = decode_tile(data)['places']
+    assert layer['version'] == 2 and layer['extent'] == 4096
+    first, second = layer['features']
+    assert first['type'] == mvt.POINT
+    assert first['geometry'] == [9, 20, 40]  # MoveTo(1), zigzag(10), zigzag(20)
+    assert first['properties'] == {'name': 'Café', 'count': 3, 'starred': True, 'score': -1.5}
+    assert second['properties']['offset'] == 13  # zigzag-encoded sint
+    assert mvt.point_geometry([(1, 1), (0, 3)]) == [17, 2, 2, 1, 4]
+
+@pytest.fixture
+def user(db, locmem_cache):
+    user = User.objects.create_user(username='tiler', password='TilerPass123!')
+    locations = Location.objects.bulk_create([
+        Location(name=f'Spot {i}', latitude=35.66 + i * 0.001, longitude=139.70, category='food')
+        for i in range(5)
+    ])
+    UserLocation.objects.bulk_create([UserLocation(user=user, location=location, is_favorite=True) for location in locations])
+    Location.objects.create(name='Unsaved', latitude=35.661, longitude=139.701, category='park')
+    return user
+
+@pytest.mark.django_db
+def test_user_and_public_tiles(user):
+    x, y = lnglat_to_tile(139.70, 35.66, 16)
+    points = decode_tile(LocationTileService(user).render(16, x, y))['locations']['features']
+    assert {f['properties']['name'] for f in points} <= {f'Spot {i}' for i in range(5)}
+    assert all(f['properties']['is_favorite'] and not f['properties']['cluster'] for f in points)
+
+    public = decode_tile(LocationTileService().render(16, x, y))['locations']['features']
+    assert 'Unsaved' in {f['properties']['name'] for f in public}
+
+    x, y = lnglat_to_tile(139.70, 35.66, 4)
+    clusters = decode_tile(LocationTileService(user).render(4, x, y))['locations']['features']
+    assert [(f['properties']['cluster'], f['properties']['point_count']) for f in clusters] == [(True, 5)]
+    assert LocationTileService(user).render(4, 0, 0) == b''
+
+@pytest.mark.django_db
+def test_tile_cache_follows_location_writes(user):
+    x, y = lnglat_to_tile(139.70, 35.66, 4)
+    service = LocationTileService()
+    before = service.render(4, x, y)
+    assert LocationTileService().version == service.version
+
+    Location.objects.create(name='New', latitude=35.7, longitude=139.8, category='food')
+    fresh = LocationTileService()
+    assert fresh.version != service.version
+    assert fresh.render(4, x, y) != before
@@ -0,0 +1,16 @@
+# apps/core/throttling.py
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+class TileAnonThrottle(AnonRateThrottle):
+    """Per-IP limit on base map tiles for clients that are not signed in"""
+    scope = 'osm_tile_anon'
+
+class TileUserThrottle(UserRateThrottle):
+    """Per-user limit on base map tiles (a map view loads a few dozen)"""
+    scope = 'osm_tile_user'
+
+    def allow_request(self, request, view):
+        # Anonymous callers are limited by TileAnonThrottle
+        if not request.user or not request.user.is_authenticated:
+            return True
+        return super().allow_request(request, view)
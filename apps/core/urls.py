@@ -9,7 +9,20 @@ from .views import (
     test_auth,
     sync_to_firebase,
     sync_from_firebase,
-    analyze_and_save_reel
+    analyze_and_save_reel,
+    submit_reel_job,
+    reel_job_status,
+    import_locations,
+    export_locations,
+    geocode_cache_stats,
+    map_viewport,
+    spatial_nearby,
+    spatial_search,
+    location_tile,
+    osm_tile,
+    report_positions,
+    location_events,
+    listener_hub_stats
 )
 
 app_name = 'core-api'
@@ -25,7 +38,33 @@ urlpatterns = [
     # Instagram Analysis
     path('analyze-reel/', analyze_instagram_reel, name='analyze-reel'),
     path('analyze-save-reel/', analyze_and_save_reel, name='analyze-save-reel'),
+
+    # Background Jobs
+    path('reel-jobs/', submit_reel_job, name='reel-job-submit'),
+    path('reel-jobs/<uuid:job_id>/', reel_job_status, name='reel-job-status'),
+    path('jobs/<uuid:job_id>/', reel_job_status, name='job-status'),
     
+    # Import / Export
+    path('import/', import_locations, name='import-locations'),
+    path('export/', export_locations, name='export-locations'),
+
+    # Map
+    path('map/viewport/', map_viewport, name='map-viewport'),
+    path('spatial/nearby/', spatial_nearby, name='spatial-nearby'),
+    path('spatial/search/', spatial_search, name='spatial-search'),
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', location_tile, name='location-tile'),
+    path('tiles/osm/<int:z>/<int:x>/<int:y>.png', osm_tile, name='osm-tile'),
+
+    # Geofences
+    path('geofence/positions/', report_positions, name='geofence-positions'),
+
+    # Realtime
+    path('events/', location_events, name='location-events'),
+    path('realtime/stats/', listener_hub_stats, name='listener-hub-stats'),
+
+    # Geocoding
+    path('geocode-cache/stats/', geocode_cache_stats, name='geocode-cache-stats'),
+
     # Firebase Sync
     path('sync/to-firebase/', sync_to_firebase, name='sync-to-firebase'),
     path('sync/from-firebase/', sync_from_firebase, name='sync-from-firebase'),
@@ -1,27 +1,50 @@
 # app/core/views.py
 from django.shortcuts import render
-from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework import serializers, viewsets, status
+from rest_framework.decorators import api_view, parser_classes, permission_classes, renderer_classes, throttle_classes, action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.exceptions import NotAuthenticated, NotFound, ValidationError
 from django.conf import settings
 from django.db.models import Q
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from django.urls import reverse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.core.files.storage import default_storage
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from .models import Location, UserLocation
-from .serializers import LocationSerializer, UserLocationSerializer, LocationAnalysisSerializer
-from .instagram.analyzer import InstagramReelAnalyzer
+from .models import Location, PENDING_SYNC, UserLocation
+from .serializers import LocationSerializer, UserLocationSerializer, UserLocationReadSerializer, LocationAnalysisSerializer
+from .pagination import FirebaseKeyPagination, UserLocationCursorPagination, get_page_size
+from .streaming import get_stream_format, streaming_json_response
+from .projection import get_projection, get_requested_fields
+from .conditional import conditional, conditional_response
+from .renderers import EventStreamRenderer, MVTRenderer, ORJSONRenderer, PNGRenderer
+from .throttling import TileAnonThrottle, TileUserThrottle
+from . import mvt
 import logging
 from rest_framework.response import Response
-from .services.sync_service import SyncService
-import firebase_admin
-from firebase_admin import auth
 from rest_framework import viewsets, status
 from .services.firebase_service import FirebaseService, FirebaseServiceError
-from asgiref.sync import async_to_sync
+from .services.reel_service import ReelService
+from .services.job_queue import JobQueue, serialize_job
+from .services.geocode_cache import get_geocode_cache
+from .services.location_versions import get_location_versions
+from .services.map_clusters import MAX_ZOOM, MapClusterService, parse_bbox
+from .services.vector_tiles import LocationTileService
+from .services.tile_proxy import TileProxyError, get_tile_proxy
+from .services.geofence import clean_notify_radius, get_geofence_engine, parse_positions
+from .services.spatial import get_spatial_queries
+from .services.realtime import get_broadcaster, iter_sse
+from .services.listener_hub import get_listener_hub
+from .services.export_service import EXPORT_FORMATS, LocationExportService
+from .services.import_service import IMPORT_FORMATS
+from .models import BackgroundJob, GeocodeCache
+from asgiref.sync import async_to_sync, sync_to_async
 from datetime import datetime
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -32,141 +55,98 @@ __all__ = [
     'test_firebase_connection',
     'test_auth',
     'sync_to_firebase',
-    'sync_from_firebase'
+    'sync_from_firebase',
+    'submit_reel_job',
+    'reel_job_status',
+    'import_locations',
+    'export_locations',
+    'geocode_cache_stats',
+    'map_viewport',
+    'spatial_nearby',
+    'spatial_search',
+    'location_tile',
+    'osm_tile',
+    'report_positions',
+    'location_events',
+    'listener_hub_stats'
 ]
-# Define reusable response schemas
-location_response_schema = openapi.Schema(
-    type=openapi.TYPE_OBJECT,
-    properties={
-        'id': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_UUID),
-        'name': openapi.Schema(type=openapi.TYPE_STRING),
-        'latitude': openapi.Schema(type=openapi.TYPE_NUMBER, format=openapi.FORMAT_FLOAT),
-        'longitude': openapi.Schema(type=openapi.TYPE_NUMBER, format=openapi.FORMAT_FLOAT),
-        'description': openapi.Schema(type=openapi.TYPE_STRING),
-        'category': openapi.Schema(type=openapi.TYPE_STRING),
-        'address': openapi.Schema(type=openapi.TYPE_STRING),
-        'is_instagram_source': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-        'instagram_url': openapi.Schema(type=openapi.TYPE_STRING),
-        'created_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
-        'updated_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
-    }
-)
+
+def firebase_locations_version(view, request, *args, **kwargs):
+    """Cached version token of the user's Firebase locations"""
+    if not request.user.is_authenticated:
+        return None
+    return get_location_versions().get(request.user.id)
+
+def user_locations_version(view, request, *args, **kwargs):
+    """Version of the user's rows in the local mirror"""
+    if not request.user.is_authenticated:
+        return None
+    return get_location_versions().fingerprint(request.user.id)
+
+def location_version(view, request, pk=None, **kwargs):
+    try:
+        row = Location.objects.filter(pk=pk).values_list('version', 'last_modified').first()
+    except (ValueError, DjangoValidationError):
+        return None  # let retrieve answer the bad id
+    if row is None:
+        return None
+    version, last_modified = row
+    return f'{pk}:{version}:{last_modified.timestamp()}', last_modified
+
+def user_location_version(view, request, pk=None, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    try:
+        row = UserLocation.objects.filter(user=request.user, pk=pk).values_list(
+            'updated_at', 'location__version', 'location__last_modified'
+        ).first()
+    except (ValueError, DjangoValidationError):
+        return None
+    if row is None:
+        return None
+    updated_at, version, last_modified = row
+    return f'{pk}:{updated_at.timestamp()}:{version}:{last_modified.timestamp()}', max(updated_at, last_modified)
 
 class LocationViewSet(viewsets.ModelViewSet):
     serializer_class = LocationSerializer
     # permission_classes = [IsAuthenticated]
     permission_classes = [AllowAny] 
-    firebase_service = FirebaseService()
-
-    @swagger_auto_schema(
-        operation_description="List all locations with optional filtering",
-        manual_parameters=[
-            openapi.Parameter(
-                'category',
-                openapi.IN_QUERY,
-                description="Filter by category",
-                type=openapi.TYPE_STRING,
-                required=False
-            ),
-            openapi.Parameter(
-                'search',
-                openapi.IN_QUERY,
-                description="Search in name, description, and address",
-                type=openapi.TYPE_STRING,
-                required=False
-            )
-        ],
-        responses={
-            200: openapi.Response(
-                description="Successful response",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_ARRAY,
-                    items=openapi.Schema(
-                        type=openapi.TYPE_OBJECT,
-                        properties={
-                            'id': openapi.Schema(
-                                type=openapi.TYPE_STRING,
-                                description="Unique identifier for the location",
-                                example="550e8400-e29b-41d4-a716-446655440000"
-                            ),
-                            'name': openapi.Schema(
-                                type=openapi.TYPE_STRING,
-                                description="Name of the location",
-                                example="Grand Canyon"
-                            ),
-                            'latitude': openapi.Schema(
-                                type=openapi.TYPE_NUMBER,
-                                description="Latitude coordinate",
-                                example=36.0544
-                            ),
-                            'longitude': openapi.Schema(
-                                type=openapi.TYPE_NUMBER,
-                                description="Longitude coordinate",
-                                example=-112.1401
-                            ),
-                            'description': openapi.Schema(
-                                type=openapi.TYPE_STRING,
-                                description="Location description",
-                                example="Beautiful view point of the canyon"
-                            ),
-                            'user_location': openapi.Schema(
-                                type=openapi.TYPE_OBJECT,
-                                properties={
-                                    'custom_name': openapi.Schema(
-                                        type=openapi.TYPE_STRING,
-                                        description="User's custom name for location"
-                                    ),
-                                    'is_favorite': openapi.Schema(
-                                        type=openapi.TYPE_BOOLEAN,
-                                        description="Whether location is marked as favorite"
-                                    ),
-                                    'notify_radius': openapi.Schema(
-                                        type=openapi.TYPE_NUMBER,
-                                        description="Notification radius in kilometers"
-                                    )
-                                }
-                            )
-                        }
-                    )
-                ),
-                examples={
-                    'application/json': [
-                        {
-                            'id': '550e8400-e29b-41d4-a716-446655440000',
-                            'name': 'Grand Canyon',
-                            'latitude': 36.0544,
-                            'longitude': -112.1401,
-                            'description': 'Beautiful view point',
-                            'user_location': {
-                                'custom_name': 'My Favorite Spot',
-                                'is_favorite': True,
-                                'notify_radius': 1.0
-                            }
-                        }
-                    ]
-                }
-            ),
-            401: 'Authentication credentials were not provided',
-            404: 'Not found',
-            500: 'Internal server error'
-        }
-    )
+
+    @property
+    def firebase_service(self):
+        return FirebaseService()
+
     @action(detail=False, methods=['GET'])
     def search(self, request):
         """Search locations by query"""
         try:
             query = request.query_params.get('query', '')
-            
+            category = request.query_params.get('category') or None
+            projection = get_projection(request)
+
+            stream_format = get_stream_format(request)
+            if stream_format:
+                return streaming_json_response(
+                    self.firebase_service.iter_search_locations(
+                        query=query, category=category, projection=projection
+                    ),
+                    stream_format
+                )
+
             @async_to_sync
             async def search_locations():
                 return await self.firebase_service.search_locations(
                     query=query,
-                    user_id=str(request.user.id)
+                    category=category
                 )
 
             results = search_locations()
+            if projection:
+                results = [projection(location) for location in results]
             return Response(results)
             
+        except ValidationError:
+            raise
         except Exception as e:
             logger.error(f"Search error: {str(e)}")
             return Response(
@@ -186,6 +166,8 @@ class LocationViewSet(viewsets.ModelViewSet):
                     'source_type': 'search',
                     'category': request.data.get('category', 'uncategorized')
                 }
+                # Reuse coordinates already resolved for this place name
+                location_data = await sync_to_async(get_geocode_cache().complete_location)(location_data)
                 return await self.firebase_service.save_location(location_data)
 
             location_id, location = save_searched_location()
@@ -216,16 +198,38 @@ class LocationViewSet(viewsets.ModelViewSet):
         return Response({'status': 'shared'})
     
 
+    def _paginate_user_locations(self, request):
+        """One cursor page of the user's Firebase locations, or all of them streamed"""
+        user_id = str(request.user.id)
+        projection = get_projection(request)
+
+        stream_format = get_stream_format(request)
+        if stream_format:
+            return streaming_json_response(
+                self.firebase_service.iter_user_locations(
+                    user_id, page_size=get_page_size(request), projection=projection
+                ),
+                stream_format
+            )
+
+        def fetch_page(page_size, start_key=None, end_before=None):
+            return async_to_sync(self.firebase_service.get_user_locations_page)(
+                user_id,
+                page_size,
+                start_key=start_key,
+                end_before=end_before,
+                projection=projection
+            )
+
+        return FirebaseKeyPagination().paginate(request, fetch_page)
+
+    @conditional(firebase_locations_version)
     def list(self, request):
         """List user locations with Firebase integration"""
         try:
-            @async_to_sync
-            async def get_locations():
-                user_id = str(request.user.id)
-                return await self.firebase_service.get_user_locations(user_id)
-
-            locations = get_locations()
-            return Response(locations)
+            return self._paginate_user_locations(request)
+        except (NotFound, ValidationError):
+            raise
         except Exception as e:
             logger.error(f"Error fetching user locations: {str(e)}", exc_info=True)
             return Response(
@@ -282,8 +286,26 @@ class LocationViewSet(viewsets.ModelViewSet):
     def analyze_reel(self, request):
         """Your existing analyze_reel implementation"""
         pass
+    @conditional(location_version)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def get_queryset(self):
-        return Location.objects.all()
+        queryset = Location.objects.all()
+        fields = self._requested_fields()
+        return queryset.only(*fields) if fields else queryset
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self._requested_fields()
+        if fields:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def _requested_fields(self):
+        """``?fields=`` for the DB-backed retrieve, pushed into .only()"""
+        if getattr(self, 'action', None) != 'retrieve':
+            return None
+        return get_requested_fields(self.request, LocationSerializer.Meta.fields)
 
     def destroy(self, request, pk=None):
         """Delete location"""
@@ -305,18 +327,13 @@ class LocationViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['GET'])
+    @conditional(firebase_locations_version)
     def me(self, request):
         """Get current user's locations"""
         try:
-            @async_to_sync
-            async def get_my_locations():
-                return await self.firebase_service.get_user_locations(
-                    str(request.user.id)
-                )
-
-            locations = get_my_locations()
-            return Response(locations)
-
+            return self._paginate_user_locations(request)
+        except (NotFound, ValidationError):
+            raise
         except Exception as e:
             logger.error(f"Error fetching user locations: {str(e)}", exc_info=True)
             return Response({
@@ -328,6 +345,7 @@ class LocationViewSet(viewsets.ModelViewSet):
 class UserLocationViewSet(viewsets.ModelViewSet):
     serializer_class = UserLocationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = UserLocationCursorPagination
 
     
 
@@ -342,150 +360,46 @@ class UserLocationViewSet(viewsets.ModelViewSet):
         if not self.request.user.is_authenticated:
             return UserLocation.objects.none()
             
-        return UserLocation.objects.filter(user=self.request.user)
-    @swagger_auto_schema(
-        operation_description="""
-        List user's saved locations with custom preferences.
-        
-        Returns:
-        - Custom names and descriptions
-        - Favorite status
-        - Notification settings
-        - Original location data
-        """,
-        manual_parameters=[
-            openapi.Parameter(
-                'is_favorite',
-                openapi.IN_QUERY,
-                description="Filter favorite locations",
-                type=openapi.TYPE_BOOLEAN,
-                required=False
-            )
-        ],
-        responses={
-            200: openapi.Response(
-                description="Success",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_ARRAY,
-                    items=openapi.Schema(
-                        type=openapi.TYPE_OBJECT,
-                        properties={
-                            'id': openapi.Schema(type=openapi.TYPE_STRING),
-                            'user_id': openapi.Schema(type=openapi.TYPE_STRING),
-                            'location_id': openapi.Schema(type=openapi.TYPE_STRING),
-                            'custom_name': openapi.Schema(type=openapi.TYPE_STRING),
-                            'custom_description': openapi.Schema(type=openapi.TYPE_STRING),
-                            'category': openapi.Schema(type=openapi.TYPE_STRING),
-                            'is_favorite': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                            'notify_radius': openapi.Schema(type=openapi.TYPE_NUMBER),
-                            'notifications_enabled': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                            'saved_at': openapi.Schema(type=openapi.TYPE_STRING, format='date-time'),
-                            'last_updated': openapi.Schema(type=openapi.TYPE_STRING, format='date-time')
-                        }
-                    )
-                )
-            ),
-            401: 'Unauthorized'
-        }
-    )
+        return UserLocation.objects.filter(user=self.request.user).select_related('location')
+    @conditional(user_locations_version)
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        stream_format = get_stream_format(request)
+        if stream_format:
+            reader = self._get_reader()
+            rows = reader.values(queryset.order_by('-saved_at', '-id'))
+            return streaming_json_response(
+                rows.iterator(chunk_size=get_page_size(request)),
+                stream_format,
+                transform=reader.to_representation
+            )
+        return self._list_rows(queryset)
 
     def get(self, request, *args, **kwargs):
         return self.list(request)
+
+    @conditional(user_location_version)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     @action(detail=False, methods=['get'])
+    @conditional(user_locations_version)
     def favorites(self, request):
-        queryset = self.get_queryset().filter(is_favorite=True)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._list_rows(self.get_queryset().filter(is_favorite=True))
+
+    def _get_reader(self):
+        """values()-based serializer limited to ``?fields=``"""
+        fields = get_requested_fields(self.request, UserLocationReadSerializer.field_names())
+        # The cursor is built from the first ordering column
+        ordering = self.paginator.ordering[0].lstrip('-')
+        return UserLocationReadSerializer(fields, required_columns=(ordering,))
+
+    def _list_rows(self, queryset):
+        """Paginated listing read with values() instead of model instances"""
+        reader = self._get_reader()
+        page = self.paginate_queryset(reader.values(queryset))
+        return self.get_paginated_response(reader.many(page))
 
 
-@swagger_auto_schema(
-    method='post',
-    operation_description="""
-    Analyze Instagram reel URL and extract locations without saving.
-    
-    This endpoint will:
-    1. Check if URL already exists in database
-    2. If new URL, extract locations from description
-    3. Return locations without saving
-    """,
-    request_body=openapi.Schema(
-        type=openapi.TYPE_OBJECT,
-        required=['url'],
-        properties={
-            'url': openapi.Schema(
-                type=openapi.TYPE_STRING,
-                description='Instagram reel URL',
-                example='https://www.instagram.com/reel/ABC123/'
-            )
-        }
-    ),
-    responses={
-        200: openapi.Response(
-            description="Success",
-            schema=openapi.Schema(
-                type=openapi.TYPE_OBJECT,
-                properties={
-                    'status': openapi.Schema(
-                        type=openapi.TYPE_STRING,
-                        enum=['existing', 'new'],
-                        description="Whether URL was previously analyzed"
-                    ),
-                    'locations': openapi.Schema(
-                        type=openapi.TYPE_ARRAY,
-                        items=openapi.Schema(
-                            type=openapi.TYPE_OBJECT,
-                            properties={
-                                'name': openapi.Schema(type=openapi.TYPE_STRING),
-                                'type': openapi.Schema(type=openapi.TYPE_STRING),
-                                'coordinates': openapi.Schema(
-                                    type=openapi.TYPE_OBJECT,
-                                    properties={
-                                        'latitude': openapi.Schema(type=openapi.TYPE_NUMBER),
-                                        'longitude': openapi.Schema(type=openapi.TYPE_NUMBER)
-                                    }
-                                ),
-                                'category': openapi.Schema(type=openapi.TYPE_STRING)
-                            }
-                        )
-                    ),
-                    'url': openapi.Schema(type=openapi.TYPE_STRING),
-                    'metadata': openapi.Schema(
-                        type=openapi.TYPE_OBJECT,
-                        properties={
-                            'date_posted': openapi.Schema(type=openapi.TYPE_STRING),
-                            'description': openapi.Schema(type=openapi.TYPE_STRING)
-                        }
-                    )
-                }
-            ),
-            examples={
-                'application/json': {
-                    'status': 'new',
-                    'locations': [
-                        {
-                            'name': 'Grand Canyon National Park',
-                            'type': 'national_park',
-                            'coordinates': {
-                                'latitude': 36.0544,
-                                'longitude': -112.1401
-                            },
-                            'category': 'nature'
-                        }
-                    ],
-                    'url': 'https://www.instagram.com/reel/ABC123/',
-                    'metadata': {
-                        'date_posted': '2024-11-19',
-                        'description': 'Beautiful day at the Grand Canyon!'
-                    }
-                }
-            }
-        ),
-        400: 'Bad Request - Invalid URL or parsing error',
-        500: 'Server Error - Analysis failed'
-    }
-)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def analyze_instagram_reel(request):
@@ -509,6 +423,7 @@ def analyze_instagram_reel(request):
                 }
             
             # Analyze new
+            from .instagram.analyzer import InstagramReelAnalyzer
             analyzer = InstagramReelAnalyzer(settings.GOOGLE_API_KEY)
             result = analyzer.analyze_reel(url)
             
@@ -531,100 +446,6 @@ def analyze_instagram_reel(request):
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}")
         return Response({'error': str(e)}, status=400)
-@swagger_auto_schema(
-    method='post',
-    operation_description="""
-    Analyze Instagram reel URL and immediately save extracted locations.
-    
-    This endpoint will:
-    1. Extract locations from Instagram reel
-    2. Save all extracted locations
-    3. Create user location references
-    """,
-    request_body=openapi.Schema(
-        type=openapi.TYPE_OBJECT,
-        required=['url'],  # Only specify required fields in this array
-        properties={
-            'url': openapi.Schema(
-                type=openapi.TYPE_STRING,
-                description='Instagram reel URL',
-                example='https://www.instagram.com/reel/ABC123/'
-            ),
-            'category': openapi.Schema(
-                type=openapi.TYPE_STRING,
-                description='Default category for all locations'
-            ),
-            'is_favorite': openapi.Schema(
-                type=openapi.TYPE_BOOLEAN,
-                description='Mark all locations as favorite',
-                default=False
-            ),
-            'notify_radius': openapi.Schema(
-                type=openapi.TYPE_NUMBER,
-                description='Notification radius in km',
-                default=1.0
-            )
-        }
-    ),
-    responses={
-        200: openapi.Response(
-            description="Success",
-            schema=openapi.Schema(
-                type=openapi.TYPE_OBJECT,
-                properties={
-                    'saved_locations': openapi.Schema(
-                        type=openapi.TYPE_ARRAY,
-                        items=openapi.Schema(
-                            type=openapi.TYPE_OBJECT,
-                            properties={
-                                'id': openapi.Schema(type=openapi.TYPE_STRING),
-                                'name': openapi.Schema(type=openapi.TYPE_STRING),
-                                'latitude': openapi.Schema(type=openapi.TYPE_NUMBER),
-                                'longitude': openapi.Schema(type=openapi.TYPE_NUMBER),
-                                'description': openapi.Schema(type=openapi.TYPE_STRING),
-                                'category': openapi.Schema(type=openapi.TYPE_STRING),
-                                'is_instagram_source': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                                'instagram_url': openapi.Schema(type=openapi.TYPE_STRING),
-                                'user_location': openapi.Schema(
-                                    type=openapi.TYPE_OBJECT,
-                                    properties={
-                                        'is_favorite': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                                        'notify_radius': openapi.Schema(type=openapi.TYPE_NUMBER)
-                                    }
-                                )
-                            }
-                        )
-                    ),
-                }
-            ),
-            examples={
-                'application/json': {
-                    'saved_locations': [
-                        {
-                            'id': 'loc_123',
-                            'name': 'Grand Canyon',
-                            'latitude': 36.0544,
-                            'longitude': -112.1401,
-                            'category': 'nature',
-                            'is_instagram_source': True,
-                            'user_location': {
-                                'is_favorite': False,
-                                'notify_radius': 1.0
-                            }
-                        }
-                    ],
-                    'metadata': {
-                        'total_saved': 1,
-                        'instagram_url': 'https://www.instagram.com/reel/ABC123/',
-                        'date_processed': '2024-11-19T12:00:00Z'
-                    }
-                }
-            }
-        ),
-        400: 'Bad Request - Invalid URL or parsing error',
-        500: 'Server Error - Save failed'
-    }
-)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def analyze_and_save_reel(request):
@@ -634,105 +455,307 @@ def analyze_and_save_reel(request):
             return Response({'error': 'URL is required'}, status=400)
             
         category = request.data.get('category', 'uncategorized')
-        is_favorite = request.data.get('is_favorite', False)
-        notify_radius = float(request.data.get('notify_radius', 1.0))
+        is_favorite = serializers.BooleanField().to_internal_value(request.data.get('is_favorite', False))
+        notify_radius = clean_notify_radius(request.data.get('notify_radius', 1.0))
         
-        firebase_service = FirebaseService()
-        
-        @async_to_sync
-        async def process_and_save():
-            # First check if URL exists
-            existing = await firebase_service.get_locations_by_instagram_url(url)
-            if existing:
-                return {
-                    'status': 'existing',
-                    'saved_locations': existing,
-                    'metadata': {
-                        'total_saved': len(existing),
-                        'instagram_url': url,
-                        'date_processed': datetime.now().isoformat()
-                    }
-                }
-            
-            # Analyze new URL
-            analyzer = InstagramReelAnalyzer(settings.GOOGLE_API_KEY)
-            result = analyzer.analyze_reel(url)
-            
-            logger.debug(f"Analyzer result: {result}")  # Debug log
-            
-            if not result or not isinstance(result, dict):
-                raise ValueError("Invalid analyzer result format")
-                
-            locations = result.get('locations', [])
-            if not locations:
-                raise ValueError("No locations found in reel")
-            
-            # Prepare locations with user settings
-            locations_to_save = []
-            for loc in locations:
-                if not isinstance(loc, dict):
-                    logger.warning(f"Skipping invalid location data: {loc}")
-                    continue
-                    
-                loc_data = {
-                    **loc,  # Original location data
-                    'latitude': loc.get('coordinates', {}).get('latitude') if loc.get('coordinates') else None,
-                    'longitude': loc.get('coordinates', {}).get('longitude') if loc.get('coordinates') else None,
-                    'user_settings': {
-                        'is_favorite': is_favorite,
-                        'notify_radius': notify_radius,
-                        'category': category
-                    }
-                }
-                locations_to_save.append(loc_data)
-            
-            if not locations_to_save:
-                raise ValueError("No valid locations to save")
-            
-            # Save all locations
-            saved = await firebase_service.save_instagram_locations(
-                locations=locations_to_save,
-                user_id=str(request.user.id),
-                instagram_url=url
-            )
-            
-            return {
-                'status': 'saved',
-                'saved_locations': saved,
-                'metadata': {
-                    'total_saved': len(saved),
-                    'instagram_url': url,
-                    'date_processed': datetime.now().isoformat()
-                }
-            }
-
-        result = process_and_save()
+        result = async_to_sync(ReelService().analyze_and_save)(
+            url=url,
+            user_id=str(request.user.id),
+            category=category,
+            is_favorite=is_favorite,
+            notify_radius=notify_radius
+        )
         return Response(result)
         
+    except ValidationError as e:
+        return Response({'error': e.detail}, status=400)
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
         return Response({'error': str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error processing and saving reel: {str(e)}", exc_info=True)
         return Response({'error': str(e)}, status=500)
-@swagger_auto_schema(
-    method='post',
-    operation_description="Sync local data to Firebase",
-    responses={
-        200: openapi.Response(
-            description="Success",
-            schema=openapi.Schema(
-                type=openapi.TYPE_OBJECT,
-                properties={
-                    'message': openapi.Schema(
-                        type=openapi.TYPE_STRING,
-                        example="Sync completed successfully"
-                    )
-                }
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_reel_job(request):
+    """Queue reel analysis instead of running it inside the request"""
+    try:
+        url = request.data.get('url')
+        if not url:
+            return Response({'error': 'URL is required'}, status=400)
+
+        job = JobQueue().enqueue(
+            'reel_analysis',
+            user=request.user,
+            payload={
+                'url': url,
+                'category': request.data.get('category', 'uncategorized'),
+                # Form posts send 'false'/'0', which bool() would take as True
+                'is_favorite': serializers.BooleanField().to_internal_value(request.data.get('is_favorite', False)),
+                'notify_radius': clean_notify_radius(request.data.get('notify_radius', 1.0))
+            }
+        )
+        return Response({
+            'job_id': str(job.id),
+            'status': job.status,
+            'status_url': request.build_absolute_uri(
+                reverse('core-api:reel-job-status', kwargs={'job_id': job.id})
             )
+        }, status=status.HTTP_202_ACCEPTED)
+
+    except ValidationError as e:
+        return Response({'error': e.detail}, status=400)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Error queueing reel job: {str(e)}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser, FormParser])
+def import_locations(request):
+    """Queue a bulk import of an uploaded locations file"""
+    try:
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'file is required'}, status=400)
+
+        file_format = request.data.get('file_format')
+        if not file_format:
+            extension = upload.name.rsplit('.', 1)[-1].lower()
+            file_format = 'geojson' if extension in ('geojson', 'json') else extension
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {'error': f"Unsupported format, expected one of: {', '.join(IMPORT_FORMATS)}"},
+                status=400
+            )
+
+        path = default_storage.save(f"imports/{uuid.uuid4()}.{file_format}", upload)
+        job = JobQueue().enqueue(
+            'location_import',
+            user=request.user,
+            payload={
+                'path': path,
+                'format': file_format,
+                'filename': upload.name,
+                'category': request.data.get('category', 'uncategorized')
+            }
         )
+        return Response({
+            'job_id': str(job.id),
+            'status': job.status,
+            'status_url': request.build_absolute_uri(
+                reverse('core-api:job-status', kwargs={'job_id': job.id})
+            )
+        }, status=status.HTTP_202_ACCEPTED)
+
+    except Exception as e:
+        logger.error(f"Error queueing location import: {str(e)}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def reel_job_status(request, job_id):
+    """Get status (and result once finished) of a background job"""
+    try:
+        job = BackgroundJob.objects.get(id=job_id, user=request.user)
+    except BackgroundJob.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(serialize_job(job))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_locations(request):
+    """Stream the user's map as a file download"""
+    output = request.query_params.get('output', 'geojson')
+    if output not in EXPORT_FORMATS:
+        return Response(
+            {'error': f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    compress = request.query_params.get('compress') == 'gzip'
+
+    exporter = LocationExportService(request.user)
+    response = StreamingHttpResponse(
+        exporter.iter_bytes(output, compress=compress),
+        content_type='application/gzip' if compress else EXPORT_FORMATS[output][0]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{exporter.filename(output, compress)}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def map_viewport(request):
+    """Clusters or points for the visible part of the map"""
+    try:
+        bbox = parse_bbox(request.query_params.get('bbox'))
+        zoom = int(request.query_params.get('zoom', ''))
+        if not 0 <= zoom <= MAX_ZOOM:
+            raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}")
+        return Response(MapClusterService(request.user).viewport(bbox, zoom))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+SPATIAL_MAX_RESULTS = 100
+
+def _spatial_results(locations, postgis: bool):
+    return {
+        'postgis': postgis,
+        'results': [
+            {
+                'id': str(location.id),
+                'name': location.name,
+                'latitude': location.latitude,
+                'longitude': location.longitude,
+                'category': location.category,
+                'address': location.address,
+                'distance_km': round(location.distance_km, 4) if hasattr(location, 'distance_km') else None
+            }
+            for location in locations
+        ]
     }
-)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def spatial_nearby(request):
+    """Locations of the local mirror near a point: within ``radius`` km, or the ``limit`` nearest"""
+    try:
+        lat = float(request.query_params.get('lat', ''))
+        lng = float(request.query_params.get('lng', ''))
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError("lat/lng out of range")
+        limit = min(int(request.query_params.get('limit', 20)), SPATIAL_MAX_RESULTS)
+        radius = request.query_params.get('radius')
+        if limit < 1 or (radius is not None and float(radius) <= 0):
+            raise ValueError("radius and limit must be positive")
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    spatial = get_spatial_queries()
+    if radius is not None:
+        locations = spatial.within_radius(lat, lng, float(radius), limit=limit)
+    else:
+        locations = spatial.nearest(lat, lng, limit=limit)
+    return Response(_spatial_results(locations, spatial.postgis))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def spatial_search(request):
+    """Name/address search over the local mirror"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(int(request.query_params.get('limit', 20)), SPATIAL_MAX_RESULTS)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    spatial = get_spatial_queries()
+    return Response(_spatial_results(spatial.search(query, limit=max(limit, 1)), spatial.postgis))
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes([ORJSONRenderer, MVTRenderer])
+def location_tile(request, z, x, y):
+    """Serve one vector tile"""
+    scope = request.query_params.get('scope') or ('mine' if request.user.is_authenticated else 'public')
+    if scope not in ('mine', 'public'):
+        return Response({'error': 'scope must be mine or public'}, status=status.HTTP_400_BAD_REQUEST)
+    if scope == 'mine' and not request.user.is_authenticated:
+        raise NotAuthenticated()
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        raise NotFound('Tile out of range')
+
+    service = LocationTileService(request.user if scope == 'mine' else None)
+
+    def render():
+        return HttpResponse(service.render(z, x, y), content_type=mvt.MEDIA_TYPE)
+
+    version = service.version
+    if version is None:
+        return render()
+    if scope == 'public':
+        cache_control = {'public': True, 'max_age': getattr(settings, 'MAP_TILE_MAX_AGE', 300)}
+    else:
+        cache_control = None  # private, revalidate with the ETag
+    return conditional_response(request, version, None, render, cache_control)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes([TileAnonThrottle, TileUserThrottle])
+@renderer_classes([PNGRenderer, ORJSONRenderer])
+def osm_tile(request, z, x, y):
+    """Serve one base map tile from the proxy cache (rate limited, OSM tile policy)"""
+    proxy = get_tile_proxy()
+    if not proxy.in_range(z, x, y):
+        raise NotFound('Tile out of range')
+
+    try:
+        # Neighbours are fetched ahead only for signed-in users, so anonymous
+        # requests cost at most one upstream fetch each
+        tile = proxy.get_tile(z, x, y, prefetch=request.user.is_authenticated)
+    except TileProxyError as e:
+        return Response({'error': str(e)}, status=status.HTTP_502_BAD_GATEWAY)
+
+    # Browsers may keep the tile for as long as the proxy still considers it
+    # fresh; a stale copy served while the upstream is down is not cached
+    max_age = max(int(tile.expires_at - time.time()), 0)
+    last_modified = datetime.fromtimestamp(tile.last_modified) if tile.last_modified else None
+    return conditional_response(
+        request,
+        tile.etag or str(tile.fetched_at),
+        last_modified,
+        lambda: HttpResponse(tile.data, content_type='image/png'),
+        {'public': True, 'max_age': max_age}
+    )
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def report_positions(request):
+    """Evaluate position updates against the user's geofences"""
+    try:
+        positions = parse_positions(request.data, getattr(settings, 'GEOFENCE_MAX_BATCH', 1000))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    engine = get_geofence_engine()
+    user_id = request.user.id
+    events = engine.process((user_id, lat, lng) for lat, lng in positions)
+    return Response({'events': events, 'inside': sorted(engine.inside(user_id))})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([EventStreamRenderer, ORJSONRenderer])
+def location_events(request):
+    """Push location change notifications to the user"""
+    response = StreamingHttpResponse(
+        iter_sse(
+            get_broadcaster(),
+            request.user.id,
+            heartbeat=getattr(settings, 'REALTIME_HEARTBEAT_SECONDS', 15),
+            max_seconds=getattr(settings, 'REALTIME_STREAM_MAX_SECONDS', 600)
+        ),
+        content_type='text/event-stream; charset=utf-8'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def listener_hub_stats(request):
+    """Report realtime listener lag and drops for monitoring"""
+    return Response(get_listener_hub().stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def geocode_cache_stats(request):
+    """Report geocode cache hit ratio for monitoring"""
+    stats = get_geocode_cache().stats()
+    stats['cached_places'] = GeocodeCache.objects.count()
+    return Response(stats)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def save_instagram_locations(request):
@@ -796,14 +819,15 @@ def categories(self, request):
 @permission_classes([IsAuthenticated])
 def sync_to_firebase(request):
     """Sync local data to Firebase"""
+    from .services.sync_service import SyncService
     try:
         sync_service = SyncService()
         
         # Get data to sync
-        locations = Location.objects.filter(sync_status__in=[0, 1])
+        locations = Location.objects.filter(PENDING_SYNC)
         user_locations = UserLocation.objects.filter(
-            user=request.user,
-            sync_status__in=[0, 1]
+            PENDING_SYNC,
+            user=request.user
         )
         
         # Sync locations
@@ -842,6 +866,7 @@ def sync_to_firebase(request):
 @permission_classes([IsAuthenticated])
 def sync_from_firebase(request):
     """Sync data from Firebase to local database"""
+    from .services.sync_service import SyncService
     try:
         sync_service = SyncService()
         success = sync_service.sync_from_firebase(request.user.id)
@@ -874,6 +899,7 @@ def test_firebase_connection(request):
             token = auth_header.split(' ')[1]
             
             try:
+                from firebase_admin import auth
                 decoded_token = auth.verify_id_token(token)
                 return Response({
                     'success': True,
@@ -910,6 +936,7 @@ def test_auth(request):
             token = auth_header.split(' ')[1]
             
             try:
+                from firebase_admin import auth
                 decoded_token = auth.verify_id_token(token)
                 return Response({
                     'success': True,
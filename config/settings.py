@@ -85,17 +85,51 @@ TEMPLATES = [
 # WSGI configuration (Add this)
 WSGI_APPLICATION = 'config.wsgi.application'
 
-# Database configuration
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-        'CONN_MAX_AGE': 600,  # Keep connections alive
-        # 'OPTIONS': {
-        #     'MAX_CONNS': 20
-        # }
-        
+# Database configuration. SQLite by default; DATABASE_ENGINE=postgres uses
+# PostgreSQL (psycopg) so several app nodes can share one mirror. With the
+# postgis and pg_trgm extensions available, migration 0009 adds a geography
+# column and search indexes (apps/core/services/spatial.py). For a local
+# database to run the tests against:
+#   docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgis/postgis
+#   DATABASE_ENGINE=postgres POSTGRES_PASSWORD=postgres python -m pytest
+DATABASE_ENGINE = os.getenv('DATABASE_ENGINE', 'sqlite').lower()
+if DATABASE_ENGINE in ('postgres', 'postgresql', 'postgis'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'memory_map'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': 600,  # Keep connections alive
+            # 'OPTIONS': {
+            #     'MAX_CONNS': 20
+            # }
+
+        }
     }
+
+# PRAGMAs run on every new SQLite connection (apps/core/sqlite_tuning.py).
+# WAL lets web reads go on while SyncManager writes; synchronous=NORMAL is
+# safe in WAL mode (a power cut can lose the last commits, never corrupt).
+# cache_size < 0 is in KiB; busy_timeout in ms; set a value to '' to skip it.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'),
+    'cache_size': os.getenv('SQLITE_CACHE_SIZE', '-65536'),
+    'mmap_size': os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'memory'),
 }
 
 # Password validation
@@ -165,8 +199,32 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'apps.core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Only views that list throttle_classes are limited (see apps/core/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'osm_tile_anon': os.getenv('TILE_ANON_RATE', '120/minute'),
+        'osm_tile_user': os.getenv('TILE_USER_RATE', '1200/minute'),
+    },
 }
 
+# Cursor pagination of location listings (?page_size= is capped at the max)
+LOCATION_PAGE_SIZE = int(os.getenv('LOCATION_PAGE_SIZE', '50'))
+LOCATION_MAX_PAGE_SIZE = int(os.getenv('LOCATION_MAX_PAGE_SIZE', '500'))
+# Lifetime of the per-user location version token behind ETags
+LOCATION_VERSION_TIMEOUT = int(os.getenv('LOCATION_VERSION_TIMEOUT', '86400'))
+# Rows fetched per query when streaming exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+# Locations written per Firebase multi-path update during bulk imports
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '500'))
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -199,6 +257,84 @@ CSRF_TRUSTED_ORIGINS = CORS_ALLOWED_ORIGINS
 # Google API key for Instagram location extraction
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '')
 
+# Background job worker settings (see `manage.py run_job_worker`)
+# Worker concurrency is tuned here independently of web server workers.
+JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', '4'))
+JOB_WORKER_POLL_INTERVAL = float(os.getenv('JOB_WORKER_POLL_INTERVAL', '1.0'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_STALE_TIMEOUT = int(os.getenv('JOB_STALE_TIMEOUT', '600'))  # seconds
+
+# Change capture for the RTDB (see `manage.py run_outbox_dispatcher`).
+# Saves and deletes of locations are queued in the outbox table in the same
+# transaction; one dispatcher pushes them in order, only the changed fields.
+OUTBOX_ENABLED = os.getenv('OUTBOX_ENABLED', 'True').lower() == 'true'
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '500'))
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', '1.0'))
+OUTBOX_MAX_BACKOFF = float(os.getenv('OUTBOX_MAX_BACKOFF', '60'))  # seconds between retries after failures
+# Rejections (not outages) of one RTDB path before its events are parked
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '5'))
+# Events are dispatched once they are this old (seconds). Ids are taken at
+# insert time but, on PostgreSQL, transactions can commit out of that order;
+# waiting lets a slower, older transaction land before newer events are sent.
+OUTBOX_SETTLE_SECONDS = float(os.getenv('OUTBOX_SETTLE_SECONDS', '2'))
+
+# Offline gazetteer used to geocode locations the LLM returns without coordinates.
+# Any GeoNames-format dump works; the binary index is rebuilt when the TSV changes.
+GAZETTEER_PATH = os.getenv('GAZETTEER_PATH', str(BASE_DIR / 'apps' / 'core' / 'data' / 'gazetteer.tsv'))
+GAZETTEER_INDEX_PATH = os.getenv('GAZETTEER_INDEX_PATH', str(Path(GAZETTEER_PATH).with_suffix('.idx')))
+# Entries kept in each process's in-memory front of the GeocodeCache table
+GEOCODE_CACHE_SIZE = int(os.getenv('GEOCODE_CACHE_SIZE', '10000'))
+
+# Map viewport clustering: cells per tile side, zoom from which raw points
+# are returned, most raw points per tile before clustering anyway
+MAP_CLUSTER_GRID = int(os.getenv('MAP_CLUSTER_GRID', '8'))
+MAP_CLUSTER_MAX_ZOOM = int(os.getenv('MAP_CLUSTER_MAX_ZOOM', '16'))
+MAP_TILE_POINT_LIMIT = int(os.getenv('MAP_TILE_POINT_LIMIT', '200'))
+MAP_MAX_VIEWPORT_TILES = int(os.getenv('MAP_MAX_VIEWPORT_TILES', '64'))
+MAP_TILE_CACHE_TIMEOUT = int(os.getenv('MAP_TILE_CACHE_TIMEOUT', '3600'))
+# Vector tiles: coordinate extent and browser cache lifetime of public tiles
+MAP_TILE_EXTENT = int(os.getenv('MAP_TILE_EXTENT', '4096'))
+MAP_TILE_MAX_AGE = int(os.getenv('MAP_TILE_MAX_AGE', '300'))
+
+# OpenStreetMap tile proxy. OSM's usage policy asks heavy users to cache tiles
+# locally and to send a User-Agent that identifies the application.
+TILE_UPSTREAM_URL = os.getenv('TILE_UPSTREAM_URL', 'https://tile.openstreetmap.org/{z}/{x}/{y}.png')
+TILE_PROXY_USER_AGENT = os.getenv('TILE_PROXY_USER_AGENT', 'memory-map-tile-proxy/1.0')
+TILE_CACHE_DIR = os.getenv('TILE_CACHE_DIR', str(BASE_DIR / 'tile_cache'))
+TILE_CACHE_MAX_BYTES = int(os.getenv('TILE_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))
+TILE_CACHE_INDEX_SLOTS = int(os.getenv('TILE_CACHE_INDEX_SLOTS', str(1 << 16)))
+TILE_CACHE_MIN_TTL = int(os.getenv('TILE_CACHE_MIN_TTL', '86400'))  # seconds, floor on upstream max-age
+TILE_UPSTREAM_TIMEOUT = float(os.getenv('TILE_UPSTREAM_TIMEOUT', '10'))
+TILE_MAX_ZOOM = int(os.getenv('TILE_MAX_ZOOM', '19'))
+TILE_PREFETCH_RADIUS = int(os.getenv('TILE_PREFETCH_RADIUS', '1'))  # 0 disables prefetching
+TILE_PREFETCH_WORKERS = int(os.getenv('TILE_PREFETCH_WORKERS', '2'))
+
+# Geofences around notify_enabled saved locations: grid cell size of the
+# per-user index, exit hysteresis as a fraction of the radius, users kept
+# in memory, how often a cached index checks the location version token
+GEOFENCE_CELL_DEGREES = float(os.getenv('GEOFENCE_CELL_DEGREES', '0.05'))
+GEOFENCE_EXIT_MARGIN = float(os.getenv('GEOFENCE_EXIT_MARGIN', '0.1'))
+GEOFENCE_MAX_USERS = int(os.getenv('GEOFENCE_MAX_USERS', '10000'))
+GEOFENCE_REFRESH_SECONDS = float(os.getenv('GEOFENCE_REFRESH_SECONDS', '30'))
+GEOFENCE_MAX_BATCH = int(os.getenv('GEOFENCE_MAX_BATCH', '1000'))
+# Largest notify_radius users may set, and the number of grid cells above
+# which a fence is checked on every position instead of registered per cell
+GEOFENCE_MAX_RADIUS_KM = float(os.getenv('GEOFENCE_MAX_RADIUS_KM', '50'))
+GEOFENCE_MAX_FENCE_CELLS = int(os.getenv('GEOFENCE_MAX_FENCE_CELLS', '1024'))
+
+# Server-Sent Events of location changes. Each open stream holds a worker
+# thread under WSGI, so streams are closed after REALTIME_STREAM_MAX_SECONDS
+# and EventSource reconnects (after REALTIME_RETRY_MS).
+REALTIME_FIREBASE_LISTENER = os.getenv('REALTIME_FIREBASE_LISTENER', 'True').lower() == 'true'
+REALTIME_MAX_PENDING = int(os.getenv('REALTIME_MAX_PENDING', '100'))
+REALTIME_HEARTBEAT_SECONDS = float(os.getenv('REALTIME_HEARTBEAT_SECONDS', '15'))
+REALTIME_STREAM_MAX_SECONDS = float(os.getenv('REALTIME_STREAM_MAX_SECONDS', '600'))
+REALTIME_RETRY_MS = int(os.getenv('REALTIME_RETRY_MS', '3000'))
+# One RTDB stream per path per process; changes are coalesced per key and
+# dispatched by worker threads from a queue of at most this many keys
+LISTENER_HUB_WORKERS = int(os.getenv('LISTENER_HUB_WORKERS', '2'))
+LISTENER_HUB_QUEUE_SIZE = int(os.getenv('LISTENER_HUB_QUEUE_SIZE', '10000'))
+
 # Create necessary directories
 os.makedirs(BASE_DIR / 'logs', exist_ok=True)
 os.makedirs(STATIC_ROOT, exist_ok=True)
@@ -221,7 +357,7 @@ FIREBASE_CONFIG = {
 }
 
 # Make sure your serviceAccountKey.json path is correct
-FIREBASE_ADMIN_SDK_PATH = os.path.join(BASE_DIR, 'secrets', 'serviceAccountKey.json')
+FIREBASE_ADMIN_SDK_PATH = os.getenv('FIREBASE_ADMIN_SDK_PATH', os.path.join(BASE_DIR, 'secrets', 'serviceAccountKey.json'))
 
 try:
     with open(FIREBASE_ADMIN_SDK_PATH) as f:
@@ -231,6 +367,9 @@ except FileNotFoundError:
 
 # Firebase Database Settings
 FIREBASE_DATABASE_URL = "https://memory-map-78ad6-default-rtdb.firebaseio.com"
+# The Admin SDK is initialized on first use; set this to do it while the
+# app loads instead (or call FirebaseService.warm_up() from a post-fork hook)
+FIREBASE_EAGER_INIT = os.getenv('FIREBASE_EAGER_INIT', 'False').lower() == 'true'
 
 # Cache Configuration
 # settings.py